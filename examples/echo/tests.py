@@ -1,7 +1,9 @@
+import os
+import socket
 import unittest
 
-from pulsar import (send, multi_async, new_event_loop, get_application,
-                    run_in_loop, get_event_loop)
+from pulsar import (asyncio, send, multi_async, new_event_loop,
+                    get_application, run_in_loop, get_event_loop, Pool)
 from pulsar.apps.test import dont_run_with_thread
 
 from .manage import server, Echo, EchoServerProtocol
@@ -132,6 +134,132 @@ class TestEchoServerThread(unittest.TestCase):
         self.assertEqual(client.sessions, 3)
         self.assertEqual(client._requests_processed, 8)
 
+    def pool_client(self, **params):
+        client = Echo(self.server_cfg.addresses[0])
+        client.pool = Pool(client.connect, loop=client._loop, **params)
+        return client
+
+    def test_pool_prewarm(self):
+        client = self.pool_client(pool_size=3, min_idle=2)
+        created = yield from client.pool.prewarm()
+        self.assertEqual(created, 2)
+        self.assertEqual(client.pool.available, 2)
+        self.assertEqual(client.sessions, 2)
+        created = yield from client.pool.prewarm()
+        self.assertEqual(created, 0)
+        response = yield from client(b'warm')
+        self.assertEqual(response, b'warm')
+        self.assertEqual(client.sessions, 2)
+        info = client.pool.info()
+        self.assertEqual(info['creations'], 2)
+        self.assertEqual(info['checkouts'], 1)
+        self.assertEqual(info['waits'], 0)
+        client.pool.close()
+
+    def test_pool_idle_timeout(self):
+        client = self.pool_client(idle_timeout=0.2, sweep_interval=0.1)
+        result = yield from multi_async((client(b'ciao'), client(b'foo')))
+        self.assertEqual(len(result), 2)
+        self.assertEqual(client.pool.available, 2)
+        yield from asyncio.sleep(0.5)
+        self.assertEqual(client.pool.available, 0)
+        info = client.pool.info()
+        self.assertEqual(info['evicted']['idle'], 2)
+        self.assertEqual(info['evictions'], 2)
+        client.pool.close()
+
+    def test_pool_min_idle(self):
+        client = self.pool_client(min_idle=1, idle_timeout=0.01,
+                                  sweep_interval=10)
+        result = yield from multi_async((client(b'ciao'), client(b'foo')))
+        self.assertEqual(len(result), 2)
+        yield from asyncio.sleep(0.05)
+        yield from client.pool.sweep()
+        self.assertEqual(client.pool.available, 1)
+        self.assertEqual(client.pool.info()['evicted']['idle'], 1)
+        client.pool.close()
+
+    def test_pool_max_lifetime(self):
+        client = self.pool_client(max_lifetime=10, sweep_interval=10)
+        response = yield from client(b'ciao')
+        self.assertEqual(response, b'ciao')
+        self.assertEqual(client.pool.available, 1)
+        self._age_connections(client.pool, 20)
+        # expired connections are recycled at checkout
+        response = yield from client(b'ciao')
+        self.assertEqual(response, b'ciao')
+        self.assertEqual(client.sessions, 2)
+        self.assertEqual(client.pool.info()['evicted']['lifetime'], 1)
+        # and when released
+        connection = yield from client.pool.connect()
+        self._age_connections(client.pool, 20)
+        connection.close()
+        self.assertEqual(client.pool.available, 0)
+        self.assertEqual(client.pool.info()['evicted']['lifetime'], 2)
+        client.pool.close()
+
+    def _age_connections(self, pool, seconds):
+        for connection in pool._created:
+            pool._created[connection] -= seconds
+
+    def test_pool_health_check(self):
+        checked = []
+
+        def health_check(connection):
+            checked.append(connection)
+            yield None
+            return len(checked) > 1
+
+        client = self.pool_client(health_check=health_check,
+                                  sweep_interval=10)
+        response = yield from client(b'ciao')
+        self.assertEqual(response, b'ciao')
+        yield from client.pool.sweep()
+        self.assertEqual(len(checked), 1)
+        self.assertEqual(client.pool.available, 0)
+        self.assertEqual(client.pool.in_use, 0)
+        self.assertEqual(client.pool.info()['evicted']['health'], 1)
+        response = yield from client(b'ciao')
+        self.assertEqual(response, b'ciao')
+        yield from client.pool.sweep()
+        self.assertEqual(len(checked), 2)
+        self.assertEqual(client.pool.available, 1)
+        self.assertEqual(client.sessions, 2)
+        client.pool.close()
+
+    def test_pool_health_check_idle_timeout(self):
+        # health checks do not reset the idle time of connections
+        checked = []
+
+        def health_check(connection):
+            checked.append(connection)
+            return True
+
+        client = self.pool_client(health_check=health_check,
+                                  idle_timeout=0.2, sweep_interval=0.05)
+        response = yield from client(b'ciao')
+        self.assertEqual(response, b'ciao')
+        self.assertEqual(client.pool.available, 1)
+        yield from asyncio.sleep(0.5)
+        self.assertTrue(checked)
+        self.assertEqual(client.pool.available, 0)
+        self.assertEqual(client.pool.info()['evicted']['idle'], 1)
+        client.pool.close()
+
+    def test_pool_waits(self):
+        client = self.pool_client(pool_size=1)
+        result = yield from multi_async((client(b'ciao'),
+                                         client(b'pippo'),
+                                         client(b'foo')))
+        self.assertEqual(len(result), 3)
+        info = client.pool.info()
+        self.assertEqual(info['checkouts'], 3)
+        self.assertEqual(info['creations'], 1)
+        self.assertEqual(info['waits'], 2)
+        self.assertTrue(info['wait_time'] > 0)
+        self.assertEqual(sum(info['wait_histogram'].values()), 2)
+        client.pool.close()
+
     def _drop_conection(self, client):
         conn1 = client.pool._queue.get_nowait()
         conn1.close()
@@ -162,3 +290,49 @@ class TestEchoServerProcess(TestEchoServerThread):
         self.assertEqual(echo.sessions, 1)
         self.assertEqual(echo(b'ciao!'), b'ciao!')
         self.assertEqual(echo.sessions, 2)
+
+
+@dont_run_with_thread
+@unittest.skipUnless(hasattr(socket, 'SO_REUSEPORT'), 'Requires SO_REUSEPORT')
+class TestEchoServerReusePort(TestEchoServerProcess):
+
+    @classmethod
+    def setUpClass(cls):
+        s = server(name=cls.__name__.lower(), bind='127.0.0.1:0',
+                   backlog=1024, concurrency=cls.concurrency,
+                   workers=2, reuse_port=True)
+        cls.server_cfg = yield from send('arbiter', 'run', s)
+        cls.client = Echo(cls.server_cfg.addresses[0])
+
+    def test_reuse_port(self):
+        app = yield from get_application(self.__class__.__name__.lower())
+        self.assertTrue(app.cfg.reuse_port)
+        self.assertNotEqual(app.cfg.addresses[0][1], 0)
+
+
+@dont_run_with_thread
+@unittest.skipUnless(hasattr(os, 'fork'), 'Requires os.fork')
+class TestEchoServerZygote(TestEchoServerProcess):
+
+    @classmethod
+    def setUpClass(cls):
+        s = server(name=cls.__name__.lower(), bind='127.0.0.1:0',
+                   backlog=1024, concurrency=cls.concurrency,
+                   workers=2, zygote=True)
+        cls.server_cfg = yield from send('arbiter', 'run', s)
+        cls.client = Echo(cls.server_cfg.addresses[0])
+
+    def test_zygote(self):
+        yield from self.test_ping()
+        info = yield from send(self.server_cfg.name, 'info')
+        spawning = info['spawning']
+        self.assertTrue(spawning['zygote'])
+        for _ in range(20):
+            if spawning['start_latency']:
+                break
+            yield from asyncio.sleep(0.5)
+            info = yield from send(self.server_cfg.name, 'info')
+            spawning = info['spawning']
+        self.assertTrue(spawning['start_latency'] > 0)
+        self.assertTrue(spawning['max_start_latency'] >=
+                        spawning['start_latency'])
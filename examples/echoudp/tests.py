@@ -1,3 +1,4 @@
+import socket
 import unittest
 
 from pulsar import send, new_event_loop, get_application
@@ -60,3 +61,15 @@ class TestEchoUdpServerProcess(TestEchoUdpServerThread):
         echo = self.sync_client()
         self.assertEqual(echo(b'ciao!'), b'ciao!')
         self.assertEqual(echo(b'fooooooooooooo!'),  b'fooooooooooooo!')
+
+
+@dont_run_with_thread
+@unittest.skipUnless(hasattr(socket, 'SO_REUSEPORT'), 'Requires SO_REUSEPORT')
+class TestEchoUdpServerReusePort(TestEchoUdpServerProcess):
+
+    @classmethod
+    def setUpClass(cls):
+        s = server(name=cls.__name__.lower(), bind='127.0.0.1:0',
+                   concurrency=cls.concurrency, workers=2, reuse_port=True)
+        cls.server_cfg = yield from send('arbiter', 'run', s)
+        cls.client = Echo(cls.server_cfg.addresses[0])
@@ -116,7 +116,9 @@ cdef class RedisParser:
         b = self._inbuffer
         cdef int length = b.find(b'\r\n')
         if length >= 0:
-            self._inbuffer, response = b[length+2:], bytes(b[:length])
+            # consume the buffer in place
+            response = bytes(b[:length])
+            del b[:length+2]
             rtype, response = response[:1], response[1:]
             if rtype == RESPONSE_ERROR:
                 return self._responseError(response.decode('utf-8'))
@@ -160,7 +162,14 @@ cdef class Task:
         if length >= 0:
             b = parser._inbuffer
             if len(b) >= length+2:
-                parser._inbuffer, chunk = b[length+2:], bytes(b[:length])
+                # consume the buffer in place, without the intermediate
+                # copy of large values
+                if length < 1024:
+                    chunk = bytes(b[:length])
+                else:
+                    with memoryview(b) as view:
+                        chunk = view[:length].tobytes()
+                del b[:length+2]
                 if parser._encoding:
                     return chunk.decode(parser._encoding)
                 else:
@@ -153,6 +153,17 @@ cdef class FrameParser:
         return self._encode(data, opcode, masking_key, fin,
                             rsv1, rsv2, rsv3)
 
+    def encode_buffers(self, message, final=True, bytes masking_key=None,
+                       opcode=None, int rsv1=0, int rsv2=0, int rsv3=0):
+        '''Same as :meth:`encode` but return the frame as a tuple of
+        buffers, the frame header and the payload.
+        '''
+        cdef bytes data
+        cdef int fin = 1 if final else 0
+        opcode, masking_key, data = self._info(message, opcode, masking_key)
+        return self._encode_buffers(data, opcode, masking_key, fin,
+                                    rsv1, rsv2, rsv3)
+
     def multi_encode(self, message, bytes masking_key=None, opcode=None,
                      int rsv1=0, int rsv2=0, int rsv3=0,
                      cython.ulonglong max_payload=0):
@@ -175,7 +186,7 @@ cdef class FrameParser:
             yield self._encode(chunk, opcode, masking_key, fin,
                                rsv1, rsv2, rsv3)
 
-    def decode(self, bytes data=None):
+    def decode(self, data=None):
         cdef int fin, rsv1, rsv2, rsv3, opcode, payload_length
         cdef Frame frame = self.frame
         cdef int mask_length = self._decode_mask_length
@@ -247,6 +258,12 @@ cdef class FrameParser:
 
     cdef bytes _encode(self, bytes data, int opcode, bytes masking_key,
                        int fin, int rsv1, int rsv2, int rsv3):
+        return b''.join(self._encode_buffers(data, opcode, masking_key, fin,
+                                             rsv1, rsv2, rsv3))
+
+    cdef tuple _encode_buffers(self, bytes data, int opcode,
+                               bytes masking_key, int fin, int rsv1,
+                               int rsv2, int rsv3):
         cdef object buffer = bytearray()
         cdef cython.longlong length = len(data)
         cdef int mask_bit = 128 if masking_key else 0
@@ -266,11 +283,9 @@ cdef class FrameParser:
             raise self.ProtocolError('WEBSOCKET frame too large')
         if masking_key:
             buffer.extend(masking_key)
-            buffer.extend(websocket_mask(data, masking_key,
-                                         length, len(masking_key)))
-        else:
-            buffer.extend(data)
-        return bytes(buffer)
+            data = websocket_mask(data, masking_key,
+                                  length, len(masking_key))
+        return bytes(buffer), data
 
     cdef tuple _info(self, message, opcode, bytes masking_key):
         cdef int mask_length = self._encode_mask_length
@@ -294,6 +309,13 @@ cdef class FrameParser:
         return opcode, masking_key, data
 
     cdef bytes _chunk(self, int length):
-        cdef bytes chunk = bytes(self.buffer[:length])
-        self.buffer = self.buffer[length:]
+        cdef bytes chunk
+        # consume the buffer in place, rather than copying its remainder,
+        # and avoid the intermediate copy of large chunks
+        if length < 1024:
+            chunk = bytes(self.buffer[:length])
+        else:
+            with memoryview(self.buffer) as view:
+                chunk = view[:length].tobytes()
+        del self.buffer[:length]
         return chunk
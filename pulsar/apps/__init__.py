@@ -484,6 +484,14 @@ class Application(Configurator):
         '''Added to the ``stopping`` :ref:`worker hook <actor-hooks>`.'''
         pass
 
+    def zygote_start(self, zygote):
+        '''Callback by the :class:`.Zygote` process before forking workers.
+
+        Load here what workers can share, it is loaded once only when the
+        :ref:`zygote <setting-zygote>` setting is on.
+        '''
+        pass
+
     # MONITOR CALLBACKS
     def actorparams(self, monitor, params=None):
         '''Hook to add additional entries when the monitor spawn new actors.
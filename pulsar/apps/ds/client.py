@@ -174,8 +174,12 @@ class PulsarStoreClient(pulsar.Protocol, ClientMixin):
     def reply_bulk(self, value=None):
         if value is None:
             self._write(self.store.NIL)
-        else:
+        elif len(value) < self.sendmsg_size:
             self._write(self.store._parser.bulk(value))
+        else:
+            # large values are not copied into the reply
+            self._writelines((('$%d\r\n' % len(value)).encode('utf-8'),
+                              value, b'\r\n'))
 
     def reply_multi_bulk(self, value=None):
         self._write(self.store._parser.multi_bulk(value))
@@ -197,8 +201,14 @@ class PulsarStoreClient(pulsar.Protocol, ClientMixin):
     def _write(self, response):
         if self.transaction is not None:
             self.transaction.append(response)
-        elif not self._transport._closing:
-            self._transport.write(response)
+        elif not self._transport.is_closing():
+            self.write(response)
+
+    def _writelines(self, buffers):
+        if self.transaction is not None:
+            self.transaction.append(b''.join(buffers))
+        elif not self._transport.is_closing():
+            self.writelines(buffers)
 
 
 class Blocked:
@@ -24,7 +24,14 @@ class String(object):
         if length >= 0:
             b = parser._inbuffer
             if len(b) >= length+2:
-                parser._inbuffer, chunk = b[length+2:], bytes(b[:length])
+                # consume the buffer in place, without the intermediate
+                # copy of large values
+                if length < 1024:
+                    chunk = bytes(b[:length])
+                else:
+                    with memoryview(b) as view:
+                        chunk = view[:length].tobytes()
+                del b[:length+2]
                 if parser.encoding:
                     return chunk.decode(parser.encoding)
                 else:
@@ -170,7 +177,9 @@ class Parser(object):
         b = self._inbuffer
         length = b.find(b'\r\n')
         if length >= 0:
-            self._inbuffer, response = b[length+2:], bytes(b[:length])
+            # consume the buffer in place
+            response = bytes(b[:length])
+            del b[:length+2]
             rtype, response = response[:1], response[1:]
             if rtype == b'-':
                 return self.responseError(response.decode('utf-8'))
@@ -2390,7 +2390,7 @@ class Storage(object):
 
     def _client_info(self, client):
         yield 'addr=%s:%s' % client._transport.get_extra_info('addr')
-        yield 'fd=%s' % client._transport._sock_fd
+        yield 'fd=%s' % client._transport.get_extra_info('socket').fileno()
         yield 'age=%s' % int(time.time() - client.started)
         yield 'db=%s' % client.database
         yield 'sub=%s' % len(client.channels)
@@ -2441,7 +2441,7 @@ class Storage(object):
         count = 0
         for client in clients:
             try:
-                client._transport.write(msg)
+                client.write(msg)
                 count += 1
             except Exception:
                 remove.add(client)
@@ -44,6 +44,16 @@ To specify the maximum number of queued connections you can use the
 
 rarely used.
 
+reuse_port
+---------------
+To let each worker bind its own listening socket with ``SO_REUSEPORT``
+rather than sharing the socket created by the arbiter, use the
+:ref:`reuse-port <setting-reuse_port>` flag::
+
+    python script.py --reuse-port
+
+The kernel then distributes new connections evenly across workers.
+
 keep_alive
 ---------------
 To control how long a server :class:`.Connection` is kept alive after the
@@ -54,6 +64,16 @@ last read from the remote client, one can use the
 
 will close client connections which have been idle for 10 seconds.
 
+write_buffer_budget
+-----------------------
+To limit the memory used by data waiting to be sent to slow clients, use
+the :ref:`write-buffer-budget <setting-write_buffer_budget>` and
+:ref:`write-buffer-policy <setting-write_buffer_policy>` settings::
+
+    python script.py --write-buffer-budget 67108864 --write-buffer-policy drop
+
+will close the slowest clients of a worker once more than 64MB are buffered.
+
 .. _socket-server-ssl:
 
 TLS/SSL support
@@ -76,6 +96,10 @@ and then spawn several process-based actors which listen on the
 same shared socket.
 This is how pre-forking servers operate.
 
+With the :ref:`reuse-port <setting-reuse_port>` setting each worker binds
+its own socket to the same address instead, so that only one worker is woken
+for each new connection.
+
 When running a :class:`SocketServer` in threading mode::
 
     python script.py --concurrency thread
@@ -103,8 +127,9 @@ from functools import partial
 
 import pulsar
 from pulsar import (asyncio, TcpServer, DatagramServer, Connection,
-                    ImproperlyConfigured)
-from pulsar.utils.internet import parse_address, SSLContext
+                    ImproperlyConfigured, add_errback)
+from pulsar.utils.internet import (parse_address, SSLContext,
+                                   reuse_port_sockets, inherited_sockets)
 from pulsar.utils.config import pass_through
 
 
@@ -155,6 +180,73 @@ class Backlog(SocketSetting):
         """
 
 
+class ReusePort(SocketSetting):
+    name = "reuse_port"
+    flags = ["--reuse-port"]
+    validator = pulsar.validate_bool
+    action = "store_true"
+    default = False
+    desc = """\
+        Bind a separate socket in each worker with the ``SO_REUSEPORT``
+        option.
+
+        By default workers share the sockets created by the arbiter and all
+        of them are woken up when a new connection arrives. With this option
+        the kernel distributes connections (or datagrams) across workers.
+        Requires a platform supporting ``SO_REUSEPORT`` (Linux 3.9 or above)
+        and it is ignored when there are no workers.
+        """
+
+
+class WriteBufferBudget(SocketSetting):
+    name = "write_buffer_budget"
+    flags = ["--write-buffer-budget"]
+    validator = pulsar.validate_pos_int
+    type = int
+    default = 0
+    desc = """\
+        The maximum number of bytes waiting in the write buffers of all
+        client connections of a worker.
+
+        When the budget is exceeded the
+        :ref:`write_buffer_policy <setting-write_buffer_policy>` is applied
+        until buffers drain. If this is set to zero (the default) write
+        buffers are not tracked.
+        """
+
+
+class WriteBufferPolicy(SocketSetting):
+    name = "write_buffer_policy"
+    flags = ["--write-buffer-policy"]
+    choices = ('pause', 'drop', 'reject')
+    default = "pause"
+    desc = """\
+        What to do when the :ref:`write_buffer_budget
+        <setting-write_buffer_budget>` is exceeded.
+
+        ``pause`` stops reading from clients and makes writes wait until
+        buffers drain, ``drop`` closes the clients with the largest write
+        buffers and ``reject`` closes new connections.
+        """
+
+
+class DrainTimeout(SocketSetting):
+    name = "drain_timeout"
+    flags = ["--drain-timeout"]
+    validator = pulsar.validate_pos_float
+    type = float
+    default = 3
+    desc = """\
+        The number of seconds a stopping worker waits for client connections
+        to finish their current request.
+
+        Workers stop accepting new connections, close idle ones and close
+        the others once their request is processed. Connections still open
+        after this timeout are closed. If set to zero connections are
+        closed at once.
+        """
+
+
 class KeyFile(SocketSetting):
     name = "key_file"
     flags = ["--key-file"]
@@ -175,19 +267,19 @@ class CertFile(SocketSetting):
     """
 
 
-class WrapTransport:
+def reuse_port(cfg):
+    '''``True`` when workers should bind their own sockets.'''
+    return bool(cfg.reuse_port and cfg.workers)
 
-    def __init__(self, transport):
-        self.extra = transport._extra
-        self.sock = self.extra.pop('socket')
-        self.transport = transport.__class__
-        # For some reasons if we don't delete the _sock from the
-        # transport, it get closed by python garbadge collector
-        # on python 3.4.3 mac os x
-        del transport._sock
 
-    def __call__(self, loop, protocol):
-        return self.transport(loop, self.sock, protocol, extra=self.extra)
+def bind_reuse_port(address, type):
+    try:
+        return reuse_port_sockets(address, type)
+    except NotImplementedError:
+        raise ImproperlyConfigured('reuse_port is not supported by this '
+                                   'platform')
+    except socket.error as e:
+        raise ImproperlyConfigured(e)
 
 
 class SocketServer(pulsar.Application):
@@ -199,9 +291,15 @@ class SocketServer(pulsar.Application):
     .. attribute:: address
 
         The socket address, available once the application has started.
+
+    .. attribute:: drain_report
+
+        Interval, in seconds, at which draining workers notify their monitor
+        with the number of connections left.
     '''
     name = 'socket'
     cfg = pulsar.Config(apps=['socket'])
+    drain_report = 0.5
 
     def protocol_factory(self):
         '''Factory of :class:`.ProtocolConsumer` used by the server.
@@ -234,6 +332,21 @@ class SocketServer(pulsar.Application):
                                            cfg.key_file)
             ssl = SSLContext(keyfile=cfg.key_file, certfile=cfg.cert_file)
         address = parse_address(self.cfg.address)
+        monitor.ssl = ssl
+        if reuse_port(cfg):
+            # Workers bind their own sockets. The monitor keeps the address
+            # reserved with sockets which are bound but not listening.
+            sockets = bind_reuse_port(address, socket.SOCK_STREAM)
+            monitor.reserved_sockets = sockets
+            monitor.sockets = None
+            cfg.addresses = [sock.getsockname() for sock in sockets]
+            return
+        # Sockets passed by the arbiter this one is reloading
+        sockets = inherited_sockets(self.name)
+        if sockets:
+            monitor.sockets = sockets
+            cfg.addresses = [sock.getsockname() for sock in sockets]
+            return
         # First create the sockets
         try:
             server = yield from loop.create_server(asyncio.Protocol, *address)
@@ -247,24 +360,51 @@ class SocketServer(pulsar.Application):
                 sockets.append(sock)
                 loop.remove_reader(sock.fileno())
             monitor.sockets = sockets
-            monitor.ssl = ssl
             cfg.addresses = addresses
 
     def actorparams(self, monitor, params):
         params.update({'sockets': monitor.sockets, 'ssl': monitor.ssl})
 
+    def monitor_stopping(self, monitor):
+        for sock in getattr(monitor, 'reserved_sockets', None) or ():
+            sock.close()
+
+    def worker_sockets(self, worker, type=socket.SOCK_STREAM):
+        '''The sockets a ``worker`` serves.
+
+        These are the sockets created by the monitor, unless the
+        :ref:`reuse-port <setting-reuse_port>` setting is on, in which case
+        the worker binds new sockets to the monitor :attr:`cfg.addresses`.
+        '''
+        sockets = worker.sockets
+        if sockets is None and reuse_port(self.cfg):
+            sockets = []
+            for address in self.cfg.addresses:
+                sockets.extend(bind_reuse_port(address[:2], type))
+        return sockets
+
     def worker_start(self, worker, exc=None):
         '''Start the worker by invoking the :meth:`create_server` method.
+
+        Once the server reaches its ``max_requests``, a worker managed by a
+        monitor asks it to be replaced via the
+        :ref:`retire command <actor_retire_command>` and keeps serving
+        until the monitor stops it.
         '''
         if not exc:
             server = self.create_server(worker)
             server.bind_event('stop', lambda _, **kw: worker.stop())
+            if not worker.is_monitor():
+                server.bind_event('retire', partial(self._retire, worker))
             worker.servers[self.name] = server
 
     def worker_stopping(self, worker, exc=None):
         server = worker.servers.get(self.name)
         if server:
-            return server.close()
+            closed = server.close()
+            if not worker.is_monitor():
+                self._report_drain(worker, server)
+            return closed
 
     def worker_info(self, worker, info):
         server = worker.servers.get(self.name)
@@ -278,23 +418,41 @@ class SocketServer(pulsar.Application):
         return TcpServer(*args, **kw)
 
     #   INTERNALS
+    def _retire(self, worker, server, exc=None):
+        ack = worker.send('monitor', 'retire')
+        # without a monitor to replace the worker, stop serving
+        add_errback(ack, lambda exc: server.close())
+
+    def _report_drain(self, worker, server):
+        # notify the monitor of the connections left while draining
+        if not server.fired_event('stop'):
+            if server.draining:
+                worker.send('monitor', 'notify', None,
+                            {'draining': server.connected_clients})
+            worker._loop.call_later(self.drain_report, self._report_drain,
+                                    worker, server)
+
     def create_server(self, worker):
         '''Create the Server which will listen for requests.
 
         :return: a :class:`.TcpServer`.
         '''
-        sockets = worker.sockets
+        sockets = self.worker_sockets(worker)
         cfg = self.cfg
         max_requests = cfg.max_requests
         if max_requests:
             max_requests = int(lognormvariate(log(max_requests), 0.2))
-        server = self.server_factory(self.protocol_factory(),
-                                     worker._loop,
-                                     sockets=sockets,
-                                     max_requests=max_requests,
-                                     keep_alive=cfg.keep_alive,
-                                     name=self.name,
-                                     logger=self.logger)
+        server = self.server_factory(
+            self.protocol_factory(),
+            worker._loop,
+            sockets=sockets,
+            max_requests=max_requests,
+            keep_alive=cfg.keep_alive,
+            name=self.name,
+            logger=self.logger,
+            write_buffer_budget=cfg.write_buffer_budget,
+            write_buffer_policy=cfg.write_buffer_policy,
+            drain_timeout=cfg.drain_timeout)
         for event in ('connection_made', 'pre_request', 'post_request',
                       'connection_lost'):
             callback = getattr(cfg, event)
@@ -337,13 +495,30 @@ class UdpSocketServer(SocketServer):
             raise pulsar.ImproperlyConfigured('Could not open a socket. '
                                               'No address to bind to')
         address = parse_address(self.cfg.address)
-        # First create the sockets
-        t, _ = yield from loop.create_datagram_endpoint(
-            asyncio.DatagramProtocol, address)
-        sock = t.get_extra_info('socket')
-        assert loop.remove_reader(sock.fileno())
+        if reuse_port(cfg):
+            # Resolve the address and let workers bind their own sockets.
+            # A bound UDP socket receives datagrams, do not keep it open.
+            sockets = bind_reuse_port(address, socket.SOCK_DGRAM)
+            cfg.addresses = [sock.getsockname() for sock in sockets]
+            for sock in sockets:
+                sock.close()
+            monitor.sockets = None
+            return
+        sockets = inherited_sockets(self.name)
+        if sockets:
+            cfg.addresses = [sock.getsockname() for sock in sockets]
+            monitor.sockets = sockets
+            return
+        # First create the socket, served by the workers
+        infos = yield from loop.getaddrinfo(*address, type=socket.SOCK_DGRAM)
+        family, kind, proto, _, address = infos[0]
+        sock = socket.socket(family, kind, proto)
+        if os.name == 'posix':
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(address)
+        sock.setblocking(False)
         cfg.addresses = [sock.getsockname()]
-        monitor.sockets = [WrapTransport(t)]
+        monitor.sockets = [sock]
 
     def actorparams(self, monitor, params):
         params.update({'sockets': monitor.sockets})
@@ -363,9 +538,12 @@ class UdpSocketServer(SocketServer):
         max_requests = cfg.max_requests
         if max_requests:
             max_requests = int(lognormvariate(log(max_requests), 0.2))
+        sockets = worker.sockets
+        if sockets is None and reuse_port(cfg):
+            sockets = self.worker_sockets(worker, socket.SOCK_DGRAM)
         server = self.server_factory(self.protocol_factory(),
                                      worker._loop,
-                                     sockets=worker.sockets,
+                                     sockets=sockets,
                                      max_requests=max_requests,
                                      name=self.name,
                                      logger=self.logger)
@@ -28,6 +28,9 @@ class DummyTransport(asyncio.Transport):
 server :attr:`connection`.'''
         self.connection.data_received(data)
 
+    def is_closing(self):
+        return False
+
     @property
     def address(self):
         return self.connection.address
@@ -75,8 +75,9 @@ class WebSocketProtocol(ProtocolConsumer):
     def write(self, message, opcode=None, encode=True, **kw):
         '''Write a new ``message`` into the wire.
 
-        It uses the :meth:`~.FrameParser.encode` method of the
-        websocket :attr:`parser`.
+        It uses the :meth:`~.FrameParser.encode_buffers` method of the
+        websocket :attr:`parser` so that the ``message`` is not copied
+        into the frame.
 
         :param message: message to send, must be a string or bytes
         :param opcode: optional ``opcode``, if not supplied it is set to 1
@@ -84,8 +85,10 @@ class WebSocketProtocol(ProtocolConsumer):
             are bytes.
          '''
         if encode:
-            message = self.parser.encode(message, opcode=opcode, **kw)
-        result = super().write(message)
+            buffers = self.parser.encode_buffers(message, opcode=opcode, **kw)
+            result = super().writelines(buffers)
+        else:
+            result = super().write(message)
         if opcode == 0x8:
             self.finished()
         return result
@@ -105,6 +108,11 @@ class WebSocketProtocol(ProtocolConsumer):
         '''
         return self.write(self.parser.close(code), opcode=0x8, encode=False)
 
+    def drain(self):
+        '''Write a close frame with the ``1001`` (going away) code.
+        '''
+        return self.write_close(1001)
+
     def _on(self, handler, frame):
         maybe_async(handler(self, frame.body), loop=self._loop)
 
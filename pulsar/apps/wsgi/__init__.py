@@ -55,6 +55,7 @@ WSGI Server
 .. _`WSGI 1.0.1`: http://www.python.org/dev/peps/pep-3333/
 .. _`c10k problem`: http://en.wikipedia.org/wiki/C10k_problem
 """
+import logging
 from functools import partial
 
 import pulsar
@@ -63,8 +64,11 @@ from pulsar.apps.socket import SocketServer, Connection
 from .html import *         # noqa
 from .content import *      # noqa
 from .utils import *        # noqa
+from .files import *        # noqa
 from .middleware import *   # noqa
 from .response import *     # noqa
+from .cache import *        # noqa
+from .access import *       # noqa
 from .wrappers import *     # noqa
 from .server import *       # noqa
 from .route import *        # noqa
@@ -73,11 +77,99 @@ from .routers import *      # noqa
 from .auth import *         # noqa
 
 
+class WsgiSetting(pulsar.Setting):
+    virtual = True
+    app = 'wsgi'
+    section = "WSGI Servers"
+
+
+class HttpBodyBuffer(WsgiSetting):
+    name = "http_body_buffer"
+    flags = ["--http-body-buffer"]
+    validator = pulsar.validate_pos_int
+    type = int
+    default = 2**18
+    desc = """\
+        The maximum number of bytes of a request body buffered while the
+        application has not read them.
+
+        When the buffer is full the server stops reading from the client
+        until the application consumes the body. Reading the whole body
+        with the ``read`` method of the ``wsgi.input`` lifts the limit.
+        If set to zero reading is never paused.
+        """
+
+
+class HttpMaxBodySize(WsgiSetting):
+    name = "http_max_body_size"
+    flags = ["--http-max-body-size"]
+    validator = pulsar.validate_pos_int
+    type = int
+    default = 0
+    desc = """\
+        The maximum size in bytes of a request body.
+
+        Requests with a larger ``Content-Length`` receive a ``413``
+        response without invoking the application, chunked bodies exceeding
+        the limit result in a ``413`` error when the application reads
+        them. If set to zero (the default) the size is not limited.
+        """
+
+
+class HttpPipelineDepth(WsgiSetting):
+    name = "http_pipeline_depth"
+    flags = ["--http-pipeline-depth"]
+    validator = pulsar.validate_pos_int
+    type = int
+    default = 16
+    desc = """\
+        The maximum number of pipelined requests of a connection processed
+        concurrently.
+
+        ``GET``, ``HEAD``, ``OPTIONS`` and ``TRACE`` requests sent by a
+        client before receiving the responses of its previous requests
+        are processed as soon as they are received, other requests wait
+        for the responses before them. Responses are always written in
+        the order of their requests. If set to one or zero requests are
+        processed one at a time.
+        """
+
+
+class AccessLogFormat(WsgiSetting):
+    name = "access_log"
+    flags = ["--access-log"]
+    choices = ('common', 'combined', 'json')
+    default = None
+    desc = """\
+        The format of the :ref:`access log <wsgi-access-log>`.
+
+        When set, requests are logged by a background thread of each worker
+        in batches, with their response time and the number of bytes of
+        the response body. If not set (the default) each request is logged
+        by the event loop once its response is written.
+        """
+
+
+class AccessLogBuffer(WsgiSetting):
+    name = "access_log_buffer"
+    flags = ["--access-log-buffer"]
+    validator = pulsar.validate_pos_int
+    type = int
+    default = 8192
+    desc = """\
+        The maximum number of requests waiting to be written to the
+        :ref:`access log <wsgi-access-log>` of a worker.
+
+        Requests served while the buffer is full are not logged, their
+        number is reported in the ``access_log`` info of the worker.
+        """
+
+
 class WSGIServer(SocketServer):
     '''A WSGI :class:`.SocketServer`.
     '''
     name = 'wsgi'
-    cfg = pulsar.Config(apps=['socket'],
+    cfg = pulsar.Config(apps=['socket', 'wsgi'],
                         server_software=pulsar.SERVER_SOFTWARE)
 
     def protocol_factory(self):
@@ -85,3 +177,29 @@ class WSGIServer(SocketServer):
         consumer_factory = partial(HttpServerResponse, cfg.callable, cfg,
                                    cfg.server_software)
         return partial(Connection, consumer_factory)
+
+    def worker_start(self, worker, exc=None):
+        '''Start the :class:`.AccessLog` of the worker server when the
+        :ref:`access_log <setting-access_log>` setting is given.'''
+        super().worker_start(worker, exc)
+        server = worker.servers.get(self.name)
+        if server and self.cfg.access_log:
+            logger = logging.getLogger('pulsar.%s.access' % self.name)
+            access_log = AccessLog(self.cfg.access_log, logger,
+                                   maxsize=self.cfg.access_log_buffer)
+            access_log.start()
+            server.access_log = access_log
+            server.bind_event('stop', lambda _, **kw: access_log.stop())
+
+    def worker_info(self, worker, info):
+        info = super().worker_info(worker, info)
+        server = worker.servers.get(self.name)
+        access_log = getattr(server, 'access_log', None)
+        if access_log:
+            info['access_log'] = access_log.info()
+        return info
+
+    def zygote_start(self, zygote):
+        '''Load the :class:`.LazyWsgi` handler before forking workers.'''
+        if isinstance(self.cfg.callable, LazyWsgi):
+            self.cfg.callable.handler()
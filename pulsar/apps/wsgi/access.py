@@ -0,0 +1,224 @@
+'''Access log of the WSGI server.
+
+.. _wsgi-access-log:
+
+Access Log
+=====================
+
+When the :ref:`access_log <setting-access_log>` setting is given, each
+worker of a :class:`.WSGIServer` records the requests it serves in an
+:class:`AccessLog` rather than logging them as they complete.
+Requests are added to a buffer by the event loop and a background thread
+formats and logs them in batches, so that the event loop never waits for
+a log handler.
+
+Each batch is a single record of the ``<logger>.access`` logger
+(``pulsar.wsgi.access`` for a :class:`.WSGIServer` named ``wsgi``) with
+one line per request. Configure this logger with a ``%(message)s``
+formatter, via the :ref:`logconfig <setting-logconfig>` setting, to write
+a plain access log file.
+
+Lines are in one of the following formats:
+
+* ``common`` the Common Log Format followed by the response time in
+  seconds::
+
+    127.0.0.1 - - [10/Oct/2015:13:55:36 +0000] "GET / HTTP/1.1" 200 12 0.000412
+
+* ``combined`` the Combined Log Format, the ``common`` format with the
+  ``Referer`` and ``User-Agent`` headers, followed by the response time.
+* ``json`` a JSON object per line.
+
+.. autoclass:: AccessLog
+   :members:
+   :member-order: bysource
+'''
+import json
+import time
+import logging
+from collections import deque
+from threading import Thread, Event
+
+from pulsar import ImproperlyConfigured
+
+from .utils import LOGGER
+
+
+__all__ = ['AccessLog']
+
+
+FORMATS = ('common', 'combined', 'json')
+MONTHS = (None, 'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug',
+          'Sep', 'Oct', 'Nov', 'Dec')
+
+
+class AccessLog:
+    '''Buffer the requests served by a worker and log them in batches.
+
+    :param format: one of ``common``, ``combined`` or ``json``.
+    :param logger: the logger of the access log.
+    :param maxsize: the maximum number of requests in the buffer. Requests
+        recorded while the buffer is full are dropped and counted in
+        :attr:`dropped`.
+    :param interval: seconds between two flushes of the buffer.
+
+    The buffer is a :class:`~collections.deque` with the event loop
+    appending to one end and the background thread consuming the other,
+    both operations are atomic and require no lock.
+
+    .. attribute:: logged
+
+        Number of requests logged.
+
+    .. attribute:: dropped
+
+        Number of requests dropped because the buffer was full.
+    '''
+    _thread = None
+    _second = None
+    _stamp = None
+
+    def __init__(self, format='common', logger=None, maxsize=8192,
+                 interval=0.5):
+        if format not in FORMATS:
+            raise ImproperlyConfigured('Unknown access log format "%s"'
+                                       % format)
+        self.format = format
+        self._format = getattr(self, '_%s' % format)
+        self.logger = logger or logging.getLogger('pulsar.access')
+        self.maxsize = maxsize
+        self.interval = interval
+        self.logged = 0
+        self.dropped = 0
+        self._records = deque()
+        self._stopping = Event()
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__, self.format)
+    __str__ = __repr__
+
+    def record(self, environ, status, size, started):
+        '''Add a request to the buffer.
+
+        Called by the event loop once the response is written.
+
+        :param environ: the WSGI environ of the request.
+        :param status: the status of the response.
+        :param size: the number of bytes of the response body.
+        :param started: the time at which the request started, in seconds
+            since the epoch.
+        '''
+        records = self._records
+        if len(records) < self.maxsize:
+            records.append((started, time.time() - started,
+                            environ.get('REMOTE_ADDR'),
+                            environ.get('REMOTE_USER'),
+                            environ.get('REQUEST_METHOD'),
+                            environ.get('RAW_URI'),
+                            environ.get('SERVER_PROTOCOL'),
+                            status, size,
+                            environ.get('HTTP_REFERER'),
+                            environ.get('HTTP_USER_AGENT')))
+        else:
+            self.dropped += 1
+
+    def start(self):
+        '''Start the thread flushing the buffer every :attr:`interval`
+        seconds.'''
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = Thread(target=self._run, name='access-log')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        '''Stop the flushing thread once it has logged the buffer.'''
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            thread.join()
+
+    def flush(self):
+        '''Log the requests in the buffer as a single record.
+
+        :return: the number of requests logged.
+        '''
+        records = self._records
+        size = len(records)
+        if size:
+            pop = records.popleft
+            if self.logger.isEnabledFor(logging.INFO):
+                fmt = self._format
+                lines = [fmt(pop()) for _ in range(size)]
+                self.logger.info('\n'.join(lines))
+            else:
+                for _ in range(size):
+                    pop()
+            self.logged += size
+        return size
+
+    def info(self):
+        '''Dictionary of statistics of the access log.'''
+        return {'format': self.format,
+                'buffered': len(self._records),
+                'logged': self.logged,
+                'dropped': self.dropped}
+
+    #   INTERNALS
+    def _run(self):
+        stopping = self._stopping
+        while not stopping.wait(self.interval):
+            self._safe_flush()
+        self._safe_flush()
+
+    def _safe_flush(self):
+        try:
+            self.flush()
+        except Exception:
+            LOGGER.exception('Could not flush %s', self)
+
+    def _time(self, started, iso=False):
+        # the time of the request, formatted once per second
+        second = int(started)
+        if second != self._second:
+            t = time.gmtime(second)
+            if iso:
+                self._stamp = '%d-%02d-%02dT%02d:%02d:%02d' % t[:6]
+            else:
+                self._stamp = '%02d/%s/%d:%02d:%02d:%02d +0000' % (
+                    t.tm_mday, MONTHS[t.tm_mon], t.tm_year, t.tm_hour,
+                    t.tm_min, t.tm_sec)
+            self._second = second
+        return self._stamp
+
+    def _common(self, record):
+        (started, duration, addr, user, method, uri, protocol, status,
+         size) = record[:9]
+        return '%s - %s [%s] "%s %s %s" %s %s %.6f' % (
+            addr or '-', user or '-', self._time(started), method, uri,
+            protocol, status[:3] if status else '-', size or '-', duration)
+
+    def _combined(self, record):
+        (started, duration, addr, user, method, uri, protocol, status,
+         size, referer, agent) = record
+        return '%s - %s [%s] "%s %s %s" %s %s "%s" "%s" %.6f' % (
+            addr or '-', user or '-', self._time(started), method, uri,
+            protocol, status[:3] if status else '-', size or '-',
+            referer or '-', agent or '-', duration)
+
+    def _json(self, record):
+        (started, duration, addr, user, method, uri, protocol, status,
+         size, referer, agent) = record
+        return json.dumps({
+            'time': '%s.%06dZ' % (self._time(started, True),
+                                  started % 1 * 1000000),
+            'remote_addr': addr,
+            'remote_user': user,
+            'method': method,
+            'uri': uri,
+            'protocol': protocol,
+            'status': int(status[:3]) if status else None,
+            'bytes': size,
+            'duration': round(duration, 6),
+            'referer': referer,
+            'user_agent': agent})
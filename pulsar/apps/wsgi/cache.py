@@ -0,0 +1,472 @@
+'''Caching of the responses of a WSGI middleware.
+
+.. _wsgi-cache-middleware:
+
+Cache Middleware
+=====================
+
+.. autoclass:: CacheMiddleware
+   :members:
+   :member-order: bysource
+'''
+import math
+import time
+from base64 import b64encode, b64decode
+from functools import partial
+from email.utils import parsedate_tz, mktime_tz
+
+from pulsar import Future, isfuture, chain_future, add_errback, get_event_loop
+from pulsar.utils.httpurl import parse_dict_header
+from pulsar.utils.system import json
+from pulsar.utils.structures import LRUCache
+
+from .files import etag_match
+from .utils import LOGGER
+from .wrappers import WsgiResponse
+
+
+__all__ = ['CacheMiddleware']
+
+
+CACHEABLE_STATUS = frozenset((200, 203, 300, 301, 404, 410))
+UNCACHEABLE = frozenset(('no-store', 'no-cache', 'private'))
+EXCLUDED_HEADERS = frozenset(('age', 'connection', 'date', 'keep-alive',
+                              'set-cookie', 'transfer-encoding'))
+NOT_MODIFIED_HEADERS = frozenset(('cache-control', 'content-location', 'etag',
+                                  'expires', 'last-modified', 'vary'))
+
+
+def cache_control(value):
+    '''The directives of a ``Cache-Control`` header as a dictionary with
+    lowercase keys.'''
+    if not value:
+        return {}
+    return dict(((k.lower(), v) for k, v in parse_dict_header(value).items()))
+
+
+def http_time(value):
+    '''Seconds since the epoch of an HTTP date or ``None`` if not valid.'''
+    try:
+        return mktime_tz(parsedate_tz(value))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def seconds(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _start_response(status, headers, exc_info=None):
+    pass
+
+
+class CacheEntry(object):
+    '''A response stored by a :class:`CacheMiddleware`.'''
+    __slots__ = ('status', 'headers', 'body', 'encoding', 'created', 'ttl',
+                 'stale_ttl', 'etag', 'last_modified')
+
+    def __init__(self, response, created, ttl, stale_ttl):
+        headers = response.headers
+        self.status = response.status_code
+        self.headers = [(k, v) for k, v in headers
+                        if k.lower() not in EXCLUDED_HEADERS]
+        self.body = b''.join(response.content)
+        self.encoding = response.encoding
+        self.created = created
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.etag = headers.get('etag')
+        self.last_modified = http_time(headers.get('last-modified'))
+
+    @property
+    def weight(self):
+        return len(self.body) + sum((len(k) + len(v) + 4
+                                     for k, v in self.headers))
+
+    @property
+    def expiry(self):
+        return self.ttl + self.stale_ttl
+
+    def response(self, environ, now):
+        if self.not_modified(environ):
+            headers = [(k, v) for k, v in self.headers
+                       if k.lower() in NOT_MODIFIED_HEADERS]
+            response = WsgiResponse(304, response_headers=headers,
+                                    environ=environ)
+        else:
+            response = WsgiResponse(self.status, self.body, self.headers,
+                                    encoding=self.encoding, environ=environ)
+        response['Age'] = str(int(max(now - self.created, 0)))
+        return response
+
+    def not_modified(self, environ):
+        '''Check the conditional headers of a request against the
+        validators of this response.'''
+        if 'HTTP_IF_NONE_MATCH' in environ:
+            return bool(self.etag and
+                        etag_match(environ['HTTP_IF_NONE_MATCH'], self.etag))
+        since = http_time(environ.get('HTTP_IF_MODIFIED_SINCE'))
+        return bool(since and self.last_modified and
+                    self.last_modified <= since)
+
+    def to_json(self):
+        return {'status': self.status,
+                'headers': self.headers,
+                'body': b64encode(self.body).decode('ascii'),
+                'encoding': self.encoding,
+                'created': self.created,
+                'ttl': self.ttl,
+                'stale_ttl': self.stale_ttl,
+                'etag': self.etag,
+                'last_modified': self.last_modified}
+
+    @classmethod
+    def from_json(cls, data):
+        entry = cls.__new__(cls)
+        entry.status = int(data['status'])
+        entry.headers = [(str_value(k), str_value(v))
+                         for k, v in data['headers']]
+        entry.body = b64decode(str_value(data['body']).encode('ascii'),
+                               validate=True)
+        entry.encoding = optional_str(data['encoding'])
+        entry.created = float(data['created'])
+        entry.ttl = float(data['ttl'])
+        entry.stale_ttl = float(data['stale_ttl'])
+        entry.etag = optional_str(data['etag'])
+        last_modified = data['last_modified']
+        entry.last_modified = (None if last_modified is None else
+                               float(last_modified))
+        return entry
+
+
+class Variants(object):
+    '''Stored at the key of a resource whose responses have a ``Vary``
+    header.'''
+    __slots__ = ('headers',)
+    weight = 64
+
+    def __init__(self, headers):
+        self.headers = headers
+
+    def key(self, key, environ):
+        values = (environ.get('HTTP_%s' % h.upper().replace('-', '_'), '')
+                  for h in self.headers)
+        return '%s#%s' % (key, '\n'.join(values))
+
+    def to_json(self):
+        return self.headers
+
+    @classmethod
+    def from_json(cls, data):
+        return cls([str_value(h) for h in data])
+
+
+def str_value(value):
+    if not isinstance(value, str):
+        raise TypeError('expected a string, got %s' % type(value).__name__)
+    return value
+
+
+def optional_str(value):
+    return None if value is None else str_value(value)
+
+
+def dumps(value):
+    '''Serialize a :class:`CacheEntry` or :class:`Variants` for a shared
+    store.
+
+    The store receives plain JSON rather than pickles, so that whoever can
+    write to it cannot run code in the workers reading it.'''
+    kind = 'variants' if isinstance(value, Variants) else 'response'
+    return json.dumps({kind: value.to_json()})
+
+
+def loads(data):
+    '''Load a value serialized by :func:`dumps`, ``None`` if not valid.'''
+    try:
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        data = json.loads(data)
+        if 'response' in data:
+            return CacheEntry.from_json(data['response'])
+        else:
+            return Variants.from_json(data['variants'])
+    except (ValueError, TypeError, KeyError, AttributeError) as exc:
+        LOGGER.error('Invalid response in the cache store: %s', exc)
+
+
+class CacheMiddleware(object):
+    '''A :ref:`WSGI middleware <wsgi-middleware>` caching the responses of
+    another ``middleware``, such as a :class:`.Router`.
+
+    Responses to ``GET`` requests are stored when they are
+    :class:`.WsgiResponse` with a cacheable status code, a body of bytes and
+    a freshness lifetime, given by the ``s-maxage`` or ``max-age``
+    directives of the ``Cache-Control`` header, by the ``Expires`` header
+    or by ``ttl``. Responses with ``no-store``, ``no-cache`` or ``private``
+    directives or setting cookies are not stored, neither are responses to
+    requests with an ``Authorization`` header. The ``Vary`` header of a
+    response selects the stored response of a resource from the headers of
+    a request.
+
+    While a response is being computed, requests for the same resource wait
+    for it rather than invoking the ``middleware`` again. Stale responses
+    within the ``stale-while-revalidate`` directive of their
+    ``Cache-Control`` header, or ``stale_ttl`` seconds, are served while a
+    new response is computed in the background. Requests with
+    ``If-None-Match`` or ``If-Modified-Since`` headers matching the
+    validators of a stored response receive a ``304``.
+
+    :param middleware: the :ref:`WSGI middleware <wsgi-middleware>` whose
+        responses are cached.
+    :param ttl: seconds a response without freshness information is fresh,
+        such responses are not stored if zero (the default).
+    :param stale_ttl: seconds a stale response is served while it is
+        revalidated, unless given by the response.
+    :param maxsize: maximum number of responses kept in memory.
+    :param maxweight: maximum number of bytes of responses kept in memory.
+    :param store: optional :ref:`data store <apps-data>`, such as a pulsar
+        data store or redis, sharing responses between workers.
+    :param namespace: prefix of the keys in the ``store``.
+
+    When the ``middleware`` is asynchronous, so is this middleware and it
+    should be used by a :class:`.WsgiHandler` with ``async=True``.
+    '''
+    def __init__(self, middleware, ttl=0, stale_ttl=0, maxsize=1024,
+                 maxweight=2**26, store=None, namespace='wsgi-cache:'):
+        self.middleware = middleware
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.cache = LRUCache(maxsize, maxweight)
+        self.store = store
+        self.namespace = namespace
+        self.stats = dict.fromkeys(('hits', 'misses', 'stale', 'coalesced',
+                                    'not_modified', 'bypassed', 'stored',
+                                    'uncacheable', 'revalidations'), 0)
+        self._client = store.client() if store else None
+        self._flights = {}
+
+    def __call__(self, environ, start_response):
+        if (environ.get('REQUEST_METHOD') not in ('GET', 'HEAD') or
+                'HTTP_AUTHORIZATION' in environ):
+            return self.middleware(environ, start_response)
+        control = cache_control(environ.get('HTTP_CACHE_CONTROL'))
+        key = self.key(environ)
+        if 'no-store' in control:
+            self.stats['bypassed'] += 1
+            return self.middleware(environ, start_response)
+        elif 'no-cache' in control or environ.get('HTTP_PRAGMA') == 'no-cache':
+            self.stats['bypassed'] += 1
+            return self._compute(environ, start_response, key)
+        found = self._lookup(environ, key)
+        if isfuture(found):
+            return chain_future(found, callback=lambda found: self._respond(
+                environ, start_response, *found))
+        return self._respond(environ, start_response, *found)
+
+    def key(self, environ):
+        '''The key of the resource requested by ``environ``.'''
+        return '%s://%s%s?%s' % (environ.get('wsgi.url_scheme', 'http'),
+                                 environ.get('HTTP_HOST', ''),
+                                 environ.get('PATH_INFO', ''),
+                                 environ.get('QUERY_STRING', ''))
+
+    def clear(self):
+        '''Clear responses kept in memory.'''
+        self.cache.clear()
+
+    def info(self):
+        '''Hits and misses of the cache.
+
+        ``stale`` counts stale responses served, ``coalesced`` the requests
+        which waited for a response being computed and ``bypassed`` the
+        requests which asked not to use the cache.
+        '''
+        return dict(self.stats, cache=self.cache.info())
+
+    #    INTERNALS
+    def _respond(self, environ, start_response, key, entry):
+        now = time.time()
+        if entry is not None:
+            age = now - entry.created
+            if age < entry.ttl:
+                self.stats['hits'] += 1
+                return self._serve(environ, entry, now)
+            elif age < entry.expiry:
+                self.stats['stale'] += 1
+                self._revalidate(environ, key)
+                return self._serve(environ, entry, now)
+            self.cache.pop(key)
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.stats['coalesced'] += 1
+            return chain_future(flight, callback=partial(
+                self._landed, environ, start_response, key))
+        self.stats['misses'] += 1
+        return self._compute(environ, start_response, key)
+
+    def _serve(self, environ, entry, now):
+        response = entry.response(environ, now)
+        if response.status_code == 304:
+            self.stats['not_modified'] += 1
+        return response
+
+    def _landed(self, environ, start_response, key, entry):
+        # A coalesced request, serve the response computed by another one
+        # if it was stored and applies to this request
+        if entry is not None:
+            base = self.key(environ)
+            value = self.cache.get(base)
+            if isinstance(value, Variants):
+                value = self.cache.get(value.key(base, environ))
+            if value is entry:
+                return self._serve(environ, entry, time.time())
+        return self._compute(environ, start_response, key)
+
+    def _compute(self, environ, start_response, key, flight=None):
+        if flight is None:
+            flight = Future()
+            self._flights.setdefault(key, flight)
+        try:
+            response = self.middleware(environ, start_response)
+        except Exception:
+            self._land(key, flight, None)
+            raise
+        if isfuture(response):
+            return chain_future(
+                response, callback=partial(self._store, environ, key, flight),
+                errback=partial(self._failed, key, flight))
+        return self._store(environ, key, flight, response)
+
+    def _store(self, environ, key, flight, response):
+        entry = None
+        if environ.get('REQUEST_METHOD') == 'GET':
+            entry = self._entry(response)
+        self._land(key, flight, entry)
+        if entry is None:
+            if response is not None:
+                self.stats['uncacheable'] += 1
+            return response
+        self.stats['stored'] += 1
+        base = self.key(environ)
+        vary = [h.strip() for h in response.headers.get('vary', '').split(',')
+                if h.strip()]
+        if vary:
+            variants = Variants(sorted(vary, key=str.lower))
+            self._set(base, variants, entry.expiry)
+            self._set(variants.key(base, environ), entry, entry.expiry)
+        else:
+            self._set(base, entry, entry.expiry)
+        return self._serve(environ, entry, entry.created)
+
+    def _failed(self, key, flight, exc):
+        self._land(key, flight, None)
+        raise exc
+
+    def _land(self, key, flight, entry):
+        if self._flights.get(key) is flight:
+            self._flights.pop(key)
+        if not flight.done():
+            flight.set_result(entry)
+
+    def _entry(self, response):
+        # A CacheEntry for response or None if it cannot be stored
+        if (not isinstance(response, WsgiResponse) or response.started or
+                response.status_code not in CACHEABLE_STATUS or
+                response.is_streamed or response.cookies or
+                'set-cookie' in response.headers or
+                response.headers.get('vary', '').strip() == '*' or
+                not all(isinstance(c, bytes) for c in response.content)):
+            return
+        headers = response.headers
+        control = cache_control(headers.get('cache-control'))
+        if UNCACHEABLE.intersection(control):
+            return
+        now = time.time()
+        if 's-maxage' in control:
+            ttl = seconds(control['s-maxage'])
+        elif 'max-age' in control:
+            ttl = seconds(control['max-age'])
+        elif 'expires' in headers:
+            date = http_time(headers.get('date')) or now
+            ttl = (http_time(headers['expires']) or date) - date
+        else:
+            ttl = self.ttl
+        if ttl <= 0:
+            return
+        if 'stale-while-revalidate' in control:
+            stale_ttl = seconds(control['stale-while-revalidate'])
+        else:
+            stale_ttl = self.stale_ttl
+        return CacheEntry(response, now, ttl, stale_ttl)
+
+    def _revalidate(self, environ, key):
+        # Compute a new response in the background
+        if key in self._flights:
+            return
+        self.stats['revalidations'] += 1
+        flight = Future()
+        self._flights[key] = flight
+        environ = dict(environ)
+        environ.pop('pulsar.cache', None)
+        environ.pop('HTTP_IF_NONE_MATCH', None)
+        environ.pop('HTTP_IF_MODIFIED_SINCE', None)
+        environ['REQUEST_METHOD'] = 'GET'
+        get_event_loop().call_soon(self._background, environ, key, flight)
+
+    def _background(self, environ, key, flight):
+        try:
+            result = self._compute(environ, _start_response, key, flight)
+        except Exception:
+            LOGGER.exception('Could not revalidate %s', key)
+        else:
+            if isfuture(result):
+                add_errback(result, partial(self._revalidation_error, key))
+
+    def _revalidation_error(self, key, exc):
+        LOGGER.error('Could not revalidate %s: %s', key, exc)
+
+    def _lookup(self, environ, key):
+        # The key and the stored response of a request, or a future
+        value = self._get(key)
+        if isfuture(value):
+            return chain_future(value, callback=partial(self._variant,
+                                                        environ, key))
+        return self._variant(environ, key, value)
+
+    def _variant(self, environ, key, value):
+        if isinstance(value, Variants):
+            key = value.key(key, environ)
+            value = self._get(key)
+            if isfuture(value):
+                return chain_future(value, callback=lambda value: (key, value))
+        return key, value
+
+    def _get(self, key):
+        value = self.cache.get(key)
+        if value is None and self._client is not None:
+            return chain_future(self._client.get(self.namespace + key),
+                                callback=partial(self._loaded, key),
+                                errback=self._store_error)
+        return value
+
+    def _loaded(self, key, data):
+        if data:
+            value = loads(data)
+            if value is not None:
+                self.cache.set(key, value, value.weight)
+            return value
+
+    def _set(self, key, value, expiry):
+        self.cache.set(key, value, value.weight)
+        if self._client is not None:
+            result = self._client.set(self.namespace + key,
+                                      dumps(value),
+                                      ex=max(int(math.ceil(expiry)), 1))
+            add_errback(result, self._store_error)
+
+    def _store_error(self, exc):
+        LOGGER.error('Response cache store error: %s', exc)
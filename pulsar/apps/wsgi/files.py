@@ -0,0 +1,223 @@
+'''Utilities for serving files.
+
+File Wrapper
+=====================
+
+.. autoclass:: FileWrapper
+   :members:
+   :member-order: bysource
+
+
+File Cache
+=====================
+
+.. autoclass:: FileCache
+   :members:
+   :member-order: bysource
+'''
+import os
+import re
+import time
+
+from pulsar.utils.structures import LRUCache
+
+
+__all__ = ['FileWrapper', 'FileCache', 'file_etag', 'etag_match',
+           'parse_range']
+
+
+_range_re = re.compile(r'^\s*(\d*)\s*-\s*(\d*)\s*$')
+
+
+class FileWrapper(object):
+    '''The ``wsgi.file_wrapper`` of pep3333_, an iterable over blocks of a
+    file-like object.
+
+    The :class:`.HttpServerResponse` sends the file of a :class:`FileWrapper`
+    found in a response with :meth:`.Connection.sendfile`, rather than
+    iterating over it, unless the response is chunked.
+
+    :param file: a file-like object opened in binary mode.
+    :param block_size: size of blocks when iterating.
+    :param offset: where to start reading the file.
+    :param count: number of bytes to read, by default up to the end of the
+        file.
+
+    .. _pep3333: http://www.python.org/dev/peps/pep-3333/
+    '''
+    def __init__(self, file, block_size=65536, offset=0, count=None):
+        self.file = file
+        self.block_size = block_size
+        self.offset = offset
+        self.count = count
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__, self.file)
+
+    def __len__(self):
+        count = self.count
+        if count is None:
+            try:
+                count = os.fstat(self.file.fileno()).st_size - self.offset
+            except (AttributeError, OSError, ValueError):
+                raise TypeError('length of %s is not known' % self)
+        return count
+
+    def __iter__(self):
+        file = self.file
+        # wrappers of byte ranges share the same file
+        seekable = getattr(file, 'seekable', None)
+        if self.offset or (seekable and seekable()):
+            file.seek(self.offset)
+        remaining = self.count
+        while remaining is None or remaining > 0:
+            size = self.block_size
+            if remaining is not None:
+                size = min(size, remaining)
+                remaining -= size
+            data = file.read(size)
+            if not data:
+                break
+            yield data
+
+    def close(self):
+        if hasattr(self.file, 'close'):
+            self.file.close()
+
+
+class FileCache(object):
+    '''A cache of ``stat`` results and of the content of small files.
+
+    :param maxsize: maximum number of files in each cache.
+    :param max_file_size: files up to this number of bytes are kept in
+        memory.
+    :param maxweight: maximum number of bytes of file content in memory.
+    :param stat_ttl: seconds a ``stat`` result is used before the file is
+        checked again.
+
+    The content of a file is read again when its size, modification time
+    or inode change.
+    '''
+    def __init__(self, maxsize=1024, max_file_size=65536, maxweight=2**24,
+                 stat_ttl=1):
+        self.max_file_size = max_file_size
+        self.stat_ttl = stat_ttl
+        self.stats = LRUCache(maxsize)
+        self.contents = LRUCache(maxsize, maxweight)
+
+    def stat(self, path):
+        '''The :func:`os.stat` result of ``path``.
+
+        Raise :class:`OSError` if the file does not exist, a missing file
+        is cached as well.
+        '''
+        now = time.monotonic()
+        entry = self.stats.get(path)
+        if entry is None or now - entry[0] > self.stat_ttl:
+            try:
+                entry = (now, os.stat(path))
+            except OSError as exc:
+                entry = (now, exc)
+            self.stats.set(path, entry)
+        result = entry[1]
+        if isinstance(result, OSError):
+            raise type(result)(result.errno, result.strerror, path)
+        return result
+
+    def read(self, path, stat=None):
+        '''The content of the file at ``path`` or ``None`` if the file is
+        larger than :attr:`max_file_size`.
+        '''
+        stat = stat or self.stat(path)
+        if stat.st_size > self.max_file_size:
+            return
+        version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        entry = self.contents.get(path)
+        if entry is None or entry[0] != version:
+            with open(path, 'rb') as f:
+                entry = (version, f.read())
+            self.contents.set(path, entry, len(entry[1]))
+        return entry[1]
+
+    def clear(self):
+        self.stats.clear()
+        self.contents.clear()
+
+    def info(self):
+        return {'stats': self.stats.info(),
+                'contents': self.contents.info()}
+
+
+def file_etag(stat):
+    '''An ``ETag`` from the inode, modification time and size of a file.
+
+    The tag is weak when the file was modified during the last second, since
+    it could change again without changing its modification time.
+    '''
+    etag = '"%x-%x-%x"' % (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if time.time() - stat.st_mtime < 1:
+        etag = 'W/' + etag
+    return etag
+
+
+def etag_match(header, etag, weak=True):
+    '''Check if ``etag`` matches one of the tags of an ``If-None-Match`` or
+    ``If-Match`` ``header``.
+
+    With ``weak`` comparison, as for ``If-None-Match``, the weak indicator
+    of tags is ignored. Otherwise weak tags never match.
+    '''
+    if header.strip() == '*':
+        return True
+    if etag.startswith('W/'):
+        if not weak:
+            return False
+        etag = etag[2:]
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            if not weak:
+                continue
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def parse_range(header, size, max_ranges=16):
+    '''Parse the value of a ``Range`` header for a resource of ``size``
+    bytes.
+
+    Return a list of ``(start, stop)`` byte positions, where ``stop`` is
+    excluded, an empty list if no range is satisfiable or ``None`` if the
+    header is not valid or has more than ``max_ranges`` ranges, in which
+    case it should be ignored.
+    '''
+    unit, _, value = header.partition('=')
+    if unit.strip().lower() != 'bytes':
+        return
+    specs = value.split(',')
+    if len(specs) > max_ranges:
+        return
+    ranges = []
+    for spec in specs:
+        match = _range_re.match(spec)
+        if not match:
+            return
+        start, end = match.groups()
+        if start:
+            start = int(start)
+            last = int(end) if end else size - 1
+            if last < start:
+                if end:
+                    return
+            elif start < size:
+                ranges.append((start, min(last + 1, size)))
+        elif end:
+            # suffix range with the last bytes of the resource
+            end = int(end)
+            if end:
+                ranges.append((max(size - end, 0), size))
+        else:
+            return
+    return ranges
@@ -52,7 +52,7 @@ import re
 from functools import wraps
 
 import pulsar
-from pulsar import isfuture, chain_future, get_event_loop
+from pulsar import isfuture, chain_future, get_event_loop, ExecutorFull
 from pulsar.utils.httpurl import BytesIO
 
 from .auth import parse_authorization_header
@@ -111,15 +111,23 @@ def wait_for_body_middleware(environ, start_response=None):
             _wsgi_input(chunk)
 
 
-def middleware_in_executor(middleware):
+def middleware_in_executor(middleware, executor=None, retry_after=1):
     '''Use this middleware to run a synchronous middleware in the event loop
-    executor.
+    executor, or in ``executor`` if given.
 
     Useful when using synchronous web-frameworks such as :django:`django <>`.
+    When the :class:`.Executor` queue is full, requests are not queued
+    and the response is ``503 Service Unavailable`` with a ``Retry-After``
+    header of ``retry_after`` seconds.
     '''
     @wraps(middleware)
     def _(environ, start_response):
         loop = get_event_loop()
-        return loop.run_in_executor(None, middleware, environ, start_response)
+        try:
+            return loop.run_in_executor(executor, middleware, environ,
+                                        start_response)
+        except ExecutorFull:
+            raise pulsar.HttpException(
+                status=503, headers=[('Retry-After', str(retry_after))])
 
     return _
@@ -28,12 +28,16 @@ AccessControl
 
 '''
 import re
-from gzip import GzipFile
+import zlib
 
-from pulsar.utils.httpurl import BytesIO
+from pulsar.utils.structures import LRUCache
 
+from .files import FileWrapper
+from .structures import EncodingAccept
+from .utils import parse_accept_header
 
-re_accepts_gzip = re.compile(r'\bgzip\b')
+
+GZIP_WBITS = 16 + zlib.MAX_WBITS
 re_media_type = re.compile(r'^(image|audio|video)/.+')
 
 
@@ -93,49 +97,143 @@ class AccessControl(ResponseMiddleware):
 
 class GZipMiddleware(ResponseMiddleware):
     """A :class:`ResponseMiddleware` for compressing content if the request
-allows gzip compression. It sets the Vary header accordingly.
-
-The compression implementation is from
-http://jython.xhaus.com/http-compression-in-python-and-jython
+    allows gzip compression. It sets the Vary header accordingly.
+
+    :param min_length: responses with a known length shorter than this are
+        not compressed.
+    :param level: the default compression level.
+    :param levels: optional dictionary of compression levels by content
+        type, updating the :attr:`content_levels`.
+    :param flush_size: streamed content is flushed to the client after each
+        chunk when ``0``, otherwise once this number of bytes has been
+        compressed since the last flush.
+    :param cache_size: maximum number of compressed responses with a strong
+        ``ETag`` kept in memory, ``0`` to disable the cache.
+    :param cache_weight: maximum number of bytes of compressed content kept
+        in memory.
+
+    The ``Accept-Encoding`` header is negotiated with its quality values
+    via :class:`.EncodingAccept`. Streamed content and :class:`.FileWrapper`
+    are compressed as they are iterated. Compressed responses with a strong
+    ``ETag``, such as files served by a :class:`.MediaRouter`, are stored
+    in a :class:`.LRUCache` keyed by path and ``ETag``.
+
+    The ``ETag`` of compressed responses becomes weak, since the compressed
+    representation is not byte-for-byte the original one, and their
+    ``Accept-Ranges`` header is removed.
+
+    .. attribute:: content_levels
+
+        Compression levels by content type, other types are compressed with
+        the default ``level``. Static assets are compressed once and cached
+        while event streams favour latency.
     """
-    def __init__(self, min_length=200):
+    content_levels = {'text/css': 9,
+                      'text/javascript': 9,
+                      'application/javascript': 9,
+                      'application/json': 4,
+                      'text/event-stream': 1}
+
+    def __init__(self, min_length=200, level=6, levels=None, flush_size=0,
+                 cache_size=256, cache_weight=2**24):
         self.min_length = min_length
+        self.level = level
+        self.flush_size = flush_size
+        if levels:
+            self.content_levels = dict(self.content_levels)
+            self.content_levels.update(levels)
+        self.cache = LRUCache(cache_size, cache_weight) if cache_size else None
 
     def available(self, environ, response):
         # It's not worth compressing non-OK or really short responses
-        try:
-            if response.status_code == 200 and not response.is_streamed:
-                if response.length() < self.min_length:
-                    return False
-                headers = response.headers
-                ctype = headers.get('Content-Type', '').lower()
-                # Avoid gzipping if we've already got a content-encoding.
-                if 'Content-Encoding' in headers:
-                    return False
-                # MSIE have issues with gzipped response of various
-                # content types.
-                if "msie" in environ.get('HTTP_USER_AGENT', '').lower():
-                    if not ctype.startswith("text/") or "javascript" in ctype:
-                        return False
-                ae = environ.get('HTTP_ACCEPT_ENCODING', '')
-                if not re_accepts_gzip.search(ae):
-                    return False
-                if re_media_type.match(ctype):
-                    return False
-                return True
-        except Exception:
-            raise
+        if response.status_code != 200:
+            return False
+        if (not response.is_streamed and
+                response.length() < self.min_length):
+            return False
+        headers = response.headers
+        ctype = headers.get('Content-Type', '').lower()
+        # Avoid gzipping if we've already got a content-encoding.
+        if 'Content-Encoding' in headers:
+            return False
+        # MSIE have issues with gzipped response of various
+        # content types.
+        if "msie" in environ.get('HTTP_USER_AGENT', '').lower():
+            if not ctype.startswith("text/") or "javascript" in ctype:
+                return False
+        if re_media_type.match(ctype):
+            return False
+        encodings = parse_accept_header(environ.get('HTTP_ACCEPT_ENCODING'),
+                                        EncodingAccept)
+        return encodings.best_match(('gzip', 'identity')) == 'gzip'
 
     def execute(self, environ, response):
         headers = response.headers
         headers.add_header('Vary', 'Accept-Encoding')
-        content = b''.join(response.content)
-        response.content = (self.compress_string(content),)
-        response.headers['Content-Encoding'] = 'gzip'
-
-    def compress_string(self, s):
-        zbuf = BytesIO()
-        zfile = GzipFile(mode='wb', compresslevel=6, fileobj=zbuf)
-        zfile.write(s)
-        zfile.close()
-        return zbuf.getvalue()
+        headers['Content-Encoding'] = 'gzip'
+        headers.pop('Accept-Ranges', None)
+        etag = headers.get('ETag')
+        strong = etag and not etag.startswith('W/')
+        if strong:
+            headers['ETag'] = 'W/%s' % etag
+        level = self.compress_level(response)
+        content = response.content
+        if response.is_streamed or not all(isinstance(c, bytes)
+                                           for c in content):
+            headers.pop('Content-Length', None)
+            response.content = self.compress_stream(
+                content, level, response.encoding or 'utf-8')
+            return
+        if self.cache is not None and strong:
+            key = (environ.get('PATH_INFO'), etag)
+            compressed = self.cache.get(key)
+            if compressed is None:
+                compressed = self.compress_string(b''.join(content), level)
+                self.cache.set(key, compressed, len(compressed))
+        else:
+            compressed = self.compress_string(b''.join(content), level)
+        response.content = (compressed,)
+
+    def compress_level(self, response):
+        '''The compression level for the content type of ``response``.'''
+        ctype = response.content_type or ''
+        ctype = ctype.split(';', 1)[0].strip().lower()
+        return self.content_levels.get(ctype, self.level)
+
+    def compress_string(self, s, level=6):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+        return compressor.compress(s) + compressor.flush()
+
+    def compress_stream(self, content, level=6, encoding='utf-8'):
+        '''Compress an iterable of chunks as it is iterated.
+
+        Compressed data is flushed after each chunk, as required by
+        pep3333_, unless :attr:`flush_size` is set.
+        '''
+        compressor = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+        flush_size = self.flush_size
+        pending = 0
+        try:
+            for chunk in content:
+                if isinstance(chunk, FileWrapper):
+                    blocks = chunk
+                elif isinstance(chunk, str):
+                    blocks = (chunk.encode(encoding),)
+                else:
+                    blocks = (chunk,)
+                for block in blocks:
+                    pending += len(block)
+                    data = compressor.compress(block)
+                    if pending >= flush_size:
+                        data += compressor.flush(zlib.Z_SYNC_FLUSH)
+                        pending = 0
+                    if data:
+                        yield data
+            yield compressor.flush()
+        finally:
+            if hasattr(content, 'close'):
+                content.close()
+            else:
+                for chunk in content:
+                    if hasattr(chunk, 'close'):
+                        chunk.close()
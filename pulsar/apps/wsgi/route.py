@@ -48,6 +48,14 @@ Route
    :members:
    :member-order: bysource
 
+
+Route Trie
+================
+
+.. autoclass:: RouteTrie
+   :members:
+   :member-order: bysource
+
 '''
 import re
 from collections import namedtuple
@@ -59,7 +67,7 @@ from pulsar.utils.pep import to_string
 from pulsar.utils.slugify import slugify
 
 
-__all__ = ['route', 'Route']
+__all__ = ['route', 'Route', 'RouteTrie']
 
 
 class rule_info(namedtuple('rinfo', 'rule method parameters position order')):
@@ -258,6 +266,11 @@ class Route(object):
         a set of  variable names for this route. If the route has no
         variables, the set is empty.
 
+    .. attribute:: is_re
+
+        If ``True``, the static parts of the :attr:`rule` are regular
+        expressions.
+
     .. _werkzeug: https://github.com/mitsuhiko/werkzeug
     '''
     def __init__(self, rule, defaults=None, is_re=False):
@@ -265,6 +278,7 @@ class Route(object):
         self.defaults = defaults if defaults is not None else {}
         self.is_leaf = not rule.endswith('/')
         self.rule = rule[1:]
+        self.is_re = is_re
         self.variables = set(map(str, self.defaults))
         breadcrumbs = []
         self._converters = {}
@@ -430,9 +444,113 @@ class Route(object):
         return cls('%s/%s' % (self.rule, rule), defaults, is_re=is_re)
 
 
+class RouteTrie(object):
+    '''A prefix tree of :class:`Route` which selects the routes which may
+    match a path, so that only their regular expressions are tried.
+
+    Static parts of routes are children of a node keyed by the url bit,
+    variables with converters matching a single url bit are children
+    keyed by the converter regex, while routes with a ``path`` converter or
+    regular expression parts are candidates for any path below the node.
+    :meth:`candidates` returns values in the order they were added, the
+    caller must still :meth:`Route.match` them.
+    '''
+    def __init__(self):
+        self._root = _TrieNode()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, route, value, partial=False):
+        '''Add a ``route`` and the ``value`` returned by :meth:`candidates`.
+
+        :param partial: if ``True`` the route is a candidate for paths
+            which start with it, even when it is a leaf.
+        '''
+        node = self._root
+        if not route.is_leaf:
+            kind = 'prefix'
+        else:
+            kind = 'any' if partial else 'leaf'
+        for dynamic, bit in route.breadcrumbs:
+            if dynamic:
+                converter = route._converters[bit]
+                if not converter.part_isolating:
+                    kind = 'any'
+                    break
+                regex = converter.regex
+                child = node.params.get(regex)
+                if child is None:
+                    child = _TrieNode()
+                    child.regex = re.compile('(?:%s)$' % regex, re.UNICODE)
+                    node.params[regex] = child
+            elif route.is_re and _re_special.search(bit):
+                kind = 'any'
+                break
+            else:
+                child = node.static.get(bit)
+                if child is None:
+                    child = node.static[bit] = _TrieNode()
+            node = child
+        getattr(node, kind).append((self._size, value))
+        self._size += 1
+
+    def candidates(self, path):
+        '''List of values of routes which may match ``path``.
+
+        ``path`` does not start with a slash, as in :meth:`Route.match`.
+        '''
+        bits = path.split('/')
+        size = len(bits)
+        found = []
+        nodes = [(self._root, 0)]
+        while nodes:
+            node, index = nodes.pop()
+            if node.any:
+                found.extend(node.any)
+            if index == size:
+                if node.leaf:
+                    found.extend(node.leaf)
+                continue
+            # a prefix route matches up to a slash
+            if node.prefix:
+                found.extend(node.prefix)
+            bit = bits[index]
+            index += 1
+            child = node.static.get(bit)
+            if child is not None:
+                nodes.append((child, index))
+            if node.params:
+                for child in node.params.values():
+                    if child.regex.match(bit):
+                        nodes.append((child, index))
+        if len(found) > 1:
+            found.sort()
+        return [value for _, value in found]
+
+
+class _TrieNode(object):
+    __slots__ = ('static', 'params', 'regex', 'leaf', 'prefix', 'any')
+
+    def __init__(self):
+        self.static = {}
+        self.params = {}
+        self.regex = None
+        self.leaf = []
+        self.prefix = []
+        self.any = []
+
+
+_re_special = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+
 class BaseConverter(object):
     """Base class for all converters."""
     regex = '[^/]+'
+    #: ``True`` when values never contain a slash, so that the converter
+    #: matches a single url bit
+    part_isolating = True
 
     def to_python(self, value):
         return value
@@ -495,6 +613,7 @@ class PathConverter(BaseConverter):
         Rule('/<path:wikipage>/edit')
     """
     regex = '.*'
+    part_isolating = False
 
 
 class NumberConverter(BaseConverter):
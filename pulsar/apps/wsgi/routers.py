@@ -47,6 +47,19 @@ you check out the :ref:`HttpBin example <tutorials-httpbin>`.
    :member-order: bysource
 
 
+.. _wsgi-metrics-router:
+
+Metrics Router
+=====================
+
+The :class:`MetricsRouter` serves the :ref:`metrics <actor_metrics_command>`
+aggregated by the :class:`.Arbiter` from the heartbeats of actors.
+
+.. autoclass:: MetricsRouter
+   :members:
+   :member-order: bysource
+
+
 .. _wsgi-media-router:
 
 Media Router
@@ -59,6 +72,10 @@ files such ass ``css``, ``javascript``, images and so forth.
    :members:
    :member-order: bysource
 
+.. autoclass:: MediaMixin
+   :members:
+   :member-order: bysource
+
 
 RouterParam
 =================
@@ -73,20 +90,28 @@ import os
 import re
 import stat
 import mimetypes
+from uuid import uuid4
 from email.utils import parsedate_tz, mktime_tz
 
 from pulsar.utils.httpurl import http_date, CacheControl
 from pulsar.utils.structures import OrderedDict
 from pulsar.utils.slugify import slugify
-from pulsar import Http404, HttpException
+from pulsar.utils.system import json
+from pulsar import Http404, HttpException, task, send, prometheus_text
 
-from .route import Route
+from .route import Route, RouteTrie
+from .files import FileCache, FileWrapper, file_etag, etag_match, parse_range
 from .utils import wsgi_request
 from .content import Html
 
 
 __all__ = ['Router', 'MediaRouter', 'FileRouter', 'MediaMixin',
-           'RouterParam']
+           'MetricsRouter', 'RouterParam']
+
+
+# Routers with at least this number of children dispatch paths via a
+# RouteTrie
+DISPATCH_MIN_ROUTES = 8
 
 
 def get_roule_methods(attrs):
@@ -223,6 +248,7 @@ class Router(metaclass=RouterType):
     '''
     _creation_count = 0
     _parent = None
+    _dispatch = None
     name = None
 
     response_content_types = RouterParam(None)
@@ -365,6 +391,10 @@ class Router(metaclass=RouterType):
     def resolve(self, path, urlargs=None):
         '''Resolve a path and return a ``(handler, urlargs)`` tuple or
         ``None`` if the path could not be resolved.
+
+        Routers with many children select the ones which may match the path
+        via a :class:`.RouteTrie` compiled the first time they resolve a
+        path. Children are always tried in the order of :attr:`routes`.
         '''
         match = self.route.match(path)
         if match is None:
@@ -376,7 +406,10 @@ class Router(metaclass=RouterType):
         else:
             return self, update_args(urlargs, match)
         #
-        for handler in self.routes:
+        dispatch = self._dispatch
+        if dispatch is None:
+            dispatch = self._dispatch = self._compile()
+        for handler in dispatch(path):
             view_args = handler.resolve(path, urlargs)
             if view_args is None:
                 continue
@@ -416,6 +449,8 @@ class Router(metaclass=RouterType):
             router.parent.remove_child(router)
         router._parent = self
         self.routes.append(router)
+        self._reset_dispatch()
+        router._reset_dispatch(True)
         return router
 
     def remove_child(self, router):
@@ -423,6 +458,8 @@ class Router(metaclass=RouterType):
         if router in self.routes:
             self.routes.remove(router)
             router._parent = None
+            self._reset_dispatch()
+            router._reset_dispatch(True)
 
     def get_route(self, name):
         '''Get a child :class:`Router` by its :attr:`name`.
@@ -481,6 +518,31 @@ class Router(metaclass=RouterType):
         return router
 
     # INTERNALS
+    def _compile(self):
+        # The function returning the children which may match a path, built
+        # the first time the router resolves a path and reset when children
+        # are added or removed. A few children are tried in turn.
+        routes = self.routes
+        if len(routes) < DISPATCH_MIN_ROUTES:
+            return lambda path: routes
+        dispatch = RouteTrie()
+        for router in routes:
+            dispatch.add(router.route, router, partial=bool(router.routes))
+        return dispatch.candidates
+
+    def _reset_dispatch(self, children=False):
+        # Parents add leaf routers with children as partial routes, while
+        # the routes of children depend on the route of their parents
+        if children:
+            for router in self.routes:
+                router._reset_dispatch(True)
+            self._dispatch = None
+        else:
+            router = self
+            while router is not None:
+                router._dispatch = None
+                router = router._parent
+
     def _set_params(self, parameters):
         for name, value in parameters.items():
             if name not in self.defaults:
@@ -489,30 +551,132 @@ class Router(metaclass=RouterType):
 
 
 class MediaMixin(object):
+    '''Serve files with ``ETag``, ``Last-Modified`` and ``Range`` support.
+
+    .. attribute:: file_cache
+
+        The :class:`.FileCache` of ``stat`` results and small files, shared
+        by all media routers unless overwritten.
+
+    .. attribute:: gzip_static
+
+        When ``True`` (default) and a ``.gz`` sibling of a file, not older
+        than the file itself, is available, the sibling is served with the
+        ``gzip`` content encoding to clients accepting it.
+
+    Files larger than the :attr:`.FileCache.max_file_size` are served by
+    a :class:`.FileWrapper`, which the server sends with
+    :meth:`.Connection.sendfile`.
+    '''
+    file_cache = FileCache()
+    gzip_static = True
 
     def serve_file(self, request, fullpath, status_code=None):
-        # Respect the If-Modified-Since header.
-        statobj = os.stat(fullpath)
+        statobj = self.file_cache.stat(fullpath)
         content_type, encoding = mimetypes.guess_type(fullpath)
         response = request.response
         if content_type:
             response.content_type = content_type
         if encoding:
             response.encoding = encoding
-        if not (status_code or self.was_modified_since(
-                request.environ.get('HTTP_IF_MODIFIED_SINCE'),
-                statobj[stat.ST_MTIME],
-                statobj[stat.ST_SIZE])):
+        if status_code:
+            response.status_code = status_code
+            response.content = self.file_content(fullpath, statobj)
+            return response
+        gzipped = self.gzip_file(request, fullpath, statobj)
+        if gzipped:
+            fullpath, statobj = gzipped
+        mtime = statobj[stat.ST_MTIME]
+        size = statobj[stat.ST_SIZE]
+        etag = file_etag(statobj)
+        headers = response.headers
+        headers['ETag'] = etag
+        headers['Last-Modified'] = http_date(mtime)
+        headers['Accept-Ranges'] = 'bytes'
+        environ = request.environ
+        # Respect the If-None-Match and If-Modified-Since headers.
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            modified = not etag_match(if_none_match, etag)
+        else:
+            modified = self.was_modified_since(
+                environ.get('HTTP_IF_MODIFIED_SINCE'), mtime, size)
+        if not modified:
             response.status_code = 304
+            return response
+        ranges = None
+        if 'HTTP_RANGE' in environ:
+            if_range = environ.get('HTTP_IF_RANGE')
+            if (not if_range or etag_match(if_range, etag, weak=False) or
+                    if_range == headers['Last-Modified']):
+                ranges = parse_range(environ['HTTP_RANGE'], size)
+        if ranges is None:
+            response.content = self.file_content(fullpath, statobj)
+        elif not ranges:
+            response.status_code = 416
+            headers['Content-Range'] = 'bytes */%d' % size
+        elif len(ranges) == 1:
+            start, stop = ranges[0]
+            response.status_code = 206
+            headers['Content-Range'] = 'bytes %d-%d/%d' % (start, stop-1,
+                                                           size)
+            response.content = self.file_content(fullpath, statobj, ranges)
         else:
-            response.content = open(fullpath, 'rb').read()
-            if status_code:
-                response.status_code = status_code
-            else:
-                response.headers["Last-Modified"] = http_date(
-                    statobj[stat.ST_MTIME])
+            response.status_code = 206
+            boundary = uuid4().hex
+            content_type = (response.content_type or
+                            'application/octet-stream')
+            response.content_type = ('multipart/byteranges; boundary=%s' %
+                                     boundary)
+            parts = self.file_content(fullpath, statobj, ranges)
+            content = []
+            for (start, stop), part in zip(ranges, parts):
+                content.append(('--%s\r\nContent-Type: %s\r\n'
+                                'Content-Range: bytes %d-%d/%d\r\n\r\n' %
+                                (boundary, content_type, start, stop-1,
+                                 size)).encode('latin-1'))
+                content.extend((part, b'\r\n'))
+            content.append(('--%s--\r\n' % boundary).encode('latin-1'))
+            response.content = content
         return response
 
+    def gzip_file(self, request, fullpath, statobj):
+        '''The path and ``stat`` of the ``.gz`` sibling of ``fullpath`` if
+        available and accepted by the client, otherwise ``None``.
+        '''
+        if not self.gzip_static:
+            return
+        path = '%s.gz' % fullpath
+        try:
+            gzstat = self.file_cache.stat(path)
+        except OSError:
+            return
+        if gzstat[stat.ST_MTIME] < statobj[stat.ST_MTIME]:
+            return
+        response = request.response
+        response.headers.add_header('Vary', 'Accept-Encoding')
+        if request.encodings.best_match(('gzip', 'identity')) == 'gzip':
+            response.headers['Content-Encoding'] = 'gzip'
+            return path, gzstat
+
+    def file_content(self, fullpath, statobj, ranges=None):
+        '''The content of a file, or of its ``ranges``.
+
+        Small files are read from the :attr:`file_cache`, larger files are
+        returned as :class:`.FileWrapper`.
+        '''
+        data = self.file_cache.read(fullpath, statobj)
+        if data is not None:
+            if ranges:
+                data = memoryview(data)
+                return [data[start:stop] for start, stop in ranges]
+            return (data,)
+        file = open(fullpath, 'rb')
+        if ranges:
+            return [FileWrapper(file, offset=start, count=stop-start)
+                    for start, stop in ranges]
+        return (FileWrapper(file, count=statobj[stat.ST_SIZE]),)
+
     def was_modified_since(self, header=None, mtime=0, size=0):
         '''Check if an item was modified since the user last downloaded it
 
@@ -646,3 +810,27 @@ class FileRouter(Router, MediaMixin):
                                    status_code=self._status_code)
         elif self._raise_404:
             raise Http404
+
+
+class MetricsRouter(Router):
+    '''A :class:`Router` serving the rolling time series returned by the
+    :ref:`metrics command <actor_metrics_command>` of the arbiter.
+
+    Metrics are served as JSON or, for clients accepting ``text/plain``
+    only, in the Prometheus text exposition format::
+
+        middleware = MetricsRouter('/metrics')
+    '''
+    response_content_types = RouterParam(('application/json',
+                                          'text/plain'))
+
+    @task
+    def get(self, request):
+        metrics = yield from send('arbiter', 'metrics')
+        response = request.response
+        if response.content_type == 'text/plain':
+            response.content = prometheus_text(metrics)
+        else:
+            response.content_type = 'application/json'
+            response.content = json.dumps(metrics)
+        return response
@@ -17,7 +17,9 @@ import time
 import os
 import socket
 import io
+from collections import deque
 from asyncio import wait_for
+from functools import lru_cache
 from wsgiref.handlers import format_date_time
 from urllib.parse import urlparse, unquote
 
@@ -32,6 +34,7 @@ from pulsar.utils.httpurl import (Headers, has_empty_content,
 from pulsar.utils.internet import format_address, is_tls
 from pulsar.async.protocols import ProtocolConsumer
 
+from .files import FileWrapper
 from .utils import (handle_wsgi_error, wsgi_request, HOP_HEADERS,
                     log_wsgi_info, LOGGER)
 
@@ -39,7 +42,13 @@ __all__ = ['HttpServerResponse', 'MAX_CHUNK_SIZE', 'test_wsgi_environ']
 
 
 MAX_CHUNK_SIZE = 65536
+# Size line of chunks of MAX_CHUNK_SIZE bytes and the last chunk
+FULL_CHUNK_SIZE = ('%X\r\n' % MAX_CHUNK_SIZE).encode('utf-8')
+LAST_CHUNK = b'0\r\n\r\n'
 MAX_TIME_IN_LOOP = 0.5
+DISCARD_TIMEOUT = 5
+# Requests processed before the responses of previous pipelined requests
+PIPELINE_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'TRACE'))
 
 
 def test_wsgi_environ(path=None, method=None, headers=None, extra=None,
@@ -81,15 +90,56 @@ def http_protocol(parser):
 
 
 class StreamReader:
+    '''The ``wsgi.input`` of a :class:`HttpServerResponse`, an asynchronous
+    stream over the body of a request.
+
+    The body can be read in full with :meth:`read` or chunk by chunk, as
+    it is received, with :meth:`next_chunk` or, with python 3.5 and above,
+    ``async for chunk in stream``. Received chunks are buffered until they
+    are consumed, reading from the ``connection`` is paused while more
+    than ``limit`` bytes are buffered and resumed once the application
+    consumes them. Reading the whole body with :meth:`read` lifts the
+    ``limit``.
+
+    :param limit: maximum number of bytes buffered before pausing the
+        ``connection``, no limit if zero.
+    :param max_size: maximum size of the body. Larger bodies result in a
+        413 :class:`.HttpException`, before the application is invoked when
+        the ``Content-Length`` is known. No limit if zero.
+    '''
     _expect_sent = None
     _waiting = None
-
-    def __init__(self, headers, parser, transport=None):
+    _maxbuf = None
+    _waiter = None
+    _consumer = None
+    _streamed = None
+    _paused = False
+    _read_all = False
+    _discarding = False
+    error = None
+
+    def __init__(self, headers, parser, transport=None, connection=None,
+                 limit=0, max_size=0):
         self.headers = headers
         self.parser = parser
         self.transport = transport
+        self.connection = connection
+        self.limit = limit
+        self.max_size = max_size
         self.buffer = b''
+        self.received = 0
+        self._chunks = deque()
+        self._buffered = 0
         self.on_message_complete = Future()
+        self.on_message_complete.add_done_callback(self._wakeup)
+        if max_size:
+            try:
+                length = int(headers.get('content-length') or 0)
+            except ValueError:
+                self.error = HttpException(status=400)
+            else:
+                if length > max_size:
+                    self.error = HttpException(status=413)
 
     def __repr__(self):
         return repr(self.transport)
@@ -113,14 +163,12 @@ class StreamReader:
     def recv(self):
         '''Read bytes in the buffer.
         '''
-        if self.waiting_expect():
-            if self.parser.get_version() < (1, 1):
-                raise HttpException(status=417)
-            else:
-                msg = '%s 100 Continue\r\n\r\n' % http_protocol(self.parser)
-                self._expect_sent = msg
-                self.transport.write(msg.encode(DEFAULT_CHARSET))
-        return self.parser.recv_body()
+        self._continue()
+        body = b''.join(self._chunks)
+        self._chunks.clear()
+        self._buffered = 0
+        self._resume()
+        return body
 
     def read(self, maxbuf=None):
         '''Return bytes in the buffer.
@@ -129,33 +177,202 @@ class StreamReader:
         which results in the bytes read.
         '''
         if not self._waiting:
-            body = self.recv()
-            if self.done():
-                return self._getvalue(body, maxbuf)
+            self._read_all = True
+            self._maxbuf = maxbuf
+            self.buffer += self.recv()
+            if self.done() or self.error:
+                return self._getvalue()
             else:
-                self._waiting = chain_future(
-                    self.on_message_complete,
-                    lambda r: self._getvalue(body, maxbuf))
+                self._waiting = Future()
                 return self._waiting
         else:
             return self._waiting
 
+    def next_chunk(self):
+        '''A :class:`~asyncio.Future` resulting in the next chunk of the
+        body, or in an empty bytes string at the end of the body.
+        '''
+        waiter = Future()
+        try:
+            self._continue()
+        except HttpException as exc:
+            waiter.set_exception(exc)
+        else:
+            if self.buffer:
+                self._chunks.appendleft(self.buffer)
+                self._buffered += len(self.buffer)
+                self.buffer = b''
+            self._waiter = waiter
+            self._wakeup()
+        return waiter
+
+    def stream(self, consumer):
+        '''Pass the body to ``consumer`` as it is received, rather than
+        buffering it.
+
+        ``consumer`` is called with the bytes received so far and then
+        with each new chunk of the body. Return a :class:`~asyncio.Future`
+        which results in ``None`` once the body has been received or in
+        the :attr:`error` of the stream.
+        '''
+        body = self.buffer + self.recv()
+        self.buffer = b''
+        self._consumer = consumer
+        self._streamed = Future()
+        if body and not self.error:
+            consumer(body)
+        self._wakeup()
+        return self._streamed
+
+    def feed(self):
+        '''Move the body received by the parser to the buffer, or to the
+        :meth:`stream` consumer if any.
+
+        Called by the :class:`.HttpServerResponse` when it receives data.
+        '''
+        data = self.parser.recv_body()
+        if not data:
+            return
+        self.received += len(data)
+        if self.error or self._discarding:
+            return
+        if self.max_size and self.received > self.max_size:
+            self.error = HttpException(status=413)
+            self._chunks.clear()
+            self._buffered = 0
+            self._resume()
+        elif self._consumer:
+            self._consumer(data)
+            return
+        else:
+            self._chunks.append(data)
+            self._buffered += len(data)
+            if (self.limit and not self._read_all and
+                    self._buffered > self.limit):
+                self._pause()
+        self._wakeup()
+
+    def discard(self):
+        '''Drop the body which has not been read and the body received from
+        now on.'''
+        self._discarding = True
+        self._chunks.clear()
+        self._buffered = 0
+        self.buffer = b''
+        self._resume()
+
     def fail(self):
         if self.waiting_expect():
             raise HttpException(status=417)
 
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        return chain_future(self.next_chunk(), callback=self._next)
+
     #    INTERNALS
-    def _getvalue(self, body, maxbuf):
-        if self.buffer:
-            body = self.buffer + body
-        body = body + self.recv()
+    def _continue(self):
+        if self.waiting_expect():
+            if self.parser.get_version() < (1, 1):
+                raise HttpException(status=417)
+            else:
+                msg = '%s 100 Continue\r\n\r\n' % http_protocol(self.parser)
+                self._expect_sent = msg
+                self.transport.write(msg.encode(DEFAULT_CHARSET))
+
+    def _getvalue(self):
+        if self.error:
+            raise self.error
+        body = self.buffer + self.recv()
+        maxbuf = self._maxbuf
         if maxbuf and len(body) > maxbuf:
             body, self.buffer = body[:maxbuf], body[maxbuf:]
+        else:
+            self.buffer = b''
         return body
 
+    def _wakeup(self, _=None):
+        waiter = self._waiter
+        if waiter and (self._chunks or self.error or self.done()):
+            self._waiter = None
+            if waiter.done():
+                pass
+            elif self.error:
+                waiter.set_exception(self.error)
+            elif self._chunks:
+                chunk = self._chunks.popleft()
+                self._buffered -= len(chunk)
+                if self._buffered <= self.limit:
+                    self._resume()
+                waiter.set_result(chunk)
+            else:
+                waiter.set_result(b'')
+        waiting = self._waiting
+        if waiting and not waiting.done() and (self.error or self.done()):
+            try:
+                waiting.set_result(self._getvalue())
+            except HttpException as exc:
+                waiting.set_exception(exc)
+        streamed = self._streamed
+        if streamed and not streamed.done():
+            if self.error:
+                streamed.set_exception(self.error)
+            elif self.done():
+                streamed.set_result(None)
+
+    def _next(self, chunk):
+        if not chunk:
+            raise StopAsyncIteration
+        return chunk
+
+    def _pause(self):
+        if not self._paused and self.connection:
+            self._paused = True
+            self.connection.pause_reading()
+
+    def _resume(self):
+        if self._paused:
+            self._paused = False
+            self.connection.resume_reading()
+
+
+def environ_template(client_address, server_software=None, https=False,
+                     extra=None):
+    '''The part of the WSGI environ which does not change between the
+    requests of a connection.
+
+    :func:`wsgi_environ` copies it, rather than building these values again,
+    for each request.
+
+    :param client_address: client address
+    :param server_software: the ``SERVER_SOFTWARE``
+    :param https: ``True`` for a secure connection
+    :param extra: additional dictionary of parameters to add
+    '''
+    remote = remote_address(client_address)
+    environ = {"wsgi.errors": sys.stderr,
+               "wsgi.version": (1, 0),
+               "wsgi.run_once": False,
+               "wsgi.multithread": False,
+               "wsgi.multiprocess": False,
+               "wsgi.file_wrapper": FileWrapper,
+               "wsgi.url_scheme": 'https' if https else 'http',
+               "SERVER_SOFTWARE": server_software or pulsar.SERVER_SOFTWARE,
+               "SCRIPT_NAME": os.environ.get("SCRIPT_NAME", ""),
+               "CONTENT_TYPE": '',
+               "REMOTE_ADDR": remote[0],
+               "REMOTE_PORT": str(remote[1])}
+    if https:
+        environ['HTTPS'] = 'on'
+    if extra:
+        environ.update(extra)
+    return environ
+
 
 def wsgi_environ(stream, parser, request_headers, address, client_address,
-                 headers, server_software=None, https=False, extra=None):
+                 headers, server_software=None, https=False, extra=None,
+                 template=None):
     '''Build the WSGI Environment dictionary
 
     :param stream: a wsgi stream object
@@ -164,35 +381,38 @@ def wsgi_environ(stream, parser, request_headers, address, client_address,
     :param address: server address
     :param client_address: client address
     :param headers: container for response headers
+    :param template: optional :func:`environ_template` for the connection,
+        when given ``client_address``, ``server_software`` and ``https``
+        are not used.
     '''
+    if template is None:
+        template = environ_template(client_address, server_software, https)
+    environ = template.copy()
     protocol = http_protocol(parser)
     raw_uri = parser.get_url()
-    request_uri = urlparse(raw_uri)
-    #
-    # http://www.w3.org/Protocols/rfc2616/rfc2616-sec5.html#sec5.2
-    # If Request-URI is an absoluteURI, the host is part of the Request-URI.
-    # Any Host header field value in the request MUST be ignored
-    if request_uri.scheme:
-        url_scheme = request_uri.scheme
-        host = request_uri.netloc
+    url_scheme = environ['wsgi.url_scheme']
+    host = None
+    if raw_uri[:1] == '/':
+        # the parser has already split the path from the query
+        path_info = parser.get_path()
     else:
-        url_scheme = 'https' if https else 'http'
-        host = None
+        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec5.html#sec5.2
+        # If Request-URI is an absoluteURI, the host is part of the
+        # Request-URI. Any Host header field value in the request MUST be
+        # ignored
+        request_uri = urlparse(raw_uri)
+        path_info = request_uri.path
+        if request_uri.scheme:
+            url_scheme = request_uri.scheme
+            host = request_uri.netloc
     #
-    environ = {"wsgi.input": stream,
-               "wsgi.errors": sys.stderr,
-               "wsgi.version": (1, 0),
-               "wsgi.run_once": False,
-               "wsgi.multithread": False,
-               "wsgi.multiprocess": False,
-               "SERVER_SOFTWARE": server_software or pulsar.SERVER_SOFTWARE,
-               "REQUEST_METHOD": native_str(parser.get_method()),
-               "QUERY_STRING": parser.get_query_string(),
-               "RAW_URI": raw_uri,
-               "SERVER_PROTOCOL": protocol,
-               "CONTENT_TYPE": ''}
-    forward = client_address
-    script_name = os.environ.get("SCRIPT_NAME", "")
+    environ["wsgi.input"] = stream
+    environ["REQUEST_METHOD"] = native_str(parser.get_method())
+    environ["QUERY_STRING"] = parser.get_query_string()
+    environ["RAW_URI"] = raw_uri
+    environ["SERVER_PROTOCOL"] = protocol
+    forward = None
+    script_name = environ['SCRIPT_NAME']
     for header, value in request_headers:
         header = header.lower()
         if header in HOP_HEADERS:
@@ -215,28 +435,22 @@ def wsgi_environ(stream, parser, request_headers, address, client_address,
             continue
         key = 'HTTP_' + header.upper().replace('-', '_')
         environ[key] = value
-    environ['wsgi.url_scheme'] = url_scheme
-    if url_scheme == 'https':
-        environ['HTTPS'] = 'on'
-    if isinstance(forward, str):
-        # we only took the last one
-        # http://en.wikipedia.org/wiki/X-Forwarded-For
-        if forward.find(",") >= 0:
-            forward = forward.rsplit(",", 1)[1].strip()
-        remote = forward.split(":")
-        if len(remote) < 2:
-            remote.append('80')
-    else:
-        remote = forward
-    environ['REMOTE_ADDR'] = remote[0]
-    environ['REMOTE_PORT'] = str(remote[1])
+    if url_scheme != environ['wsgi.url_scheme']:
+        environ['wsgi.url_scheme'] = url_scheme
+        if url_scheme == 'https':
+            environ['HTTPS'] = 'on'
+        else:
+            environ.pop('HTTPS', None)
+    if forward is not None:
+        remote = remote_address(forward)
+        environ['REMOTE_ADDR'] = remote[0]
+        environ['REMOTE_PORT'] = str(remote[1])
     if not host and protocol == 'HTTP/1.0':
         host = format_address(address)
     if host:
         h = host_and_port_default(url_scheme, host)
-        environ['SERVER_NAME'] = socket.getfqdn(h[0]) if h[0] else '0.0.0.0'
+        environ['SERVER_NAME'] = server_name(h[0])
         environ['SERVER_PORT'] = h[1]
-    path_info = request_uri.path
     if path_info is not None:
         if script_name:
             path_info = path_info.split(script_name, 1)[1]
@@ -247,6 +461,46 @@ def wsgi_environ(stream, parser, request_headers, address, client_address,
     return environ
 
 
+def remote_address(forward):
+    '''The remote address, as a ``(host, port)`` pair, from the client
+    address or the value of a ``X-Forwarded-For`` header.'''
+    if isinstance(forward, str):
+        # we only took the last one
+        # http://en.wikipedia.org/wiki/X-Forwarded-For
+        if forward.find(",") >= 0:
+            forward = forward.rsplit(",", 1)[1].strip()
+        remote = forward.split(":")
+        if len(remote) < 2:
+            remote.append('80')
+        return remote
+    return forward
+
+
+@lru_cache(maxsize=256)
+def server_name(host):
+    '''The ``SERVER_NAME`` of ``host``.
+
+    The fully qualified domain name lookup can block on DNS, results are
+    kept in a bounded cache.
+    '''
+    return socket.getfqdn(host) if host else '0.0.0.0'
+
+
+_date = [None, None]
+
+
+def http_date_now():
+    '''The current time formatted for the ``Date`` header.
+
+    The value is formatted at most once per second.
+    '''
+    now = int(time.time())
+    date = _date
+    if date[0] != now:
+        date[:] = now, format_date_time(now)
+    return date[1]
+
+
 def chunk_encoding(chunk):
     '''Write a chunk::
 
@@ -255,8 +509,22 @@ def chunk_encoding(chunk):
 
     If the size is 0, this is the last chunk, and an extra CRLF is appended.
     '''
-    head = ("%X\r\n" % len(chunk)).encode('utf-8')
-    return head + chunk + b'\r\n'
+    return b''.join(chunk_buffers(chunk))
+
+
+def chunk_buffers(chunk):
+    '''The buffers of a chunk, as in :func:`chunk_encoding`, without
+    copying ``chunk``.'''
+    return ("%X\r\n" % len(chunk)).encode('utf-8'), chunk, b'\r\n'
+
+
+def close_pipeline(connection, exc=None):
+    '''Fail the pipelined responses of a closed ``connection`` waiting
+    for their turn.'''
+    for consumer in tuple(connection._pipeline):
+        turn = consumer._turn
+        if turn is not None and not turn.done():
+            turn.set_exception(ConnectionResetError('Connection lost'))
 
 
 def keep_alive(headers, version):
@@ -286,6 +554,12 @@ def keep_alive_with_status(status, headers):
 class HttpServerResponse(ProtocolConsumer):
     '''Server side WSGI :class:`.ProtocolConsumer`.
 
+    Requests pipelined by a client are processed concurrently, up to the
+    :ref:`http_pipeline_depth <setting-http_pipeline_depth>` setting, and
+    their responses are queued in the ``_pipeline`` of the connection so
+    that they are written in order. A response waits for its turn, the
+    ``post_request`` event of the response before it.
+
     .. attribute:: wsgi_callable
 
         The wsgi callable handling requests.
@@ -294,6 +568,9 @@ class HttpServerResponse(ProtocolConsumer):
     _headers_sent = None
     _stream = None
     _buffer = None
+    _turn = None
+    _pending = None
+    _bytes_sent = 0
     _logger = LOGGER
     SERVER_SOFTWARE = pulsar.SERVER_SOFTWARE
     ONE_TIME_EVENTS = ProtocolConsumer.ONE_TIME_EVENTS + ('on_headers',)
@@ -307,6 +584,26 @@ class HttpServerResponse(ProtocolConsumer):
         self.keep_alive = False
         self.SERVER_SOFTWARE = server_software or self.SERVER_SOFTWARE
 
+    def connection_made(self, connection):
+        '''Add this response to the pipeline of ``connection``.
+
+        If the pipeline has responses to write before this one, this
+        response waits for its turn.
+        '''
+        pipeline = getattr(connection, '_pipeline', None)
+        if pipeline is None:
+            pipeline = connection._pipeline = deque()
+            connection.bind_event('connection_lost', close_pipeline)
+        if pipeline:
+            self._turn = Future(loop=self._loop)
+        pipeline.append(self)
+        self.bind_event('post_request', self._next_in_pipeline)
+
+    def drain(self):
+        '''Respond with ``Connection: close`` unless headers were sent.
+        '''
+        self.keep_alive = False
+
     @property
     def headers_sent(self):
         '''Available once the headers have been sent to the client.
@@ -326,8 +623,14 @@ class HttpServerResponse(ProtocolConsumer):
         processed = parser.execute(data, len(data))
         if not self._stream and parser.is_headers_complete():
             headers = Headers(parser.get_headers(), kind='client')
-            self._stream = StreamReader(headers, parser, self.transport)
+            cfg = self.cfg
+            self._stream = StreamReader(
+                headers, parser, self.transport, self._connection,
+                limit=cfg.get('http_body_buffer', 0),
+                max_size=cfg.get('http_max_body_size', 0))
             self._response(self.wsgi_environ())
+        if self._stream:
+            self._stream.feed()
         #
         if parser.is_message_complete():
             #
@@ -336,11 +639,17 @@ class HttpServerResponse(ProtocolConsumer):
                 self._stream.on_message_complete.set_result(None)
 
             if processed < len(data):
-                if not self._buffer:
-                    self._buffer = data[processed:]
+                data = data[processed:]
+                if self._pipelining():
+                    # the connection builds a consumer for the next request
+                    self._connection._current_consumer = None
+                    return data
+                elif not self._buffer:
+                    self._buffer = data
+                    self._connection.pause_reading()
                     self.bind_event('post_request', self._new_request)
                 else:
-                    self._buffer += data[processed:]
+                    self._buffer += data
         #
         elif processed < len(data):
             # This is a parsing error, the client must have sent
@@ -427,11 +736,18 @@ class HttpServerResponse(ProtocolConsumer):
 
         Required by the WSGI specification.
 
+        Headers, chunk delimiters and ``data`` are written as separate
+        buffers with a single :meth:`~.ProtocolConsumer.writelines` call,
+        so that ``data`` is never copied into a larger response. Chunks
+        are ``memoryview`` slices of ``data``.
+
+        A pipelined response keeps ``data`` until the responses before it
+        are written.
+
         :param data: bytes to write
         :param force: Optional flag used internally
         :return: a :class:`~asyncio.Future` or the number of bytes written
         '''
-        write = super().write
         chunks = []
         if not self._headers_sent:
             tosend = self.get_headers()
@@ -439,18 +755,29 @@ class HttpServerResponse(ProtocolConsumer):
             self.fire_event('on_headers')
             chunks.append(self._headers_sent)
         if data:
+            size = len(data)
+            self._bytes_sent += size
             if self.chunked:
-                while len(data) >= MAX_CHUNK_SIZE:
-                    chunk, data = data[:MAX_CHUNK_SIZE], data[MAX_CHUNK_SIZE:]
-                    chunks.append(chunk_encoding(chunk))
-                if data:
-                    chunks.append(chunk_encoding(data))
+                data = memoryview(data)
+                end = size - size % MAX_CHUNK_SIZE
+                for start in range(0, end, MAX_CHUNK_SIZE):
+                    chunks.extend((FULL_CHUNK_SIZE,
+                                   data[start:start+MAX_CHUNK_SIZE], b'\r\n'))
+                if end < size:
+                    chunks.extend(chunk_buffers(data[end:]))
             else:
                 chunks.append(data)
         elif force and self.chunked:
-            chunks.append(chunk_encoding(data))
+            chunks.append(LAST_CHUNK)
         if chunks:
-            return write(b''.join(chunks))
+            if self._turn is not None and not self._turn.done():
+                if self._pending is None:
+                    self._pending = []
+                self._pending.extend(chunks)
+                return self._turn
+            elif self._pending:
+                chunks[:0], self._pending = self._pending, None
+            return self.writelines(chunks)
 
     ########################################################################
     #    INTERNALS
@@ -460,12 +787,18 @@ class HttpServerResponse(ProtocolConsumer):
         response = None
         done = False
         alive = self.cfg.keep_alive or 15
+        started = time.time()
         while not done:
             done = True
             try:
                 if exc_info is None:
                     if 'SERVER_NAME' not in environ:
                         raise HttpException(status=400)
+                    if self._stream.error:
+                        raise self._stream.error
+                    if (self._turn is not None and
+                            environ['REQUEST_METHOD'] not in PIPELINE_METHODS):
+                        yield from self._turn
                     response = self.wsgi_callable(environ, self.start_response)
                     if isfuture(response):
                         response = yield from wait_for(response, alive)
@@ -478,13 +811,30 @@ class HttpServerResponse(ProtocolConsumer):
                     self.start_response(response.status,
                                         response.get_headers(), exc_info)
                 #
+                # Wait for the responses of previous pipelined requests
+                if self._turn is not None:
+                    yield from self._turn
+                    if self._pending:
+                        pending, self._pending = self._pending, None
+                        result = self.writelines(pending)
+                        if isfuture(result):
+                            yield from wait_for(result, alive)
+                #
                 # Do the actual writing
                 loop = self._loop
                 start = loop.time()
-                for chunk in response:
+                if isinstance(response, FileWrapper):
+                    body = (response,)
+                else:
+                    body = response
+                for chunk in body:
                     if isfuture(chunk):
                         chunk = yield from wait_for(chunk, alive)
                         start = loop.time()
+                    if isinstance(chunk, FileWrapper):
+                        yield from self._write_file(chunk)
+                        start = loop.time()
+                        continue
                     result = self.write(chunk)
                     if isfuture(result):
                         yield from wait_for(result, alive)
@@ -513,10 +863,18 @@ class HttpServerResponse(ProtocolConsumer):
                     done = False
                     exc_info = sys.exc_info()
             else:
-                if not self.keep_alive:
-                    self.connection.close()
-                self.finished()
-                log_wsgi_info(self.logger.info, environ, self.status)
+                if not self.parser.is_message_complete():
+                    self._discard_body()
+                else:
+                    if not self.keep_alive:
+                        self.connection.close()
+                    self.finished()
+                access_log = getattr(self.producer, 'access_log', None)
+                if access_log is None:
+                    log_wsgi_info(self.logger.info, environ, self.status)
+                else:
+                    access_log.record(environ, self.status, self._bytes_sent,
+                                      started)
             finally:
                 if hasattr(response, 'close'):
                     try:
@@ -561,26 +919,93 @@ class HttpServerResponse(ProtocolConsumer):
 
     def wsgi_environ(self):
         # return a the WSGI environ dictionary
-        transport = self.transport
-        https = True if is_tls(transport.get_extra_info('socket')) else False
-        multiprocess = (self.cfg.concurrency == 'process')
         environ = wsgi_environ(self._stream,
                                self.parser,
                                self._stream.headers,
-                               transport.get_extra_info('sockname'),
+                               self.transport.get_extra_info('sockname'),
                                self.address, self.headers,
-                               self.SERVER_SOFTWARE,
-                               https=https,
-                               extra={'pulsar.connection': self.connection,
-                                      'pulsar.cfg': self.cfg,
-                                      'wsgi.multiprocess': multiprocess})
+                               template=self.environ_template())
+        environ['pulsar.connection'] = self._connection
         self.keep_alive = keep_alive(self.headers, self.parser.get_version())
+        if self.keep_alive and getattr(self.producer, 'draining', False):
+            self.keep_alive = False
         self.headers.update([('Server', self.SERVER_SOFTWARE),
-                             ('Date', format_date_time(time.time()))])
+                             ('Date', http_date_now())])
         return environ
 
+    def environ_template(self):
+        '''The :func:`environ_template` of the connection.
+
+        Built by the first request and stored in the connection for the
+        requests which follow.
+        '''
+        connection = self._connection
+        template = getattr(connection, '_environ_template', None)
+        if template is None:
+            sock = self.transport.get_extra_info('socket')
+            extra = {'pulsar.cfg': self.cfg,
+                     'wsgi.multiprocess': self.cfg.concurrency == 'process'}
+            template = environ_template(self.address, self.SERVER_SOFTWARE,
+                                        https=bool(is_tls(sock)),
+                                        extra=extra)
+            connection._environ_template = template
+        return template
+
+    def _discard_body(self):
+        # The response was sent before the request body was read. Read and
+        # drop the body for a while before closing the connection, so that
+        # the client can receive the response rather than a reset.
+        self.keep_alive = False
+        self._stream.discard()
+        handle = self._loop.call_later(DISCARD_TIMEOUT, self._close)
+        self._stream.on_message_complete.add_done_callback(
+            lambda fut: self._close(handle))
+
+    def _close(self, handle=None):
+        if handle:
+            handle.cancel()
+        if not self.event('post_request').fired():
+            self.connection.close()
+            self.finished()
+
+    def _write_file(self, wrapper):
+        # Send the file of a FileWrapper unless the response is chunked
+        result = self.write(b'')
+        if isfuture(result):
+            yield from result
+        if self.chunked:
+            for data in wrapper:
+                result = self.write(data)
+                if isfuture(result):
+                    yield from result
+        else:
+            sent = yield from self.sendfile(wrapper.file, wrapper.offset,
+                                            wrapper.count)
+            self._bytes_sent += sent
+
+    def _pipelining(self):
+        # Check if the next request can be processed before this response
+        # is finished
+        connection = self._connection
+        return (self.keep_alive and
+                self.parser.get_method() in PIPELINE_METHODS and
+                'upgrade' not in self._stream.headers and
+                connection._current_consumer is self and
+                len(connection._pipeline) <
+                self.cfg.get('http_pipeline_depth', 1))
+
+    def _next_in_pipeline(self, _, exc=None):
+        pipeline = self._connection._pipeline
+        if self in pipeline:
+            pipeline.remove(self)
+            if pipeline:
+                turn = pipeline[0]._turn
+                if turn is not None and not turn.done():
+                    turn.set_result(None)
+
     def _new_request(self, _, exc=None):
         connection = self._connection
+        connection.resume_reading()
         connection.data_received(self._buffer)
 
     def _write_headers(self):
@@ -222,5 +222,43 @@ class CharsetAccept(Accept):
         return item == '*' or _normalize(value) == _normalize(item)
 
 
+class EncodingAccept(Accept):
+    """Like :class:`Accept` but with the rules of the ``Accept-Encoding``
+    header: an explicit coding takes precedence over ``*``, a quality of
+    ``0`` means not acceptable and ``identity`` is acceptable unless
+    excluded.
+
+    >>> a = EncodingAccept([('gzip', 1), ('*', 0)])
+    >>> a.best_match(['br', 'gzip', 'identity'])
+    'gzip'
+    """
+    def quality(self, key):
+        key = key.lower()
+        star = None
+        for item, quality in self:
+            item = item.lower()
+            if item == key:
+                return quality
+            elif item == '*' and star is None:
+                star = quality
+        if star is not None:
+            return star
+        return 1 if key == 'identity' else 0
+
+    def best_match(self, matches, default=None):
+        """The acceptable coding in ``matches`` with the highest quality.
+        If two codings have the same quality, the one which comes first is
+        returned.
+        """
+        result = default
+        best_quality = 0
+        for server_item in matches:
+            quality = self.quality(server_item)
+            if quality > best_quality:
+                best_quality = quality
+                result = server_item
+        return result
+
+
 class RequestCacheControl(FrozenDict):
     pass
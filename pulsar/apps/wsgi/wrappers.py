@@ -27,6 +27,16 @@ Wsgi Request
    :member-order: bysource
 
 
+.. _wsgi-multipart-reader:
+
+Multipart Reader
+=====================
+
+.. autoclass:: MultipartReader
+   :members:
+   :member-order: bysource
+
+
 .. _wsgi-response:
 
 Wsgi Response
@@ -40,14 +50,17 @@ Wsgi Response
 .. _AJAX: http://en.wikipedia.org/wiki/Ajax_(programming)
 .. _TLS: http://en.wikipedia.org/wiki/Transport_Layer_Security
 '''
+from collections import deque
 from functools import reduce, partial
 from io import BytesIO
 from http.client import responses
 
-from pulsar import Future, chain_future
+from pulsar import Future, HttpException, chain_future
 from pulsar.utils.system import json
-from pulsar.utils.multipart import parse_form_data, parse_options_header
-from pulsar.utils.structures import AttributeDictionary
+from pulsar.utils.multipart import (parse_form_data, parse_options_header,
+                                    MultipartStreamParser, MultipartError,
+                                    MultipartLimitError)
+from pulsar.utils.structures import AttributeDictionary, MultiValueDict
 from pulsar.utils.httpurl import (Headers, SimpleCookie,
                                   has_empty_content, REDIRECT_CODES,
                                   ENCODE_URL_METHODS, JSON_CONTENT_TYPES,
@@ -57,10 +70,11 @@ from pulsar.utils.httpurl import (Headers, SimpleCookie,
 from .content import HtmlDocument
 from .utils import (set_wsgi_request_class, set_cookie, query_dict,
                     parse_accept_header)
-from .structures import ContentAccept, CharsetAccept, LanguageAccept
+from .structures import (ContentAccept, CharsetAccept, LanguageAccept,
+                         EncodingAccept)
 
 
-__all__ = ['EnvironMixin', 'WsgiResponse',
+__all__ = ['EnvironMixin', 'WsgiResponse', 'MultipartReader',
            'WsgiRequest', 'cached_property']
 
 MAX_BUFFER_SIZE = 2**16
@@ -263,6 +277,10 @@ class WsgiResponse(object):
         if self.is_streamed:
             if hasattr(self.content, 'close'):
                 self.content.close()
+        else:
+            for chunk in self.content:
+                if hasattr(chunk, 'close'):
+                    chunk.close()
 
     def set_cookie(self, key, **kwargs):
         """
@@ -319,6 +337,133 @@ class WsgiResponse(object):
         return self.headers[header]
 
 
+class MultipartReader(object):
+    '''An asynchronous iterator over the parts of a ``multipart/form-data``
+    request body, parsed by a :class:`.MultipartStreamParser` as the body
+    is received.
+
+    Obtained from :meth:`WsgiRequest.multipart`::
+
+        reader = request.multipart()
+        while True:
+            part = yield from reader.next_part()
+            if part is None:
+                break
+            ...
+
+    or, with python 3.5 and above, ``async for part in reader``.
+    Parts larger than ``memfile_limit`` are spooled to temporary files.
+    A body exceeding the limits of the parser results in a 413
+    :class:`.HttpException`, a malformed body in a 400.
+
+    :param stream: the ``wsgi.input``, either a :class:`.StreamReader` or a
+        file-like object.
+    :param boundary: the multipart boundary.
+    :param limits: key-valued parameters passed to the
+        :class:`.MultipartStreamParser`.
+    '''
+    def __init__(self, stream, boundary, **limits):
+        self.parser = MultipartStreamParser(boundary, **limits)
+        self._parts = deque()
+        self._waiter = None
+        self._error = None
+        self._complete = Future()
+        if hasattr(stream, 'stream'):
+            stream.stream(self._feed).add_done_callback(self._finish)
+        else:
+            read, size = stream.read, self.parser.buffer_size
+            while self._error is None:
+                data = read(size)
+                if not data:
+                    break
+                self._feed(data)
+            self._finish()
+
+    def done(self):
+        '''``True`` when the whole body has been parsed.'''
+        return self._complete.done()
+
+    def next_part(self):
+        '''A :class:`~asyncio.Future` resulting in the next
+        :class:`.MultipartPart` or in ``None`` when there are no more
+        parts.'''
+        waiter = Future()
+        if self._parts or self._error or self.done():
+            self._resolve(waiter)
+        else:
+            self._waiter = waiter
+        return waiter
+
+    def form_data(self):
+        '''A :class:`~asyncio.Future` resulting in the ``(forms, files)``
+        tuple of the parts not yet consumed, as returned by
+        :func:`.parse_form_data`.'''
+        return chain_future(self._complete, callback=self._form_data)
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        return chain_future(self.next_part(), callback=self._next)
+
+    #    INTERNALS
+    def _feed(self, data):
+        if self._error is None:
+            try:
+                self._parts.extend(self.parser.feed(data))
+            except MultipartError as exc:
+                self._set_error(exc)
+            self._wakeup()
+
+    def _finish(self, fut=None):
+        if self._error is None:
+            if fut is not None and fut.exception():
+                self._error = fut.exception()
+            else:
+                try:
+                    self.parser.close()
+                except MultipartError as exc:
+                    self._set_error(exc)
+        self._complete.set_result(None)
+        self._wakeup()
+
+    def _set_error(self, exc):
+        status = 413 if isinstance(exc, MultipartLimitError) else 400
+        self._error = HttpException(str(exc), status=status)
+
+    def _wakeup(self):
+        waiter = self._waiter
+        if waiter and (self._parts or self._error or self.done()):
+            self._waiter = None
+            if not waiter.done():
+                self._resolve(waiter)
+
+    def _resolve(self, waiter):
+        if self._parts:
+            waiter.set_result(self._parts.popleft())
+        elif self._error:
+            waiter.set_exception(self._error)
+        else:
+            waiter.set_result(None)
+
+    def _next(self, part):
+        if part is None:
+            raise StopAsyncIteration
+        return part
+
+    def _form_data(self, _):
+        if self._error:
+            raise self._error
+        forms, files = MultiValueDict(), MultiValueDict()
+        while self._parts:
+            part = self._parts.popleft()
+            if part.filename or not part.is_buffered():
+                files[part.name] = part
+            else:
+                forms[part.name] = part.string()
+        return forms, files
+
+
 class EnvironMixin(object):
     '''A wrapper around a WSGI_ environ.
 
@@ -412,13 +557,14 @@ class WsgiRequest(EnvironMixin):
     @cached_property
     def encodings(self):
         """List of encodings this client supports as
-        :class:`.Accept` object.
+        :class:`.EncodingAccept` object.
 
-        Obtained form the ``Accept-Charset`` request header.
+        Obtained form the ``Accept-Encoding`` request header.
         Encodings in a HTTP term are compression encodings such as gzip.
         For charsets have a look at :attr:`charsets` attribute.
         """
-        return parse_accept_header(self.environ.get('HTTP_ACCEPT_ENCODING'))
+        return parse_accept_header(self.environ.get('HTTP_ACCEPT_ENCODING'),
+                                   EncodingAccept)
 
     @cached_property
     def languages(self):
@@ -537,12 +683,37 @@ class WsgiRequest(EnvironMixin):
         '''
         return self.data_and_files(files=False)
 
+    def multipart(self, **limits):
+        '''A :class:`MultipartReader` over the parts of a
+        ``multipart/form-data`` body.
+
+        Parts are parsed as the body is received, without buffering it.
+        ``limits`` are passed to the :class:`.MultipartStreamParser`.
+        The reader is cached.
+        '''
+        reader = self.cache.multipart
+        if reader is None:
+            content_type, options = self.content_type_options
+            boundary = options.get('boundary')
+            if content_type != 'multipart/form-data' or not boundary:
+                raise HttpException(status=415)
+            limits.setdefault('charset', options.get('charset', 'utf-8'))
+            stream = self.environ.get('wsgi.input') or BytesIO()
+            reader = MultipartReader(stream, boundary, **limits)
+            self.cache.multipart = reader
+        return reader
+
     def _data_and_files(self, data=True, files=True, future=None):
         result = {}, None
         chunk = None
         if future is None:
             stream = self.environ.get('wsgi.input')
             if self.method not in ENCODE_URL_METHODS and stream:
+                if (self.content_type_options[0] == 'multipart/form-data' and
+                        hasattr(stream, 'stream') and not stream.done()):
+                    # parse the parts as they are received
+                    return chain_future(self.multipart().form_data(),
+                                        partial(self._form_data, data, files))
                 chunk = stream.read()
                 if isinstance(chunk, Future):
                     return chain_future(
@@ -563,6 +734,12 @@ class WsgiRequest(EnvironMixin):
         self.cache.data_and_files = result
         return self.data_and_files(data, files)
 
+    def _form_data(self, data, files, result):
+        # the body has been consumed by the MultipartReader
+        self.environ['wsgi.input'] = BytesIO()
+        self.cache.data_and_files = result
+        return self.data_and_files(data, files)
+
     @cached_property
     def url_data(self):
         '''A (cached) dictionary containing data from the ``QUERY_STRING``
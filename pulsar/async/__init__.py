@@ -6,5 +6,7 @@ from .proxy import *            # noqa
 from .protocols import *        # noqa
 from .clients import *          # noqa
 from .actor import *            # noqa
+from .metrics import *          # noqa
+from .executor import *         # noqa
 from .concurrency import *      # noqa
 from . import commands          # noqa
@@ -26,6 +26,7 @@ __all__ = ['get_event_loop',
            'Future',
            'reraise',
            'get_io_loop',
+           'loop_events',
            'coroutine',
            'is_async',
            'CANCELLED_ERRORS']
@@ -104,6 +105,19 @@ def new_event_loop(**kwargs):
     return loop
 
 
+def loop_events(loop):
+    '''Dictionary with the number of ``callbacks`` ready to run and of
+    ``scheduled`` callbacks in the event ``loop``.
+
+    Only loops derived from :class:`asyncio.BaseEventLoop` expose them,
+    the values are ``None`` for other loop implementations.
+    '''
+    if isinstance(loop, asyncio.BaseEventLoop):
+        return {'callbacks': len(loop._ready),
+                'scheduled': len(loop._scheduled)}
+    return {'callbacks': None, 'scheduled': None}
+
+
 def is_mainthread(thread=None):
     '''Check if thread is the main thread.
 
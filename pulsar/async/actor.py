@@ -10,7 +10,7 @@ from pulsar.utils.log import WritelnDecorator
 from .events import EventHandler
 from .proxy import ActorProxy, ActorProxyMonitor, actor_identity
 from .mailbox import command_in_context
-from .access import get_actor
+from .access import get_actor, loop_events
 from .cov import Coverage
 from .consts import *   # noqa
 
@@ -177,6 +177,22 @@ class Actor(EventHandler, Coverage):
         The :class:`asyncio.Handle` for the next
         :ref:`actor periodic task <actor-periodic-task>`.
 
+    .. attribute:: loop_lag
+
+        Seconds the last :ref:`actor periodic task <actor-periodic-task>`
+        was called after its scheduled time.
+
+    .. attribute:: executor
+
+        The :class:`.Executor` of the actor event loop, ``None`` for
+        monitors, which share the event loop of the arbiter.
+
+    .. attribute:: loop_monitor
+
+        The :class:`.LoopMonitor` measuring the event loop lag and
+        slow callbacks, ``None`` when the :ref:`loop_probe
+        <setting-loop_probe>` is disabled.
+
     .. attribute:: stream
 
         A ``stream`` handler to write information messages without using
@@ -188,6 +204,9 @@ class Actor(EventHandler, Coverage):
     mailbox = None
     monitor = None
     next_periodic_task = None
+    loop_lag = 0
+    loop_monitor = None
+    executor = None
 
     def __init__(self, impl):
         self.state = ACTOR_STATES.INITIAL
@@ -397,6 +416,9 @@ class Actor(EventHandler, Coverage):
         * ``events`` a dictionary of information about the
           :ref:`event loop <asyncio-event-loop>` running the actor.
         * ``extra`` the :attr:`extra` attribute (you can use it to add stuff).
+        * ``loop`` the event loop lag histogram and slow callbacks
+          measured by the :attr:`loop_monitor`.
+        * ``executor`` the :meth:`.Executor.info` of the :attr:`executor`.
         * ``system`` system info.
 
         This method is invoked when you run the
@@ -413,16 +435,51 @@ class Actor(EventHandler, Coverage):
                  'process_id': self.pid,
                  'is_process': isp,
                  'age': self.impl.age}
-        events = {'callbacks': len(self._loop._ready),
-                  'scheduled': len(self._loop._scheduled)}
+        events = loop_events(self._loop)
         data = {'actor': actor,
                 'events': events,
                 'extra': self.extra}
+        if self.loop_monitor:
+            data['loop'] = self.loop_monitor.info()
+        if self.executor:
+            data['executor'] = self.executor.info()
         if isp:
             data['system'] = system.process_info(self.pid)
         self.fire_event('on_info', info=data)
         return data
 
+    def counters(self):
+        '''Return a flat dictionary of counters sent to the monitor with
+        each :ref:`heartbeat <actor-periodic-task>`:
+
+        * ``callbacks`` and ``scheduled``, the callbacks waiting in the
+          :ref:`event loop <asyncio-event-loop>`, see :func:`.loop_events`.
+        * ``loop_lag`` the delay, in seconds, of the last periodic task.
+        * ``connections`` and ``requests``, the connected clients and the
+          requests processed by the actor :attr:`servers`.
+        * ``draining`` the connections of :attr:`servers` which are
+          draining.
+        * ``rss`` the resident memory of the process, ``None`` for actors
+          running in a thread.
+        '''
+        if not self.started():
+            return
+        connections = requests = draining = 0
+        for server in self.servers.values():
+            clients = getattr(server, 'connected_clients', 0)
+            connections += clients
+            requests += getattr(server, 'requests_processed', 0)
+            if getattr(server, 'draining', False):
+                draining += clients
+        counters = loop_events(self._loop)
+        counters.update({'loop_lag': round(self.loop_lag, 4),
+                         'connections': connections,
+                         'requests': requests,
+                         'draining': draining,
+                         'rss': system.process_rss(self.pid)
+                         if self.is_process() else None})
+        return counters
+
     def _run(self, initial=True):
         exc = None
         if initial:
@@ -1,11 +1,13 @@
 import logging
+from bisect import bisect
 from functools import reduce
 
 from pulsar.utils.internet import is_socket_closed
 
 import asyncio
 
-from .futures import AsyncObject
+from .access import is_async
+from .futures import AsyncObject, async
 from .protocols import Producer
 
 
@@ -21,9 +23,17 @@ class Pool(AsyncObject):
     Open connections are either :attr:`in_use` or :attr:`available`
     to be used. Available connection are placed in an :class:`asyncio.Queue`.
 
+    The lifecycle of available connections is managed by a periodic
+    :meth:`sweep`, enabled by any of the ``min_idle``, ``idle_timeout``,
+    ``max_lifetime`` or ``health_check`` parameters.
+
     This class is not thread safe.
     '''
-    def __init__(self, creator, pool_size=10, loop=None, timeout=None, **kw):
+    wait_buckets = (0.001, 0.01, 0.1, 1, 10)
+
+    def __init__(self, creator, pool_size=10, loop=None, timeout=None,
+                 min_idle=0, idle_timeout=None, max_lifetime=None,
+                 health_check=None, sweep_interval=None, **kw):
         '''
         Construct an asynchronous Pool.
 
@@ -37,6 +47,23 @@ class Pool(AsyncObject):
 
         :param timeout: The number of seconds to wait before giving up
           on returning a connection. Defaults to 30.
+
+        :param min_idle: The number of :attr:`available` connections the
+          :meth:`sweep` keeps open, defaults to 0.
+
+        :param idle_timeout: Optional number of seconds after which an
+          :attr:`available` connection is closed.
+
+        :param max_lifetime: Optional number of seconds after which a
+          connection is closed rather than returned to the pool.
+
+        :param health_check: Optional callable receiving an
+          :attr:`available` connection and returning, possibly
+          asynchronously, ``True`` if the connection is healthy.
+
+        :param sweep_interval: Seconds between two :meth:`sweep`. Defaults
+          to half the smallest of ``idle_timeout`` and ``max_lifetime`` or
+          5 seconds.
         '''
         self._creator = creator
         self._closed = False
@@ -46,6 +73,24 @@ class Pool(AsyncObject):
         self._loop = self._queue._loop
         self._logger = logger
         self._in_use_connections = set()
+        self._min_idle = min(min_idle, pool_size)
+        self._idle_timeout = idle_timeout
+        self._max_lifetime = max_lifetime
+        self._health_check = health_check
+        if sweep_interval is None:
+            timeouts = [t for t in (idle_timeout, max_lifetime) if t]
+            sweep_interval = 0.5*min(timeouts) if timeouts else 5
+        if not (min_idle or idle_timeout or max_lifetime or health_check):
+            sweep_interval = 0
+        self._sweep_interval = sweep_interval
+        self._sweep_handle = None
+        self._created = {}
+        self._released = {}
+        self._counters = {'checkouts': 0, 'waits': 0, 'wait_time': 0,
+                          'creations': 0}
+        self._evictions = {'closed': 0, 'idle': 0, 'lifetime': 0,
+                           'health': 0}
+        self._wait_histogram = [0]*(len(self.wait_buckets) + 1)
 
     @property
     def pool_size(self):
@@ -86,24 +131,103 @@ class Pool(AsyncObject):
         :return: a :class:`~asyncio.Future` resulting in the connection.
         '''
         assert not self._closed
+        self._schedule_sweep()
+        self._counters['checkouts'] += 1
         connection = yield from self._get()
         return PoolConnection(self, connection)
 
+    def prewarm(self):
+        '''Open new connections until ``min_idle`` connections are
+        :attr:`available`.
+
+        :return: the number of connections created.
+        '''
+        assert not self._closed
+        self._schedule_sweep()
+        queue = self._queue
+        missing = min(self._min_idle - self.available,
+                      queue._maxsize - self.in_use - self._connecting -
+                      queue.qsize())
+        if missing <= 0:
+            return 0
+        connections = yield from asyncio.gather(
+            *[self._create() for _ in range(missing)], loop=self._loop)
+        for connection in connections:
+            self._put(connection)
+        return len(connections)
+
+    def sweep(self):
+        '''Evict :attr:`available` connections which are closed, idle for
+        more than ``idle_timeout`` seconds, older than ``max_lifetime``
+        seconds or failing the ``health_check``, and :meth:`prewarm`
+        the pool.
+        '''
+        if self._closed:
+            return
+        now = self._loop.time()
+        queue = self._queue
+        available = []
+        while queue.qsize():
+            connection = queue.get_nowait()
+            if connection is not None:
+                # the number of available connections left, including this
+                left = len(available) + queue.qsize() + 1
+                reason = self._evict_reason(connection, now, left)
+                if reason:
+                    self._evict(connection, reason)
+                else:
+                    available.append(connection)
+        health_check = self._health_check
+        if health_check and available:
+            # connections are in use while checked
+            self._in_use_connections.update(available)
+            yield from asyncio.wait([self._check(health_check, c)
+                                     for c in available], loop=self._loop)
+        else:
+            for connection in available:
+                queue.put_nowait(connection)
+        if self._min_idle and not self._closed:
+            yield from self.prewarm()
+
     def close(self, in_use=True):
         '''Close all :attr:`available` connections and
         :attr:`in_use` connections only when ``in_use`` is ``True``.
         '''
         self._closed = True
+        if self._sweep_handle:
+            self._sweep_handle.cancel()
+            self._sweep_handle = None
         queue = self._queue
         while queue.qsize():
             connection = queue.get_nowait()
-            connection.close()
+            if connection is not None:
+                self._forget(connection)
+                connection.close()
         if in_use:
             in_use = self._in_use_connections
             self._in_use_connections = set()
             for connection in in_use:
+                self._forget(connection)
                 connection.close()
 
+    def info(self):
+        '''Dictionary of counters for this :class:`Pool`.
+
+        The ``wait_histogram`` counts checkouts which waited for a connection
+        to be released by upper bound, in seconds, of the wait time.
+        '''
+        info = dict(self._counters)
+        bounds = [str(b) for b in self.wait_buckets] + ['inf']
+        info.update({'pool_size': self.pool_size,
+                     'in_use': self.in_use,
+                     'available': self.available,
+                     'connecting': self._connecting,
+                     'evictions': sum(self._evictions.values()),
+                     'evicted': dict(self._evictions),
+                     'wait_histogram': dict(zip(bounds,
+                                                self._wait_histogram))})
+        return info
+
     def _get(self):
         queue = self._queue
         # grab the connection without waiting, important!
@@ -111,40 +235,59 @@ class Pool(AsyncObject):
             connection = queue.get_nowait()
         # wait for one to be available
         elif self.in_use + self._connecting >= queue._maxsize:
+            start = self._loop.time()
             connection = yield from asyncio.wait_for(queue.get(),
                                                      self._timeout,
                                                      loop=self._loop)
+            self._record_wait(self._loop.time() - start)
         else:   # must create a new connection
-            self._connecting += 1
-            try:
-                connection = yield from self._creator()
-            finally:
-                self._connecting -= 1
+            connection = yield from self._create()
         # None signal that a connection was removed form the queue
         # Go again
         if connection is None:
             connection = yield from self._get()
         else:
-            if self.is_connection_closed(connection):
+            if (self.is_connection_closed(connection) or
+                    self._expired(connection)):
                 connection = yield from self._get()
             else:
                 self._in_use_connections.add(connection)
         return connection
 
-    def _put(self, conn, discard=False):
+    def _put(self, conn, discard=False, released=None):
         if not self._closed:
+            if not discard and self._expired(conn):
+                discard = True
             try:
                 # None signal that a connection was removed form the queue
                 self._queue.put_nowait(None if discard else conn)
             except asyncio.QueueFull:
                 # The queue of available connection is already full
                 if conn:
+                    self._forget(conn)
                     conn.close()
+            else:
+                if discard:
+                    self._forget(conn)
+                else:
+                    self._released[conn] = (self._loop.time()
+                                            if released is None else released)
         self._in_use_connections.discard(conn)
 
     def is_connection_closed(self, connection):
-        if is_socket_closed(connection.sock):
-            connection.close()
+        '''Check if ``connection`` is closed before a checkout.
+
+        When the pool is swept, the socket of available connections is
+        polled by the :meth:`sweep` and this method only checks the state
+        of the transport.
+        '''
+        transport = connection.transport
+        if self._sweep_interval:
+            closed = transport is None or transport.is_closing()
+        else:
+            closed = is_socket_closed(connection.sock)
+        if closed:
+            self._evict(connection, 'closed')
             return True
         return False
 
@@ -156,6 +299,85 @@ class Pool(AsyncObject):
     def _count_connections(self, x, y):
         return x + int(y is not None)
 
+    def _create(self):
+        self._connecting += 1
+        try:
+            connection = yield from self._creator()
+        finally:
+            self._connecting -= 1
+        self._counters['creations'] += 1
+        self._created[connection] = self._loop.time()
+        return connection
+
+    def _age(self, connection, now):
+        return now - self._created.get(connection, now)
+
+    def _expired(self, connection):
+        if (self._max_lifetime and
+                self._age(connection, self._loop.time()) >
+                self._max_lifetime):
+            self._evict(connection, 'lifetime')
+            return True
+        return False
+
+    def _evict_reason(self, connection, now, left):
+        if is_socket_closed(connection.sock):
+            return 'closed'
+        elif (self._max_lifetime and
+                self._age(connection, now) > self._max_lifetime):
+            return 'lifetime'
+        elif (self._idle_timeout and left > self._min_idle and
+                now - self._released.get(connection, now) >
+                self._idle_timeout):
+            return 'idle'
+
+    def _evict(self, connection, reason):
+        self._evictions[reason] += 1
+        self._forget(connection)
+        connection.close()
+
+    def _forget(self, connection):
+        self._created.pop(connection, None)
+        self._released.pop(connection, None)
+
+    def _check(self, health_check, connection):
+        try:
+            healthy = health_check(connection)
+            if is_async(healthy):
+                healthy = yield from healthy
+        except Exception:
+            self.logger.exception('Health check failed for %s', connection)
+            healthy = False
+        if healthy:
+            # a checked connection is still idle since its release
+            self._put(connection, released=self._released.get(connection))
+        else:
+            self._evict(connection, 'health')
+            self._put(connection, True)
+
+    def _record_wait(self, wait):
+        self._counters['waits'] += 1
+        self._counters['wait_time'] += wait
+        self._wait_histogram[bisect(self.wait_buckets, wait)] += 1
+
+    def _schedule_sweep(self):
+        if (self._sweep_interval and self._sweep_handle is None and
+                not self._closed):
+            self._sweep_handle = self._loop.call_later(self._sweep_interval,
+                                                       self._run_sweep)
+
+    def _run_sweep(self):
+        # the handle is released once the sweep is done
+        sweep = async(self.sweep(), loop=self._loop)
+        sweep.add_done_callback(self._sweep_done)
+
+    def _sweep_done(self, sweep):
+        self._sweep_handle = None
+        if not sweep.cancelled() and sweep.exception():
+            self.logger.error('Error while sweeping the pool: %s',
+                              sweep.exception())
+        self._schedule_sweep()
+
 
 class PoolConnection(object):
     '''A wrapper for a :class:`Connection` in a connection :class:`Pool`.
@@ -1,9 +1,13 @@
+import asyncio
 from time import time
+from threading import get_ident
 
 from pulsar import CommandError
+from pulsar.utils.pep import default_timer
 
 from .proxy import command, ActorProxyMonitor
 from .futures import async_while
+from .metrics import StackSampler, merge_stacks
 
 
 @command()
@@ -45,13 +49,17 @@ def stop(request):
 
 
 @command()
-def notify(request, info):
-    '''The actor notify itself with a dictionary of information.
+def notify(request, info=None, counters=None):
+    '''The actor notify itself with its counters and, optionally, a
+    dictionary of information.
 
     The command perform the following actions:
 
     * Update the mailbox to the current consumer of the actor connection
-    * Update the info dictionary
+    * Update the info dictionary, when ``info`` is given
+    * Update the counters with ``counters``, the counters which changed
+      since the previous notification, and record them in the monitor
+      metrics
     * Returns the time of the update
     '''
     t = time()
@@ -59,13 +67,20 @@ def notify(request, info):
     remote_actor = request.caller
     if isinstance(remote_actor, ActorProxyMonitor):
         remote_actor.mailbox = request.connection
-        info['last_notified'] = t
-        remote_actor.info = info
+        if info is not None:
+            remote_actor.info = info
+        remote_actor.info['last_notified'] = t
+        if counters:
+            remote_actor.counters.update(counters)
+        actor.impl.metrics.add(remote_actor.aid, t, remote_actor.counters)
         callback = remote_actor.callback
         # if a callback is still available, this is the first
         # time we got notified
         if callback:
             remote_actor.callback = None
+            if remote_actor.spawning_start:
+                remote_actor.start_latency = (default_timer() -
+                                              remote_actor.spawning_start)
             callback.set_result(remote_actor)
             if actor.cfg.debug:
                 actor.logger.debug('Got first notification from %s',
@@ -77,6 +92,22 @@ def notify(request, info):
     return t
 
 
+@command()
+def retire(request):
+    '''The actor asks its monitor to be replaced.
+
+    The monitor spawns a new actor and stops the caller once the new actor
+    has notified itself, so that the number of serving actors never drops.
+    '''
+    remote_actor = request.caller
+    if isinstance(remote_actor, ActorProxyMonitor):
+        if not remote_actor.retiring:
+            remote_actor.retiring = time()
+            request.actor.logger.info('Retiring %s', remote_actor)
+        return True
+    return False
+
+
 @command()
 def spawn(request, **kwargs):
     '''Spawn a new actor.'''
@@ -85,8 +116,59 @@ def spawn(request, **kwargs):
 
 @command()
 def info(request):
-    ''' Returns information and statistics about the server as a json string'''
-    return request.actor.info()
+    ''' Returns information and statistics about the server as a json string
+
+    The arbiter and monitors refresh first the information of the actors
+    they manage.
+    '''
+    actor = request.actor
+    if actor.is_arbiter() or actor.is_monitor():
+        yield from actor.impl.refresh_info(actor)
+    return actor.info()
+
+
+@command()
+def metrics(request):
+    '''Returns the rolling time series of the counters actors send with
+    their heartbeats, grouped by monitor.'''
+    actor = request.actor
+    if actor.is_arbiter() or actor.is_monitor():
+        return actor.impl.metrics_info(actor)
+    raise CommandError('metrics are available from monitors only')
+
+
+@command()
+def profile(request, seconds=5, interval=0.005, workers=False):
+    '''Sample the stack of the actor event loop thread every
+    ``interval`` seconds for ``seconds`` seconds.
+
+    When ``workers`` is true and the actor is the arbiter or a monitor, the
+    actors it manages are profiled at the same time. Their results are
+    awaited for at most one second after the actor has finished sampling.
+    Returns a dictionary with the number of ``samples`` by actor id and the
+    merged collapsed ``stacks``, see :func:`.collapsed_stacks`.
+    '''
+    actor = request.actor
+    requests = []
+    if workers and (actor.is_arbiter() or actor.is_monitor()):
+        requests = [monitor.send(proxy, 'profile', seconds, interval)
+                    for monitor, proxy in actor.impl._refreshable(actor)]
+    sampler = StackSampler(get_ident(), interval).start()
+    try:
+        yield from asyncio.sleep(seconds, loop=actor._loop)
+    finally:
+        stacks = sampler.stop()
+    samples = {actor.aid: sampler.samples}
+    results = [stacks]
+    if requests:
+        done, _ = yield from asyncio.wait(
+            requests, timeout=1, loop=actor._loop)
+        for request in done:
+            if not request.exception():
+                data = request.result()
+                samples.update(data['samples'])
+                results.append(data['stacks'])
+    return {'samples': samples, 'stacks': merge_stacks(*results)}
 
 
 @command()
@@ -1,17 +1,23 @@
 import os
 import sys
+import json
+import socket
+import subprocess
 from time import time
-from collections import OrderedDict
-from multiprocessing import Process, current_process
-from concurrent.futures import ThreadPoolExecutor
+from math import ceil
+from collections import OrderedDict, deque
+from multiprocessing import Process, current_process, get_context
 
 import asyncio
 
 import pulsar
-from pulsar import system, MonitorStarted, HaltServer, Config
+from pulsar import (system, MonitorStarted, HaltServer, Config,
+                    ImproperlyConfigured)
 from pulsar.utils.log import logger_fds
 from pulsar.utils import autoreload
 from pulsar.utils.tools import Pidfile
+from pulsar.utils.internet import INHERITED_SOCKETS
+from pulsar.utils.importer import module_attribute
 
 from .proxy import ActorProxyMonitor, get_proxy, actor_proxy_future
 from .access import get_actor, set_actor, logger, SELECTORS
@@ -20,6 +26,8 @@ from .mailbox import MailboxClient, MailboxProtocol, ProxyMailbox, create_aid
 from .futures import async, add_errback, chain_future, Future
 from .protocols import TcpServer
 from .actor import Actor
+from .metrics import Metrics, LoopMonitor
+from .executor import Executor
 from .consts import *   # noqa
 
 
@@ -31,6 +39,8 @@ else:
 
 __all__ = ['arbiter']
 
+READY_FD = 'PULSAR_READY_FD'
+
 
 def arbiter(**params):
     '''Obtain the ``arbiter``.
@@ -69,6 +79,8 @@ class Concurrency(object):
     terminated_actors = None
     registered = None
     actor_class = Actor
+    _heartbeat = None
+    _heartbeat_due = None
 
     def make(self, kind, cfg, name, aid, **kw):
         self.__class__._creation_counter += 1
@@ -111,6 +123,24 @@ class Concurrency(object):
         '''
         return SELECTORS[self.cfg.selector]()
 
+    def create_event_loop(self):
+        '''Create the event loop of the actor from the
+        :ref:`event_loop <setting-event_loop>` setting.
+        '''
+        name = self.cfg.event_loop
+        if name == 'asyncio':
+            return asyncio.SelectorEventLoop(self.selector())
+        elif name == 'uvloop':
+            name = 'uvloop.new_event_loop'
+        try:
+            factory = module_attribute(name)
+        except ImportError:
+            factory = None
+        if not factory:
+            raise ImproperlyConfigured('Event loop "%s" not available' %
+                                       self.cfg.event_loop)
+        return factory()
+
     def get_actor(self, actor, aid, check_monitor=True):
         if aid == actor.aid:
             return actor
@@ -138,9 +168,12 @@ class Concurrency(object):
         '''Set up the event loop for ``actor``.
         '''
         actor._logger = self.cfg.configured_logger('pulsar.%s' % actor.name)
-        loop = asyncio.SelectorEventLoop(self.selector())
-        executor = ThreadPoolExecutor(self.cfg.thread_workers)
+        loop = self.create_event_loop()
+        cfg = self.cfg
+        executor = Executor(cfg.thread_workers, cfg.executor_queue,
+                            cfg.min_thread_workers or None)
         loop.set_default_executor(executor)
+        actor.executor = executor
         loop.logger = actor._logger
         asyncio.set_event_loop(loop)
         actor.mailbox = self.create_mailbox(actor, loop)
@@ -153,7 +186,9 @@ class Concurrency(object):
         It performs the following actions:
 
         * set the ``actor`` as the actor of the current thread
-        * bind two additional callbacks to the ``start`` event
+        * bind additional callbacks to the ``start`` event, which switch
+          the actor to running, start the :class:`.LoopMonitor` and the
+          :ref:`periodic task <actor-periodic-task>`
         * fire the ``start`` event
 
         If the hand shake is successful, the actor will eventually
@@ -167,6 +202,7 @@ class Concurrency(object):
             if a is not actor and a is not actor.monitor:
                 set_actor(actor)
             actor.bind_event('start', self._switch_to_run)
+            actor.bind_event('start', self._start_loop_monitor)
             actor.bind_event('start', self.periodic_task)
             actor.bind_event('start', self._acknowledge_start)
             actor.fire_event('start')
@@ -195,20 +231,41 @@ class Concurrency(object):
         '''
         actor.next_periodic_task = None
         ack = None
+        loop = actor._loop
         if actor.is_running():
+            if self._heartbeat_due:
+                actor.loop_lag = max(loop.time() - self._heartbeat_due, 0)
             if actor.cfg.debug:
                 actor.logger.debug('notify monitor')
             # if an error occurs, shut down the actor
-            ack = actor.send('monitor', 'notify', actor.info())
+            ack = actor.send('monitor', 'notify', *self.heartbeat(actor))
             add_errback(ack, actor.stop)
             actor.fire_event('periodic_task')
             next = max(ACTOR_TIMEOUT_TOLE*actor.cfg.timeout, MIN_NOTIFY)
         else:
             next = 0
-        actor.next_periodic_task = actor._loop.call_later(
-            min(next, MAX_NOTIFY), self.periodic_task, actor)
+        next = min(next, MAX_NOTIFY)
+        self._heartbeat_due = loop.time() + next
+        actor.next_periodic_task = loop.call_later(next, self.periodic_task,
+                                                   actor)
         return ack
 
+    def heartbeat(self, actor):
+        '''Return the ``info`` and ``counters`` the ``actor`` sends to its
+        monitor with the :ref:`notify command <actor_notify_command>`.
+
+        The full :meth:`.Actor.info` is sent with the first heartbeat only,
+        afterwards ``info`` is ``None`` and ``counters`` contains only the
+        :meth:`.Actor.counters` which changed since the previous heartbeat.
+        '''
+        counters = actor.counters()
+        previous = self._heartbeat
+        self._heartbeat = counters
+        if previous is None:
+            return actor.info(), counters
+        return None, dict(((key, value) for key, value in counters.items()
+                           if previous.get(key) != value))
+
     def stop(self, actor, exc=None, exit_code=0):
         '''Gracefully stop the ``actor``.
         '''
@@ -297,6 +354,18 @@ class Concurrency(object):
         elif exc:
             actor.stop(exc)
 
+    def _start_loop_monitor(self, actor, exc=None):
+        if exc is None and actor.cfg.loop_probe:
+            actor.loop_monitor = LoopMonitor(actor._loop,
+                                             actor.cfg.loop_probe,
+                                             actor.cfg.slow_callback,
+                                             actor.logger)
+            actor.loop_monitor.start()
+            actor.bind_event('stopping', self._stop_loop_monitor)
+
+    def _stop_loop_monitor(self, actor, exc=None):
+        actor.loop_monitor.stop()
+
     def _acknowledge_start(self, actor, exc=None):
         if exc is None:
             actor.logger.info('started')
@@ -330,6 +399,11 @@ class MonitorMixin(object):
     def create_actor(self):
         self.managed_actors = {}
         self.terminated_actors = []
+        self.target_workers = None
+        self.zygote = None
+        self.metrics = Metrics()
+        self._scaling = {'scaled_up': 0, 'scaled_down': 0,
+                         'last_scaled': 0, 'low_load_since': None}
         actor = self.actor_class(self)
         actor.bind_event('on_info', self._info_monitor)
         return actor
@@ -357,6 +431,9 @@ class MonitorMixin(object):
         '''Spawn a new :class:`Actor` and return its
         :class:`.ActorProxyMonitor`.
         '''
+        if kind is None and self.zygote:
+            kind = 'zygote'
+            params['fork_from'] = self.zygote
         proxy = _spawn_actor(kind, monitor, **params)
         # Add to the list of managed actors if this is a remote actor
         if isinstance(proxy, Actor):
@@ -427,26 +504,164 @@ class MonitorMixin(object):
                 monitor.send(actor, 'stop')
         return 1
 
+    def num_workers(self, monitor):
+        '''The number of workers the ``monitor`` should maintain.
+
+        It is given by the :ref:`workers <setting-workers>` setting unless
+        :meth:`autoscale` has changed it.
+        '''
+        if self.target_workers is None:
+            return monitor.cfg.workers
+        return self.target_workers
+
     def spawn_actors(self, monitor):
         '''Spawn new actors if needed.
+
+        Actors stopping or retiring are not counted, their replacements are
+        spawned before they stop serving.
         '''
-        to_spawn = monitor.cfg.workers - len(self.managed_actors)
-        if monitor.cfg.workers and to_spawn > 0:
+        num_workers = self.num_workers(monitor)
+        to_spawn = num_workers - len(self.serving_actors())
+        if num_workers and to_spawn > 0 and self.zygote_ready(monitor):
             for _ in range(to_spawn):
                 monitor.spawn()
 
+    def zygote_ready(self, monitor):
+        '''``True`` when the ``monitor`` can spawn workers.
+
+        When the :ref:`zygote <setting-zygote>` setting is on, start the
+        :class:`Zygote` if needed and return ``True`` once it has loaded
+        the application.
+        '''
+        cfg = monitor.cfg
+        if (not cfg.zygote or cfg.concurrency != 'process' or
+                not hasattr(os, 'fork')):
+            return True
+        zygote = self.zygote
+        if zygote is None:
+            self.zygote = zygote = Zygote(monitor)
+            monitor.logger.info('Starting %s', zygote)
+            zygote.start()
+        elif zygote.closed or not zygote.is_alive():
+            monitor.logger.warning('%s died, starting a new one', zygote)
+            zygote.close()
+            self.zygote = None
+            return False
+        return zygote.ready()
+
+    def serving_actors(self):
+        '''The managed actors which are neither stopping nor retiring.
+        '''
+        return [w for w in self.managed_actors.values()
+                if not (w.stopping_start or w.retiring)]
+
     def stop_actors(self, monitor):
-        """Maintain the number of workers by spawning or killing as required
+        """Retire workers in excess of :meth:`num_workers`.
+
+        Workers which asked to retire are stopped once enough workers are
+        serving. Workers already stopping or retiring are not counted. The
+        least loaded workers are stopped first and, for equal load, the
+        oldest.
         """
-        if monitor.cfg.workers:
-            num_to_kill = len(self.managed_actors) - monitor.cfg.workers
-            for i in range(num_to_kill, 0, -1):
-                w, kage = 0, sys.maxsize
-                for worker in self.managed_actors.values():
-                    age = worker.impl.age
-                    if age < kage:
-                        w, kage = w, age
-                self.manage_actor(monitor, w, True)
+        num_workers = self.num_workers(monitor)
+        if num_workers:
+            workers = self.serving_actors()
+            retiring = [w for w in self.managed_actors.values()
+                        if w.retiring and not w.stopping_start]
+            # stop retiring workers once their replacements are up
+            if retiring and sum(1 for w in workers
+                                if w.notified) >= num_workers:
+                for worker in retiring:
+                    self.manage_actor(monitor, worker, True)
+            num_to_kill = len(workers) - num_workers
+            if num_to_kill > 0:
+                workers.sort(key=lambda w: (self.worker_load(w), w.impl.age))
+                for worker in workers[:num_to_kill]:
+                    self.manage_actor(monitor, worker, True)
+
+    def worker_load(self, worker):
+        '''The load of a ``worker`` from the counters it sends with
+        the ``notify`` command.
+
+        The load is the number of callbacks waiting in the worker event
+        loop, plus its connected clients, plus the number of requests per
+        second processed between its last two notifications.
+        '''
+        counters = worker.counters
+        load = ((counters.get('callbacks') or 0) +
+                counters.get('connections', 0))
+        sample = self.metrics.latest(worker.aid)
+        if sample:
+            load += sample['requests_per_second']
+        return load
+
+    def refresh_info(self, monitor, timeout=1):
+        '''Refresh the :attr:`~.ActorProxyMonitor.info` of managed actors
+        via the :ref:`info command <actor_info_command>`.
+
+        Actors send their full information with the first heartbeat only,
+        this method waits at most ``timeout`` seconds for fresh ones.
+        '''
+        requests = [self._refresh_info(m, actor) for m, actor
+                    in self._refreshable(monitor)]
+        if requests:
+            yield from asyncio.wait(requests, timeout=timeout,
+                                    loop=monitor._loop)
+
+    def metrics_info(self, monitor):
+        '''Dictionary of :class:`.Metrics` information by monitor name.
+        '''
+        return {monitor.name: self.metrics.info()}
+
+    def autoscale(self, monitor, now=None):
+        '''Adjust :meth:`num_workers` to the load of workers.
+
+        Autoscaling is active when the :ref:`max_workers
+        <setting-max_workers>` setting is greater than
+        :ref:`workers <setting-workers>`. Workers are added when the
+        average load is above ``scale_up_load`` and removed, one at a time,
+        when it has stayed below ``scale_down_load`` for
+        ``scale_cooldown`` seconds. No action is taken within
+        ``scale_cooldown`` seconds of the previous one.
+        '''
+        cfg = monitor.cfg
+        if not cfg.workers or cfg.max_workers <= cfg.workers:
+            return
+        now = now or time()
+        scaling = self._scaling
+        min_workers = min(cfg.min_workers or cfg.workers, cfg.max_workers)
+        target = min(max(self.num_workers(monitor), min_workers),
+                     cfg.max_workers)
+        workers = [w for w in self.managed_actors.values()
+                   if not w.stopping_start]
+        if workers:
+            load = sum((self.worker_load(w) for w in workers))
+            average = load/len(workers)
+            cooling = now - scaling['last_scaled'] < cfg.scale_cooldown
+            if average > cfg.scale_up_load:
+                scaling['low_load_since'] = None
+                if not cooling and target < cfg.max_workers:
+                    needed = int(ceil(load/cfg.scale_up_load))
+                    target = min(max(needed, target + 1), cfg.max_workers)
+                    scaling['scaled_up'] += 1
+                    scaling['last_scaled'] = now
+                    monitor.logger.info('Scaling up to %d workers. '
+                                        'Average load %.1f', target, average)
+            elif average < cfg.scale_down_load and target > min_workers:
+                since = scaling['low_load_since']
+                if since is None:
+                    scaling['low_load_since'] = now
+                elif (not cooling and
+                        now - since >= cfg.scale_cooldown):
+                    target -= 1
+                    scaling['scaled_down'] += 1
+                    scaling['last_scaled'] = now
+                    scaling['low_load_since'] = now
+                    monitor.logger.info('Scaling down to %d workers. '
+                                        'Average load %.1f', target, average)
+            else:
+                scaling['low_load_since'] = None
+        self.target_workers = target
 
     def _close_actors(self, monitor):
         # Close all managed actors at once and wait for completion
@@ -465,6 +680,7 @@ class MonitorMixin(object):
 
     def _remove_actor(self, monitor, actor, log=True):
         removed = self.managed_actors.pop(actor.aid, None)
+        self.metrics.remove(actor.aid)
         if log and removed:
             log = False
             monitor.logger.warning('Removed %s', actor)
@@ -476,10 +692,42 @@ class MonitorMixin(object):
         if actor.started():
             info['actor'].update({'concurrency': actor.cfg.concurrency,
                                   'workers': len(self.managed_actors)})
-            info['workers'] = [a.info for a in self.managed_actors.values()
+            info['workers'] = [dict(a.info, counters=a.counters,
+                                    retiring=a.retiring)
+                               for a in self.managed_actors.values()
                                if a.info]
+            info['metrics'] = self.metrics.info()
+            latencies = [a.start_latency for a in
+                         self.managed_actors.values() if a.start_latency]
+            info['spawning'] = {
+                'zygote': self.zygote.pid if self.zygote else None,
+                'start_latency': (sum(latencies)/len(latencies)
+                                  if latencies else None),
+                'max_start_latency': max(latencies) if latencies else None}
+            cfg = actor.cfg
+            if cfg.workers and cfg.max_workers > cfg.workers:
+                info['autoscale'] = dict(
+                    target_workers=self.num_workers(actor),
+                    min_workers=cfg.min_workers or cfg.workers,
+                    max_workers=cfg.max_workers,
+                    scaled_up=self._scaling['scaled_up'],
+                    scaled_down=self._scaling['scaled_down'])
         return info
 
+    def _refreshable(self, monitor):
+        for actor in self.managed_actors.values():
+            if actor.mailbox and not actor.stopping_start:
+                yield monitor, actor
+
+    def _refresh_info(self, monitor, actor):
+        try:
+            info = yield from monitor.send(actor, 'info')
+        except Exception:
+            return
+        if info:
+            info['last_notified'] = actor.notified
+            actor.info = info
+
     def _register(self, arbiter):
         raise HaltServer('Critical error')
 
@@ -519,6 +767,7 @@ class MonitorConcurrency(MonitorMixin, Concurrency):
             self.manage_actors(monitor)
             #
             if monitor.is_running():
+                self.autoscale(monitor)
                 self.spawn_actors(monitor)
                 self.stop_actors(monitor)
             elif monitor.cfg.debug:
@@ -537,6 +786,9 @@ class MonitorConcurrency(MonitorMixin, Concurrency):
         def _cleanup(_):
             if actor.cfg.debug:
                 actor.logger.debug('monitor is now stopping')
+            if self.zygote:
+                self.zygote.close()
+                self.zygote = None
             actor.state = ACTOR_STATES.CLOSE
             if actor.next_periodic_task:
                 actor.next_periodic_task.cancel()
@@ -550,6 +802,8 @@ class ArbiterConcurrency(MonitorMixin, ProcessMixin, Concurrency):
     '''Concurrency implementation for the ``arbiter``
     '''
     pidfile = None
+    ready_fd = None
+    reload_process = None
 
     def is_arbiter(self):
         return True
@@ -609,6 +863,56 @@ class ArbiterConcurrency(MonitorMixin, ProcessMixin, Concurrency):
                 return
         actor.start_coverage()
         self._install_signals(actor)
+        if signal and hasattr(signal, 'SIGUSR2'):
+            actor._loop.add_signal_handler(signal.SIGUSR2, self.reload, actor)
+
+    def reload(self, actor):
+        '''Start a new arbiter with the same command line and hand it the
+        listening sockets of the monitors.
+
+        The new arbiter adopts the sockets rather than binding new ones and
+        notifies this arbiter, via a pipe, once the workers of all its
+        monitors are up. This arbiter then stops gracefully so that
+        connections are never refused during the reload.
+        The pid file, if any, is renamed with the ``.oldpid`` suffix until
+        the new arbiter is ready.
+        '''
+        if self.reload_process:
+            actor.logger.warning('Already reloading')
+            return
+        inherited = {}
+        for m in self.monitors.values():
+            sockets = getattr(m, 'sockets', None)
+            if sockets:
+                inherited[m.name] = [
+                    (sock.fileno(), sock.family,
+                     sock.getsockopt(socket.SOL_SOCKET, socket.SO_TYPE))
+                    for sock in sockets]
+        if self.pidfile:
+            oldpid = '%s.oldpid' % self.pidfile.fname
+            if Pidfile(oldpid).read():
+                actor.logger.warning('Cannot reload. Old pid file %s exists',
+                                     oldpid)
+                return
+            self.pidfile.rename(oldpid)
+        fds = [fd for sockets in inherited.values() for fd, _, _ in sockets]
+        r, w = os.pipe()
+        env = os.environ.copy()
+        env[INHERITED_SOCKETS] = json.dumps(inherited)
+        env[READY_FD] = str(w)
+        try:
+            self.reload_process = subprocess.Popen(
+                [sys.executable] + sys.argv, env=env, pass_fds=fds + [w])
+        except Exception:
+            actor.logger.exception('Could not start a new arbiter')
+            os.close(r)
+            self._reload_failed(actor)
+        else:
+            actor.logger.warning('Reloading. Started new arbiter %s',
+                                 self.reload_process.pid)
+            actor._loop.add_reader(r, self._reload_ready, actor, r)
+        finally:
+            os.close(w)
 
     def create_mailbox(self, actor, loop):
         '''Override :meth:`.Concurrency.create_mailbox` to create the
@@ -635,6 +939,11 @@ class ArbiterConcurrency(MonitorMixin, ProcessMixin, Concurrency):
             for m in list(self.monitors.values()):
                 if m.closed():
                     actor._remove_actor(m)
+            if self.ready_fd is not None and self._monitors_ready():
+                actor.logger.info('Ready, notifying the reloading arbiter')
+                os.write(self.ready_fd, b'ready')
+                os.close(self.ready_fd)
+                self.ready_fd = None
 
             interval = MONITOR_TASK_PERIOD
             if not actor.is_running() and actor.cfg.debug:
@@ -697,8 +1006,43 @@ class ArbiterConcurrency(MonitorMixin, ProcessMixin, Concurrency):
             arbiter.logger.warning('Removed %s', actor)
         return removed
 
+    def _monitors_ready(self):
+        for m in self.monitors.values():
+            if not m.is_running():
+                return False
+            workers = [w for w in m.managed_actors.values() if w.notified]
+            if len(workers) < m.impl.num_workers(m):
+                return False
+        return True
+
+    def _reload_ready(self, actor, fd):
+        actor._loop.remove_reader(fd)
+        ready = os.read(fd, 64)
+        os.close(fd)
+        if ready:
+            actor.logger.warning('New arbiter %s ready. Stopping.',
+                                 self.reload_process.pid)
+            actor.stop()
+        else:
+            actor.logger.error('New arbiter %s exited before being ready',
+                               self.reload_process.pid)
+            self._reload_failed(actor)
+
+    def _reload_failed(self, actor):
+        process, self.reload_process = self.reload_process, None
+        if process:
+            process.wait()
+        p = self.pidfile
+        if p and p.fname.endswith('.oldpid'):
+            p.rename(p.fname[:-7])
+
     def _stop_arbiter(self, actor):     # pragma    nocover
         self._remove_signals(actor)
+        if signal and hasattr(signal, 'SIGUSR2'):
+            try:
+                actor._loop.remove_signal_handler(signal.SIGUSR2)
+            except Exception:
+                pass
         p = self.pidfile
         if p is not None:
             actor.logger.debug('Removing %s' % p.fname)
@@ -725,6 +1069,8 @@ class ArbiterConcurrency(MonitorMixin, ProcessMixin, Concurrency):
             raise HaltServer('Cannot create the arbiter in a daemon process')
         if not os.environ.get('SERVER_SOFTWARE'):
             os.environ["SERVER_SOFTWARE"] = pulsar.SERVER_SOFTWARE
+        if READY_FD in os.environ:
+            self.ready_fd = int(os.environ.pop(READY_FD))
         pidfile = actor.cfg.pidfile
         if pidfile is not None:
             actor.logger.info('Create pid file %s', pidfile)
@@ -753,10 +1099,23 @@ class ArbiterConcurrency(MonitorMixin, ProcessMixin, Concurrency):
         server.pop('actor_id', None)
         server.pop('age', None)
         data['server'] = server
-        data['workers'] = [a.info for a in self.managed_actors.values()]
+        data['workers'] = [dict(a.info, counters=a.counters)
+                           for a in self.managed_actors.values()]
         data['monitors'] = monitors
+        data['metrics'] = self.metrics.info()
         return data
 
+    def metrics_info(self, arbiter):
+        data = super().metrics_info(arbiter)
+        for m in self.monitors.values():
+            data.update(m.impl.metrics_info(m))
+        return data
+
+    def _refreshable(self, arbiter):
+        yield from super()._refreshable(arbiter)
+        for m in self.monitors.values():
+            yield from m.impl._refreshable(m)
+
     def _register(self, actor):
         aid = self.identity(actor)
         self.registered[aid] = actor
@@ -805,10 +1164,258 @@ class ActorThread(Concurrency, Thread):
         pass
 
 
+class ActorZygoteProcess(ProcessMixin, Concurrency):
+    '''Actor on a Operative system process forked by a :class:`Zygote`.
+
+    On the monitor side, :meth:`start` asks the :attr:`zygote` to fork a
+    new process and the remaining methods manage it via its :attr:`pid`.
+    The process is a child of the zygote, which reaps it and reports its
+    :attr:`exitcode` to the monitor.
+    '''
+    pid = None
+    zygote = None
+    exitcode = None
+
+    def create_actor(self):
+        self.zygote = self.params.pop('fork_from', None)
+        return super().create_actor()
+
+    def start(self):
+        try:
+            fork = self.zygote.fork(self.aid, self.age)
+        except (OSError, EOFError):
+            logger().exception('Could not fork %s', self)
+        else:
+            fork.add_done_callback(self._forked)
+
+    def is_alive(self):
+        if self.pid and self.exitcode is None:
+            zygote = self.zygote
+            self.exitcode = zygote.exitcodes.pop(self.pid, None)
+            if self.exitcode is not None:
+                return False
+            elif not zygote.closed:
+                return True
+            # orphaned by the zygote and reaped by init
+            try:
+                os.kill(self.pid, 0)
+            except ProcessLookupError:
+                return False
+            except PermissionError:     # pragma    nocover
+                pass
+            return True
+        return False
+
+    def join(self, timeout=None):
+        '''Collect the exit code of the process, if reported by the zygote.
+
+        It never waits, the monitor checks the process with :meth:`is_alive`
+        from its event loop.
+        '''
+        self.is_alive()
+
+    def terminate(self):
+        if self.pid:
+            try:
+                os.kill(self.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):  # pragma    nocover
+        run_actor(self)
+
+    def stop_coverage(self, actor):
+        actor.stop_coverage()
+
+    def _forked(self, fork):
+        try:
+            self.pid = fork.result()
+        except (OSError, EOFError):
+            logger().exception('Could not fork %s', self)
+
+
+class Zygote:
+    '''A template process which loads the application once and forks
+    process actors on request from the :class:`.Monitor`.
+
+    The zygote is forked from the monitor process once the application
+    has started and it keeps the parameters for spawning workers. When
+    started, it invokes the :meth:`.Application.zygote_start` hook,
+    so that workers forked afterwards share, copy-on-write, everything
+    the application loaded there.
+
+    The monitor reads the replies of the zygote from its event loop: the
+    process ids of forked actors, which resolve the futures returned by
+    :meth:`fork`, and the exit codes of the actors the zygote reaps,
+    stored in :attr:`exitcodes`.
+    '''
+    closed = False
+
+    def __init__(self, monitor):
+        params = monitor.actorparams()
+        self.name = '%s.zygote' % monitor.name
+        self.cfg = params.pop('cfg', None) or monitor.cfg.clone()
+        params.pop('aid', None)
+        params['monitor'] = monitor
+        self.params = params
+        context = get_context('fork')
+        self._conn, self._child_conn = context.Pipe()
+        self._process = context.Process(target=self._run, name=self.name)
+        self._process.daemon = True
+        self._loop = monitor._loop
+        self._ready = False
+        self._forks = deque()
+        self.exitcodes = {}
+
+    def __repr__(self):
+        return self.name
+    __str__ = __repr__
+
+    @property
+    def pid(self):
+        return self._process.pid
+
+    def start(self):
+        self._process.start()
+        self._child_conn.close()
+        self._loop.add_reader(self._conn.fileno(), self._read)
+
+    def is_alive(self):
+        return self._process.is_alive()
+
+    def ready(self):
+        '''``True`` once the zygote has loaded the application.'''
+        return self._ready and not self.closed
+
+    def fork(self, aid, age, timeout=ZYGOTE_FORK_TIMEOUT):
+        '''Ask the zygote to fork a new actor with ``aid``.
+
+        :return: a :class:`~asyncio.Future` called back with the process
+            id of the actor. A zygote not replying within ``timeout``
+            seconds is closed, so that the monitor starts a new one, and
+            the future fails with :class:`TimeoutError`.
+        '''
+        if self.closed:
+            raise EOFError('%s is closed' % self)
+        self._conn.send((aid, age))
+        fork = Future(loop=self._loop)
+        self._forks.append(fork)
+        handle = self._loop.call_later(timeout, self._fork_timeout, fork,
+                                       aid, timeout)
+        fork.add_done_callback(lambda f: handle.cancel())
+        return fork
+
+    def close(self):
+        '''Stop reading from the zygote and terminate it.
+
+        Pending forks fail with :class:`EOFError`. It does not wait for the
+        zygote to exit, the monitor reaps it when starting a new one.
+        '''
+        if not self.closed:
+            self.closed = True
+            self._loop.remove_reader(self._conn.fileno())
+            self._conn.close()
+            while self._forks:
+                fork = self._forks.popleft()
+                if not fork.done():
+                    fork.set_exception(EOFError('%s closed' % self))
+        if self._process.is_alive():
+            self._process.terminate()
+
+    #   INTERNALS
+    def _read(self):
+        try:
+            while not self.closed and self._conn.poll():
+                self._received(self._conn.recv())
+        except (OSError, EOFError):
+            self.close()
+
+    def _received(self, message):
+        if message == 'ready':
+            self._ready = True
+        elif isinstance(message, tuple):
+            _, pid, exitcode = message
+            self.exitcodes[pid] = exitcode
+        elif self._forks:
+            # replies come in the order of requests
+            fork = self._forks.popleft()
+            if not fork.done():
+                fork.set_result(message)
+
+    def _fork_timeout(self, fork, aid, timeout):
+        if not fork.done():
+            # a late reply would resolve the next fork, start a new zygote
+            fork.set_exception(TimeoutError(
+                '%s did not fork %s within %s seconds' % (self, aid, timeout)))
+            self.close()
+
+    def _run(self):     # pragma    nocover
+        self._conn.close()
+        conn = self._child_conn
+        if signal:
+            signal.set_wakeup_fd(-1)
+            for sig in system.EXIT_SIGNALS:
+                signal.signal(sig, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+        cfg = self.cfg
+        system.set_proctitle('%s-%s' % (cfg.proc_name, self.name))
+        if cfg.application:
+            app = cfg.application.from_config(cfg)
+            app.zygote_start(self)
+        conn.send('ready')
+        while True:
+            while conn.poll(0.5) is False:
+                self._reap(conn)
+            try:
+                aid, age = conn.recv()
+            except EOFError:
+                break
+            pid = os.fork()
+            if pid:
+                conn.send(pid)
+            else:
+                conn.close()
+                self._run_actor(aid, age)
+
+    def _reap(self, conn):    # pragma    nocover
+        # reap exited actors and report their exit code to the monitor
+        try:
+            while True:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+                if not pid:
+                    break
+                if os.WIFSIGNALED(status):
+                    exitcode = -os.WTERMSIG(status)
+                else:
+                    exitcode = os.WEXITSTATUS(status)
+                conn.send(('exit', pid, exitcode))
+        except ChildProcessError:
+            pass
+
+    def _run_actor(self, aid, age):    # pragma    nocover
+        exit_code = 1
+        try:
+            impl = ActorZygoteProcess()
+            impl.make('process', self.cfg, self.params.pop('name', None),
+                      aid, **self.params)
+            impl.age = age
+            impl.run()
+            exit_code = 0
+        except SystemExit as exc:
+            exit_code = exc.code if isinstance(exc.code, int) else 1
+        except BaseException:
+            logger().exception('Unhandled exception in %s', aid)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(exit_code)
+
+
 concurrency_models = {'arbiter': ArbiterConcurrency,
                       'monitor': MonitorConcurrency,
                       'thread': ActorThread,
-                      'process': ActorProcess}
+                      'process': ActorProcess,
+                      'zygote': ActorZygoteProcess}
 
 
 def _spawn_actor(kind, monitor, cfg=None, name=None, aid=None, **kw):
@@ -82,7 +82,7 @@ class Event(AbstractEvent):
 
     def fire(self, arg, **kwargs):
         if not self._silenced:
-            self._fired += self._fired + 1
+            self._fired += 1
             if self._handlers:
                 for hnd in self._handlers:
                     try:
@@ -164,42 +164,67 @@ class EventHandler(AsyncObject):
 
     It handles :class:`OneTime` events and :class:`Event` that occur
     several times.
+
+    Events are created lazily, the first time a callback is bound to them
+    or they are waited for, so that handlers created in large numbers
+    (connections, protocol consumers) do not pay for events nobody uses.
+    Firing a :ref:`many times event <many-times-event>` with no callbacks
+    bound does nothing.
     '''
     ONE_TIME_EVENTS = ()
     '''Event names which occur once only.'''
     MANY_TIMES_EVENTS = ()
     '''Event names which occur several times.'''
+    _events = None
+    _shared = None
+
     def __init__(self, loop=None, one_time_events=None,
                  many_times_events=None):
         assert isinstance(loop, _EVENT_LOOP_CLASSES)
         self._loop = loop
-        one = self.ONE_TIME_EVENTS
         if one_time_events:
-            one = set(one)
-            one.update(one_time_events)
-        events = dict(((name, OneTime(loop=loop, name=name)) for name in one))
-        many = self.MANY_TIMES_EVENTS
+            self.ONE_TIME_EVENTS = tuple(set(self.ONE_TIME_EVENTS).union(
+                one_time_events))
         if many_times_events:
-            many = set(many)
-            many.update(many_times_events)
-        events.update(((name, Event(loop=loop, name=name)) for name in many))
-        self._events = events
+            self.MANY_TIMES_EVENTS = tuple(set(self.MANY_TIMES_EVENTS).union(
+                many_times_events))
 
     @property
     def events(self):
         '''The dictionary of all events.
+
+        Accessing this property creates all declared events.
         '''
+        for name in self.ONE_TIME_EVENTS:
+            self.event(name)
+        for name in self.MANY_TIMES_EVENTS:
+            self.event(name)
+        if self._events is None:
+            self._events = {}
         return self._events
 
     def event(self, name):
         '''Returns the :class:`Event` at ``name``.
 
+        If the event is declared but not yet created, it is created.
         If no event is registered for ``name`` returns nothing.
         '''
-        return self._events.get(name)
+        events = self._events
+        if events is None:
+            events = self._events = {}
+        event = events.get(name)
+        if event is None:
+            if name in self.ONE_TIME_EVENTS:
+                event = OneTime(loop=self._loop, name=name)
+            elif name in self.MANY_TIMES_EVENTS:
+                event = Event(loop=self._loop, name=name)
+            else:
+                return
+            events[name] = event
+        return event
 
     def fired_event(self, name):
-        event = self._events.get(name)
+        event = self._events.get(name) if self._events else None
         return event._fired if event else 0
 
     def bind_event(self, name, callback):
@@ -222,15 +247,15 @@ class EventHandler(AsyncObject):
             can also be a list/tuple of callables.
         :return: nothing.
         '''
-        if name not in self._events:
-            self._events[name] = Event()
-        event = self._events[name]
+        event = self.event(name)
+        if event is None:
+            event = self._events[name] = Event(loop=self._loop, name=name)
         event.bind(callback)
 
     def remove_callback(self, name, callback):
         '''Remove a ``callback`` from event ``name``
         '''
-        if name in self._events:
+        if self._events and name in self._events:
             event = self._events[name]
             return event.remove_callback(callback)
 
@@ -240,7 +265,10 @@ class EventHandler(AsyncObject):
         The events callbacks can be specified as a single callable or as
         list/tuple of callabacks or (callback, erroback) tuples.
         '''
-        for name in self._events:
+        known = set(self.ONE_TIME_EVENTS).union(self.MANY_TIMES_EVENTS)
+        if self._events:
+            known.update(self._events)
+        for name in known:
             if name in events:
                 self.bind_event(name, events[name])
 
@@ -249,13 +277,16 @@ class EventHandler(AsyncObject):
 
         * If event at ``name`` is a one-time event, it makes sure that it was
           not fired before.
+        * Callbacks shared via :meth:`copy_many_times_events` are executed
+          before the callbacks bound to this handler.
 
         :param args: optional argument passed as positional parameter to the
             event handler.
         :param kwargs: optional key-valued parameters to pass to the event
             handler. Can only be used for
             :ref:`many times events <many-times-event>`.
-        :return: the :class:`Event` fired
+        :return: the :class:`Event` fired or ``None`` if this is a
+            :ref:`many times event <many-times-event>` with no callbacks.
         """
         if not args:
             arg = self
@@ -264,15 +295,24 @@ class EventHandler(AsyncObject):
         else:
             raise TypeError('fire_event expected at most 1 argument got %s' %
                             len(args))
-        event = self.event(name)
-        if event:
+        event = self._events.get(name) if self._events else None
+        if event is None:
+            if name in self.ONE_TIME_EVENTS:
+                # one time events are futures and must record the result
+                event = self.event(name)
+            elif name not in self.MANY_TIMES_EVENTS:
+                self.logger.warning('Unknown event "%s" for %s', name, self)
+                return
+        if event is not None and event._silenced:
+            return event
+        if self._shared:
+            self._fire_shared(name, arg, kwargs)
+        if event is not None:
             try:
                 event.fire(arg, **kwargs)
             except InvalidStateError:
                 self.logger.error('Event %s already fired' % name)
-            return event
-        else:
-            self.logger.warning('Unknown event "%s" for %s', name, self)
+        return event
 
     def silence_event(self, name):
         '''Silence event ``name``.
@@ -280,22 +320,29 @@ class EventHandler(AsyncObject):
         This causes the event not to fire at the :meth:`fire_event` method
         is invoked with the event ``name``.
         '''
-        event = self._events.get(name)
+        event = self.event(name)
         if event:
             event.silence()
 
     def copy_many_times_events(self, other):
-        '''Copy :ref:`many times events <many-times-event>` from  ``other``.
+        '''Share :ref:`many times events <many-times-event>` of ``other``.
 
-        All many times events of ``other`` are copied to this handler
-        provided the events handlers already exist.
+        Callbacks bound to the many times events of ``other`` are executed
+        when this handler fires an event with the same name, provided the
+        event is declared by this handler. Callbacks are shared by
+        reference, nothing is copied.
         '''
         if isinstance(other, EventHandler):
-            events = self._events
-            for name, event in other._events.items():
-                if isinstance(event, Event) and event._handlers:
-                    ev = events.get(name)
-                    # If the event is available add it
-                    if ev:
-                        for callback in event._handlers:
-                            ev.bind(callback)
+            self._shared = other
+
+    #    INTERNALS
+    def _fire_shared(self, name, arg, kwargs):
+        events = self._shared._events
+        event = events.get(name) if events else None
+        if (isinstance(event, Event) and event._handlers and
+                not event._silenced):
+            for hnd in event._handlers:
+                try:
+                    hnd(arg, **kwargs)
+                except Exception:
+                    self.logger.exception('Exception while firing event')
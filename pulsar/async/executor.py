@@ -0,0 +1,175 @@
+import threading
+from math import ceil
+from time import monotonic
+from bisect import bisect
+from collections import deque
+from concurrent import futures
+
+
+__all__ = ['Executor', 'ExecutorFull']
+
+
+class ExecutorFull(RuntimeError):
+    '''Raised by :meth:`Executor.submit` when the executor queue is full.
+    '''
+
+
+class Executor(futures.Executor):
+    '''A pool of threads with a bounded queue, used as the default executor
+    of actors event loops.
+
+    :param max_workers: the maximum number of threads.
+    :param max_queue: the maximum number of calls waiting for a thread.
+        When the queue is full :meth:`submit` raises :class:`ExecutorFull`,
+        so that producers can shed load rather than queuing work without
+        limit. ``0`` for an unbounded queue.
+    :param min_workers: the minimum number of threads. When lower than
+        ``max_workers`` the pool resizes itself: threads are started when
+        calls are waiting and idle threads stop once the pool is larger than
+        the threads needed to sustain the rate of submitted calls with the
+        observed blocking time.
+
+    Threads are started on demand, :meth:`info` reports the queue depth,
+    the time calls waited for a thread and the time they blocked it.
+    '''
+    wait_buckets = (0.001, 0.01, 0.1, 1, 10)
+    resize_interval = 1
+
+    def __init__(self, max_workers=5, max_queue=0, min_workers=None):
+        self.max_workers = max(max_workers, 1)
+        if min_workers is None:
+            min_workers = self.max_workers
+        self.min_workers = min(min_workers, self.max_workers)
+        self.max_queue = max_queue
+        self.target_workers = self.min_workers
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._threads = set()
+        self._idle = 0
+        self._shutdown = False
+        self._counters = {'submitted': 0, 'completed': 0, 'rejected': 0,
+                          'max_wait': 0}
+        self._wait_time = 0
+        self._run_time = 0
+        self._blocking_time = 0
+        self._wait_histogram = [0]*(len(self.wait_buckets) + 1)
+        self._arrivals = 0
+        self._resized = monotonic()
+
+    @property
+    def queued(self):
+        '''Number of calls waiting for a thread.'''
+        return len(self._queue)
+
+    @property
+    def saturated(self):
+        '''``True`` when the queue is full.'''
+        return bool(self.max_queue and len(self._queue) >= self.max_queue)
+
+    def submit(self, fn, *args, **kwargs):
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError('cannot schedule new futures after '
+                                   'shutdown')
+            if self.saturated:
+                self._counters['rejected'] += 1
+                raise ExecutorFull('executor queue is full')
+            future = futures.Future()
+            self._queue.append((future, fn, args, kwargs, monotonic()))
+            self._counters['submitted'] += 1
+            self._arrivals += 1
+            self._resize()
+            if (len(self._queue) > self._idle and
+                    len(self._threads) < self.max_workers):
+                thread = threading.Thread(target=self._worker, daemon=True,
+                                          name='pulsar-executor')
+                self._threads.add(thread)
+                thread.start()
+            else:
+                self._cond.notify()
+        return future
+
+    def shutdown(self, wait=True):
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+            threads = list(self._threads)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def info(self):
+        '''Dictionary of information about the executor.
+
+        The ``wait_histogram`` counts calls by upper bound, in seconds, of
+        the time they waited for a thread. ``blocking_time`` is the moving
+        average of the time calls blocked a thread.
+        '''
+        with self._cond:
+            info = dict(self._counters)
+            completed = info['completed']
+            bounds = [str(b) for b in self.wait_buckets] + ['inf']
+            info.update({
+                'max_workers': self.max_workers,
+                'min_workers': self.min_workers,
+                'target_workers': self.target_workers,
+                'workers': len(self._threads),
+                'idle': self._idle,
+                'queued': len(self._queue),
+                'max_queue': self.max_queue,
+                'wait_time': self._wait_time/completed if completed else 0,
+                'run_time': self._run_time/completed if completed else 0,
+                'blocking_time': self._blocking_time,
+                'wait_histogram': dict(zip(bounds, self._wait_histogram))})
+        return info
+
+    def _resize(self):
+        # Update the target number of threads from the arrival rate and the
+        # blocking time of calls (Little's law). Called with the lock held.
+        now = monotonic()
+        elapsed = now - self._resized
+        if elapsed >= self.resize_interval:
+            needed = ceil(self._arrivals*self._blocking_time/elapsed)
+            self.target_workers = min(max(needed, self.min_workers),
+                                      self.max_workers)
+            self._arrivals = 0
+            self._resized = now
+
+    def _worker(self):
+        cond = self._cond
+        thread = threading.current_thread()
+        while True:
+            with cond:
+                self._idle += 1
+                while not self._queue and not self._shutdown:
+                    if not cond.wait(self.resize_interval):
+                        self._resize()
+                        if (not self._queue and
+                                len(self._threads) > self.target_workers):
+                            break
+                self._idle -= 1
+                if not self._queue:
+                    self._threads.discard(thread)
+                    return
+                future, fn, args, kwargs, submitted = self._queue.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            start = monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+            self._completed(start - submitted, monotonic() - start)
+            del future, fn, args, kwargs
+
+    def _completed(self, wait, run):
+        with self._cond:
+            counters = self._counters
+            counters['completed'] += 1
+            counters['max_wait'] = max(counters['max_wait'], wait)
+            self._wait_time += wait
+            self._run_time += run
+            self._blocking_time += 0.2*(run - self._blocking_time)
+            self._wait_histogram[bisect(self.wait_buckets, wait)] += 1
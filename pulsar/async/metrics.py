@@ -0,0 +1,299 @@
+import sys
+import time
+import traceback
+from bisect import bisect
+from collections import deque
+from threading import Thread, Event, get_ident
+
+from asyncio import Handle
+
+
+__all__ = ['Metrics', 'LoopMonitor', 'StackSampler', 'merge_stacks',
+           'collapsed_stacks', 'prometheus_text']
+
+
+class Metrics:
+    '''Rolling time series of the counters actors send to their monitor.
+
+    Each :ref:`heartbeat <actor-periodic-task>` of a managed actor is
+    recorded as a sample of :attr:`fields`. The last :attr:`size` samples
+    are kept for each actor, while the ``totals`` series aggregates the
+    latest sample of all actors at most once every :attr:`resolution`
+    seconds.
+    '''
+    fields = ('time', 'requests_per_second', 'connections', 'loop_lag', 'rss')
+
+    def __init__(self, size=60, resolution=1):
+        self.size = size
+        self.resolution = resolution
+        self.series = {}
+        self.totals = deque(maxlen=size)
+        self._requests = {}
+
+    def add(self, aid, t, counters):
+        '''Add a sample for actor ``aid`` at time ``t`` from its
+        ``counters``.
+        '''
+        requests = counters.get('requests', 0)
+        previous = self._requests.get(aid)
+        self._requests[aid] = (t, requests)
+        rate = 0
+        if previous and t > previous[0]:
+            rate = max(requests - previous[1], 0)/(t - previous[0])
+        series = self.series.get(aid)
+        if series is None:
+            series = self.series[aid] = deque(maxlen=self.size)
+        series.append((t, rate, counters.get('connections', 0),
+                       counters.get('loop_lag', 0), counters.get('rss')))
+        self._add_total(t)
+
+    def remove(self, aid):
+        '''Remove the series of actor ``aid``.'''
+        self.series.pop(aid, None)
+        self._requests.pop(aid, None)
+
+    def latest(self, aid):
+        '''The last sample of actor ``aid`` as a dictionary or ``None``.
+        '''
+        series = self.series.get(aid)
+        if series:
+            return dict(zip(self.fields, series[-1]))
+
+    def info(self):
+        return {'fields': self.fields,
+                'actors': dict(((aid, list(series)) for aid, series
+                                in self.series.items())),
+                'totals': list(self.totals)}
+
+    def _add_total(self, t):
+        latest = [series[-1] for series in self.series.values()]
+        total = (t,
+                 sum((s[1] for s in latest)),
+                 sum((s[2] for s in latest)),
+                 max((s[3] for s in latest)),
+                 sum((s[4] or 0 for s in latest)))
+        totals = self.totals
+        if totals and t - totals[-1][0] < self.resolution:
+            totals[-1] = total
+        else:
+            totals.append(total)
+
+
+class LoopMonitor:
+    '''Measure the responsiveness of an event ``loop``.
+
+    A probe callback is scheduled every ``interval`` seconds and the delay
+    between its scheduled and actual time is recorded in a histogram by
+    upper bound, in seconds, of :attr:`lag_buckets`.
+
+    When ``slow_callback`` is positive, a watchdog thread checks that the
+    probe runs on time. If the loop is blocked for more than
+    ``slow_callback`` seconds, the watchdog captures the stack of the
+    loop thread and the callback being executed. The last :attr:`size`
+    slow callbacks are available in :meth:`info` and they are logged as
+    warnings at most once every :attr:`log_interval` seconds.
+    '''
+    lag_buckets = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+    log_interval = 10
+    size = 10
+
+    def __init__(self, loop, interval=0.1, slow_callback=0, logger=None):
+        self._loop = loop
+        self.interval = interval
+        self.slow_callback = slow_callback
+        self.logger = logger
+        self.slow_callbacks = deque(maxlen=self.size)
+        self.max_lag = 0
+        self._histogram = [0]*(len(self.lag_buckets) + 1)
+        self._probes = 0
+        self._total_lag = 0
+        self._handle = None
+        self._due = None
+        self._watchdog = None
+        self._stopped = Event()
+        self._logged = 0
+        self._suppressed = 0
+
+    def start(self):
+        '''Start probing the loop, must be called from the loop thread.
+        '''
+        if self._handle is None and self.interval:
+            self._thread_id = get_ident()
+            self._stopped.clear()
+            self._schedule()
+            if self.slow_callback:
+                self._watchdog = Thread(target=self._watch,
+                                        name='loop-watchdog', daemon=True)
+                self._watchdog.start()
+
+    def stop(self):
+        '''Stop probing the loop.'''
+        self._stopped.set()
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+
+    def info(self):
+        bounds = [str(b) for b in self.lag_buckets] + ['inf']
+        probes = self._probes
+        return {'interval': self.interval,
+                'probes': probes,
+                'max_lag': round(self.max_lag, 4),
+                'mean_lag': round(self._total_lag/probes, 4) if probes else 0,
+                'lag_histogram': dict(zip(bounds, self._histogram)),
+                'slow_callback': self.slow_callback,
+                'slow_callbacks': list(self.slow_callbacks)}
+
+    def _schedule(self):
+        self._due = self._loop.time() + self.interval
+        self._handle = self._loop.call_at(self._due, self._probe)
+
+    def _probe(self):
+        lag = max(self._loop.time() - self._due, 0)
+        self._probes += 1
+        self._total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        self._histogram[bisect(self.lag_buckets, lag)] += 1
+        if self.slow_callbacks:
+            slow = self.slow_callbacks[-1]
+            if slow['duration'] is None:
+                slow['duration'] = round(lag, 4)
+        self._schedule()
+
+    def _watch(self):
+        # Runs in the watchdog thread, the loop time is monotonic
+        clock = time.monotonic
+        threshold = self.slow_callback
+        reported = None
+        while not self._stopped.wait(threshold/2):
+            due = self._due
+            if due is None or due == reported:
+                continue
+            blocked = clock() - due
+            if blocked > threshold:
+                frame = sys._current_frames().get(self._thread_id)
+                # Extract the stack at once, holding the frame of the loop
+                # thread would keep its local variables alive
+                stack = (traceback.extract_stack(frame)
+                         if frame is not None else None)
+                del frame
+                if stack and due == self._due:
+                    reported = due
+                    self._slow_callback(stack, blocked)
+
+    def _slow_callback(self, stack, blocked):
+        # The callback is the function called by the innermost Handle._run
+        callback = None
+        code = Handle._run.__code__
+        for index in range(len(stack) - 1, 0, -1):
+            entry = stack[index - 1]
+            if (entry.name == code.co_name and
+                    entry.filename == code.co_filename):
+                entry = stack[index]
+                callback = '%s (%s:%d)' % (entry.name, entry.filename,
+                                           entry.lineno)
+                break
+        stack = ''.join(traceback.format_list(stack))
+        self.slow_callbacks.append({'time': time.time(),
+                                    'blocked': round(blocked, 4),
+                                    'duration': None,
+                                    'callback': callback,
+                                    'stack': stack})
+        if self.logger:
+            now = time.time()
+            if now - self._logged >= self.log_interval:
+                suppressed, self._suppressed = self._suppressed, 0
+                self._logged = now
+                self.logger.warning(
+                    'Event loop blocked for more than %.3f seconds by %s '
+                    '(%d similar warnings suppressed)\n%s', blocked,
+                    callback or 'unknown callback', suppressed, stack)
+            else:
+                self._suppressed += 1
+
+
+class StackSampler:
+    '''A statistical profiler sampling the stack of a thread.
+
+    Once started, a sampling thread records the stack of the thread
+    ``thread_id``, by default the calling thread, every ``interval``
+    seconds. Stacks are collapsed into a string of frames, from the
+    outermost to the innermost, separated by semicolons and counted in
+    the :attr:`stacks` dictionary, the input of flame graph tools.
+    '''
+    def __init__(self, thread_id=None, interval=0.005):
+        self.thread_id = thread_id or get_ident()
+        self.interval = interval
+        self.samples = 0
+        self.stacks = {}
+        self._stopped = Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name='stack-sampler',
+                                  daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        '''Stop sampling and return the :attr:`stacks`.'''
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.stacks
+
+    def _run(self):
+        stacks = self.stacks
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append('%s (%s:%d)' % (code.co_name, code.co_filename,
+                                             code.co_firstlineno))
+                frame = frame.f_back
+            key = ';'.join(reversed(names))
+            stacks[key] = stacks.get(key, 0) + 1
+            self.samples += 1
+
+
+def merge_stacks(*stacks):
+    '''Merge the collapsed ``stacks`` of several :class:`StackSampler`.
+    '''
+    merged = {}
+    for data in stacks:
+        for key, count in data.items():
+            merged[key] = merged.get(key, 0) + count
+    return merged
+
+
+def collapsed_stacks(stacks):
+    '''Format ``stacks`` in the collapsed text format read by flame
+    graph tools, one stack and its count per line.'''
+    lines = ['%s %d' % item for item in sorted(stacks.items())]
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def prometheus_text(metrics, prefix='pulsar'):
+    '''Format the latest samples of ``metrics``, the result of the
+    :ref:`metrics command <actor_metrics_command>`, in the Prometheus
+    text exposition format.
+    '''
+    lines = []
+    fields = Metrics.fields[1:]
+    for index, field in enumerate(fields, 1):
+        name = '%s_%s' % (prefix, field)
+        lines.append('# TYPE %s gauge' % name)
+        for monitor, data in sorted(metrics.items()):
+            for aid, series in sorted(data['actors'].items()):
+                value = series[-1][index] if series else None
+                if value is not None:
+                    lines.append('%s{monitor="%s",actor="%s"} %s' %
+                                 (name, monitor, aid, value))
+    lines.append('')
+    return '\n'.join(lines)
@@ -5,17 +5,23 @@ class FlowControl(object):
     """A protocol mixin for flow control logic.
 
     This implements the protocol methods :meth:`pause_writing`,
-    :meth:`resume_writing`.
+    :meth:`resume_writing`, the :meth:`throttle`, :meth:`unthrottle`
+    methods used by producers to apply backpressure across connections and
+    the :meth:`pause_reading`, :meth:`resume_reading` methods used by
+    consumers which cannot keep up with the data received.
+
+    The internal callbacks are invoked directly by the protocol when the
+    connection is made, lost and after writing, rather than being bound
+    to its events.
     """
     _paused = False
+    _throttled = False
+    _reading_paused = False
     _write_waiter = None
 
     def __init__(self, low_limit=None, high_limit=None, **kw):
         self._low_limit = low_limit
         self._high_limit = high_limit
-        self.bind_event('connection_made', self._set_flow_limits)
-        self.bind_event('connection_lost', self._wakeup_waiter)
-        self.bind_event('after_write', self._make_write_waiter)
 
     def pause_writing(self):
         '''Called by the transport when the buffer goes over the
@@ -26,7 +32,8 @@ class FlowControl(object):
         '''
         assert not self._paused
         self._paused = True
-        self._transport.pause_reading()
+        if not self._throttled and not self._reading_paused:
+            self._transport.pause_reading()
 
     def resume_writing(self, exc=None):
         '''Resume writing.
@@ -36,15 +43,54 @@ class FlowControl(object):
         '''
         assert self._paused
         self._paused = False
-        waiter = self._write_waiter
-        if waiter is not None:
-            self._write_waiter = None
-            if not waiter.done():
-                if exc is None:
-                    waiter.set_result(None)
-                else:
-                    waiter.set_exception(exc)
-        self._transport.resume_reading()
+        if not self._throttled:
+            self._release_write_waiter(exc)
+            if not self._reading_paused:
+                self._transport.resume_reading()
+
+    def throttle(self):
+        '''Pause reading and make writes return a waiter until
+        :meth:`unthrottle` is called.
+
+        Unlike :meth:`pause_writing`, it is not triggered by the transport
+        buffer but by a producer, for example when the write buffers of
+        all its connections exceed a budget.
+        '''
+        if not self._throttled:
+            self._throttled = True
+            if not self._paused and not self._reading_paused:
+                self._transport.pause_reading()
+
+    def unthrottle(self, exc=None):
+        '''Resume a connection paused by :meth:`throttle`.
+        '''
+        if self._throttled:
+            self._throttled = False
+            if not self._paused:
+                self._release_write_waiter(exc)
+                if exc is None and not self._reading_paused:
+                    self._transport.resume_reading()
+
+    def pause_reading(self):
+        '''Stop reading from the transport until :meth:`resume_reading`
+        is called.
+
+        Used by consumers to stop receiving data while their buffer is
+        full. Independent from the pause caused by :meth:`pause_writing`
+        and :meth:`throttle`, reading resumes once all of them are over.
+        '''
+        if not self._reading_paused:
+            self._reading_paused = True
+            if not self._paused and not self._throttled:
+                self._transport.pause_reading()
+
+    def resume_reading(self):
+        '''Resume reading paused by :meth:`pause_reading`.
+        '''
+        if self._reading_paused:
+            self._reading_paused = False
+            if not self._paused and not self._throttled:
+                self._transport.resume_reading()
 
     # INTERNAL CALLBACKS
     def _set_flow_limits(self, _, exc=None):
@@ -54,13 +100,25 @@ class FlowControl(object):
 
     def _wakeup_waiter(self, _, exc=None):
         # Wake up the writer if currently paused.
-        if not self._paused:
-            return
-        self.resume_writing(exc=exc)
+        if self._paused:
+            self._throttled = False
+            self.resume_writing(exc=exc)
+        elif self._throttled:
+            self.unthrottle(exc=exc)
+
+    def _release_write_waiter(self, exc=None):
+        waiter = self._write_waiter
+        if waiter is not None:
+            self._write_waiter = None
+            if not waiter.done():
+                if exc is None:
+                    waiter.set_result(None)
+                else:
+                    waiter.set_exception(exc)
 
     def _make_write_waiter(self, _, exc=None):
         # callback for the after_write event
-        if self._paused:
+        if self._paused or self._throttled:
             waiter = self._write_waiter
             assert waiter is None or waiter.cancelled()
             waiter = Future(loop=self._loop)
@@ -70,6 +128,10 @@ class FlowControl(object):
 
 class Timeout(object):
     '''Adds a timeout for idle connections to protocols
+
+    The protocol is responsible for invoking :meth:`_add_timeout` and
+    :meth:`_cancel_timeout` when the connection is made, lost, when data
+    is received and when data is written.
     '''
     _timeout = None
     _timeout_handler = None
@@ -82,15 +144,7 @@ class Timeout(object):
     def timeout(self, timeout):
         '''Set a new :attr:`timeout` for this protocol
         '''
-        if self._timeout is None:
-            self.bind_event('connection_made', self._add_timeout)
-            self.bind_event('connection_lost', self._cancel_timeout)
-            self.bind_event('before_write', self._cancel_timeout)
-            self.bind_event('after_write', self._add_timeout)
-            self.bind_event('data_received', self._cancel_timeout)
-            self.bind_event('data_processed', self._add_timeout)
-        else:
-            self._cancel_timeout(None)
+        self._cancel_timeout(None)
         self._timeout = timeout or 0
         self._add_timeout(None)
 
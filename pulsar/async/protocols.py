@@ -1,4 +1,6 @@
+import os
 import sys
+import socket
 
 import pulsar
 from pulsar.utils.internet import nice_address, format_address
@@ -18,6 +20,11 @@ __all__ = ['ProtocolConsumer',
            'DatagramServer']
 
 
+# Maximum number of buffers passed to a single sendmsg call, the minimum
+# IOV_MAX required by POSIX is 16 while Linux and BSD allow 1024
+IOV_MAX = 1024
+
+
 class ProtocolConsumer(EventHandler):
     '''The consumer of data for a server or client :class:`.Connection`.
 
@@ -104,6 +111,15 @@ class ProtocolConsumer(EventHandler):
         By default it does nothing.
         '''
 
+    def drain(self):
+        '''Called when the server of this consumer starts draining its
+        connections.
+
+        Consumers should finish their current request as soon as possible,
+        the connection is closed once the ``post_request`` event fires.
+        By default it does nothing.
+        '''
+
     def data_received(self, data):
         '''Called when some data is received.
 
@@ -188,6 +204,29 @@ class ProtocolConsumer(EventHandler):
         else:
             raise RuntimeError('No connection')
 
+    def writelines(self, buffers):
+        '''Delegate writing a sequence of ``buffers`` to the underlying
+        :class:`.Connection`
+
+        Return an empty tuple or a :class:`~asyncio.Future`
+        '''
+        c = self._connection
+        if c:
+            return c.writelines(buffers)
+        else:
+            raise RuntimeError('No connection')
+
+    def sendfile(self, file, offset=0, count=None):
+        '''Delegate sending ``file`` to the underlying :class:`.Connection`
+
+        Return a :class:`~asyncio.Future`
+        '''
+        c = self._connection
+        if c:
+            return c.sendfile(file, offset, count)
+        else:
+            raise RuntimeError('No connection')
+
     def _data_received(self, data):
         # Called by Connection, it updates the counters and invoke
         # the high level data_received method which must be implemented
@@ -279,7 +318,7 @@ class PulsarProtocol(EventHandler, FlowControl):
     @property
     def closed(self):
         '''``True`` if the :attr:`transport` is closed.'''
-        return self._transport._closing if self._transport else True
+        return self._transport.is_closing() if self._transport else True
 
     def close(self):
         '''Close by closing the :attr:`transport`.'''
@@ -301,12 +340,14 @@ class PulsarProtocol(EventHandler, FlowControl):
             self._type = 'client'
             addr = self._transport.get_extra_info('sockname')
         self._address = addr
+        self._set_flow_limits(self)
         # let everyone know we have a connection with endpoint
         self.fire_event('connection_made')
 
     def connection_lost(self, exc=None):
         '''Fires the ``connection_lost`` event.
         '''
+        self._wakeup_waiter(self)
         self.fire_event('connection_lost')
 
     def eof_received(self):
@@ -321,8 +362,14 @@ class PulsarProtocol(EventHandler, FlowControl):
 
 class Protocol(PulsarProtocol, asyncio.Protocol):
     '''An :class:`asyncio.Protocol` with :ref:`events <event-handling>`
+
+    .. attribute:: sendmsg_size
+
+        Minimum number of bytes for :meth:`writelines` to send buffers
+        with ``sendmsg`` rather than joining them.
     '''
     _data_received_count = 0
+    sendmsg_size = 4096
 
     def write(self, data):
         '''Write ``data`` into the wire.
@@ -330,26 +377,84 @@ class Protocol(PulsarProtocol, asyncio.Protocol):
         Returns an empty tuple or a :class:`~asyncio.Future` if this
         protocol has paused writing.
         '''
+        return self._write_transport(data, False)
+
+    def writelines(self, buffers):
+        '''Write a sequence of bytes-like ``buffers`` into the wire.
+
+        When the transport buffer is empty, buffers of at least
+        :attr:`sendmsg_size` bytes in total are sent with a single
+        :meth:`~socket.socket.sendmsg` call on the socket of the transport
+        rather than being joined, the transport buffers what could not be
+        sent. Transports without a plain socket, such as SSL transports, and
+        transports with buffered data use their ``writelines`` method.
+
+        Returns an empty tuple or a :class:`~asyncio.Future` if this
+        protocol has paused writing.
+        '''
+        return self._write_transport(buffers, True)
+
+    def _write_transport(self, data, vectored):
         t = self._transport
         if t:
-            if t._closing:  # Uses private variable.
+            if t.is_closing():
                 raise ConnectionResetError('Connection lost')
+            self.fire_event('before_write')
             if self._paused:
-                # # Uses private variable once again!
                 # This occurs when the protocol is paused from writing
                 # but another data ready callback is fired in the same
                 # event-loop frame
                 self.logger.debug('protocol cannot write, add data to the '
                                   'transport buffer')
-                t._buffer.extend(data)
+                if vectored:
+                    t.writelines(data)
+                else:
+                    t.write(data)
             else:
-                self.fire_event('before_write')
-                t.write(data)
-                self.fire_event('after_write')
+                if vectored:
+                    self._sendmsg(t, data)
+                else:
+                    t.write(data)
+                self._make_write_waiter(self)
+            # fired while paused too, the write buffer keeps growing
+            self.fire_event('after_write')
             return self._write_waiter or ()
         else:
             raise ConnectionResetError('No Transport')
 
+    def _sendmsg(self, t, buffers):
+        # sizes in bytes, whatever the format of memoryviews
+        buffers = [b if isinstance(b, bytes) else memoryview(b).cast('B')
+                   for b in buffers]
+        if sum(len(b) for b in buffers) < self.sendmsg_size:
+            return t.write(b''.join(buffers))
+        sock = t.get_extra_info('socket')
+        # The socket is owned by the transport. Sending on it directly is
+        # safe only while the transport buffer is empty: data is sent in
+        # order and the transport buffers, and handles the errors of, what
+        # sendmsg could not send as for any other write.
+        if (not isinstance(sock, socket.socket) or
+                not hasattr(sock, 'sendmsg') or
+                t.get_extra_info('sslcontext') is not None or
+                t.get_write_buffer_size()):
+            return t.writelines(buffers)
+        try:
+            sent = sock.sendmsg(buffers[:IOV_MAX])
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except OSError:
+            # the transport handles the error
+            return t.writelines(buffers)
+        for data in buffers:
+            size = len(data)
+            if sent >= size:
+                sent -= size
+            else:
+                if sent:
+                    data = memoryview(data)[sent:]
+                    sent = 0
+                t.write(data)
+
 
 class DatagramProtocol(PulsarProtocol, asyncio.DatagramProtocol):
     '''An ``asyncio.DatagramProtocol`` with events`'''
@@ -370,11 +475,19 @@ class Connection(Protocol, Timeout):
     .. attribute:: _processed
 
         number of separate requests processed.
+
+    .. attribute:: sendfile_block_size
+
+        Size of blocks read from files by :meth:`sendfile` when it cannot
+        use :func:`os.sendfile`.
     '''
+    sendfile_block_size = 65536
+    _sendfile_fd = None
+    _sendfile_waiter = None
+
     def __init__(self, consumer_factory=None, timeout=None,
                  low_limit=None, high_limit=None, **kw):
         super().__init__(**kw)
-        self.bind_event('connection_lost', self._connection_lost)
         self._processed = 0
         self._current_consumer = None
         self._consumer_factory = consumer_factory
@@ -397,12 +510,39 @@ class Connection(Protocol, Timeout):
             self._build_consumer(None)
         return self._current_consumer
 
+    def connection_made(self, transport):
+        '''Override :meth:`PulsarProtocol.connection_made` to add
+        a :attr:`timeout` for idle connections.
+        '''
+        super().connection_made(transport)
+        self._add_timeout(self)
+
+    def connection_lost(self, exc=None):
+        '''It performs these actions in the following order:
+
+        * Cancel the idle timeout if set.
+        * Invokes the :meth:`ProtocolConsumer.connection_lost` method in the
+          :meth:`current_consumer`.
+        * Fires the ``connection_lost`` :ref:`one time event <one-time-event>`
+          if not fired before.
+        '''
+        self._cancel_timeout(self)
+        if self._sendfile_fd is not None:
+            self._loop.remove_writer(self._sendfile_fd)
+            self._sendfile_fd = None
+            self._sendfile_waiter.set_exception(
+                ConnectionResetError('Connection lost'))
+        if self._current_consumer:
+            self._current_consumer.connection_lost(exc)
+        super().connection_lost(exc)
+
     def data_received(self, data):
         '''Delegates handling of data to the :meth:`current_consumer`.
 
-        Once done set a timeout for idle connections when a
-        :attr:`~Protocol.timeout` is a positive number (of seconds).
+        The idle timeout is cancelled while data is being processed and it is
+        set again once a response is written.
         '''
+        self._cancel_timeout(self)
         self._data_received_count = self._data_received_count + 1
         self.fire_event('data_received', data=data)
         while data:
@@ -410,7 +550,83 @@ class Connection(Protocol, Timeout):
             data = consumer._data_received(data)
             if isinstance(data, Future):
                 break
-        self.fire_event('data_received', data=data)
+        self.fire_event('data_processed', data=data)
+
+    def write(self, data):
+        '''Override :meth:`Protocol.write` to reset the idle timeout.
+        '''
+        self._cancel_timeout(self)
+        result = super().write(data)
+        self._add_timeout(self)
+        return result
+
+    def writelines(self, buffers):
+        '''Override :meth:`Protocol.writelines` to reset the idle timeout.
+        '''
+        self._cancel_timeout(self)
+        result = super().writelines(buffers)
+        self._add_timeout(self)
+        return result
+
+    @task
+    def sendfile(self, file, offset=0, count=None):
+        '''Send ``count`` bytes of ``file``, from ``offset``, into the wire.
+
+        On transports with a plain socket, data is sent with
+        :func:`os.sendfile` from the file to the socket, without copying it
+        into user space. Otherwise, for example with SSL transports, blocks
+        of :attr:`sendfile_block_size` bytes read from the file are written,
+        waiting for the write buffer to drain between blocks.
+
+        The idle :attr:`~.Timeout.timeout` applies while waiting for the
+        socket to accept data.
+
+        :param file: a file object opened in binary mode.
+        :param offset: where to start reading the file.
+        :param count: number of bytes to send, by default up to the end of
+            the file.
+        :return: a :class:`~asyncio.Future` called back with the number of
+            bytes sent.
+        '''
+        t = self._transport
+        if not t or t.is_closing():
+            raise ConnectionResetError('Connection lost')
+        try:
+            fileno = file.fileno()
+        except (AttributeError, OSError):
+            fileno = None
+        if count is None and fileno is not None:
+            count = os.fstat(fileno).st_size - offset
+        sock = t.get_extra_info('socket')
+        if (fileno is None or not hasattr(os, 'sendfile') or
+                not isinstance(sock, socket.socket) or
+                t.get_extra_info('sslcontext') is not None or
+                t.get_write_buffer_size()):
+            sent = yield from self._sendfile_blocks(file, offset, count)
+            return sent
+        # the event loop does not accept writers for the socket of a
+        # transport, wait for a duplicate descriptor to be writable instead
+        out = os.dup(sock.fileno())
+        sent = 0
+        self._cancel_timeout(self)
+        try:
+            while sent < count:
+                try:
+                    size = os.sendfile(out, fileno, offset + sent,
+                                       count - sent)
+                except (BlockingIOError, InterruptedError):
+                    yield from self._writable(out)
+                    continue
+                except OSError as exc:
+                    t.abort()
+                    raise ConnectionResetError('Connection lost') from exc
+                if not size:    # end of file
+                    break
+                sent += size
+        finally:
+            os.close(out)
+            self._add_timeout(self)
+        return sent
 
     def upgrade(self, consumer_factory):
         '''Upgrade the :func:`_consumer_factory` callable.
@@ -450,17 +666,39 @@ class Connection(Protocol, Timeout):
             consumer._connection = self
             consumer.connection_made(self)
 
-    def _connection_lost(self, _, exc=None):
-        '''It performs these actions in the following order:
-
-        * Fires the ``connection_lost`` :ref:`one time event <one-time-event>`
-          if not fired before, with ``exc`` as event data.
-        * Cancel the idle timeout if set.
-        * Invokes the :meth:`ProtocolConsumer.connection_lost` method in the
-          :meth:`current_consumer`.
-          '''
-        if self._current_consumer:
-            self._current_consumer.connection_lost(exc)
+    def _writable(self, fd):
+        # Wait for the socket to accept data, the idle timeout closes the
+        # connection if it does not
+        waiter = Future(loop=self._loop)
+        self._sendfile_fd = fd
+        self._sendfile_waiter = waiter
+        self._loop.add_writer(fd, self._wakeup_sendfile)
+        self._add_timeout(self)
+        try:
+            yield from waiter
+        finally:
+            self._cancel_timeout(self)
+
+    def _wakeup_sendfile(self):
+        self._loop.remove_writer(self._sendfile_fd)
+        self._sendfile_fd = None
+        self._sendfile_waiter.set_result(None)
+
+    def _sendfile_blocks(self, file, offset, count):
+        file.seek(offset)
+        block_size = self.sendfile_block_size
+        sent = 0
+        while count is None or sent < count:
+            size = block_size if count is None else min(block_size,
+                                                        count - sent)
+            data = file.read(size)
+            if not data:
+                break
+            sent += len(data)
+            waiter = self.write(data)
+            if waiter:
+                yield from waiter
+        return sent
 
 
 class Producer(EventHandler):
@@ -530,21 +768,60 @@ class TcpServer(Producer):
         A :class:`.Server` managed by this Tcp wrapper.
 
         Available once the :meth:`start_serving` method has returned.
+
+    When ``write_buffer_budget`` is given, the bytes waiting in the write
+    buffers of all connections are tracked and, once above the budget,
+    the ``write_buffer_policy`` is applied until they drop below
+    :attr:`write_buffer_low` times the budget:
+
+    * ``pause`` :meth:`~.FlowControl.throttle` all connections. Writers
+      which do not wait for connections to drain, such as pub/sub
+      publishers, can still fill the buffers: above :attr:`write_buffer_high`
+      times the budget the connections with the largest write buffers are
+      aborted
+    * ``drop`` abort the connections with the largest write buffers
+    * ``reject`` close new connections
+
+    When ``drain_timeout`` is given, :meth:`close` drains connections rather
+    than closing them at once.
+
+    Once ``max_requests`` connections are created the server fires the
+    ``retire`` event, if callbacks are bound to it, otherwise it closes.
     '''
-    ONE_TIME_EVENTS = ('start', 'stop')
+    ONE_TIME_EVENTS = ('start', 'retire', 'stop')
     MANY_TIMES_EVENTS = ('connection_made', 'pre_request', 'post_request',
                          'connection_lost')
+    write_buffer_policies = ('pause', 'drop', 'reject')
+    write_buffer_low = 0.75
+    write_buffer_high = 2
+    write_buffer_check = 0.1
     _server = None
     _started = None
+    _drain = None
 
     def __init__(self, protocol_factory, loop, address=None,
                  name=None, sockets=None, max_requests=None,
-                 keep_alive=None, logger=None):
+                 keep_alive=None, logger=None, write_buffer_budget=None,
+                 write_buffer_policy=None, drain_timeout=None):
         super().__init__(loop, protocol_factory, name=name,
                          max_requests=max_requests, logger=logger)
         self._params = {'address': address, 'sockets': sockets}
         self._keep_alive = max(keep_alive or 0, 0)
+        self._drain_timeout = max(drain_timeout or 0, 0)
         self._concurrent_connections = set()
+        self._write_buffer_budget = max(write_buffer_budget or 0, 0)
+        policy = write_buffer_policy or 'pause'
+        if policy not in self.write_buffer_policies:
+            raise ValueError('Unknown write buffer policy "%s"' % policy)
+        self._write_buffer_policy = policy
+        self._write_buffers = {}
+        self._write_buffer = {'size': 0, 'peak': 0, 'over_budget': 0,
+                              'dropped': 0, 'rejected': 0}
+        self._over_budget = False
+        self._write_buffer_handle = None
+        # connections share these callbacks by reference
+        self.bind_event('connection_made', self._connection_made)
+        self.bind_event('connection_lost', self._connection_lost)
 
     def __repr__(self):
         address = self.address
@@ -554,6 +831,27 @@ class TcpServer(Producer):
             return self.__class__.__name__
     __str_ = __repr__
 
+    @property
+    def connected_clients(self):
+        '''Number of connections currently served.
+        '''
+        return len(self._concurrent_connections)
+
+    @property
+    def write_buffer_size(self):
+        '''Bytes waiting in the write buffers of connections, updated
+        after writes and every :attr:`write_buffer_check` seconds.
+
+        Only tracked when a ``write_buffer_budget`` is given.
+        '''
+        return self._write_buffer['size']
+
+    @property
+    def draining(self):
+        '''``True`` while :meth:`close` drains connections.
+        '''
+        return bool(self._drain and not self.fired_event('stop'))
+
     @property
     def address(self):
         '''Socket address of this server.
@@ -618,11 +916,18 @@ class TcpServer(Producer):
     def close(self):
         '''Stop serving the :attr:`.Server.sockets` and close all
         concurrent connections.
+
+        With a ``drain_timeout``, idle connections are closed at once while
+        the others are closed once they have processed their current
+        request. Connections still open after ``drain_timeout`` seconds
+        are closed.
         '''
         if not self.fired_event('stop'):
             if self._server:
                 server, self._server = self._server, None
                 server.close()
+                if self._drain_timeout:
+                    yield from self._drain_connections()
                 coro = self._close_connections()
                 if coro:
                     yield from coro
@@ -644,29 +949,167 @@ class TcpServer(Producer):
             for sock in self._server.sockets:
                 sockets.append({
                     'address': format_address(sock.getsockname())})
-        return {'server': server,
-                'clients': clients}
+        info = {'server': server, 'clients': clients}
+        if self._write_buffer_budget:
+            write_buffer = dict(self._write_buffer)
+            write_buffer.update({
+                'budget': self._write_buffer_budget,
+                'policy': self._write_buffer_policy,
+                'over_budget_now': self._over_budget,
+                'buffering_clients': len(self._write_buffers)})
+            info['write_buffer'] = write_buffer
+        if self._drain:
+            drain = dict(self._drain)
+            drain.update({'draining': self.draining,
+                          'remaining': len(self._concurrent_connections),
+                          'elapsed': self._loop.time() - drain['started']})
+            info['drain'] = drain
+        return info
 
     def create_protocol(self):
         '''Override :meth:`Producer.create_protocol`.
         '''
         protocol = super().create_protocol(timeout=self._keep_alive)
-        protocol.bind_event('connection_made', self._connection_made)
-        protocol.bind_event('connection_lost', self._connection_lost)
+        protocol.copy_many_times_events(self)
         if (self._server and self._max_requests and
-                self._sessions >= self._max_requests):
-            self.logger.info('Reached maximum number of connections %s. '
-                             'Stop serving.' % self._max_requests)
-            self.close()
+                self._sessions >= self._max_requests and
+                not self.fired_event('retire')):
+            if self.event('retire').handlers:
+                self.logger.info('Reached maximum number of connections %s. '
+                                 'Retiring.' % self._max_requests)
+                self.fire_event('retire')
+            else:
+                self.logger.info('Reached maximum number of connections %s. '
+                                 'Stop serving.' % self._max_requests)
+                self.close()
         return protocol
 
     #    INTERNALS
+    def _drain_connections(self):
+        # consumers share the server callbacks, close connections once
+        # their request is processed
+        self.bind_event('post_request', self._close_after_request)
+        connections = list(self._concurrent_connections)
+        self._drain = drain = {'started': self._loop.time(),
+                               'timeout': self._drain_timeout,
+                               'connections': len(connections),
+                               'idle': 0, 'forced': 0}
+        waiting = []
+        for connection in connections:
+            consumer = connection._current_consumer
+            if consumer is not None:
+                consumer.drain()
+            elif connection._processed:
+                drain['idle'] += 1
+                connection.close()
+            waiting.append(connection.event('connection_lost'))
+        if waiting:
+            self.logger.info('%s draining %d connections', self, len(waiting))
+            _, pending = yield from asyncio.wait(
+                waiting, timeout=self._drain_timeout, loop=self._loop)
+            if pending:
+                drain['forced'] = len(pending)
+                self.logger.warning('%s closing %d connections after drain '
+                                    'timeout', self, len(pending))
+
+    def _close_after_request(self, consumer, exc=None):
+        if consumer is not None and consumer.connection:
+            consumer.connection.close()
+
     def _connection_made(self, connection, exc=None):
         if not exc:
+            if self._write_buffer_budget:
+                if self._over_budget:
+                    if self._write_buffer_policy == 'reject':
+                        self._write_buffer['rejected'] += 1
+                        connection.transport.abort()
+                        return
+                    elif self._write_buffer_policy == 'pause':
+                        connection.throttle()
+                connection.bind_event('after_write', self._after_write)
             self._concurrent_connections.add(connection)
 
     def _connection_lost(self, connection, exc=None):
         self._concurrent_connections.discard(connection)
+        size = self._write_buffers.pop(connection, None)
+        if size:
+            self._update_write_buffer(-size)
+
+    def _after_write(self, connection, exc=None):
+        # track the write buffer of connection after a write
+        transport = connection.transport
+        size = transport.get_write_buffer_size() if transport else 0
+        buffers = self._write_buffers
+        previous = buffers.pop(connection, 0)
+        if size:
+            buffers[connection] = size
+        self._update_write_buffer(size - previous)
+        if buffers and not self._write_buffer_handle:
+            self._write_buffer_handle = self._loop.call_later(
+                self.write_buffer_check, self._check_write_buffers)
+
+    def _check_write_buffers(self):
+        # Refresh the write buffer sizes since transports drain
+        # their buffers without notifying protocols
+        self._write_buffer_handle = None
+        buffers = self._write_buffers
+        size = 0
+        for connection in list(buffers):
+            transport = connection.transport
+            value = transport.get_write_buffer_size() if transport else 0
+            if value:
+                buffers[connection] = value
+                size += value
+            else:
+                buffers.pop(connection)
+        self._update_write_buffer(size - self._write_buffer['size'])
+        if buffers:
+            self._write_buffer_handle = self._loop.call_later(
+                self.write_buffer_check, self._check_write_buffers)
+
+    def _update_write_buffer(self, delta):
+        stats = self._write_buffer
+        stats['size'] = size = stats['size'] + delta
+        stats['peak'] = max(stats['peak'], size)
+        budget = self._write_buffer_budget
+        if size > budget:
+            if not self._over_budget:
+                self._over_budget = True
+                stats['over_budget'] += 1
+                self.logger.warning('%s write buffers above budget, %d bytes',
+                                    self, size)
+                if self._write_buffer_policy == 'pause':
+                    for connection in self._concurrent_connections:
+                        connection.throttle()
+            if (self._write_buffer_policy == 'drop' or
+                    size > self.write_buffer_high*budget):
+                self._drop_slowest(size - budget)
+        elif (self._over_budget and
+                size <= self.write_buffer_low*budget):
+            self._below_budget()
+
+    def _below_budget(self):
+        self._over_budget = False
+        if self._write_buffer_policy == 'pause':
+            for connection in self._concurrent_connections:
+                connection.unthrottle()
+
+    def _drop_slowest(self, excess):
+        buffers = self._write_buffers
+        slowest = sorted(buffers, key=buffers.get, reverse=True)
+        for connection in slowest:
+            if excess <= 0:
+                break
+            size = buffers.pop(connection)
+            excess -= size
+            self._write_buffer['size'] -= size
+            self._write_buffer['dropped'] += 1
+            self.logger.warning('Dropping %s with %d bytes in write buffer',
+                                connection, size)
+            connection.transport.abort()
+        if self._write_buffer['size'] <= (self.write_buffer_low *
+                                          self._write_buffer_budget):
+            self._below_budget()
 
     def _close_connections(self, connection=None):
         '''Close ``connection`` if specified, otherwise close all connections.
@@ -697,6 +1140,8 @@ class DatagramServer(Producer):
         A list of :class:`.DatagramTransport`.
 
         Available once the :meth:`create_endpoint` method has returned.
+        There is one transport for each of the bound ``sockets`` given
+        to the constructor, or a transport bound to ``address``.
     '''
     _transports = None
     _started = None
@@ -722,14 +1167,16 @@ class DatagramServer(Producer):
             address = self._params['address']
             sockets = self._params['sockets']
             del self._params
+            loop = self._loop
             try:
                 transports = []
                 if sockets:
-                    for transport in sockets:
-                        proto = self.create_protocol()
-                        transports.append(transport(self._loop, proto))
+                    for sock in sockets:
+                        endpoint = loop.create_datagram_endpoint(
+                            self.create_protocol, sock=sock)
+                        transport, _ = yield from endpoint
+                        transports.append(transport)
                 else:
-                    loop = self._loop
                     transport, _ = yield from loop.create_datagram_endpoint(
                         self.protocol_factory, local_addr=address)
                     transports.append(transport)
@@ -769,6 +1216,7 @@ class DatagramServer(Producer):
         if self._transports:
             for transport in self._transports:
                 sockets.append({
-                    'address': format_address(transport._sock.getsockname())})
+                    'address': format_address(
+                        transport.get_extra_info('sockname'))})
         return {'server': server,
                 'clients': clients}
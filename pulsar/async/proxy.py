@@ -141,6 +141,21 @@ class ActorProxyMonitor(ActorProxy):
 
         Dictionary of information regarding the remote :class:`.Actor`
 
+    .. attribute:: counters
+
+        The latest :meth:`.Actor.counters` of the remote :class:`.Actor`,
+        updated at every :ref:`notification <actor_notify_command>`.
+
+    .. attribute:: retiring
+
+        Time at which the remote :class:`.Actor` asked to be replaced via
+        the :ref:`retire command <actor_retire_command>`, ``None`` otherwise.
+
+    .. attribute:: start_latency
+
+        Seconds between the spawning of the remote :class:`.Actor` and its
+        first notification.
+
     .. attribute:: mailbox
 
         This is the connection with the remote actor. It is available once the
@@ -154,10 +169,13 @@ class ActorProxyMonitor(ActorProxy):
     def __init__(self, impl):
         self.impl = impl
         self.info = {}
+        self.counters = {}
         self.mailbox = None
         self.callback = None
         self.spawning_start = None
         self.stopping_start = None
+        self.retiring = None
+        self.start_latency = None
         super().__init__(impl)
 
     @property
@@ -1056,6 +1056,88 @@ class Workers(Setting):
         """
 
 
+class MinWorkers(Setting):
+    name = "min_workers"
+    section = "Worker Processes"
+    flags = ["--min-workers"]
+    validator = validate_pos_int
+    type = int
+    default = 0
+    desc = """\
+        The minimum number of workers kept when autoscaling.
+
+        Only used when :ref:`max_workers <setting-max_workers>` is set.
+        If zero (the default), the :ref:`workers <setting-workers>` value
+        is used.
+        """
+
+
+class MaxWorkers(Setting):
+    name = "max_workers"
+    section = "Worker Processes"
+    flags = ["--max-workers"]
+    validator = validate_pos_int
+    type = int
+    default = 0
+    desc = """\
+        The maximum number of workers when autoscaling.
+
+        Any value greater than :ref:`workers <setting-workers>` switches on
+        autoscaling. The monitor spawns new workers, up to this number, when
+        the average worker load is above
+        :ref:`scale_up_load <setting-scale_up_load>` and retires the least
+        loaded workers when the load stays below
+        :ref:`scale_down_load <setting-scale_down_load>`.
+
+        The load of a worker is the number of callbacks waiting in its event
+        loop plus its connected clients plus the requests per second it
+        processed between its last two notifications to the monitor.
+        """
+
+
+class ScaleUpLoad(Setting):
+    name = "scale_up_load"
+    section = "Worker Processes"
+    flags = ["--scale-up-load"]
+    validator = validate_pos_float
+    type = float
+    default = 50
+    desc = """\
+        Average worker load above which the monitor adds workers.
+        """
+
+
+class ScaleDownLoad(Setting):
+    name = "scale_down_load"
+    section = "Worker Processes"
+    flags = ["--scale-down-load"]
+    validator = validate_pos_float
+    type = float
+    default = 5
+    desc = """\
+        Average worker load below which the monitor retires workers.
+
+        It should be well below :ref:`scale_up_load <setting-scale_up_load>`
+        so that the number of workers does not oscillate.
+        """
+
+
+class ScaleCooldown(Setting):
+    name = "scale_cooldown"
+    section = "Worker Processes"
+    flags = ["--scale-cooldown"]
+    validator = validate_pos_int
+    type = int
+    default = 30
+    desc = """\
+        Seconds to wait after a scaling action before the next one.
+
+        A worker is retired only if the load has stayed below
+        :ref:`scale_down_load <setting-scale_down_load>` for this many
+        seconds.
+        """
+
+
 class Concurrency(Setting):
     name = "concurrency"
     section = "Worker Processes"
@@ -1065,6 +1147,43 @@ class Concurrency(Setting):
     desc = """The type of concurrency to use."""
 
 
+class EventLoop(Setting):
+    name = "event_loop"
+    section = "Worker Processes"
+    flags = ["--event-loop"]
+    validator = validate_string
+    default = "asyncio"
+    desc = """\
+        The event loop implementation used by actors.
+
+        ``asyncio`` is the :class:`asyncio.SelectorEventLoop` polling with
+        the :ref:`selector <setting-selector>`, ``uvloop`` the loop of
+        the uvloop_ package, when installed. Any other value is the dotted
+        path of a callable returning a new event loop.
+
+        .. _uvloop: https://github.com/MagicStack/uvloop
+        """
+
+
+class Zygote(Setting):
+    name = "zygote"
+    section = "Worker Processes"
+    flags = ["--zygote"]
+    validator = validate_bool
+    action = "store_true"
+    default = False
+    desc = """\
+        Fork process workers from a zygote process.
+
+        The zygote is a template process which loads the application once,
+        via the :meth:`.Application.zygote_start` hook, and forks
+        workers on request from the monitor. Workers share the modules
+        loaded by the zygote and start faster, which reduces capacity dips
+        when workers are restarted after :ref:`max_requests
+        <setting-max_requests>`. Only available on posix systems.
+        """
+
+
 class MaxRequests(Setting):
     name = "max_requests"
     section = "Worker Processes"
@@ -1096,6 +1215,42 @@ class Timeout(Setting):
         killed and restarted."""
 
 
+class LoopProbe(Setting):
+    name = "loop_probe"
+    section = "Worker Processes"
+    flags = ["--loop-probe"]
+    validator = validate_pos_float
+    type = float
+    default = 0.1
+    desc = """\
+        Interval, in seconds, of the event loop lag probe.
+
+        Each actor schedules a callback every ``loop_probe`` seconds and
+        records the delay between its scheduled and actual time in
+        a histogram, available in the ``loop`` entry of the actor
+        :ref:`info <actor_info_command>`. Set to 0 to disable the probe.
+        """
+
+
+class SlowCallback(Setting):
+    name = "slow_callback"
+    section = "Worker Processes"
+    flags = ["--slow-callback"]
+    validator = validate_pos_float
+    type = float
+    default = 0
+    desc = """\
+        Seconds after which a callback blocking the event loop is reported.
+
+        A watchdog thread captures the stack of callbacks blocking
+        the event loop of an actor for longer than this threshold. They are
+        logged, at most once every ten seconds, and the last ten are
+        included in the actor :ref:`info <actor_info_command>`.
+        It requires the :ref:`loop_probe <setting-loop_probe>`.
+        If set to zero (the default) the watchdog is disabled.
+        """
+
+
 class ThreadWorkers(Setting):
     name = "thread_workers"
     section = "Worker Processes"
@@ -1113,6 +1268,42 @@ class ThreadWorkers(Setting):
         """
 
 
+class MinThreadWorkers(Setting):
+    name = "min_thread_workers"
+    section = "Worker Processes"
+    flags = ["--min-thread-workers"]
+    validator = validate_pos_int
+    type = int
+    default = 0
+    desc = """\
+        Minimum number of threads used by the actor event loop executor.
+
+        When lower than :ref:`thread_workers <setting-thread_workers>`,
+        the executor resizes between the two values, keeping the threads
+        needed for the rate of calls and the time they block a thread.
+        0, the default, keeps up to ``thread_workers`` threads.
+        """
+
+
+class ExecutorQueue(Setting):
+    name = "executor_queue"
+    section = "Worker Processes"
+    flags = ["--executor-queue"]
+    validator = validate_pos_int
+    type = int
+    default = 0
+    desc = """\
+        Maximum number of calls waiting for a thread of the event loop
+        executor.
+
+        When the queue is full, calls are rejected rather than queued and
+        the :func:`.middleware_in_executor` responds with
+        ``503 Service Unavailable``. The bound applies to every call run in
+        the executor, including the ``getaddrinfo`` of new connections.
+        0, the default, for an unbounded queue.
+        """
+
+
 ############################################################################
 #    APPLICATION HOOKS
 section_docs['Application Hooks'] = '''
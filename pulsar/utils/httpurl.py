@@ -353,6 +353,30 @@ def header_field(name, HEADERS_SET=None, strict=False):
 HEADER_FIELDS_JOINER = {'Cookie': '; ',
                         'Set-Cookie': None,
                         'Set-Cookie2': None}
+# Position of header fields in serialized headers, non-standard fields
+# are serialized with entity fields
+HEADER_FIELDS_RANK = {}
+for _rank, _name in enumerate(('general', 'request', 'response', 'entity')):
+    for _field in HEADER_FIELDS[_name]:
+        HEADER_FIELDS_RANK.setdefault(_field, _rank)
+HEADER_ORDER_CACHE_SIZE = 1024
+_header_orders = {}
+
+
+def header_order(fields):
+    '''The header ``fields`` sorted in the order of serialization.
+
+    Responses of an application tend to have the same fields, the order
+    of a tuple of ``fields`` is sorted once and cached.
+    '''
+    order = _header_orders.get(fields)
+    if order is None:
+        rank = HEADER_FIELDS_RANK.get
+        order = sorted(fields, key=lambda field: rank(field, 3))
+        if len(_header_orders) >= HEADER_ORDER_CACHE_SIZE:
+            _header_orders.clear()
+        _header_orders[fields] = order
+    return order
 
 
 def split_comma(value):
@@ -662,8 +686,17 @@ class Headers(object):
 
     def flat(self, version, status):
         '''Full headers bytes representation'''
-        vs = version + (status, self)
-        return ('HTTP/%s.%s %s\r\n%s' % vs).encode(DEFAULT_CHARSET)
+        hj = HEADER_FIELDS_JOINER
+        headers = self._headers
+        lines = ['HTTP/%s.%s %s\r\n' % (version + (status,))]
+        for k in header_order(tuple(headers)):
+            joiner = hj.get(k, ', ')
+            if joiner:
+                lines.append('%s: %s\r\n' % (k, joiner.join(headers[k])))
+            else:
+                lines.extend(['%s: %s\r\n' % (k, v) for v in headers[k]])
+        lines.append('\r\n')
+        return ''.join(lines).encode(DEFAULT_CHARSET)
 
     def __iter__(self):
         dj = ', '
@@ -676,27 +709,16 @@ class Headers(object):
                     yield k, value
 
     def _ordered(self):
-        hf = HEADER_FIELDS
         hj = HEADER_FIELDS_JOINER
         dj = ', '
-        order = (('general', []), ('request', []),
-                 ('response', []), ('entity', []))
         headers = self._headers
-        for key in headers:
-            for name, group in order:
-                if key in hf[name]:
-                    group.append(key)
-                    break
-            if key not in group:    # non-standard header
-                group.append(key)
-        for _, group in order:
-            for k in group:
-                joiner = hj.get(k, dj)
-                if not joiner:
-                    for header in headers[k]:
-                        yield "%s: %s" % (k, header)
-                else:
-                    yield "%s: %s" % (k, joiner.join(headers[k]))
+        for k in header_order(tuple(headers)):
+            joiner = hj.get(k, dj)
+            if not joiner:
+                for header in headers[k]:
+                    yield "%s: %s" % (k, header)
+            else:
+                yield "%s: %s" % (k, joiner.join(headers[k]))
         yield ''
         yield ''
 
@@ -830,7 +852,7 @@ class HttpParser(object):
         #
         data = bytes(data)
         # start to parse
-        nb_parsed = 0
+        nb_parsed = start = 0
         while True:
             if not self.__on_firstline:
                 idx = data.find(b'\r\n')
@@ -842,23 +864,27 @@ class HttpParser(object):
                     self._buf.append(data[:idx])
                     first_line = to_string(b''.join(self._buf),
                                            DEFAULT_CHARSET)
-                    rest = data[idx+2:]
-                    data = b''
+                    self._buf = []
                     if self._parse_firstline(first_line):
-                        nb_parsed = nb_parsed + idx + 2
-                        self._buf = [rest]
+                        # headers are parsed from data, without copying
+                        start = idx + 2
+                        nb_parsed = nb_parsed + start
                     else:
                         return nb_parsed
             elif not self.__on_headers_complete:
-                if data:
-                    self._buf.append(data)
-                    data = b''
+                if self._buf:
+                    if data:
+                        self._buf.append(data)
+                    to_parse, start = b''.join(self._buf), 0
+                else:
+                    to_parse = data
+                data = b''
                 try:
-                    to_parse = b''.join(self._buf)
-                    ret = self._parse_headers(to_parse)
+                    ret = self._parse_headers(to_parse, start)
                     if ret is False:
+                        self._buf = [to_parse[start:] if start else to_parse]
                         return length
-                    nb_parsed = nb_parsed + (len(to_parse) - ret)
+                    nb_parsed = nb_parsed + (len(to_parse) - start - ret)
                 except InvalidHeader as e:
                     self.errno = INVALID_HEADER
                     self.errstr = str(e)
@@ -869,13 +895,16 @@ class HttpParser(object):
                     self._buf.append(data)
                     data = b''
                 ret = self._parse_body()
-                if ret is None:
+                if self.__on_message_complete:
+                    # bytes after the end of the message, such as pipelined
+                    # requests, are not parsed
+                    rest = sum((len(b) for b in self._buf))
+                    self._buf = []
+                    return max(length - rest, 0)
+                elif ret is None:
                     return length
                 elif ret < 0:
                     return ret
-                elif ret == 0:
-                    self.__on_message_complete = True
-                    return length
                 else:
                     nb_parsed = max(length, ret)
             else:
@@ -938,37 +967,15 @@ class HttpParser(object):
             raise InvalidRequestLine("Invalid HTTP version: %s" % bits[2])
         self._version = (int(match.group(1)), int(match.group(2)))
 
-    def _parse_headers(self, data):
-        if data == b'\r\n':
-            self.__on_headers_complete = True
-            self._buf = []
-            return 0
-        idx = data.find(b'\r\n\r\n')
-        if idx < 0:  # we don't have all headers
-            return False
-        chunk = to_string(data[:idx], DEFAULT_CHARSET)
-        # Split lines on \r\n keeping the \r\n on each line
-        lines = deque(('%s\r\n' % line for line in chunk.split('\r\n')))
-        # Parse headers into key/value pairs paying attention
-        # to continuation lines.
-        while len(lines):
-            # Parse initial header name : value pair.
-            curr = lines.popleft()
-            if curr.find(":") < 0:
-                continue
-            name, value = curr.split(":", 1)
-            name = name.rstrip(" \t").upper()
-            if HEADER_RE.search(name):
-                raise InvalidHeader("invalid header name %s" % name)
-            name, value = header_field(name.strip()), [value.lstrip()]
-            # Consume value continuation lines
-            while len(lines) and lines[0].startswith((" ", "\t")):
-                value.append(lines.popleft())
-            value = ''.join(value).rstrip()
-            if name in self._headers:
-                self._headers[name].append(value)
-            else:
-                self._headers[name] = [value]
+    def _parse_headers(self, data, start=0):
+        if data[start:start+2] == b'\r\n':
+            # no header fields, the empty line follows the first line
+            idx = start - 2
+        else:
+            idx = data.find(b'\r\n\r\n', start)
+            if idx < 0:  # we don't have all headers
+                return False
+        self._parse_fields(data[start:idx], self._headers)
         # detect now if body is sent by chunks.
         clen = self._headers.get('Content-Length')
         if 'Transfer-Encoding' in self._headers:
@@ -1012,16 +1019,46 @@ class HttpParser(object):
         self.__on_message_begin = True
         return len(rest)
 
+    def _parse_fields(self, data, headers):
+        chunk = to_string(data, DEFAULT_CHARSET)
+        # Split lines on \r\n keeping the \r\n on each line
+        lines = deque(('%s\r\n' % line for line in chunk.split('\r\n')))
+        # Parse headers into key/value pairs paying attention
+        # to continuation lines.
+        while len(lines):
+            # Parse initial header name : value pair.
+            curr = lines.popleft()
+            if curr.find(":") < 0:
+                continue
+            name, value = curr.split(":", 1)
+            name = name.rstrip(" \t").upper()
+            if HEADER_RE.search(name):
+                raise InvalidHeader("invalid header name %s" % name)
+            name, value = header_field(name.strip()), [value.lstrip()]
+            # Consume value continuation lines
+            while len(lines) and lines[0].startswith((" ", "\t")):
+                value.append(lines.popleft())
+            value = ''.join(value).rstrip()
+            if name in headers:
+                headers[name].append(value)
+            else:
+                headers[name] = [value]
+
     def _parse_body(self):
         data = b''.join(self._buf)
         #
         if not self._chunked:
             #
-            if not data and self._clen is None:
-                if not self._status:    # message complete only for servers
-                    self.__on_message_complete = True
-            else:
-                if self._clen_rest is not None:
+            if self._clen is None and not self._status:
+                # requests without Content-Length have no body
+                self.__on_message_complete = True
+            elif data:
+                if self._status_code == 101:
+                    # data after the headers belongs to the upgraded protocol
+                    rest, self._clen_rest = b'', 0
+                else:
+                    rest = data[self._clen_rest:]
+                    data = data[:self._clen_rest]
                     self._clen_rest -= len(data)
 
                 # maybe decompress
@@ -1030,9 +1067,11 @@ class HttpParser(object):
                 self._partial_body = True
                 if data:
                     self._body.append(data)
-                self._buf = []
+                self._buf = [rest] if rest else []
                 if self._clen_rest <= 0:
                     self.__on_message_complete = True
+            elif self._clen_rest <= 0:
+                self.__on_message_complete = True
             return
         else:
             try:
@@ -1042,6 +1081,18 @@ class HttpParser(object):
                 self.errstr = "invalid chunk size [%s]" % str(e)
                 return -1
             if size == 0:
+                # the last chunk, followed by optional trailers
+                if rest.startswith(b'\r\n'):
+                    idx = 0
+                else:
+                    idx = rest.find(b'\r\n\r\n')
+                    if idx < 0:
+                        return None
+                    self._trailers = OrderedDict()
+                    self._parse_fields(rest[:idx], self._trailers)
+                    idx += 2
+                self._buf = [rest[idx+2:]]
+                self.__on_message_complete = True
                 return size
             if size is None or len(rest) < size + 2:
                 return None
@@ -1065,16 +1116,8 @@ class HttpParser(object):
             chunk_size = int(chunk_size, 16)
         except ValueError:
             raise InvalidChunkSize(chunk_size)
-        if chunk_size == 0:
-            self._parse_trailers(rest_chunk)
-            return 0, None
         return chunk_size, rest_chunk
 
-    def _parse_trailers(self, data):
-        idx = data.find(b'\r\n\r\n')
-        if data[:2] == b'\r\n':
-            self._trailers = self._parse_headers(data[:idx])
-
     def _decompress(self, data):
         deco = self.__decompress_obj
         if deco is not None:
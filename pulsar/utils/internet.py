@@ -1,3 +1,5 @@
+import os
+import json
 import socket
 from functools import partial
 from urllib.parse import urlsplit, parse_qsl, urlencode
@@ -149,6 +151,72 @@ def close_socket(sock):
             pass
 
 
+def reuse_port_sockets(address, type=socket.SOCK_STREAM):
+    '''Create sockets bound to ``address`` with the ``SO_REUSEPORT`` option.
+
+    Several sockets bound to the same address with this option let the
+    kernel distribute incoming connections (or datagrams) among them.
+
+    :param address: a ``(host, port)`` tuple.
+    :param type: the socket type, ``SOCK_STREAM`` or ``SOCK_DGRAM``.
+    :return: a list of non-blocking sockets, one for each address family
+        resolved from ``address``.
+    '''
+    if not hasattr(socket, 'SO_REUSEPORT'):
+        raise NotImplementedError('SO_REUSEPORT not supported')
+    host, port = address
+    sockets = []
+    infos = socket.getaddrinfo(host or None, port, socket.AF_UNSPEC, type, 0,
+                               socket.AI_PASSIVE)
+    try:
+        for family, stype, proto, _, sockaddr in infos:
+            sock = socket.socket(family, stype, proto)
+            sockets.append(sock)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            if family == getattr(socket, 'AF_INET6', None):
+                sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 1)
+            sock.bind(sockaddr)
+            sock.setblocking(False)
+    except Exception:
+        for sock in sockets:
+            sock.close()
+        raise
+    return sockets
+
+
+INHERITED_SOCKETS = 'PULSAR_SOCKETS'
+
+
+def inherited_sockets(name):
+    '''Sockets inherited from the process which started this one.
+
+    When reloading, the arbiter passes its listening sockets to the new
+    arbiter via the ``PULSAR_SOCKETS`` environment variable, a JSON object
+    mapping server names to lists of ``[fd, family, type]``. The sockets of
+    ``name`` are removed from the variable so that they are adopted once.
+
+    :param name: the name of the server owning the sockets.
+    :return: a list of non-blocking sockets or ``None``.
+    '''
+    value = os.environ.get(INHERITED_SOCKETS)
+    if not value:
+        return
+    inherited = json.loads(value)
+    fds = inherited.pop(name, None)
+    if inherited:
+        os.environ[INHERITED_SOCKETS] = json.dumps(inherited)
+    else:
+        os.environ.pop(INHERITED_SOCKETS)
+    if fds:
+        sockets = []
+        for fd, family, type in fds:
+            sock = socket.socket(family, type, fileno=fd)
+            sock.setblocking(False)
+            sockets.append(sock)
+        return sockets
+
+
 def nice_address(address, family=None):
     if isinstance(address, tuple):
         address = ':'.join((str(s) for s in address[:2]))
@@ -4,6 +4,15 @@ Parser for multipart/form-data
 
 This module provides a parser for the multipart/form-data format. It can read
 from a file, a socket or a WSGI environment.
+
+The :class:`MultipartStreamParser` is fed with chunks of the body as they
+are received, searching for boundaries in a byte buffer and spooling
+large parts to temporary files. :class:`MultipartParser` and
+:func:`parse_form_data` use it to parse file-like streams.
+
+.. autoclass:: MultipartStreamParser
+   :members:
+   :member-order: bysource
 '''
 import re
 from tempfile import TemporaryFile
@@ -75,17 +84,179 @@ class MultipartError(ValueError):
     pass
 
 
+class MultipartLimitError(MultipartError):
+    '''Raised when a multipart body exceeds one of the limits of the
+    :class:`MultipartStreamParser`.'''
+
+
+class MultipartStreamParser(object):
+    '''An incremental parser of multipart/form-data bodies.
+
+    The parser is :meth:`feed` with chunks of the body, of any size, and
+    returns the parts completed by each chunk. Boundaries are searched in a
+    byte buffer, part bodies are written to a :class:`MultipartPart` as
+    they are found, spooled to a temporary file once larger than
+    ``memfile_limit``.
+
+    :param boundary: the multipart boundary.
+    :param charset: the charset of part headers.
+    :param max_parts: maximum number of parts.
+    :param max_header_size: maximum size in bytes of the headers of a part.
+    :param disk_limit: maximum size in bytes of all parts.
+    :param mem_limit: maximum size in bytes of parts kept in memory.
+    :param memfile_limit: parts larger than this are spooled to disk.
+
+    :class:`MultipartLimitError` is raised when a limit is exceeded,
+    :class:`MultipartError` when the body is malformed.
+    '''
+    PREAMBLE, BOUNDARY, HEADERS, BODY, DONE = range(5)
+
+    def __init__(self, boundary, charset='latin1', max_parts=1000,
+                 max_header_size=8192, disk_limit=2**30, mem_limit=2**20,
+                 memfile_limit=2**18, buffer_size=2**16):
+        if isinstance(boundary, str):
+            boundary = boundary.encode('latin1')
+        if not boundary:
+            raise MultipartError('No boundary for multipart/form-data.')
+        self.charset = charset
+        self.max_parts = max_parts
+        self.max_header_size = max_header_size
+        self.disk_limit = disk_limit
+        self.mem_limit = min(mem_limit, disk_limit)
+        self.memfile_limit = memfile_limit
+        self.buffer_size = buffer_size
+        self.parts = 0
+        self.size = 0
+        self.state = self.PREAMBLE
+        self._delimiter = b'\r\n--' + boundary
+        # the first boundary is not preceded by a line break
+        self._buffer = bytearray(b'\r\n')
+        self._part = None
+        self._mem_used = 0
+        self._disk_used = 0
+
+    @property
+    def done(self):
+        '''``True`` once the final boundary has been parsed.'''
+        return self.state == self.DONE
+
+    def feed(self, data):
+        '''Parse a chunk of the body and return the list of completed
+        :class:`MultipartPart`, with their file positioned at the start.'''
+        if self.state == self.DONE or not data:
+            return []
+        buffer = self._buffer
+        buffer.extend(data)
+        delimiter = self._delimiter
+        parts = []
+        while True:
+            state = self.state
+            if state == self.BODY:
+                idx = buffer.find(delimiter)
+                if idx < 0:
+                    # keep what could be the start of a delimiter
+                    self._write(len(buffer) - len(delimiter) + 1)
+                    break
+                self._write(idx)
+                del buffer[:len(delimiter)]
+                parts.append(self._finish_part())
+                self.state = self.BOUNDARY
+            elif state == self.BOUNDARY:
+                if buffer[:2] == b'--':
+                    self.state = self.DONE
+                    buffer.clear()
+                    break
+                idx = buffer.find(b'\r\n')
+                if idx < 0:
+                    if len(buffer) > self.max_header_size:
+                        raise MultipartError('Invalid boundary line.')
+                    break
+                if buffer[:idx].strip():
+                    raise MultipartError('Invalid boundary line.')
+                del buffer[:idx+2]
+                self._new_part()
+            elif state == self.HEADERS:
+                if buffer[:2] == b'\r\n':     # a part without headers
+                    idx, end = 0, 2
+                else:
+                    idx = buffer.find(b'\r\n\r\n', 0,
+                                      self.max_header_size + 4)
+                    end = idx + 4
+                if idx < 0:
+                    if len(buffer) >= self.max_header_size + 4:
+                        raise MultipartLimitError('Part headers too large.')
+                    break
+                self._part.parse_headers(bytes(buffer[:idx]))
+                del buffer[:end]
+                self.state = self.BODY
+            elif state == self.PREAMBLE:
+                idx = buffer.find(delimiter)
+                if idx < 0:
+                    del buffer[:max(len(buffer) - len(delimiter) + 1, 0)]
+                    break
+                del buffer[:idx+len(delimiter)]
+                self.state = self.BOUNDARY
+            else:
+                buffer.clear()
+                break
+        return parts
+
+    def close(self):
+        '''Signal the end of the body.
+
+        Raise :class:`MultipartError` if the final boundary has not been
+        parsed.'''
+        if self.state != self.DONE:
+            raise MultipartError('Unexpected end of multipart stream.')
+
+    #    INTERNALS
+    def _new_part(self):
+        if self.parts >= self.max_parts:
+            raise MultipartLimitError('Too many parts.')
+        self.parts += 1
+        self._part = MultipartPart(self.buffer_size, self.memfile_limit,
+                                   self.charset)
+        self.state = self.HEADERS
+
+    def _write(self, size):
+        if size <= 0:
+            return
+        part = self._part
+        self.size += size
+        if self.size > self.disk_limit:
+            raise MultipartLimitError('Disk limit reached.')
+        in_memory = part.size if part.is_buffered() else 0
+        # release the exports of the buffer before resizing it
+        with memoryview(self._buffer) as view, view[:size] as chunk:
+            part.write(chunk)
+        del self._buffer[:size]
+        if part.is_buffered():
+            self._mem_used += part.size - in_memory
+            if self._mem_used > self.mem_limit:
+                raise MultipartLimitError('Memory limit reached.')
+        else:
+            self._mem_used -= in_memory
+
+    def _finish_part(self):
+        part, self._part = self._part, None
+        part.file.seek(0)
+        return part
+
+
 class MultipartParser(object):
 
     def __init__(self, stream, boundary, content_length=-1,
                  disk_limit=2**30, mem_limit=2**20, memfile_limit=2**18,
-                 buffer_size=2**16, charset='latin1'):
+                 buffer_size=2**16, charset='latin1', **kw):
         ''' Parse a multipart/form-data byte stream. This object is an
         iterator over the parts of the message.
 
         :param stream: A file-like stream. Must implement ``.read(size)``.
         :param boundary: The multipart boundary as a byte string.
         :param content_length: The maximum number of bytes to read.
+
+        Additional key-valued parameters are limits of the
+        :class:`MultipartStreamParser`.
         '''
         self.stream, self.boundary = stream, boundary
         self.content_length = content_length
@@ -94,12 +265,11 @@ class MultipartParser(object):
         self.mem_limit = min(mem_limit, self.disk_limit)
         self.buffer_size = min(buffer_size, self.mem_limit)
         self.charset = charset
+        self.limits = kw
         if self.buffer_size - 6 < len(boundary):  # "--boundary--\r\n"
             raise MultipartError('Boundary does not fit into buffer_size.')
         self._done = []
         self._part_iter = None
-        self.separator = '--{0}'.format(self.boundary).encode()
-        self.terminator = '--{0}--'.format(self.boundary).encode()
 
     def __iter__(self):
         ''' Iterate over the parts of the multipart message. '''
@@ -126,89 +296,21 @@ class MultipartParser(object):
         ''' Return a list of parts with that name. '''
         return [p for p in self if p.name == name]
 
-    def _lineiter(self):
-        ''' Iterate over a binary file-like object line by line. Each line is
-            returned as a (line, line_ending) tuple. If the line does not fit
-            into self.buffer_size, line_ending is empty and the rest of the
-            lineis returned with the next iteration.
-        '''
+    def _iterparse(self):
+        parser = MultipartStreamParser(
+            self.boundary, self.charset, disk_limit=self.disk_limit,
+            mem_limit=self.mem_limit, memfile_limit=self.memfile_limit,
+            buffer_size=self.buffer_size, **self.limits)
         read = self.stream.read
         maxread, maxbuf = self.content_length, self.buffer_size
-        _bcrnl = b'\r\n'
-        _bcr = _bcrnl[:1]
-        _bnl = _bcrnl[1:]
-        _bempty = _bcrnl[:0]  # b'rn'[:0] -> b''
-        buffer = _bempty  # buffer for the last (partial) line
-        while 1:
+        while not parser.done:
             data = read(maxbuf if maxread < 0 else min(maxbuf, maxread))
-            maxread -= len(data)
-            lines = (buffer+data).splitlines(True)
-            len_first_line = len(lines[0])
-            # be sure that the first line does not become too big
-            if len_first_line > self.buffer_size:
-                # at the same time don't split a '\r\n' accidentally
-                if (len_first_line == self.buffer_size+1 and
-                        lines[0].endswith(_bcrnl)):
-                    splitpos = self.buffer_size - 1
-                else:
-                    splitpos = self.buffer_size
-                lines[:1] = [lines[0][:splitpos],
-                             lines[0][splitpos:]]
-            if data:
-                buffer = lines[-1]
-                lines = lines[:-1]
-            for line in lines:
-                if line.endswith(_bcrnl):
-                    yield line[:-2], _bcrnl
-                elif line.endswith(_bnl):
-                    yield line[:-1], _bnl
-                elif line.endswith(_bcr):
-                    yield line[:-1], _bcr
-                else:
-                    yield line, _bempty
             if not data:
                 break
-
-    def _iterparse(self):
-        lines, line = self._lineiter(), ''
-        separator = self.separator
-        terminator = self.terminator
-        # Consume first boundary. Ignore leading blank lines
-        for line, nl in lines:
-            if line:
-                break
-        if line != separator:
-            raise MultipartError("Stream does not start with boundary")
-        # For each part in stream...
-        mem_used, disk_used = 0, 0  # Track used resources to prevent DoS
-        is_tail = False  # True if the last line was incomplete (cutted)
-        opts = {'buffer_size': self.buffer_size,
-                'memfile_limit': self.memfile_limit,
-                'charset': self.charset}
-        part = MultipartPart(**opts)
-        for line, nl in lines:
-            if line == terminator and not is_tail:
-                part.file.seek(0)
-                yield part
-                break
-            elif line == separator and not is_tail:
-                if part.is_buffered():
-                    mem_used += part.size
-                else:
-                    disk_used += part.size
-                part.file.seek(0)
+            maxread -= len(data)
+            for part in parser.feed(data):
                 yield part
-                part = MultipartPart(**opts)
-            else:
-                is_tail = not nl  # The next line continues this one
-                part.feed(line, nl)
-                if part.is_buffered():
-                    if part.size + mem_used > self.mem_limit:
-                        raise MultipartError("Memory limit reached.")
-                elif part.size + disk_used > self.disk_limit:
-                    raise MultipartError("Disk limit reached.")
-        if line != terminator:
-            raise MultipartError("Unexpected end of multipart stream.")
+        parser.close()
 
 
 class MultipartPart(object):
@@ -231,6 +333,26 @@ class MultipartPart(object):
             return self.write_body(line, nl)
         return self.write_header(line, nl)
 
+    def parse_headers(self, data):
+        '''Parse the block of headers of this part, without the blank line
+        which terminates it.'''
+        for line in data.split(b'\r\n'):
+            if line:
+                self.write_header(line, '\r\n')
+        self.finish_header()
+
+    def write(self, data):
+        '''Write a chunk of the body of this part, spooled to a temporary
+        file once larger than ``memfile_limit``.'''
+        self.size += len(data)
+        if self.content_length > 0 and self.size > self.content_length:
+            raise MultipartError('Size of body exceeds Content-Length header.')
+        if self.size > self.memfile_limit and isinstance(self.file, BytesIO):
+            self.file, old = TemporaryFile(mode='w+b'), self.file
+            with old.getbuffer() as buffer:
+                self.file.write(buffer)
+        self.file.write(data)
+
     def write_header(self, line, nl):
         line = line.decode(self.charset)
         if not nl:
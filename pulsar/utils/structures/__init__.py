@@ -29,6 +29,14 @@ FrozenDict
    :member-order: bysource
 
 
+LRUCache
+~~~~~~~~~~~~~~~~~~~~~~~
+
+.. autoclass:: LRUCache
+   :members:
+   :member-order: bysource
+
+
 .. module:: pulsar.utils.structures.skiplist
 
 Skiplist
@@ -52,4 +60,5 @@ from .skiplist import Skiplist  # noqa
 from .zset import Zset          # noqa
 from .misc import (MultiValueDict, AttributeDictionary, FrozenDict,  # noqa
                    Dict, Deque, merge_prefix, recursive_update,  # noqa
-                   mapping_iterator, inverse_mapping, aslist)    # noqa
+                   mapping_iterator, inverse_mapping, aslist,    # noqa
+                   LRUCache)    # noqa
@@ -219,6 +219,81 @@ class FrozenDict(dict):
             return False
 
 
+class LRUCache(object):
+    '''A bounded mapping which discards the least recently used items.
+
+    :param maxsize: the maximum number of items.
+    :param maxweight: optional maximum total weight of items. The weight of
+        an item is given when it is :meth:`set`, for example the number of
+        bytes of a value.
+
+    Hits and misses of :meth:`get` are counted in :meth:`info`.
+    '''
+    def __init__(self, maxsize=128, maxweight=None):
+        self.maxsize = maxsize
+        self.maxweight = maxweight
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        '''The value at ``key``, which becomes the most recently used item,
+        or ``default``.'''
+        try:
+            value, _ = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, weight=0):
+        '''Set ``value`` at ``key`` and discard the least recently used
+        items above :attr:`maxsize` or :attr:`maxweight`.
+
+        Values heavier than :attr:`maxweight` are not stored.
+        '''
+        self.pop(key)
+        maxweight = self.maxweight
+        if maxweight is not None and weight > maxweight:
+            return
+        data = self._data
+        data[key] = (value, weight)
+        self.weight += weight
+        while len(data) > self.maxsize or (maxweight is not None and
+                                           self.weight > maxweight):
+            _, (_, w) = data.popitem(last=False)
+            self.weight -= w
+
+    def pop(self, key, default=None):
+        try:
+            value, weight = self._data.pop(key)
+        except KeyError:
+            return default
+        self.weight -= weight
+        return value
+
+    def clear(self):
+        self._data.clear()
+        self.weight = 0
+
+    def info(self):
+        return {'size': len(self._data),
+                'maxsize': self.maxsize,
+                'weight': self.weight,
+                'maxweight': self.maxweight,
+                'hits': self.hits,
+                'misses': self.misses}
+
+
 class Dict(dict):
 
     def mget(self, fields):
@@ -64,3 +64,22 @@ def process_info(pid=None):
                 'cpu_percent': p.cpu_percent(),
                 'nice': p.nice(),
                 'num_threads': p.num_threads()}
+
+
+def process_rss(pid=None):
+    '''Resident set size, in bytes, of the process ``pid``.
+
+    Cheaper than :func:`process_info`, it uses psutil_ when available
+    and ``/proc`` otherwise. Returns ``None`` when it cannot be evaluated.
+    '''
+    pid = pid or os.getpid()
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.NoSuchProcess:  # pragma    nocover
+            return None
+    try:    # pragma    nocover
+        with open('/proc/%s/statm' % pid) as fp:
+            return int(fp.read().split()[1])*os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):  # pragma    nocover
+        return None
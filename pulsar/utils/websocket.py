@@ -250,6 +250,19 @@ class FrameParser(object):
         return self._encode(data, opcode, masking_key, fin,
                             rsv1, rsv2, rsv3)
 
+    def encode_buffers(self, message, final=True, masking_key=None,
+                       opcode=None, rsv1=0, rsv2=0, rsv3=0):
+        '''Same as :meth:`encode` but return the frame as a tuple of
+        buffers, the frame header and the payload.
+
+        Unmasked payloads are not copied, the buffers can be written with
+        :meth:`.Protocol.writelines`.
+        '''
+        fin = 1 if final else 0
+        opcode, masking_key, data = self._info(message, opcode, masking_key)
+        return self._encode_buffers(data, opcode, masking_key, fin,
+                                    rsv1, rsv2, rsv3)
+
     def multi_encode(self, message, masking_key=None, opcode=None,
                      rsv1=0, rsv2=0, rsv3=0, max_payload=0):
         '''Encode a ``message`` into several frames depending on size.
@@ -336,6 +349,11 @@ class FrameParser(object):
             return frame
 
     def _encode(self, data, opcode, masking_key, fin, rsv1, rsv2, rsv3):
+        return b''.join(self._encode_buffers(data, opcode, masking_key, fin,
+                                             rsv1, rsv2, rsv3))
+
+    def _encode_buffers(self, data, opcode, masking_key, fin,
+                        rsv1, rsv2, rsv3):
         buffer = bytearray()
         length = len(data)
         mask_bit = 128 if masking_key else 0
@@ -355,10 +373,8 @@ class FrameParser(object):
             raise ProtocolError('WEBSOCKET frame too large')
         if masking_key:
             buffer.extend(masking_key)
-            buffer.extend(websocket_mask(data, masking_key))
-        else:
-            buffer.extend(data)
-        return bytes(buffer)
+            data = websocket_mask(data, masking_key)
+        return bytes(buffer), data
 
     def _info(self, message, opcode, masking_key):
         mask_length = self._encode_mask_length
@@ -382,8 +398,14 @@ class FrameParser(object):
         return opcode, masking_key, data
 
     def _chunk(self, length):
-        chunk = bytes(self.buffer[:length])
-        self.buffer = self.buffer[length:]
+        # consume the buffer in place, rather than copying its remainder,
+        # and avoid the intermediate copy of large chunks
+        if length < 1024:
+            chunk = bytes(self.buffer[:length])
+        else:
+            with memoryview(self.buffer) as view:
+                chunk = view[:length].tobytes()
+        del self.buffer[:length]
         return chunk
 
 
@@ -4,7 +4,9 @@ import unittest
 from functools import partial
 
 import pulsar
-from pulsar import send, async_while, TcpServer, Connection
+from pulsar import (send, async_while, TcpServer, Connection, asyncio,
+                    ImproperlyConfigured, Config)
+from pulsar.async.concurrency import Concurrency
 from pulsar.apps.test import ActorTestMixin, dont_run_with_thread
 
 from examples.echo.manage import EchoServerProtocol
@@ -14,6 +16,18 @@ def add(actor, a, b):
     return (actor.name, a+b)
 
 
+class CustomLoop(asyncio.SelectorEventLoop):
+    pass
+
+
+def custom_loop():
+    return CustomLoop()
+
+
+def loop_class(actor):
+    return type(actor._loop).__name__
+
+
 class create_echo_server(object):
     '''partial is not picklable in python 2.6'''
     def __init__(self, address):
@@ -57,6 +71,20 @@ class TestActorThread(ActorTestMixin, unittest.TestCase):
         ainfo = info['actor']
         self.assertEqual(ainfo['is_process'], self.concurrency == 'process')
 
+    def test_event_loop(self):
+        proxy = yield from self.spawn_actor(
+            name='loop-%s' % self.concurrency,
+            event_loop='tests.async.actor.custom_loop')
+        name = yield from send(proxy, 'run', loop_class)
+        self.assertEqual(name, 'CustomLoop')
+        info = yield from send(proxy, 'info')
+        self.assertTrue(info['events']['callbacks'] is not None)
+
+    def test_event_loop_not_available(self):
+        impl = Concurrency()
+        impl.cfg = Config(event_loop='foo.new_event_loop')
+        self.assertRaises(ImproperlyConfigured, impl.create_event_loop)
+
     def test_simple_spawn(self):
         '''Test start and stop for a standard actor on the arbiter domain.'''
         proxy = yield from self.spawn_actor(
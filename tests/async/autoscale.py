@@ -0,0 +1,197 @@
+'''Tests for the monitor autoscaler with a synthetic load.'''
+import logging
+import unittest
+from itertools import count
+
+from pulsar import Config
+from pulsar.async.concurrency import MonitorConcurrency
+
+
+class SyntheticWorker:
+    '''A stand-in for the ActorProxyMonitor of a worker.'''
+    stopping_start = None
+    retiring = None
+
+    def __init__(self, age):
+        self.aid = 'w%s' % age
+        self.impl = self
+        self.age = age
+        self.info = {}
+        self.counters = {}
+
+    @property
+    def notified(self):
+        return self.info.get('last_notified')
+
+    def notify(self, metrics, now, callbacks=0, connections=0, requests=0):
+        self.info = {'last_notified': now}
+        self.counters = {'callbacks': callbacks, 'scheduled': 0,
+                         'connections': connections, 'requests': requests}
+        metrics.add(self.aid, now, self.counters)
+
+
+class SyntheticMonitor:
+    '''A stand-in for a Monitor spawning :class:`SyntheticWorker`.'''
+    _ages = count(1)
+
+    def __init__(self, impl):
+        self.impl = impl
+        self.cfg = impl.cfg
+        self.logger = logging.getLogger('pulsar.autoscale')
+        self.stopped = []
+
+    def bind_event(self, name, callback):
+        pass
+
+    def spawn(self):
+        worker = SyntheticWorker(next(self._ages))
+        self.impl.managed_actors[worker.aid] = worker
+
+
+class SyntheticConcurrency(MonitorConcurrency):
+    actor_class = SyntheticMonitor
+
+    def manage_actor(self, monitor, actor, stop=False):
+        if stop:
+            actor.stopping_start = 1
+            monitor.stopped.append(actor)
+        return 1
+
+
+class TestAutoscale(unittest.TestCase):
+
+    def monitor(self, **params):
+        params.setdefault('workers', 2)
+        params.setdefault('max_workers', 4)
+        params.setdefault('scale_cooldown', 10)
+        impl = SyntheticConcurrency()
+        monitor = impl.make('monitor', Config(**params), 'test', 'test')
+        impl.spawn_actors(monitor)
+        return impl, monitor
+
+    def load(self, impl, now, **load):
+        for worker in impl.managed_actors.values():
+            worker.notify(impl.metrics, now, **load)
+
+    def test_settings(self):
+        cfg = Config()
+        self.assertEqual(cfg.min_workers, 0)
+        self.assertEqual(cfg.max_workers, 0)
+        self.assertEqual(cfg.scale_up_load, 50)
+        self.assertEqual(cfg.scale_down_load, 5)
+        self.assertEqual(cfg.scale_cooldown, 30)
+
+    def test_disabled(self):
+        impl, monitor = self.monitor(max_workers=0)
+        self.load(impl, 100, connections=500)
+        impl.autoscale(monitor, 100)
+        self.assertEqual(impl.target_workers, None)
+        self.assertEqual(impl.num_workers(monitor), 2)
+
+    def test_worker_load(self):
+        impl, monitor = self.monitor()
+        worker = list(impl.managed_actors.values())[0]
+        self.assertEqual(impl.worker_load(worker), 0)
+        worker.notify(impl.metrics, 100, callbacks=3, connections=4,
+                      requests=100)
+        self.assertEqual(impl.worker_load(worker), 7)
+        worker.notify(impl.metrics, 110, callbacks=3, connections=4,
+                      requests=300)
+        self.assertEqual(impl.worker_load(worker), 27)
+
+    def test_scale_up(self):
+        impl, monitor = self.monitor(max_workers=6)
+        self.assertEqual(len(impl.managed_actors), 2)
+        self.load(impl, 100, connections=80)
+        impl.autoscale(monitor, 100)
+        # 160 connections need 4 workers
+        self.assertEqual(impl.target_workers, 4)
+        impl.spawn_actors(monitor)
+        self.assertEqual(len(impl.managed_actors), 4)
+        # Still overloaded but cooling down
+        self.load(impl, 105, connections=80)
+        impl.autoscale(monitor, 105)
+        self.assertEqual(impl.target_workers, 4)
+        # Cooldown expired
+        impl.autoscale(monitor, 110)
+        self.assertEqual(impl.target_workers, 6)
+        # Never above max_workers
+        impl.spawn_actors(monitor)
+        self.load(impl, 130, connections=200)
+        impl.autoscale(monitor, 130)
+        self.assertEqual(impl.target_workers, 6)
+        self.assertEqual(impl._scaling['scaled_up'], 2)
+
+    def test_hysteresis(self):
+        impl, monitor = self.monitor()
+        # Between the two thresholds nothing happens
+        self.load(impl, 100, connections=20)
+        impl.autoscale(monitor, 100)
+        self.assertEqual(impl.target_workers, 2)
+        impl.autoscale(monitor, 200)
+        self.assertEqual(impl.target_workers, 2)
+
+    def test_scale_down(self):
+        impl, monitor = self.monitor(min_workers=1)
+        self.load(impl, 100, connections=60)
+        impl.autoscale(monitor, 100)
+        self.assertEqual(impl.target_workers, 3)
+        impl.spawn_actors(monitor)
+        workers = sorted(impl.managed_actors.values(), key=lambda w: w.age)
+        for worker in workers:
+            worker.notify(impl.metrics, 105, connections=2)
+        workers[0].notify(impl.metrics, 105, connections=1)
+        workers[1].notify(impl.metrics, 105, connections=0)
+        # Load must stay low for scale_cooldown seconds
+        impl.autoscale(monitor, 105)
+        self.assertEqual(impl.target_workers, 3)
+        impl.autoscale(monitor, 112)
+        self.assertEqual(impl.target_workers, 3)
+        impl.autoscale(monitor, 115)
+        self.assertEqual(impl.target_workers, 2)
+        # The least loaded worker is retired
+        impl.stop_actors(monitor)
+        self.assertEqual(monitor.stopped, [workers[1]])
+        # A stopping worker is not retired twice
+        impl.stop_actors(monitor)
+        self.assertEqual(monitor.stopped, [workers[1]])
+        # Spike resets the low load window
+        impl.autoscale(monitor, 120)
+        self.load(impl, 122, connections=20)
+        impl.autoscale(monitor, 122)
+        self.load(impl, 124, connections=0)
+        impl.autoscale(monitor, 124)
+        impl.autoscale(monitor, 130)
+        self.assertEqual(impl.target_workers, 2)
+        impl.autoscale(monitor, 134)
+        self.assertEqual(impl.target_workers, 1)
+        # Never below min_workers
+        impl.autoscale(monitor, 200)
+        impl.autoscale(monitor, 300)
+        self.assertEqual(impl.target_workers, 1)
+        self.assertEqual(impl._scaling['scaled_down'], 2)
+
+    def test_stop_oldest(self):
+        impl, monitor = self.monitor(workers=3, max_workers=0)
+        workers = sorted(impl.managed_actors.values(), key=lambda w: w.age)
+        monitor.cfg.set('workers', 1)
+        impl.stop_actors(monitor)
+        self.assertEqual(monitor.stopped, workers[:2])
+
+    def test_retire(self):
+        impl, monitor = self.monitor(workers=2, max_workers=0)
+        self.load(impl, 100)
+        old = sorted(impl.managed_actors.values(), key=lambda w: w.age)
+        old[0].retiring = 100
+        # the replacement is spawned before the retiring worker stops
+        impl.spawn_actors(monitor)
+        self.assertEqual(len(impl.managed_actors), 3)
+        self.assertEqual(len(impl.serving_actors()), 2)
+        impl.stop_actors(monitor)
+        self.assertEqual(monitor.stopped, [])
+        # and the retiring worker stops once the replacement notified
+        self.load(impl, 101)
+        impl.stop_actors(monitor)
+        self.assertEqual(monitor.stopped, [old[0]])
+        impl.spawn_actors(monitor)
+        self.assertEqual(len(impl.managed_actors), 3)
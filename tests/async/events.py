@@ -50,3 +50,27 @@ class TestFailure(unittest.TestCase):
         self.assertEqual(h.remove_callback('many', cbk), 1)
         self.assertEqual(h.remove_callback('many', cbk), 0)
         self.assertEqual(h.event('many').handlers, [])
+
+    def test_lazy_events(self):
+        h = Handler(one_time_events=('start',), many_times_events=('many',))
+        self.assertFalse(h._events)
+        self.assertEqual(h.fire_event('many', 3), None)
+        self.assertFalse(h._events)
+        self.assertEqual(h.fired_event('many'), 0)
+        h.bind_event('many', lambda r, **kw: r)
+        self.assertEqual(list(h._events), ['many'])
+        self.assertEqual(h.fire_event('many', 3).fired(), 1)
+        result = yield from h.fire_event('start', 2)
+        self.assertEqual(result, 2)
+        self.assertEqual(h.fired_event('start'), 1)
+
+    def test_shared_events(self):
+        producer = Handler(many_times_events=('request',))
+        consumer = Handler(many_times_events=('request',))
+        consumer.copy_many_times_events(producer)
+        results = []
+        producer.bind_event('request', lambda r, **kw: results.append(r))
+        self.assertFalse(consumer._events)
+        consumer.fire_event('request', 5)
+        self.assertEqual(results, [5])
+        self.assertFalse(consumer._events)
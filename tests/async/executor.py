@@ -0,0 +1,145 @@
+'''Tests for the event loop executor.'''
+import time
+import unittest
+from threading import Event
+
+import pulsar
+from pulsar import get_event_loop, send, Executor, ExecutorFull
+from pulsar.apps import wsgi
+from pulsar.apps.test import ActorTestMixin, dont_run_with_thread
+
+
+def wait_for(condition, timeout=2):
+    start = time.time()
+    while not condition() and time.time() - start < timeout:
+        time.sleep(0.01)
+
+
+def hello(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [b'hello']
+
+
+class TestExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.executors = []
+
+    def tearDown(self):
+        for executor in self.executors:
+            executor.shutdown()
+
+    def executor(self, *args, **kwargs):
+        executor = Executor(*args, **kwargs)
+        self.executors.append(executor)
+        return executor
+
+    def test_submit(self):
+        executor = self.executor(2)
+        future = executor.submit(sum, (1, 2, 3))
+        self.assertEqual(future.result(1), 6)
+        future = executor.submit(int, 'x')
+        self.assertRaises(ValueError, future.result, 1)
+        wait_for(lambda: executor.info()['completed'] == 2)
+        info = executor.info()
+        self.assertEqual(info['submitted'], 2)
+        self.assertEqual(info['completed'], 2)
+        self.assertEqual(info['max_workers'], 2)
+        self.assertEqual(info['min_workers'], 2)
+        self.assertEqual(sum(info['wait_histogram'].values()), 2)
+        executor.shutdown()
+        self.assertRaises(RuntimeError, executor.submit, sum, ())
+
+    def test_bounded_queue(self):
+        executor = self.executor(1, max_queue=2)
+        event = Event()
+        running = executor.submit(event.wait, 2)
+        wait_for(lambda: not executor.queued)
+        queued = [executor.submit(sum, (1, 2)) for _ in range(2)]
+        self.assertTrue(executor.saturated)
+        self.assertRaises(ExecutorFull, executor.submit, sum, ())
+        info = executor.info()
+        self.assertEqual(info['queued'], 2)
+        self.assertEqual(info['rejected'], 1)
+        self.assertEqual(info['workers'], 1)
+        event.set()
+        self.assertTrue(running.result(1))
+        self.assertEqual([f.result(1) for f in queued], [3, 3])
+        self.assertFalse(executor.saturated)
+        wait_for(lambda: executor.info()['completed'] == 3)
+        self.assertTrue(executor.info()['max_wait'] > 0)
+
+    def test_unbounded_queue(self):
+        # the default executor of actors queues every call
+        cfg = pulsar.Config()
+        self.assertEqual(cfg.executor_queue, 0)
+        executor = self.executor(1, max_queue=cfg.executor_queue)
+        event = Event()
+        running = executor.submit(event.wait, 2)
+        queued = [executor.submit(sum, (1, 2)) for _ in range(200)]
+        self.assertFalse(executor.saturated)
+        event.set()
+        self.assertTrue(running.result(1))
+        self.assertEqual(sum(f.result(1) for f in queued), 600)
+
+    def test_resize(self):
+        executor = self.executor(4, min_workers=1)
+        executor.resize_interval = 0.05
+        event = Event()
+        running = [executor.submit(event.wait, 2) for _ in range(4)]
+        self.assertEqual(executor.info()['workers'], 4)
+        event.set()
+        for future in running:
+            future.result(1)
+        wait_for(lambda: executor.info()['workers'] == 1)
+        info = executor.info()
+        self.assertEqual(info['workers'], 1)
+        self.assertEqual(info['target_workers'], 1)
+        self.assertTrue(info['blocking_time'] > 0)
+        # the pool grows again on demand
+        self.assertEqual(executor.submit(sum, (1, 1)).result(1), 2)
+
+    def test_run_in_executor(self):
+        executor = self.executor(1)
+        loop = get_event_loop()
+        result = yield from loop.run_in_executor(executor, sum, (1, 2))
+        self.assertEqual(result, 3)
+
+    def test_middleware_in_executor(self):
+        executor = self.executor(1, max_queue=1)
+        event = Event()
+        executor.submit(event.wait, 2)
+        wait_for(lambda: not executor.queued)
+        executor.submit(event.wait, 2)
+        handler = wsgi.WsgiHandler(
+            [wsgi.middleware_in_executor(hello, executor)], async=True)
+        environ = wsgi.test_wsgi_environ()
+        started = []
+        try:
+            response = yield from handler(
+                environ, lambda status, headers: started.append(status))
+        finally:
+            event.set()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(started, ['503 Service Unavailable'])
+
+
+class TestActorExecutorThread(ActorTestMixin, unittest.TestCase):
+    concurrency = 'thread'
+
+    def test_info(self):
+        proxy = yield from self.spawn_actor(name='executor',
+                                            executor_queue=10,
+                                            thread_workers=3)
+        info = yield from send(proxy, 'info')
+        info = info['executor']
+        self.assertEqual(info['max_queue'], 10)
+        self.assertEqual(info['max_workers'], 3)
+        self.assertEqual(info['min_workers'], 3)
+        self.assertTrue(isinstance(pulsar.get_actor().executor, Executor))
+
+
+@dont_run_with_thread
+class TestActorExecutorProcess(TestActorExecutorThread):
+    concurrency = 'process'
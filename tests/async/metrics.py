@@ -0,0 +1,291 @@
+'''Tests for actor heartbeats and the metrics aggregated by monitors.'''
+import time
+import weakref
+import unittest
+
+import pulsar
+from pulsar import send, asyncio, get_event_loop
+from pulsar.async.concurrency import Concurrency
+from pulsar.async.metrics import (Metrics, LoopMonitor, StackSampler,
+                                  merge_stacks, collapsed_stacks,
+                                  prometheus_text)
+from pulsar.apps import wsgi
+from pulsar.apps.test import (ActorTestMixin, dont_run_with_thread,
+                              sequential)
+from pulsar.utils.system import json
+
+
+def notify_now(actor):
+    actor.next_periodic_task.cancel()
+    return actor.impl.periodic_task(actor)
+
+
+class HeartbeatActor:
+    '''A stand-in for an :class:`.Actor` sending heartbeats.'''
+    def __init__(self):
+        self.values = {'callbacks': 0, 'connections': 0, 'requests': 0}
+
+    def info(self):
+        return {'actor': {'name': 'test'}}
+
+    def counters(self):
+        return dict(self.values)
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_requests_per_second(self):
+        metrics = Metrics()
+        metrics.add('a', 100, {'requests': 50, 'connections': 3})
+        self.assertEqual(metrics.latest('a')['requests_per_second'], 0)
+        metrics.add('a', 110, {'requests': 250, 'connections': 3})
+        sample = metrics.latest('a')
+        self.assertEqual(sample['requests_per_second'], 20)
+        self.assertEqual(sample['connections'], 3)
+        self.assertEqual(sample['rss'], None)
+        self.assertEqual(metrics.latest('b'), None)
+
+    def test_rolling(self):
+        metrics = Metrics(size=3)
+        for t in range(10):
+            metrics.add('a', t, {'requests': t})
+        series = metrics.series['a']
+        self.assertEqual(len(series), 3)
+        self.assertEqual(series[0][0], 7)
+        self.assertEqual(len(metrics.totals), 3)
+
+    def test_totals(self):
+        metrics = Metrics()
+        metrics.add('a', 100, {'connections': 3, 'loop_lag': 0.1,
+                               'rss': 1000})
+        metrics.add('b', 100.5, {'connections': 4, 'loop_lag': 0.3,
+                                 'rss': 2000})
+        # same resolution interval
+        self.assertEqual(len(metrics.totals), 1)
+        self.assertEqual(metrics.totals[-1], (100.5, 0, 7, 0.3, 3000))
+        metrics.add('a', 102, {'connections': 1, 'loop_lag': 0,
+                               'rss': 1000})
+        self.assertEqual(len(metrics.totals), 2)
+        self.assertEqual(metrics.totals[-1], (102, 0, 5, 0.3, 3000))
+        metrics.remove('b')
+        self.assertEqual(list(metrics.info()['actors']), ['a'])
+
+    def test_prometheus_text(self):
+        metrics = Metrics()
+        metrics.add('a', 100, {'connections': 3, 'rss': 1000})
+        text = prometheus_text({'wsgi': metrics.info()})
+        lines = text.split('\n')
+        self.assertTrue('# TYPE pulsar_connections gauge' in lines)
+        self.assertTrue('pulsar_connections{monitor="wsgi",actor="a"} 3'
+                        in lines)
+        self.assertTrue('pulsar_rss{monitor="wsgi",actor="a"} 1000' in lines)
+        self.assertTrue(text.endswith('\n'))
+
+    def test_heartbeat(self):
+        impl = Concurrency()
+        actor = HeartbeatActor()
+        info, counters = impl.heartbeat(actor)
+        self.assertEqual(info, actor.info())
+        self.assertEqual(counters, actor.values)
+        info, counters = impl.heartbeat(actor)
+        self.assertEqual(info, None)
+        self.assertEqual(counters, {})
+        actor.values['requests'] = 10
+        info, counters = impl.heartbeat(actor)
+        self.assertEqual(info, None)
+        self.assertEqual(counters, {'requests': 10})
+
+
+def blocking(seconds, objects=None):
+    local = Local()
+    if objects is not None:
+        objects.append(weakref.ref(local))
+    time.sleep(seconds)
+
+
+class Local:
+    pass
+
+
+class Logger:
+
+    def __init__(self):
+        self.warnings = []
+
+    def warning(self, msg, *args):
+        self.warnings.append(msg % args)
+
+
+@sequential
+class TestLoopMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.monitors = []
+
+    def tearDown(self):
+        for monitor in self.monitors:
+            monitor.stop()
+
+    def monitor(self, **kw):
+        monitor = LoopMonitor(get_event_loop(), **kw)
+        monitor.start()
+        self.monitors.append(monitor)
+        return monitor
+
+    def block(self, seconds):
+        loop = get_event_loop()
+        loop.call_soon(blocking, seconds)
+        yield from asyncio.sleep(0.05)
+
+    def test_lag_histogram(self):
+        monitor = self.monitor(interval=0.01)
+        yield from asyncio.sleep(0.05)
+        yield from self.block(0.2)
+        info = monitor.info()
+        self.assertTrue(info['probes'] >= 3)
+        self.assertEqual(info['probes'], sum(info['lag_histogram'].values()))
+        self.assertTrue(info['max_lag'] >= 0.15)
+        self.assertTrue(info['lag_histogram']['0.5'] >= 1)
+        self.assertEqual(info['slow_callbacks'], [])
+        self.assertFalse(monitor._watchdog)
+
+    def test_slow_callback(self):
+        logger = Logger()
+        monitor = self.monitor(interval=0.01, slow_callback=0.05,
+                               logger=logger)
+        yield from asyncio.sleep(0.05)
+        yield from self.block(0.2)
+        slow = monitor.info()['slow_callbacks']
+        self.assertEqual(len(slow), 1)
+        slow = slow[0]
+        self.assertTrue('blocking' in slow['callback'])
+        self.assertTrue('time.sleep(seconds)' in slow['stack'])
+        self.assertTrue(slow['blocked'] > 0.05)
+        self.assertTrue(slow['duration'] >= slow['blocked'])
+        self.assertEqual(len(logger.warnings), 1)
+        self.assertTrue('blocking' in logger.warnings[0])
+        # rate limited logging
+        yield from self.block(0.2)
+        self.assertEqual(len(monitor.slow_callbacks), 2)
+        self.assertEqual(len(logger.warnings), 1)
+        self.assertEqual(monitor._suppressed, 1)
+        monitor.stop()
+        self.assertFalse(monitor._handle)
+        monitor._watchdog.join(1)
+        self.assertFalse(monitor._watchdog.is_alive())
+
+    def test_slow_callback_frames(self):
+        # the watchdog does not keep the frames of the loop thread alive
+        monitor = self.monitor(interval=0.01, slow_callback=0.05)
+        objects = []
+        get_event_loop().call_soon(blocking, 0.2, objects)
+        yield from asyncio.sleep(0.1)
+        self.assertEqual(len(monitor.slow_callbacks), 1)
+        self.assertEqual(objects[0](), None)
+
+
+class TestStackSampler(unittest.TestCase):
+
+    def test_sampler(self):
+        sampler = StackSampler(interval=0.001).start()
+        get_event_loop().call_soon(blocking, 0.05)
+        yield from asyncio.sleep(0.1)
+        stacks = sampler.stop()
+        self.assertTrue(sampler.samples > 10)
+        self.assertEqual(sum(stacks.values()), sampler.samples)
+        blocked = [key for key in stacks if key.startswith('<module>')
+                   and 'blocking (' in key]
+        self.assertTrue(blocked)
+        self.assertFalse(sampler._thread)
+
+    def test_merge(self):
+        a = {'main;foo': 2, 'main;bar': 1}
+        b = {'main;foo': 3, 'main': 1}
+        merged = merge_stacks(a, b)
+        self.assertEqual(merged, {'main;foo': 5, 'main;bar': 1, 'main': 1})
+        self.assertEqual(collapsed_stacks(merged),
+                         'main 1\nmain;bar 1\nmain;foo 5\n')
+
+
+class TestHeartbeatThread(ActorTestMixin, unittest.TestCase):
+    concurrency = 'thread'
+
+    def test_counters(self):
+        arbiter = pulsar.get_actor()
+        proxy = yield from self.spawn_actor(name='heartbeat')
+        monitor = arbiter.managed_actors[proxy.aid]
+        self.assertTrue(monitor.info['actor'])
+        counters = monitor.counters
+        for key in ('callbacks', 'scheduled', 'loop_lag', 'connections',
+                    'requests', 'rss'):
+            self.assertTrue(key in counters)
+        self.assertEqual(counters['connections'], 0)
+        if self.concurrency == 'process':
+            self.assertTrue(counters['rss'] > 0)
+        else:
+            self.assertEqual(counters['rss'], None)
+        notified = monitor.notified
+        yield from send(proxy, 'run', notify_now)
+        self.assertTrue(monitor.notified > notified)
+        self.assertTrue(len(arbiter.impl.metrics.series[proxy.aid]) >= 2)
+
+    def test_metrics_command(self):
+        proxy = yield from self.spawn_actor(name='metrics')
+        metrics = yield from send('arbiter', 'metrics')
+        self.assertTrue('arbiter' in metrics)
+        self.assertTrue(proxy.aid in metrics['arbiter']['actors'])
+        self.assertTrue(prometheus_text(metrics))
+
+    def test_metrics_router(self):
+        proxy = yield from self.spawn_actor(name='metrics-router')
+        router = wsgi.MetricsRouter('/metrics')
+        environ = wsgi.test_wsgi_environ('/metrics')
+        response = yield from router(environ)
+        self.assertEqual(response.content_type, 'application/json')
+        data = json.loads(b''.join(response.content).decode('utf-8'))
+        self.assertTrue(proxy.aid in data['arbiter']['actors'])
+        environ = wsgi.test_wsgi_environ(
+            '/metrics', headers=[('Accept', 'text/plain')])
+        response = yield from router(environ)
+        self.assertEqual(response.content_type, 'text/plain')
+        text = b''.join(response.content).decode('utf-8')
+        self.assertTrue('actor="%s"' % proxy.aid in text)
+
+    def test_info_refresh(self):
+        arbiter = pulsar.get_actor()
+        proxy = yield from self.spawn_actor(name='info-refresh')
+        monitor = arbiter.managed_actors[proxy.aid]
+        monitor.info.pop('actor')
+        info = yield from send('arbiter', 'info')
+        self.assertTrue(monitor.info['actor'])
+        self.assertTrue(monitor.notified)
+        workers = dict(((w['actor']['actor_id'], w) for w in info['workers']
+                        if 'actor' in w))
+        self.assertTrue(proxy.aid in workers)
+        self.assertEqual(workers[proxy.aid]['counters'], monitor.counters)
+
+    def test_profile(self):
+        proxy = yield from self.spawn_actor(name='profile')
+        data = yield from send(proxy, 'profile', 0.2, 0.005)
+        self.assertEqual(list(data['samples']), [proxy.aid])
+        self.assertTrue(data['samples'][proxy.aid] > 5)
+        self.assertTrue(any(('run_forever' in key for key in data['stacks'])))
+        data = yield from send('arbiter', 'profile', 0.2, workers=True)
+        arbiter = pulsar.get_actor()
+        self.assertTrue(arbiter.aid in data['samples'])
+        self.assertTrue(proxy.aid in data['samples'])
+        self.assertEqual(sum(data['stacks'].values()),
+                         sum(data['samples'].values()))
+
+    def test_loop_info(self):
+        proxy = yield from self.spawn_actor(name='loop-info')
+        info = yield from send(proxy, 'info')
+        loop = info['loop']
+        self.assertEqual(loop['interval'], 0.1)
+        self.assertEqual(loop['slow_callback'], 0)
+        self.assertTrue('inf' in loop['lag_histogram'])
+
+
+@dont_run_with_thread
+class TestHeartbeatProcess(TestHeartbeatThread):
+    concurrency = 'process'
@@ -0,0 +1,266 @@
+'''Tests the reload of the arbiter on SIGUSR2.'''
+import os
+import sys
+import signal
+import socket
+import shutil
+import tempfile
+import unittest
+import subprocess
+from threading import Thread
+
+import pulsar
+from pulsar import asyncio, get_event_loop, TcpServer
+from pulsar.apps.wsgi import WSGIServer
+from pulsar.apps.test import test_timeout
+from pulsar.utils.websocket import frame_parser
+
+from examples.helloworld.manage import hello
+from examples.websocket.manage import Site
+
+
+ROOT = os.path.dirname(os.path.dirname(pulsar.__file__))
+REQUEST = (b'GET / HTTP/1.1\r\n'
+           b'Host: 127.0.0.1\r\n'
+           b'Connection: close\r\n\r\n')
+HANDSHAKE = (b'GET /echo HTTP/1.1\r\n'
+             b'Host: 127.0.0.1\r\n'
+             b'Upgrade: websocket\r\n'
+             b'Connection: Upgrade\r\n'
+             b'Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n'
+             b'Sec-WebSocket-Version: 13\r\n\r\n')
+
+
+def free_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def get(address):
+    sock = socket.create_connection(address, timeout=5)
+    try:
+        sock.sendall(REQUEST)
+        data = b''
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                return data
+            data += chunk
+    finally:
+        sock.close()
+
+
+class Client(Thread):
+    '''Send requests, one per connection, until stopped.'''
+    def __init__(self, address):
+        super().__init__(daemon=True)
+        self.address = address
+        self.responses = 0
+        self.errors = []
+        self.stopped = False
+
+    def run(self):
+        while not self.stopped:
+            try:
+                data = get(self.address)
+            except Exception as exc:
+                self.errors.append(exc)
+            else:
+                if data.endswith(b'Hello World!\n'):
+                    self.responses += 1
+                else:
+                    self.errors.append(data)
+
+
+class TestDrain(unittest.TestCase):
+
+    def wait_for(self, condition, timeout=2):
+        loop = get_event_loop()
+        start = loop.time()
+        while not condition():
+            self.assertTrue(loop.time() - start < timeout)
+            yield from asyncio.sleep(0.02)
+
+    def recv(self, sock):
+        loop = get_event_loop()
+        return loop.run_in_executor(None, sock.recv, 4096)
+
+    def server(self, callable, **kw):
+        app = WSGIServer(callable, parse_console=False)
+        server = TcpServer(app.protocol_factory(), get_event_loop(),
+                           address=('127.0.0.1', 0), keep_alive=15, **kw)
+        yield from server.start_serving()
+        return server
+
+    def test_drain(self):
+        server = yield from self.server(hello, drain_timeout=2)
+        # an idle keep-alive connection and one which did not send data
+        idle, pending = [socket.create_connection(server.address)
+                         for _ in range(2)]
+        try:
+            idle.sendall(REQUEST.replace(b'close', b'keep-alive'))
+            data = yield from self.recv(idle)
+            self.assertTrue(data.endswith(b'Hello World!\n'))
+            yield from self.wait_for(lambda: server.connected_clients == 2)
+            closed = server.close()
+            data = yield from self.recv(idle)
+            self.assertEqual(data, b'')
+            yield from self.wait_for(lambda: server.connected_clients == 1)
+            self.assertFalse(closed.done())
+            # the pending connection is served before being closed
+            pending.sendall(REQUEST.replace(b'close', b'keep-alive'))
+            data = yield from self.recv(pending)
+            self.assertTrue(data.endswith(b'Hello World!\n'))
+            yield from closed
+            data = yield from self.recv(pending)
+            self.assertEqual(data, b'')
+            self.assertEqual(server.connected_clients, 0)
+            info = server.info()['drain']
+            self.assertEqual(info['connections'], 2)
+            self.assertEqual(info['idle'], 1)
+            self.assertEqual(info['forced'], 0)
+            self.assertEqual(info['remaining'], 0)
+            self.assertFalse(info['draining'])
+        finally:
+            idle.close()
+            pending.close()
+
+    def test_drain_request(self):
+        # requests in progress are served with Connection: close
+        server = yield from self.server(hello, drain_timeout=2)
+        sock = socket.create_connection(server.address)
+        try:
+            sock.sendall(REQUEST.replace(b'close', b'keep-alive')[:-2])
+            yield from self.wait_for(lambda: server.connected_clients == 1)
+            closed = server.close()
+            yield from self.wait_for(lambda: server.draining)
+            sock.sendall(b'\r\n')
+            data = yield from self.recv(sock)
+            self.assertTrue(b'Connection: close' in data)
+            self.assertTrue(data.endswith(b'Hello World!\n'))
+            yield from closed
+            self.assertFalse(server.draining)
+        finally:
+            sock.close()
+
+    def test_drain_timeout(self):
+        server = yield from self.server(hello, drain_timeout=0.2)
+        sock = socket.create_connection(server.address)
+        try:
+            sock.sendall(REQUEST[:20])
+            yield from self.wait_for(lambda: server.connected_clients == 1)
+            yield from server.close()
+            info = server.info()['drain']
+            self.assertEqual(info['forced'], 1)
+            self.assertTrue(info['elapsed'] >= 0.2)
+            self.assertEqual(server.connected_clients, 0)
+        finally:
+            sock.close()
+
+    def test_drain_websocket(self):
+        # websocket clients receive a close frame with the 1001 code
+        server = yield from self.server(Site(), drain_timeout=2)
+        sock = socket.create_connection(server.address)
+        try:
+            sock.sendall(HANDSHAKE)
+            data = yield from self.recv(sock)
+            self.assertTrue(data.startswith(b'HTTP/1.1 101'))
+            closed = server.close()
+            data = yield from self.recv(sock)
+            frame = frame_parser(kind=1).decode(data)
+            self.assertEqual(frame.opcode, 0x8)
+            self.assertEqual(frame.body[:2], (1001).to_bytes(2, 'big'))
+            sock.sendall(frame_parser(kind=1).close(1001))
+            yield from closed
+            self.assertEqual(server.info()['drain']['forced'], 0)
+        finally:
+            sock.close()
+
+    def test_retire(self):
+        # with callbacks on the retire event, the server keeps serving
+        server = yield from self.server(hello, max_requests=1)
+        retired = []
+        server.bind_event('retire', lambda s, **kw: retired.append(s))
+        try:
+            for _ in range(2):
+                data = yield from get_event_loop().run_in_executor(
+                    None, get, server.address)
+                self.assertTrue(data.endswith(b'Hello World!\n'))
+            self.assertEqual(retired, [server])
+            self.assertFalse(server.fired_event('stop'))
+        finally:
+            yield from server.close()
+
+
+@unittest.skipUnless(hasattr(signal, 'SIGUSR2'), 'Requires SIGUSR2')
+class TestReload(unittest.TestCase):
+
+    def wait_for(self, condition, timeout=20):
+        loop = get_event_loop()
+        start = loop.time()
+        while not condition():
+            self.assertTrue(loop.time() - start < timeout)
+            yield from asyncio.sleep(0.05)
+
+    def read_pid(self, pidfile):
+        try:
+            with open(pidfile) as f:
+                return int(f.read())
+        except (IOError, ValueError):
+            return None
+
+    def serving(self, address):
+        try:
+            return get(address).endswith(b'Hello World!\n')
+        except Exception:
+            return False
+
+    def server(self, address, pidfile):
+        script = os.path.join(ROOT, 'examples', 'helloworld', 'manage.py')
+        env = os.environ.copy()
+        env['PYTHONPATH'] = ROOT
+        return subprocess.Popen([sys.executable, script,
+                                 '--bind', '%s:%s' % address,
+                                 '--workers', '2', '--pid', pidfile],
+                                env=env, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL)
+
+    def kill(self, proc, pidfile):
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        pid = self.read_pid(pidfile)
+        if pid and pid != proc.pid:
+            os.kill(pid, signal.SIGTERM)
+
+    @test_timeout(30)
+    def test_reload(self):
+        tmp = tempfile.mkdtemp()
+        pidfile = os.path.join(tmp, 'pulsar.pid')
+        address = ('127.0.0.1', free_port())
+        proc = self.server(address, pidfile)
+        client = Client(address)
+        try:
+            yield from self.wait_for(lambda: self.serving(address))
+            self.assertEqual(self.read_pid(pidfile), proc.pid)
+            client.start()
+            yield from self.wait_for(lambda: client.responses)
+            os.kill(proc.pid, signal.SIGUSR2)
+            # the old arbiter exits once the new one is ready
+            yield from self.wait_for(lambda: proc.poll() is not None)
+            self.assertEqual(proc.returncode, 0)
+            pid = self.read_pid(pidfile)
+            self.assertTrue(pid)
+            self.assertNotEqual(pid, proc.pid)
+            self.assertFalse(os.path.exists('%s.oldpid' % pidfile))
+            responses = client.responses
+            yield from self.wait_for(
+                lambda: client.responses > responses + 10)
+        finally:
+            client.stopped = True
+            self.kill(proc, pidfile)
+            shutil.rmtree(tmp)
+        self.assertEqual(client.errors, [])
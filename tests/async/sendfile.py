@@ -0,0 +1,101 @@
+'''Tests for Connection.sendfile.'''
+import io
+import os
+import socket
+import tempfile
+import unittest
+from functools import partial
+
+from pulsar import get_event_loop, TcpServer, Connection, ProtocolConsumer
+
+
+DATA = os.urandom(2**16)*40
+
+
+class Sender(ProtocolConsumer):
+    '''Send a portion of a file for every message received.'''
+    def data_received(self, data):
+        offset, count = (int(v) for v in data.split(b','))
+        f = open(self.producer.filename, 'rb')
+        result = self.sendfile(f, offset, count or None)
+        result.add_done_callback(lambda fut: f.close())
+        self.sent = result
+
+
+def small_send_buffer(connection, exc=None):
+    connection.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+
+
+class TestSendfile(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        fd, cls.filename = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(DATA)
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.filename)
+
+    def setUp(self):
+        self.resources = []
+
+    def tearDown(self):
+        for resource in self.resources:
+            resource.close()
+
+    def server(self):
+        server = TcpServer(partial(Connection, Sender), get_event_loop(),
+                           address=('127.0.0.1', 0))
+        server.filename = self.filename
+        yield from server.start_serving()
+        self.resources.append(server)
+        return server
+
+    def recv(self, sock, size):
+        data = b''
+        while len(data) < size:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+        return data
+
+    def request(self, server, offset, count):
+        sock = socket.create_connection(server.address, timeout=5)
+        self.resources.append(sock)
+        sock.sendall(('%d,%d' % (offset, count)).encode('utf-8'))
+        size = count or len(DATA) - offset
+        return get_event_loop().run_in_executor(None, self.recv, sock, size)
+
+    def test_sendfile(self):
+        server = yield from self.server()
+        data = yield from self.request(server, 0, 0)
+        self.assertEqual(len(data), len(DATA))
+        self.assertEqual(data, DATA)
+
+    def test_sendfile_range(self):
+        server = yield from self.server()
+        data = yield from self.request(server, 1000, 300000)
+        self.assertEqual(data, DATA[1000:301000])
+
+    def test_small_send_buffer(self):
+        # the socket is not writable for most of the time
+        server = yield from self.server()
+        server.bind_event('connection_made', small_send_buffer)
+        data = yield from self.request(server, 10, 0)
+        self.assertEqual(data, DATA[10:])
+
+    def test_sendfile_blocks(self):
+        # files without a file descriptor are sent in blocks
+        loop = get_event_loop()
+        a, b = socket.socketpair()
+        self.resources.extend((a, b))
+        transport, protocol = yield from loop.create_connection(
+            partial(Connection, loop=loop), sock=a)
+        self.resources.append(transport)
+        sent = yield from protocol.sendfile(io.BytesIO(DATA), 5, 200000)
+        self.assertEqual(sent, 200000)
+        data = yield from loop.run_in_executor(None, self.recv, b, 200000)
+        self.assertEqual(data, DATA[5:200005])
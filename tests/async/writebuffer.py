@@ -0,0 +1,146 @@
+'''Tests for the write buffer budget of TcpServer.'''
+import socket
+import unittest
+from functools import partial
+
+from pulsar import (asyncio, get_event_loop, TcpServer, Connection,
+                    ProtocolConsumer)
+
+
+CHUNK = 2**20
+
+
+class Flood(ProtocolConsumer):
+    '''Write a large chunk of data for every message received.'''
+    def data_received(self, data):
+        self.write(b'x'*CHUNK)
+
+
+def small_send_buffer(connection, exc=None):
+    connection.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+
+
+class TestWriteBufferBudget(unittest.TestCase):
+    budget = int(2.5*CHUNK)
+
+    def setUp(self):
+        self.resources = []
+
+    def tearDown(self):
+        for resource in self.resources:
+            resource.close()
+
+    def server(self, policy):
+        loop = get_event_loop()
+        server = TcpServer(partial(Connection, Flood), loop,
+                           address=('127.0.0.1', 0),
+                           write_buffer_budget=self.budget,
+                           write_buffer_policy=policy)
+        server.bind_event('connection_made', small_send_buffer)
+        yield from server.start_serving()
+        self.resources.append(server)
+        return server
+
+    def client(self, server, message=True):
+        '''A client which does not read from its socket.'''
+        sock = socket.socket()
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 16384)
+        sock.connect(server.address)
+        sock.setblocking(False)
+        self.resources.append(sock)
+        if message:
+            sock.send(b'go')
+        return sock
+
+    def flood(self, server, clients=3):
+        socks = []
+        for _ in range(clients):
+            socks.append(self.client(server))
+            yield from asyncio.sleep(0.05)
+        return socks
+
+    def drain(self, sock, size):
+        received = 0
+        while received < size:
+            try:
+                received += len(sock.recv(65536))
+            except BlockingIOError:
+                yield from asyncio.sleep(0.001)
+
+    def wait_for(self, condition, timeout=2):
+        loop = get_event_loop()
+        start = loop.time()
+        while not condition() and loop.time() - start < timeout:
+            yield from asyncio.sleep(0.02)
+
+    def test_disabled(self):
+        server = TcpServer(partial(Connection, Flood), get_event_loop())
+        self.assertFalse('write_buffer' in server.info())
+        self.assertRaises(ValueError, TcpServer, partial(Connection, Flood),
+                          get_event_loop(), write_buffer_budget=10,
+                          write_buffer_policy='foo')
+
+    def test_pause(self):
+        server = yield from self.server('pause')
+        socks = yield from self.flood(server)
+        info = server.info()['write_buffer']
+        self.assertEqual(info['policy'], 'pause')
+        self.assertEqual(info['over_budget'], 1)
+        self.assertTrue(info['over_budget_now'])
+        self.assertTrue(info['size'] > self.budget)
+        connections = list(server._concurrent_connections)
+        self.assertEqual(len(connections), 3)
+        for connection in connections:
+            self.assertTrue(connection._throttled)
+        # New connections are throttled too
+        self.client(server, False)
+        yield from self.wait_for(lambda: server.connected_clients == 4)
+        for connection in server._concurrent_connections:
+            self.assertTrue(connection._throttled)
+        # Drain the buffers
+        for sock in socks:
+            yield from self.drain(sock, CHUNK)
+        yield from self.wait_for(lambda: not server.write_buffer_size)
+        info = server.info()['write_buffer']
+        self.assertFalse(info['over_budget_now'])
+        self.assertEqual(info['size'], 0)
+        self.assertTrue(info['peak'] > self.budget)
+        for connection in server._concurrent_connections:
+            self.assertFalse(connection._throttled)
+
+    def test_pause_high(self):
+        # writers ignoring the pause, as publishers do, are dropped above
+        # write_buffer_high times the budget
+        server = yield from self.server('pause')
+        yield from self.flood(server)
+        connections = list(server._concurrent_connections)
+        self.assertTrue(server.info()['write_buffer']['over_budget_now'])
+        for connection in connections:
+            connection.write(b'x'*CHUNK)
+        info = server.info()['write_buffer']
+        self.assertTrue(info['dropped'] >= 1)
+        self.assertTrue(info['size'] <= server.write_buffer_high*self.budget)
+        yield from self.wait_for(lambda: server.connected_clients < 3)
+        self.assertTrue(server.connected_clients < 3)
+
+    def test_drop(self):
+        server = yield from self.server('drop')
+        yield from self.flood(server)
+        yield from self.wait_for(lambda: server.connected_clients < 3)
+        info = server.info()['write_buffer']
+        self.assertEqual(info['dropped'], 1)
+        self.assertTrue(info['size'] <= self.budget)
+        self.assertEqual(server.connected_clients, 2)
+
+    def test_reject(self):
+        server = yield from self.server('reject')
+        yield from self.flood(server)
+        self.assertTrue(server.info()['write_buffer']['over_budget_now'])
+        self.client(server, False)
+
+        def rejected():
+            return server.info()['write_buffer']['rejected']
+
+        yield from self.wait_for(rejected)
+        self.assertEqual(rejected(), 1)
+        self.assertEqual(server.connected_clients, 3)
@@ -0,0 +1,95 @@
+'''Tests for vectored writes with Protocol.writelines.'''
+import socket
+import unittest
+from array import array
+from functools import partial
+
+from pulsar import get_event_loop, TcpServer, Connection, ProtocolConsumer
+
+
+CHUNK = 2**20
+BUFFERS = (b'head\r\n', b'x'*CHUNK, memoryview(b'y'*CHUNK)[10:], b'\r\n')
+DATA = b''.join(BUFFERS)
+
+
+class Writer(ProtocolConsumer):
+    '''Write :data:`BUFFERS` for every message received.'''
+    def data_received(self, data):
+        self.writelines(BUFFERS)
+
+
+def small_send_buffer(connection, exc=None):
+    connection.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+
+
+class TestWritelines(unittest.TestCase):
+
+    def setUp(self):
+        self.resources = []
+
+    def tearDown(self):
+        for resource in self.resources:
+            resource.close()
+
+    def server(self):
+        server = TcpServer(partial(Connection, Writer), get_event_loop(),
+                           address=('127.0.0.1', 0))
+        yield from server.start_serving()
+        self.resources.append(server)
+        return server
+
+    def recv(self, sock, size):
+        data = b''
+        while len(data) < size:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+        return data
+
+    def request(self, server, size):
+        sock = socket.create_connection(server.address, timeout=5)
+        self.resources.append(sock)
+        sock.sendall(b'go')
+        return get_event_loop().run_in_executor(None, self.recv, sock, size)
+
+    def test_writelines(self):
+        server = yield from self.server()
+        data = yield from self.request(server, len(DATA))
+        self.assertEqual(data, DATA)
+
+    def test_small_send_buffer(self):
+        # the transport buffers what sendmsg could not send
+        server = yield from self.server()
+        server.bind_event('connection_made', small_send_buffer)
+        data = yield from self.request(server, len(DATA))
+        self.assertEqual(data, DATA)
+
+    def test_small_buffers(self):
+        loop = get_event_loop()
+        a, b = socket.socketpair()
+        self.resources.extend((a, b))
+        transport, protocol = yield from loop.create_connection(
+            partial(Connection, loop=loop), sock=a)
+        self.resources.append(transport)
+        self.assertEqual(protocol.writelines((b'a', memoryview(b'bc'))), ())
+        self.assertEqual(protocol.writelines([]), ())
+        data = yield from loop.run_in_executor(None, self.recv, b, 3)
+        self.assertEqual(data, b'abc')
+
+    def test_buffer_formats(self):
+        # partial sends of memoryviews are counted in bytes, not items
+        loop = get_event_loop()
+        a, b = socket.socketpair()
+        self.resources.extend((a, b))
+        a.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        transport, protocol = yield from loop.create_connection(
+            partial(Connection, loop=loop), sock=a)
+        self.resources.append(transport)
+        values = memoryview(array('i', range(CHUNK)))
+        buffers = (b'head', values[1:], memoryview(b'tail'))
+        protocol.writelines(buffers)
+        expected = b'head' + values[1:].tobytes() + b'tail'
+        data = yield from loop.run_in_executor(None, self.recv, b,
+                                               len(expected))
+        self.assertEqual(data, expected)
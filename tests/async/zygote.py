@@ -0,0 +1,127 @@
+'''Tests the Zygote forking process actors for a monitor.'''
+import unittest
+from unittest import mock
+from multiprocessing import Pipe
+
+from pulsar import get_event_loop, asyncio
+from pulsar.async import concurrency
+from pulsar.async.concurrency import Zygote, ActorZygoteProcess
+
+
+class WedgedProcess:
+    '''A stand-in for a zygote process which never replies.'''
+    pid = 1
+
+    def __init__(self):
+        self.alive = True
+
+    def start(self):
+        pass
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.alive = False
+
+
+def zygote_process(zygote, pid):
+    impl = ActorZygoteProcess.__new__(ActorZygoteProcess)
+    impl.aid = 'a'
+    impl.age = 1
+    impl.zygote = zygote
+    impl.pid = pid
+    return impl
+
+
+class TestZygote(unittest.TestCase):
+
+    def setUp(self):
+        self.resources = []
+
+    def tearDown(self):
+        for resource in self.resources:
+            resource.close()
+
+    def zygote(self):
+        monitor = mock.Mock(_loop=get_event_loop())
+        monitor.name = 'test'
+        monitor.actorparams.return_value = {'cfg': mock.Mock()}
+        conn, child = Pipe()
+        with mock.patch.object(concurrency, 'get_context') as context:
+            context().Pipe.return_value = (conn, mock.Mock())
+            context().Process.return_value = WedgedProcess()
+            zygote = Zygote(monitor)
+        zygote.start()
+        self.resources.extend((zygote, child))
+        return zygote, child
+
+    def test_ready(self):
+        zygote, child = self.zygote()
+        self.assertFalse(zygote.ready())
+        child.send('ready')
+        yield from asyncio.sleep(0.05)
+        self.assertTrue(zygote.ready())
+
+    def test_fork(self):
+        zygote, child = self.zygote()
+        fork1 = zygote.fork('a', 1)
+        fork2 = zygote.fork('b', 1)
+        self.assertEqual(child.recv(), ('a', 1))
+        self.assertEqual(child.recv(), ('b', 1))
+        child.send(1234)
+        child.send(1235)
+        pid = yield from fork1
+        self.assertEqual(pid, 1234)
+        pid = yield from fork2
+        self.assertEqual(pid, 1235)
+        self.assertFalse(zygote.closed)
+
+    def test_fork_timeout(self):
+        zygote, child = self.zygote()
+        fork = zygote.fork('a', 1, 0.01)
+        pending = zygote.fork('b', 1)
+        try:
+            yield from fork
+        except TimeoutError:
+            pass
+        else:
+            raise AssertionError('TimeoutError not raised')
+        self.assertTrue(zygote.closed)
+        self.assertFalse(zygote.ready())
+        self.assertFalse(zygote.is_alive())
+        self.assertIsInstance(pending.exception(), EOFError)
+        self.assertRaises(EOFError, zygote.fork, 'c', 1)
+
+    def test_exitcodes(self):
+        zygote, child = self.zygote()
+        impl = zygote_process(zygote, 1234)
+        self.assertTrue(impl.is_alive())
+        child.send(('exit', 1234, -15))
+        yield from asyncio.sleep(0.05)
+        impl.join()
+        self.assertFalse(impl.is_alive())
+        self.assertEqual(impl.exitcode, -15)
+        self.assertEqual(zygote.exitcodes, {})
+
+    def test_orphan(self):
+        zygote, child = self.zygote()
+        zygote.close()
+        impl = zygote_process(zygote, 2**22 + 1)
+        self.assertFalse(impl.is_alive())
+        self.assertEqual(impl.exitcode, None)
+
+    def test_failed_spawn(self):
+        zygote, child = self.zygote()
+        impl = zygote_process(zygote, None)
+        zygote.close()
+        impl.start()
+        self.assertEqual(impl.pid, None)
+        self.assertFalse(impl.is_alive())
+        zygote, child = self.zygote()
+        impl = zygote_process(zygote, None)
+        impl.start()
+        zygote._fork_timeout(zygote._forks[0], impl.aid, 0)
+        yield from asyncio.sleep(0)
+        self.assertEqual(impl.pid, None)
+        self.assertTrue(zygote.closed)
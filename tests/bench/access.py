@@ -0,0 +1,105 @@
+'''Benchmarks for logging requests to a file, as the WSGI server does by
+default and with an :class:`.AccessLog`.
+
+The overhead of logging is reported in microseconds per request and as the
+percentage of a CPU core used at :data:`RATE` requests per second.
+'''
+import os
+import time
+import shutil
+import logging
+import tempfile
+import unittest
+
+from pulsar.apps import wsgi
+from pulsar.apps.wsgi.utils import log_wsgi_info
+
+
+RATE = 100000
+BATCH = 1000
+
+
+def file_logger(name, directory):
+    logger = logging.getLogger('pulsar.bench.%s' % name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = logging.FileHandler(os.path.join(directory, '%s.log' % name))
+    handler.setFormatter(logging.Formatter(
+        '%(asctime)s [p=%(process)s, t=%(thread)s, %(levelname)s, '
+        '%(name)s] %(message)s'))
+    logger.handlers = [handler]
+    return logger
+
+
+class AccessLogMixin(object):
+    __benchmark__ = True
+    __number__ = 10000
+    format = None
+    benchmark_template = ('{0[name]}: repeated {0[repeat]}(x{0[times]}) '
+                          'times, average {0[mean]} secs, {0[usecs]} usecs '
+                          'per request, {0[load]}% of a core at 100k '
+                          'requests per second')
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.logger = file_logger(cls.__name__, cls.directory)
+        cls.environ = wsgi.test_wsgi_environ(
+            '/path?page=1', headers=[('User-Agent', 'pulsar-bench')])
+        cls.environ['REMOTE_ADDR'] = '127.0.0.1'
+        if cls.format:
+            cls.access_log = wsgi.AccessLog(cls.format, cls.logger,
+                                            maxsize=2*BATCH)
+
+    @classmethod
+    def tearDownClass(cls):
+        for handler in cls.logger.handlers:
+            handler.close()
+        shutil.rmtree(cls.directory)
+
+    def getInfo(self, info, delta, dt):
+        info['requests'] = info.get('requests', 0) + 1
+
+    def getSummary(self, info, repeat, total_time, total_time2):
+        usecs = 1000000*total_time/info.pop('requests')
+        info['usecs'] = '%.2f' % usecs
+        info['load'] = '%.1f' % (usecs*RATE/10000)
+        return info
+
+
+class TestLogWsgiInfo(AccessLogMixin, unittest.TestCase):
+
+    def test_log(self):
+        '''Log the request in the event loop.'''
+        environ = self.environ
+        environ['pulsar.logged'] = False
+        log_wsgi_info(self.logger.info, environ, '200 OK')
+
+
+class TestCommonAccessLog(AccessLogMixin, unittest.TestCase):
+    format = 'common'
+
+    def setUp(self):
+        self.requests = 0
+
+    def test_record(self):
+        '''Record the request in the event loop.'''
+        self.access_log.record(self.environ, '200 OK', 12, time.time())
+        self.requests += 1
+        if self.requests % BATCH == 0:
+            self.access_log._records.clear()
+
+    def test_record_and_flush(self):
+        '''Record the request and log it in batches of :data:`BATCH`.'''
+        self.access_log.record(self.environ, '200 OK', 12, time.time())
+        self.requests += 1
+        if self.requests % BATCH == 0:
+            self.access_log.flush()
+
+
+class TestCombinedAccessLog(TestCommonAccessLog):
+    format = 'combined'
+
+
+class TestJsonAccessLog(TestCommonAccessLog):
+    format = 'json'
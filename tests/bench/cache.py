@@ -0,0 +1,38 @@
+'''Benchmarks for serving the responses of a slow middleware taking
+:data:`DELAY` seconds, without and with a :class:`.CacheMiddleware`.
+'''
+import time
+import unittest
+
+from pulsar.apps import wsgi
+
+
+DELAY = 0.01
+BODY = b'x' * 4096
+
+
+def slow(environ, start_response):
+    time.sleep(DELAY)
+    return wsgi.WsgiResponse(200, BODY, [('Cache-Control', 'max-age=60'),
+                                         ('ETag', '"abc"')])
+
+
+class TestCache(unittest.TestCase):
+    __benchmark__ = True
+    __number__ = 100
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache = wsgi.CacheMiddleware(slow)
+        cls.environ = wsgi.test_wsgi_environ('/resource')
+        cls.conditional = wsgi.test_wsgi_environ(
+            '/resource', headers=[('If-None-Match', '"abc"')])
+
+    def test_uncached(self):
+        assert slow(self.environ, None).status_code == 200
+
+    def test_hit(self):
+        assert self.cache(self.environ, None).status_code == 200
+
+    def test_not_modified(self):
+        assert self.cache(self.conditional, None).status_code == 304
@@ -0,0 +1,65 @@
+'''Benchmarks for the :class:`.GZipMiddleware`.
+
+A 1MB html body is compressed in full, from the ``ETag`` cache and as a
+stream of 64KB chunks. Times are CPU times per request, except for the
+time to first byte benchmarks which measure the time until the first
+compressed chunk is available.
+'''
+import time
+import unittest
+from timeit import default_timer
+
+from pulsar.apps import wsgi
+
+
+BODY = b''.join(b'<p class="item-%d">Hello World! %d</p>\n' % (n, n*n)
+                for n in range(26000))[:2**20]
+CHUNKS = [BODY[i:i+2**16] for i in range(0, len(BODY), 2**16)]
+
+
+class GZipMixin(object):
+    __benchmark__ = True
+    __number__ = 20
+    middleware = wsgi.GZipMiddleware()
+
+    def response(self, content=BODY, etag=None):
+        response = wsgi.WsgiResponse(200, content, content_type='text/html')
+        if etag:
+            response['ETag'] = etag
+        environ = wsgi.test_wsgi_environ(
+            headers=[('Accept-Encoding', 'gzip, deflate')])
+        return self.middleware(environ, response)
+
+    def run_timed(self, callable, *args):
+        start = time.process_time()
+        callable(*args)
+        self._time = time.process_time() - start
+
+    def getTime(self, dt):
+        return self._time
+
+
+class TestGZip(GZipMixin, unittest.TestCase):
+
+    def test_buffered(self):
+        self.run_timed(lambda: list(self.response()))
+
+    def test_etag_cache(self):
+        self.run_timed(lambda: list(self.response(etag='"bench"')))
+
+    def test_streamed(self):
+        self.run_timed(lambda: list(self.response(iter(CHUNKS))))
+
+
+class TestGZipFirstByte(GZipMixin, unittest.TestCase):
+
+    def first_byte(self, content):
+        start = default_timer()
+        next(iter(self.response(content)))
+        self._time = default_timer() - start
+
+    def test_buffered(self):
+        self.first_byte(BODY)
+
+    def test_streamed(self):
+        self.first_byte(iter(CHUNKS))
@@ -0,0 +1,123 @@
+'''Benchmarks for serving files with a :class:`.MediaRouter`.
+
+A large file is sent with :func:`os.sendfile` and small files are served
+from the :class:`.FileCache`. The server runs on its own event loop in a
+separate thread while a blocking client reads responses into a reusable
+buffer, so that the peak memory traced by :mod:`tracemalloc` approximates
+the memory used by the server.
+'''
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+import tracemalloc
+from threading import Thread, Event
+
+from pulsar import new_event_loop, TcpServer
+from pulsar.apps import wsgi
+
+
+LARGE_SIZE = 2**27
+SMALL_SIZE = 2**10
+SMALL_FILES = 10000
+
+
+def media_server(path, loop):
+    app = wsgi.WSGIServer(wsgi.WsgiHandler([wsgi.MediaRouter('/', path)]),
+                          parse_console=False)
+    return TcpServer(app.protocol_factory(), loop,
+                     address=('127.0.0.1', 0), keep_alive=15)
+
+
+class FileServerMixin(object):
+    __benchmark__ = True
+    benchmark_template = ('{0[name]}: repeated {0[repeat]}(x{0[times]}) '
+                          'times, average {0[mean]} secs, {0[throughput]} '
+                          'MB/s, peak {0[peak]} bytes per request')
+
+    @classmethod
+    def setUpClass(cls):
+        cls.path = tempfile.mkdtemp()
+        cls.create_files(cls.path, os.urandom(2**20))
+        cls._loop = new_event_loop()
+        cls.server = media_server(cls.path, cls._loop)
+        serving = Event()
+        cls.server.start_serving().add_done_callback(lambda f: serving.set())
+        cls._thread = Thread(target=cls._loop.run_forever)
+        cls._thread.start()
+        serving.wait()
+        cls.sock = socket.create_connection(cls.server.address)
+        cls.buffer = memoryview(bytearray(2**20))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sock.close()
+        cls._loop.call_soon_threadsafe(cls._loop.stop)
+        cls._thread.join()
+        cls._loop.close()
+        shutil.rmtree(cls.path)
+
+    def get(self, path):
+        '''Request ``path`` and read the response, return the body size.'''
+        sock = self.sock
+        sock.sendall(('GET %s HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n' %
+                      path).encode('latin-1'))
+        head = b''
+        while b'\r\n\r\n' not in head:
+            head += sock.recv(4096)
+        head, body = head.split(b'\r\n\r\n', 1)
+        assert head.startswith(b'HTTP/1.1 200'), head
+        length = int(head.split(b'Content-Length: ')[1].split(b'\r\n')[0])
+        received = len(body)
+        while received < length:
+            received += sock.recv_into(self.buffer)
+        return length
+
+    def request(self, path):
+        tracemalloc.start()
+        try:
+            self._size = self.get(path)
+            self._peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def getInfo(self, info, delta, dt):
+        info['bytes'] = info.get('bytes', 0) + self._size
+        info['peak'] = info.get('peak', 0) + self._peak
+
+    def getSummary(self, info, repeat, total_time, total_time2):
+        info['throughput'] = '%.1f' % (info.pop('bytes')/total_time/2**20)
+        info['peak'] = int(info['peak']/repeat/self.__number__)
+        return info
+
+
+class TestLargeFile(FileServerMixin, unittest.TestCase):
+    __number__ = 1
+
+    @classmethod
+    def create_files(cls, path, block):
+        with open(os.path.join(path, 'large.bin'), 'wb') as f:
+            for _ in range(LARGE_SIZE//len(block)):
+                f.write(block)
+
+    def test_large_file(self):
+        self.request('/large.bin')
+
+
+class TestSmallFiles(FileServerMixin, unittest.TestCase):
+    '''Requests cycle over :data:`SMALL_FILES` files, more than the
+    default size of the :class:`.FileCache`.'''
+    __number__ = 1000
+    small = 0
+
+    @classmethod
+    def create_files(cls, path, block):
+        for n in range(SMALL_FILES):
+            with open(os.path.join(path, '%d.txt' % n), 'wb') as f:
+                f.write(block[:SMALL_SIZE])
+
+    def test_small_files(self):
+        cls = self.__class__
+        cls.small = (cls.small + 1) % SMALL_FILES
+        self.request('/%d.txt' % cls.small)
@@ -0,0 +1,128 @@
+'''Benchmark matrix of event loop implementations.
+
+The servers run in-process on an event loop created by the
+``loop_factory`` of the test class, in a separate thread. Each test
+performs a round trip from a blocking client over a keep-alive
+connection, so that loop implementations can be compared on the same
+workloads: the WSGI hello world, pulsar-ds ``SET`` and ``GET`` and the
+websocket echo.
+'''
+import socket
+import unittest
+from functools import partial
+from threading import Thread
+
+from pulsar import asyncio, coroutine, TcpServer
+from pulsar.apps.wsgi import WSGIServer
+from pulsar.apps.ds.server import PulsarDS, TcpServer as DsServer
+from pulsar.apps.ds.client import PulsarStoreClient
+from pulsar.utils.websocket import frame_parser
+
+from examples.helloworld.manage import hello
+from examples.websocket.manage import Site
+
+try:
+    import uvloop
+except ImportError:     # pragma    nocover
+    uvloop = None
+
+
+HELLO = (b'GET / HTTP/1.1\r\n'
+         b'Host: 127.0.0.1\r\n'
+         b'Accept: */*\r\n\r\n')
+HANDSHAKE = (b'GET /echo HTTP/1.1\r\n'
+             b'Host: 127.0.0.1\r\n'
+             b'Upgrade: websocket\r\n'
+             b'Connection: Upgrade\r\n'
+             b'Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n'
+             b'Sec-WebSocket-Version: 13\r\n\r\n')
+SET_GET = (b'*3\r\n$3\r\nSET\r\n$3\r\nfoo\r\n$3\r\nbar\r\n'
+           b'*2\r\n$3\r\nGET\r\n$3\r\nfoo\r\n')
+SET_GET_REPLY = b'+OK\r\n$3\r\nbar\r\n'
+
+
+@coroutine
+def start_serving(servers):
+    for server in servers:
+        yield from server.start_serving()
+
+
+def recv_exactly(sock, size, data=b''):
+    while len(data) < size:
+        chunk = sock.recv(65536)
+        if not chunk:
+            raise ConnectionResetError('Connection lost')
+        data += chunk
+    return data
+
+
+def recv_response(sock):
+    '''Receive an HTTP response and return its body.'''
+    data = b''
+    while b'\r\n\r\n' not in data:
+        data = recv_exactly(sock, len(data) + 1, data)
+    headers, body = data.split(b'\r\n\r\n', 1)
+    length = 0
+    for header in headers.split(b'\r\n')[1:]:
+        name, value = header.split(b':', 1)
+        if name.lower() == b'content-length':
+            length = int(value)
+    return recv_exactly(sock, length, body)
+
+
+class TestAsyncioLoop(unittest.TestCase):
+    __benchmark__ = True
+    __number__ = 1000
+    loop_factory = staticmethod(asyncio.SelectorEventLoop)
+
+    @classmethod
+    def setUpClass(cls):
+        cls._loop = loop = cls.loop_factory()
+        wsgi = WSGIServer(hello, parse_console=False)
+        ws = WSGIServer(Site(), parse_console=False)
+        cfg = PulsarDS.cfg.copy()
+        cls.servers = [
+            TcpServer(wsgi.protocol_factory(), loop,
+                      address=('127.0.0.1', 0), keep_alive=15),
+            DsServer(cfg, partial(PulsarStoreClient, cfg), loop,
+                     address=('127.0.0.1', 0)),
+            TcpServer(ws.protocol_factory(), loop,
+                      address=('127.0.0.1', 0), keep_alive=15)]
+        cls._thread = Thread(target=loop.run_forever)
+        cls._thread.start()
+        asyncio.run_coroutine_threadsafe(start_serving(cls.servers),
+                                         loop).result()
+        cls.wsgi, cls.ds, cls.ws = [socket.create_connection(s.address)
+                                    for s in cls.servers]
+        cls.ws.sendall(HANDSHAKE)
+        recv_response(cls.ws)
+        cls.message = frame_parser(kind=1).encode('hello', opcode=1)
+        cls.echo = frame_parser().encode('hello', opcode=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        for sock in (cls.wsgi, cls.ds, cls.ws):
+            sock.close()
+        loop = cls._loop
+        for server in cls.servers:
+            loop.call_soon_threadsafe(server.close)
+        loop.call_soon_threadsafe(loop.stop)
+        cls._thread.join()
+        loop.close()
+
+    def test_wsgi_hello_world(self):
+        self.wsgi.sendall(HELLO)
+        assert recv_response(self.wsgi) == b'Hello World!\n'
+
+    def test_ds_set_get(self):
+        self.ds.sendall(SET_GET)
+        assert recv_exactly(self.ds, len(SET_GET_REPLY)) == SET_GET_REPLY
+
+    def test_websocket_echo(self):
+        self.ws.sendall(self.message)
+        assert recv_exactly(self.ws, len(self.echo)) == self.echo
+
+
+@unittest.skipUnless(uvloop, 'Requires uvloop')
+class TestUvloop(TestAsyncioLoop):
+    loop_factory = staticmethod(uvloop.new_event_loop if uvloop else None)
@@ -0,0 +1,114 @@
+'''Benchmarks for uploading a large file with a multipart/form-data body.
+
+The body is parsed as it is received by the :class:`.MultipartReader` or
+buffered by the :func:`.wait_for_body_middleware` before being parsed.
+The server runs on its own event loop in a separate thread, so that the
+peak memory traced by :mod:`tracemalloc` approximates the memory used by
+the server.
+'''
+import os
+import socket
+import unittest
+import tracemalloc
+from threading import Thread, Event
+
+from pulsar import new_event_loop, chain_future, isfuture, TcpServer
+from pulsar.apps import wsgi
+
+
+UPLOAD_SIZE = 2**26
+BOUNDARY = b'xYzZY'
+HEAD = (b'--' + BOUNDARY + b'\r\nContent-Disposition: form-data; '
+        b'name="upload"; filename="data.bin"\r\n\r\n')
+TAIL = b'\r\n--' + BOUNDARY + b'--\r\n'
+
+
+def upload(environ, start_response):
+    request = wsgi.WsgiRequest(environ)
+
+    def respond(result):
+        part = result[1]['upload']
+        part.file.close()
+        data = str(part.size).encode('utf-8')
+        start_response('200 OK', [('Content-Length', str(len(data)))])
+        return [data]
+
+    result = request.data_and_files()
+    if isfuture(result):
+        return chain_future(result, callback=respond)
+    return respond(result)
+
+
+class UploadMixin(object):
+    __benchmark__ = True
+    __number__ = 1
+    benchmark_template = ('{0[name]}: repeated {0[repeat]}(x{0[times]}) '
+                          'times, average {0[mean]} secs, {0[throughput]} '
+                          'MB/s, peak {0[peak]} bytes per request')
+    middleware = []
+
+    @classmethod
+    def setUpClass(cls):
+        cls._loop = new_event_loop()
+        handler = wsgi.WsgiHandler(cls.middleware + [upload], async=True)
+        app = wsgi.WSGIServer(handler, parse_console=False)
+        cls.server = TcpServer(app.protocol_factory(), cls._loop,
+                               address=('127.0.0.1', 0), keep_alive=15)
+        serving = Event()
+        cls.server.start_serving().add_done_callback(lambda f: serving.set())
+        cls._thread = Thread(target=cls._loop.run_forever)
+        cls._thread.start()
+        serving.wait()
+        cls.sock = socket.create_connection(cls.server.address)
+        cls.block = os.urandom(2**16)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sock.close()
+        cls._loop.call_soon_threadsafe(cls._loop.stop)
+        cls._thread.join()
+        cls._loop.close()
+
+    def post(self):
+        '''Upload :data:`UPLOAD_SIZE` bytes and wait for the response.'''
+        sock = self.sock
+        length = len(HEAD) + UPLOAD_SIZE + len(TAIL)
+        sock.sendall(b'POST / HTTP/1.1\r\nHost: 127.0.0.1\r\n'
+                     b'Content-Type: multipart/form-data; boundary=' +
+                     BOUNDARY + b'\r\nContent-Length: ' +
+                     str(length).encode('utf-8') + b'\r\n\r\n' + HEAD)
+        for _ in range(UPLOAD_SIZE//len(self.block)):
+            sock.sendall(self.block)
+        sock.sendall(TAIL)
+        size = str(UPLOAD_SIZE).encode('utf-8')
+        data = b''
+        while not data.endswith(b'\r\n\r\n' + size):
+            chunk = sock.recv(4096)
+            assert chunk, data
+            data += chunk
+        assert data.startswith(b'HTTP/1.1 200'), data
+
+    def test_upload(self):
+        tracemalloc.start()
+        try:
+            self.post()
+            self._peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def getInfo(self, info, delta, dt):
+        info['bytes'] = info.get('bytes', 0) + UPLOAD_SIZE
+        info['peak'] = info.get('peak', 0) + self._peak
+
+    def getSummary(self, info, repeat, total_time, total_time2):
+        info['throughput'] = '%.1f' % (info.pop('bytes')/total_time/2**20)
+        info['peak'] = int(info['peak']/repeat/self.__number__)
+        return info
+
+
+class TestStreamedUpload(UploadMixin, unittest.TestCase):
+    pass
+
+
+class TestBufferedUpload(UploadMixin, unittest.TestCase):
+    middleware = [wsgi.wait_for_body_middleware]
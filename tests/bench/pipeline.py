@@ -0,0 +1,96 @@
+'''Benchmarks for HTTP/1.1 pipelining.
+
+A client sends :data:`DEPTH` requests on a connection without waiting for
+the responses and then reads them. The server runs on its own event loop
+in a separate thread, with and without processing pipelined requests
+concurrently. Requests are handled synchronously or with a latency of
+:data:`LATENCY` seconds, as for an application waiting for a database.
+'''
+import socket
+import unittest
+from threading import Thread, Event
+
+from pulsar import asyncio, async, new_event_loop, TcpServer
+from pulsar.apps import wsgi
+
+
+DEPTH = 16
+LATENCY = 0.002
+BODY = b'pong'
+REQUEST = b'GET / HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n'
+
+
+def respond(start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain'),
+                              ('Content-Length', str(len(BODY)))])
+    return [BODY]
+
+
+def pong(environ, start_response):
+    return respond(start_response)
+
+
+def slow_pong(environ, start_response):
+    return async(_slow_pong(start_response))
+
+
+def _slow_pong(start_response):
+    yield from asyncio.sleep(LATENCY)
+    return respond(start_response)
+
+
+class PipelineMixin(object):
+    __benchmark__ = True
+    __number__ = 100
+    depth = DEPTH
+    wsgi_callable = staticmethod(pong)
+
+    @classmethod
+    def setUpClass(cls):
+        cls._loop = new_event_loop()
+        app = wsgi.WSGIServer(cls.wsgi_callable, parse_console=False,
+                              http_pipeline_depth=cls.depth)
+        cls.server = TcpServer(app.protocol_factory(), cls._loop,
+                               address=('127.0.0.1', 0), keep_alive=15)
+        serving = Event()
+        cls.server.start_serving().add_done_callback(lambda f: serving.set())
+        cls._thread = Thread(target=cls._loop.run_forever)
+        cls._thread.start()
+        serving.wait()
+        cls.sock = socket.create_connection(cls.server.address)
+        cls.requests = REQUEST*DEPTH
+        cls.end = b'\r\n\r\n' + BODY
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sock.close()
+        cls._loop.call_soon_threadsafe(cls._loop.stop)
+        cls._thread.join()
+        cls._loop.close()
+
+    def test_pipeline(self):
+        '''Send :data:`DEPTH` requests and read their responses.'''
+        sock = self.sock
+        sock.sendall(self.requests)
+        data = b''
+        while data.count(self.end) < DEPTH:
+            chunk = sock.recv(65536)
+            assert chunk, data
+            data += chunk
+
+
+class TestPipeline(PipelineMixin, unittest.TestCase):
+    pass
+
+
+class TestNoPipeline(PipelineMixin, unittest.TestCase):
+    depth = 1
+
+
+class TestPipelineLatency(PipelineMixin, unittest.TestCase):
+    __number__ = 20
+    wsgi_callable = staticmethod(slow_pong)
+
+
+class TestNoPipelineLatency(TestPipelineLatency):
+    depth = 1
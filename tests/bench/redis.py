@@ -1,9 +1,15 @@
 from random import choice
 import string
 import unittest
+import tracemalloc
+from functools import partial
 
-from pulsar import HAS_C_EXTENSIONS
+from pulsar import HAS_C_EXTENSIONS, new_event_loop
 from pulsar.apps.ds import redis_parser
+from pulsar.apps.ds.server import PulsarDS, TcpServer
+from pulsar.apps.ds.client import PulsarStoreClient
+
+from tests.bench import wsgi
 
 characters = string.ascii_letters + string.digits
 
@@ -46,3 +52,57 @@ class RedisPyParser(unittest.TestCase):
 @unittest.skipUnless(HAS_C_EXTENSIONS, 'Requires C extensions')
 class RedisCParser(RedisPyParser):
     redis_py_parser = False
+
+
+class TestPulsarDsServer(unittest.TestCase):
+    '''Benchmarks for the pulsar-ds server.
+
+    Commands are fed to a server connection on a transport which discards
+    replies, as in the WSGI server benchmarks.
+    '''
+    __benchmark__ = True
+    __number__ = 1000
+    request = (b'*3\r\n$3\r\nSET\r\n$3\r\nfoo\r\n$3\r\nbar\r\n'
+               b'*2\r\n$3\r\nGET\r\n$3\r\nfoo\r\n')
+    pipeline = request*100
+
+    @classmethod
+    def setUpClass(cls):
+        cls._loop = new_event_loop()
+        cfg = PulsarDS.cfg.copy()
+        cls.server = TcpServer(cfg, partial(PulsarStoreClient, cfg),
+                               cls._loop)
+        cls.connection = cls.server.create_protocol()
+        cls.connection.connection_made(wsgi.BenchTransport())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._loop.close()
+
+    def serve(self, data):
+        self.connection.data_received(data)
+
+    def test_set_get(self):
+        self.serve(self.request)
+
+    def test_pipeline(self):
+        self.serve(self.pipeline)
+
+
+class TestPulsarDsAllocations(TestPulsarDsServer):
+    '''Memory allocated by the pulsar-ds server to process a request,
+    measured with :mod:`tracemalloc`.'''
+    __number__ = 100
+    benchmark_template = wsgi.TestWsgiAllocations.benchmark_template
+    getInfo = wsgi.TestWsgiAllocations.getInfo
+    getSummary = wsgi.TestWsgiAllocations.getSummary
+
+    def serve(self, data):
+        tracemalloc.start()
+        try:
+            super().serve(data)
+            current, peak = tracemalloc.get_traced_memory()
+            blocks = len(tracemalloc.take_snapshot().traces)
+        finally:
+            tracemalloc.stop()
+        self._allocations = (peak, current, blocks)
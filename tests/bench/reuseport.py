@@ -0,0 +1,98 @@
+'''Load generation benchmark for the accept path of multi-process servers.
+
+A WSGI server with two process workers answers with the process id of the
+worker serving the request. Each test call opens a batch of concurrent
+connections and the summary reports the p99 latency and how requests
+were distributed across workers, with and without ``reuse_port``.
+'''
+import os
+import socket
+import unittest
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from pulsar import send, platform
+from pulsar.apps import wsgi
+from pulsar.apps.test.plugins.bench import default_timer
+
+
+def worker_pid(environ, start_response):
+    data = str(os.getpid()).encode('utf-8')
+    start_response('200 OK', [('Content-Type', 'text/plain'),
+                              ('Content-Length', str(len(data)))])
+    return [data]
+
+
+def request(address):
+    '''Send a request on a new connection and return the worker pid.'''
+    sock = socket.create_connection(address)
+    try:
+        sock.sendall(b'GET / HTTP/1.1\r\n'
+                     b'Host: localhost\r\n'
+                     b'Connection: close\r\n\r\n')
+        chunks = []
+        while True:
+            data = sock.recv(4096)
+            if not data:
+                break
+            chunks.append(data)
+    finally:
+        sock.close()
+    return int(b''.join(chunks).split(b'\r\n\r\n', 1)[1])
+
+
+@unittest.skipUnless(platform.has_multiProcessSocket,
+                     'Requires multiprocess sockets')
+class TestAcceptShared(unittest.TestCase):
+    __benchmark__ = True
+    __number__ = 100
+    app_cfg = None
+    reuse_port = False
+    workers = 2
+    concurrency = 8
+    benchmark_template = ('{0[name]}: repeated {0[repeat]}(x{0[times]}) '
+                          'times, average {0[mean]} secs, p99 {0[p99]} ms, '
+                          'requests per worker {0[distribution]}')
+
+    @classmethod
+    def setUpClass(cls):
+        name = cls.__name__.lower()
+        s = wsgi.WSGIServer(worker_pid, name=name, bind='127.0.0.1:0',
+                            workers=cls.workers, concurrency='process',
+                            reuse_port=cls.reuse_port)
+        cls.app_cfg = yield from send('arbiter', 'run', s)
+        cls.address = cls.app_cfg.addresses[0]
+        cls.executor = ThreadPoolExecutor(cls.concurrency)
+        cls.latencies = []
+        cls.pids = Counter()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+        if cls.app_cfg is not None:
+            return send('arbiter', 'kill_actor', cls.app_cfg.name)
+
+    def _timed_request(self):
+        start = default_timer()
+        pid = request(self.address)
+        return pid, default_timer() - start
+
+    def test_connections(self):
+        futures = [self.executor.submit(self._timed_request)
+                   for _ in range(self.concurrency)]
+        for future in futures:
+            pid, latency = future.result()
+            self.pids[pid] += 1
+            self.latencies.append(latency)
+
+    def getSummary(self, info, repeat, total_time, total_time2):
+        latencies = sorted(self.latencies)
+        index = min(int(0.99*len(latencies)), len(latencies) - 1)
+        info['p99'] = '%.3f' % (1000*latencies[index])
+        info['distribution'] = sorted(self.pids.values(), reverse=True)
+        return info
+
+
+@unittest.skipUnless(hasattr(socket, 'SO_REUSEPORT'), 'Requires SO_REUSEPORT')
+class TestAcceptReusePort(TestAcceptShared):
+    reuse_port = True
@@ -0,0 +1,51 @@
+'''Benchmarks for resolving paths with a :class:`.Router` of 500 routes.
+
+The root router has 100 children with five routes each, static, with
+integer and string variables and a path converter.
+'''
+import unittest
+
+from pulsar.apps.wsgi import Router
+
+
+RESOURCES = 100
+
+
+def get(request):
+    return request.response
+
+
+def api():
+    routes = []
+    for n in range(RESOURCES):
+        resource = Router('resource%d/' % n, get=get)
+        for rule in ('<int:id>', '<int:id>/edit', 'search/<query>',
+                     'files/<path:path>'):
+            resource.add_child(Router(rule, get=get))
+        routes.append(resource)
+    return Router('/', *routes)
+
+
+class TestRouter(unittest.TestCase):
+    __benchmark__ = True
+    __number__ = 10000
+
+    @classmethod
+    def setUpClass(cls):
+        cls.router = api()
+        last = RESOURCES - 1
+        cls.first = 'resource0/5/edit'
+        cls.last = 'resource%d/5/edit' % last
+        cls.path = 'resource%d/files/a/b/c' % last
+
+    def test_first_route(self):
+        assert self.router.resolve(self.first)
+
+    def test_last_route(self):
+        assert self.router.resolve(self.last)
+
+    def test_path_converter(self):
+        assert self.router.resolve(self.path)
+
+    def test_not_found(self):
+        assert self.router.resolve('foo/bla') is None
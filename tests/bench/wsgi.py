@@ -0,0 +1,193 @@
+'''Benchmarks for the hello world WSGI server.
+
+Server connections are driven in-process by a transport which discards
+the response, so that only the server side is measured. The server runs
+on its own event loop in a separate thread.
+'''
+import unittest
+import tracemalloc
+from threading import Thread, Event
+
+from pulsar import asyncio, new_event_loop, TcpServer, LoopMonitor
+from pulsar.apps.wsgi import WSGIServer
+
+from examples.helloworld.manage import hello
+
+
+REQUEST = (b'GET / HTTP/1.1\r\n'
+           b'Host: 127.0.0.1:8060\r\n'
+           b'Accept: */*\r\n\r\n')
+LARGE_BODY = b'x'*2**20
+HUGE_BODY = b'x'*100*2**20
+
+
+def large_body(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain'),
+                              ('Content-Length', str(len(LARGE_BODY)))])
+    return [LARGE_BODY]
+
+
+def large_chunked_body(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    yield LARGE_BODY
+
+
+def huge_chunked_body(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    yield HUGE_BODY
+
+
+class BenchTransport(asyncio.Transport):
+    '''A server transport which counts and discards written data.'''
+    _closing = False
+
+    def __init__(self):
+        super().__init__({'peername': ('127.0.0.1', 51000),
+                          'sockname': ('127.0.0.1', 8060)})
+        self.written = 0
+
+    def write(self, data):
+        self.written += len(data)
+
+    def writelines(self, buffers):
+        for data in buffers:
+            self.written += len(data)
+
+    def close(self):
+        self._closing = True
+
+    def is_closing(self):
+        return self._closing
+
+    def set_write_buffer_limits(self, high=None, low=None):
+        pass
+
+    def pause_reading(self):
+        pass
+
+    def resume_reading(self):
+        pass
+
+
+class TestWsgiHelloWorld(unittest.TestCase):
+    __benchmark__ = True
+    __number__ = 1000
+    wsgi_callable = staticmethod(hello)
+    request = REQUEST
+
+    @classmethod
+    def setUpClass(cls):
+        cls._loop = new_event_loop()
+        app = WSGIServer(cls.wsgi_callable, parse_console=False)
+        cls.server = TcpServer(app.protocol_factory(), cls._loop,
+                               keep_alive=15)
+        cls._thread = Thread(target=cls._loop.run_forever)
+        cls._thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._loop.call_soon_threadsafe(cls._loop.stop)
+        cls._thread.join()
+        cls._loop.close()
+
+    def serve(self, connection=None):
+        '''Serve one :attr:`request` and return the connection.'''
+        done = Event()
+        result = []
+        self._loop.call_soon_threadsafe(self._serve, connection, done, result)
+        done.wait()
+        return result[0]
+
+    def _serve(self, connection, done, result):
+        if connection is None:
+            connection = self.server.create_protocol()
+            connection.connection_made(BenchTransport())
+        result.append(connection)
+        connection.data_received(self.request)
+        consumer = connection._current_consumer
+        if consumer is not None and not consumer.on_finished.done():
+            consumer.on_finished.add_done_callback(lambda f: done.set())
+        else:
+            done.set()
+
+    def test_new_connection(self):
+        self.serve()
+
+    def test_keep_alive(self):
+        self._keep_alive = self.serve(getattr(self, '_keep_alive', None))
+
+
+class TestWsgiLoopMonitor(TestWsgiHelloWorld):
+    '''The hello world benchmark with the :class:`.LoopMonitor` probing
+    the server event loop with the default settings.'''
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.monitor = LoopMonitor(cls._loop, 0.1, 0.5)
+        cls._loop.call_soon_threadsafe(cls.monitor.start)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._loop.call_soon_threadsafe(cls.monitor.stop)
+        super().tearDownClass()
+
+
+class TestWsgiAllocations(TestWsgiHelloWorld):
+    '''Memory allocated by the server to process a request, measured
+    with :mod:`tracemalloc`.'''
+    benchmark_template = ('{0[name]}: repeated {0[repeat]}(x{0[times]}) '
+                          'times, peak {0[peak]} bytes, retained '
+                          '{0[retained]} bytes in {0[blocks]} blocks '
+                          'per request')
+
+    def serve(self, connection=None):
+        tracemalloc.start()
+        try:
+            connection = super().serve(connection)
+            current, peak = tracemalloc.get_traced_memory()
+            blocks = len(tracemalloc.take_snapshot().traces)
+        finally:
+            tracemalloc.stop()
+        self._allocations = (peak, current, blocks)
+        return connection
+
+    def getInfo(self, info, delta, dt):
+        peak, current, blocks = self._allocations
+        info['peak'] = info.get('peak', 0) + peak
+        info['retained'] = info.get('retained', 0) + current
+        info['blocks'] = info.get('blocks', 0) + blocks
+
+    def getSummary(self, info, repeat, total_time, total_time2):
+        n = repeat*self.__number__
+        for key in ('peak', 'retained', 'blocks'):
+            info[key] = int(info.get(key, 0)/n)
+        return info
+
+
+class TestWsgiLargeBody(TestWsgiAllocations):
+    '''Memory allocated to serve a 1MB body, the peak approximates the
+    bytes copied per response.'''
+    __number__ = 100
+    wsgi_callable = staticmethod(large_body)
+
+
+class TestWsgiLargeChunkedBody(TestWsgiLargeBody):
+    '''Memory allocated to serve a 1MB body with chunked encoding.'''
+    wsgi_callable = staticmethod(large_chunked_body)
+
+
+class TestWsgiHugeChunkedBody(TestWsgiHelloWorld):
+    '''Throughput of serving a 100MB body with chunked encoding.'''
+    __number__ = 5
+    wsgi_callable = staticmethod(huge_chunked_body)
+    benchmark_template = ('{0[name]}: repeated {0[repeat]}(x{0[times]}) '
+                          'times, average {0[mean]} secs, {0[throughput]} '
+                          'MB/s')
+
+    def getInfo(self, info, delta, dt):
+        info['bytes'] = info.get('bytes', 0) + len(HUGE_BODY)
+
+    def getSummary(self, info, repeat, total_time, total_time2):
+        info['throughput'] = '%.1f' % (info.pop('bytes')/total_time/2**20)
+        return info
@@ -158,6 +158,74 @@ class TestPythonHttpParser(unittest.TestCase):
         data = b'HTTP/1.1 200 Connection established\r\n\r\n'
         self.assertEqual(p.execute(data, len(data)), len(data))
 
+    def test_headers_and_body(self):
+        p = self.parser()
+        data = (b'POST /test HTTP/1.1\r\nContent-Length: 4\r\n'
+                b'Accept: */*\r\n\r\nciao')
+        self.assertEqual(p.execute(data, len(data)), len(data))
+        self.assertTrue(p.is_message_complete())
+        self.assertEqual(p.get_headers().get('Accept'), ['*/*'])
+        self.assertEqual(p.recv_body(), b'ciao')
+
+    def test_partial_headers(self):
+        p = self.parser()
+        data = b'GET /test HTTP/1.1\r\nAccept: */*\r\nHost: x'
+        self.assertEqual(p.execute(data, len(data)), len(data))
+        self.assertFalse(p.is_headers_complete())
+        data = memoryview(b'\r\n\r\n')
+        self.assertEqual(p.execute(data, len(data)), len(data))
+        self.assertTrue(p.is_message_complete())
+        self.assertEqual(p.get_headers().get('Host'), ['x'])
+
+    def test_pipelined_requests(self):
+        following = b'GET /next HTTP/1.1\r\nHost: x\r\n\r\n'
+        for message, body in (
+                (b'GET /test HTTP/1.1\r\nHost: x\r\n\r\n', b''),
+                (b'POST /test HTTP/1.1\r\nContent-Length: 4\r\n\r\nciao',
+                 b'ciao'),
+                (b'POST /test HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n'
+                 b'4\r\nciao\r\n0\r\n\r\n', b'ciao'),
+                (b'POST /test HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n'
+                 b'4\r\nciao\r\n0\r\nX-Trailer: 1\r\n\r\n', b'ciao')):
+            p = self.parser()
+            data = message + following
+            self.assertEqual(p.execute(data, len(data)), len(message))
+            self.assertTrue(p.is_message_complete())
+            self.assertEqual(p.recv_body(), body)
+            self.assertEqual(p.execute(following, len(following)), 0)
+
+    def test_switching_protocols(self):
+        p = self.parser()
+        data = (b'HTTP/1.1 101 Switching Protocols\r\n'
+                b'Upgrade: websocket\r\n\r\n\x81\x05hello')
+        self.assertEqual(p.execute(data, len(data)), len(data))
+        self.assertTrue(p.is_message_complete())
+        self.assertEqual(p.recv_body(), b'\x81\x05hello')
+
+    def test_last_chunk(self):
+        p = self.parser()
+        data = (b'POST /test HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n'
+                b'4\r\nciao\r\n0\r\n')
+        self.assertEqual(p.execute(data, len(data)), len(data))
+        self.assertFalse(p.is_message_complete())
+        self.assertEqual(p.execute(b'\r\n', 2), 2)
+        self.assertTrue(p.is_message_complete())
+        self.assertEqual(p.recv_body(), b'ciao')
+
+    def test_trailers(self):
+        p = self.parser()
+        if not isinstance(p, httpurl.HttpParser):
+            self.skipTest('trailers are kept by the python parser only')
+        data = (b'POST /test HTTP/1.1\r\nTransfer-Encoding: chunked\r\n'
+                b'Trailer: X-Checksum, X-Count\r\n\r\n4\r\nciao\r\n0\r\n'
+                b'X-Checksum: abc\r\nX-Count: 1\r\n\r\n')
+        self.assertEqual(p.execute(data, len(data)), len(data))
+        self.assertTrue(p.is_message_complete())
+        self.assertEqual(p.recv_body(), b'ciao')
+        self.assertEqual(p._trailers, {'X-Checksum': ['abc'],
+                                       'X-Count': ['1']})
+        self.assertFalse('X-Checksum' in p.get_headers())
+
 
 @unittest.skipUnless(hasextensions, 'Requires C extensions')
 class TestCHttpParser(TestPythonHttpParser):
@@ -88,6 +88,18 @@ class TestParser(unittest.TestCase):
         self.assertEqual(p.get(), b'QUEUED')
         self.assertEqual(p.get(), [None, 1, 39])
 
+    def test_pipeline(self):
+        p = self.parser()
+        values = [str(i).encode('utf-8')*i for i in range(1, 50)]
+        data = b''.join(p.multi_bulk([b'SET', v, v]) for v in values)
+        p.feed(data[:-1])
+        for value in values[:-1]:
+            self.assertEqual(p.get(), [b'SET', value, value])
+        self.assertEqual(p.get(), False)
+        p.feed(memoryview(data)[-1:])
+        self.assertEqual(p.get(), [b'SET', values[-1], values[-1]])
+        self.assertEqual(p.buffer(), b'')
+
     def test_nested(self):
         p = self.parser()
         result = lua_nested_table(2)
@@ -355,6 +355,14 @@ class RedisCommands(StoreMixin):
         yield from eq(c.get(key), b'foo')
         yield from eq(c.get('xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx'), None)
 
+    def test_get_large(self):
+        key = self.randomkey()
+        eq = self.async.assertEqual
+        c = self.client
+        value = random_string(min_len=100000, max_len=100000).encode('utf-8')
+        yield from c.set(key, value)
+        yield from eq(c.get(key), value)
+
     def test_incr(self):
         key = self.randomkey()
         c = self.client
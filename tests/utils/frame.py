@@ -168,6 +168,32 @@ class FrameTest(unittest.TestCase):
         msg = b''.join((f.body for f in frames))
         self.assertEqual(msg, self.large_bdata)
 
+    def test_encode_buffers(self):
+        s = self.parser()
+        c = self.parser(kind=1)
+        header, payload = s.encode_buffers(self.large_bdata, opcode=2)
+        self.assertTrue(payload is self.large_bdata)
+        self.assertEqual(header + payload,
+                         s.encode(self.large_bdata, opcode=2))
+        frame = c.decode(header + payload)
+        self.assertEqual(frame.body, self.large_bdata)
+        # masked payloads
+        header, payload = c.encode_buffers('hello', masking_key=b'abcd')
+        self.assertEqual(len(header), 6)
+        self.assertEqual(s.decode(header + payload).body, 'hello')
+
+    def test_decode_many(self):
+        s = self.parser()
+        c = self.parser(kind=1)
+        data = b''.join(s.encode('message %d' % i) for i in range(20))
+        frames = [c.decode(memoryview(data))]
+        frame = c.decode()
+        while frame:
+            frames.append(frame)
+            frame = c.decode()
+        self.assertEqual([f.body for f in frames],
+                         ['message %d' % i for i in range(20)])
+
     def test_bad_mask(self):
         s = self.parser()
         chunk = s.encode('hello')
@@ -109,3 +109,24 @@ class TestHeaders(unittest.TestCase):
         self.assertTrue(
             h in ('Set-Cookie: bla=foo\r\nSet-Cookie: pippo=pluto\r\n\r\n',
                   'Set-Cookie: pippo=pluto\r\nSet-Cookie: bla=foo\r\n\r\n'))
+
+    def test_flat(self):
+        h = Headers([('Content-Type', 'text/plain'),
+                     ('X-Custom', 'a'),
+                     ('Server', 'pulsar'),
+                     ('Connection', 'close'),
+                     ('Set-Cookie', 'a=1'),
+                     ('Set-Cookie', 'b=2')])
+        self.assertEqual(h.flat((1, 1), '200 OK'),
+                         b'HTTP/1.1 200 OK\r\n'
+                         b'Connection: close\r\n'
+                         b'Server: pulsar\r\n'
+                         b'Set-Cookie: a=1\r\n'
+                         b'Set-Cookie: b=2\r\n'
+                         b'Content-Type: text/plain\r\n'
+                         b'X-Custom: a\r\n\r\n')
+        self.assertEqual(h.flat((1, 0), '404 Not Found'),
+                         b'HTTP/1.0 404 Not Found\r\n' +
+                         str(h).encode('latin1'))
+        self.assertEqual(Headers().flat((1, 1), '200 OK'),
+                         b'HTTP/1.1 200 OK\r\n\r\n')
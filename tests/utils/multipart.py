@@ -0,0 +1,121 @@
+'''Tests the incremental multipart/form-data parser.'''
+import io
+import unittest
+from unittest import mock
+
+from pulsar.utils.multipart import (MultipartStreamParser, MultipartParser,
+                                    MultipartPart, MultipartError,
+                                    MultipartLimitError)
+
+
+BOUNDARY = 'xYzZY'
+FILE = bytes(range(256))*256 + b'\r\n--xYzZ\r\n--' + bytes(range(256))
+
+
+def body(*parts, boundary=BOUNDARY):
+    data = []
+    for name, value, filename in parts:
+        disposition = 'form-data; name="%s"' % name
+        if filename:
+            disposition += '; filename="%s"' % filename
+        data.append(('--%s\r\nContent-Disposition: %s\r\n\r\n' %
+                     (boundary, disposition)).encode('latin1'))
+        data.append(value + b'\r\n')
+    data.append(('--%s--\r\n' % boundary).encode('latin1'))
+    return b''.join(data)
+
+
+BODY = body(('a', b'hello', None), ('b', b'', None),
+            ('upload', FILE, 'data.bin'))
+
+
+class TestMultipartStreamParser(unittest.TestCase):
+
+    def parse(self, data, chunk_size=None, **limits):
+        parser = MultipartStreamParser(BOUNDARY, **limits)
+        chunk_size = chunk_size or len(data)
+        parts = []
+        for i in range(0, len(data), chunk_size):
+            parts.extend(parser.feed(data[i:i+chunk_size]))
+        parser.close()
+        return parts
+
+    def check(self, parts):
+        self.assertEqual([p.name for p in parts], ['a', 'b', 'upload'])
+        self.assertEqual(parts[0].string(), 'hello')
+        self.assertEqual(parts[1].string(), '')
+        self.assertEqual(parts[2].filename, 'data.bin')
+        self.assertEqual(parts[2].file.read(), FILE)
+
+    def test_chunk_sizes(self):
+        for chunk_size in (None, 1, 2, 7, 13, 100, 4096):
+            self.check(self.parse(BODY, chunk_size))
+
+    def test_part_keeps_data(self):
+        # the buffer of the parser is resized while a part holds the data
+        # it was given
+        kept = []
+        write = MultipartPart.write
+
+        def keep(part, data):
+            kept.append(data)
+            write(part, data)
+
+        with mock.patch.object(MultipartPart, 'write', keep):
+            self.check(self.parse(BODY, 7, memfile_limit=1024))
+        self.assertTrue(kept)
+
+    def test_preamble(self):
+        self.check(self.parse(b'preamble\r\n' + BODY, 5))
+
+    def test_spool(self):
+        parts = self.parse(BODY, 1000, memfile_limit=1024)
+        self.assertTrue(parts[0].is_buffered())
+        self.assertFalse(parts[2].is_buffered())
+        self.assertEqual(parts[2].size, len(FILE))
+        self.check(parts)
+
+    def test_parts_on_feed(self):
+        parser = MultipartStreamParser(BOUNDARY)
+        idx = BODY.index(b'--' + BOUNDARY.encode(), 10) + len(BOUNDARY) + 2
+        parts = parser.feed(BODY[:idx])
+        self.assertEqual([p.name for p in parts], ['a'])
+        self.assertFalse(parser.done)
+        parts = parser.feed(BODY[idx:])
+        self.assertEqual([p.name for p in parts], ['b', 'upload'])
+        self.assertTrue(parser.done)
+
+    def test_max_parts(self):
+        self.assertRaises(MultipartLimitError, self.parse, BODY, max_parts=2)
+
+    def test_max_header_size(self):
+        data = body(('a' * 200, b'hello', None))
+        self.assertRaises(MultipartLimitError, self.parse, data, 10,
+                          max_header_size=100)
+        self.assertEqual(len(self.parse(data, 10, max_header_size=300)), 1)
+
+    def test_disk_limit(self):
+        self.assertRaises(MultipartLimitError, self.parse, BODY, 1000,
+                          disk_limit=len(FILE))
+
+    def test_mem_limit(self):
+        self.assertRaises(MultipartLimitError, self.parse, BODY, 1000,
+                          mem_limit=1024, memfile_limit=2**20)
+        # spooled parts do not count
+        self.check(self.parse(BODY, 1000, mem_limit=1024,
+                              memfile_limit=1024))
+
+    def test_unterminated(self):
+        self.assertRaises(MultipartError, self.parse, BODY[:-20])
+
+    def test_invalid_boundary_line(self):
+        data = BODY.replace(b'--xYzZY\r\n', b'--xYzZYjunk\r\n', 1)
+        self.assertRaises(MultipartError, self.parse, data)
+
+    def test_no_boundary(self):
+        self.assertRaises(MultipartError, MultipartStreamParser, '')
+
+    def test_parser(self):
+        parts = list(MultipartParser(io.BytesIO(BODY), BOUNDARY,
+                                     buffer_size=1000))
+        self.check(parts)
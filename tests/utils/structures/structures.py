@@ -3,7 +3,7 @@ import unittest
 import pickle
 
 from pulsar.utils.structures import (MultiValueDict, merge_prefix, deque,
-                                     AttributeDictionary)
+                                     AttributeDictionary, LRUCache)
 
 
 class TestMultiValueDict(unittest.TestCase):
@@ -127,6 +127,39 @@ class TestAttributeDictionary(unittest.TestCase):
         self.assertEqual(a, c)
 
 
+class TestLRUCache(unittest.TestCase):
+
+    def test_maxsize(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertFalse('b' in cache)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('c'), 3)
+        info = cache.info()
+        self.assertEqual(info['hits'], 2)
+        self.assertEqual(info['misses'], 1)
+
+    def test_maxweight(self):
+        cache = LRUCache(10, 10)
+        cache.set('a', b'x'*4, 4)
+        cache.set('b', b'x'*4, 4)
+        cache.set('c', b'x'*4, 4)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.weight, 8)
+        self.assertFalse('a' in cache)
+        cache.set('d', b'x'*11, 11)
+        self.assertFalse('d' in cache)
+        self.assertEqual(cache.pop('b'), b'x'*4)
+        self.assertEqual(cache.weight, 4)
+        cache.clear()
+        self.assertEqual(cache.weight, 0)
+        self.assertEqual(len(cache), 0)
+
+
 class TestFunctions(unittest.TestCase):
 
     def test_merge_prefix(self):
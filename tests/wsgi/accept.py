@@ -38,3 +38,25 @@ class AcceptTests(unittest.TestCase):
         self.assertEqual(content_types.best_match(('application/json',
                                                    'text/html')),
                          'text/html')
+
+    def test_encodings(self):
+        environ = {'HTTP_ACCEPT_ENCODING': 'gzip;q=0.5, br, *;q=0'}
+        encodings = WsgiRequest(environ).encodings
+        self.assertEqual(encodings.quality('br'), 1)
+        self.assertEqual(encodings.quality('GZIP'), 0.5)
+        self.assertEqual(encodings.quality('identity'), 0)
+        self.assertEqual(encodings.best_match(('gzip', 'identity')), 'gzip')
+        self.assertEqual(encodings.best_match(('deflate', 'identity')),
+                         None)
+
+    def test_encodings_identity(self):
+        encodings = WsgiRequest({}).encodings
+        self.assertEqual(encodings.best_match(('gzip', 'identity')),
+                         'identity')
+        environ = {'HTTP_ACCEPT_ENCODING': 'gzip;q=0, deflate'}
+        encodings = WsgiRequest(environ).encodings
+        self.assertEqual(encodings.best_match(('gzip', 'identity')),
+                         'identity')
+        environ = {'HTTP_ACCEPT_ENCODING': 'gzip, deflate'}
+        encodings = WsgiRequest(environ).encodings
+        self.assertEqual(encodings.best_match(('gzip', 'identity')), 'gzip')
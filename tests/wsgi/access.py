@@ -0,0 +1,158 @@
+'''Tests the access log of the WSGI server.'''
+import json
+import socket
+import logging
+import unittest
+
+from pulsar import get_event_loop, TcpServer, ImproperlyConfigured
+from pulsar.apps import wsgi
+
+
+class Handler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def environ(**params):
+    environ = {'REMOTE_ADDR': '127.0.0.1',
+               'REQUEST_METHOD': 'GET',
+               'RAW_URI': '/path?page=1',
+               'SERVER_PROTOCOL': 'HTTP/1.1',
+               'HTTP_USER_AGENT': 'pulsar'}
+    environ.update(params)
+    return environ
+
+
+def hello(environ, start_response):
+    start_response('200 OK', [('Content-Length', '12')])
+    return [b'Hello World!']
+
+
+class TestAccessLog(unittest.TestCase):
+
+    def access_log(self, format='common', **kw):
+        logger = logging.getLogger('pulsar.test.access.%s' % format)
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        handler = Handler()
+        logger.handlers = [handler]
+        return wsgi.AccessLog(format, logger, **kw), handler
+
+    def test_common(self):
+        access_log, handler = self.access_log()
+        access_log.record(environ(), '200 OK', 12, 1444485336.5)
+        access_log.record(environ(REMOTE_USER='luca'), '404 Not Found', 0,
+                          1444485336.7)
+        self.assertEqual(access_log.flush(), 2)
+        self.assertEqual(len(handler.messages), 1)
+        lines = handler.messages[0].split('\n')
+        self.assertEqual(len(lines), 2)
+        line, duration = lines[0].rsplit(' ', 1)
+        self.assertEqual(line, '127.0.0.1 - - [10/Oct/2015:13:55:36 +0000] '
+                               '"GET /path?page=1 HTTP/1.1" 200 12')
+        self.assertTrue(float(duration) > 0)
+        self.assertTrue(lines[1].startswith('127.0.0.1 - luca [10/Oct/2015'))
+        self.assertTrue(' 404 - ' in lines[1])
+        self.assertEqual(access_log.flush(), 0)
+        self.assertEqual(access_log.logged, 2)
+
+    def test_combined(self):
+        access_log, handler = self.access_log('combined')
+        access_log.record(environ(HTTP_REFERER='http://a.com/'), '200 OK', 12,
+                          1444485336.5)
+        access_log.flush()
+        line = handler.messages[0].rsplit(' ', 1)[0]
+        self.assertEqual(line, '127.0.0.1 - - [10/Oct/2015:13:55:36 +0000] '
+                               '"GET /path?page=1 HTTP/1.1" 200 12 '
+                               '"http://a.com/" "pulsar"')
+
+    def test_json(self):
+        access_log, handler = self.access_log('json')
+        access_log.record(environ(), '201 Created', 12, 1444485336.5)
+        access_log.flush()
+        data = json.loads(handler.messages[0])
+        self.assertEqual(data['time'], '2015-10-10T13:55:36.500000Z')
+        self.assertEqual(data['remote_addr'], '127.0.0.1')
+        self.assertEqual(data['method'], 'GET')
+        self.assertEqual(data['uri'], '/path?page=1')
+        self.assertEqual(data['status'], 201)
+        self.assertEqual(data['bytes'], 12)
+        self.assertEqual(data['user_agent'], 'pulsar')
+        self.assertEqual(data['referer'], None)
+        self.assertTrue(data['duration'] > 0)
+
+    def test_bad_format(self):
+        self.assertRaises(ImproperlyConfigured, wsgi.AccessLog, 'apache')
+
+    def test_dropped(self):
+        access_log, handler = self.access_log(maxsize=2)
+        for _ in range(5):
+            access_log.record(environ(), '200 OK', 12, 1444485336.5)
+        self.assertEqual(access_log.info(), {'format': 'common',
+                                             'buffered': 2,
+                                             'logged': 0,
+                                             'dropped': 3})
+        self.assertEqual(access_log.flush(), 2)
+        access_log.record(environ(), '200 OK', 12, 1444485336.5)
+        self.assertEqual(access_log.info()['buffered'], 1)
+
+    def test_disabled_logger(self):
+        access_log, handler = self.access_log()
+        access_log.logger.setLevel(logging.WARNING)
+        access_log.record(environ(), '200 OK', 12, 1444485336.5)
+        self.assertEqual(access_log.flush(), 1)
+        self.assertFalse(handler.messages)
+        self.assertEqual(access_log.info()['buffered'], 0)
+
+    def test_thread(self):
+        access_log, handler = self.access_log(interval=60)
+        access_log.start()
+        access_log.record(environ(), '200 OK', 12, 1444485336.5)
+        access_log.stop()
+        self.assertEqual(len(handler.messages), 1)
+        self.assertEqual(access_log.logged, 1)
+        # start again
+        access_log.start()
+        access_log.record(environ(), '200 OK', 12, 1444485336.5)
+        access_log.stop()
+        self.assertEqual(access_log.logged, 2)
+
+    def get(self, address):
+        sock = socket.create_connection(address, timeout=5)
+        try:
+            sock.sendall(b'GET /hello HTTP/1.1\r\nHost: 127.0.0.1\r\n'
+                         b'Connection: close\r\n\r\n')
+            data = b''
+            while True:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+        finally:
+            sock.close()
+        return data
+
+    def test_server(self):
+        access_log, handler = self.access_log('json')
+        app = wsgi.WSGIServer(hello, parse_console=False)
+        loop = get_event_loop()
+        server = TcpServer(app.protocol_factory(), loop,
+                           address=('127.0.0.1', 0))
+        server.access_log = access_log
+        yield from server.start_serving()
+        try:
+            data = yield from loop.run_in_executor(None, self.get,
+                                                   server.address)
+        finally:
+            yield from server.close()
+        self.assertTrue(data.endswith(b'\r\n\r\nHello World!'))
+        access_log.flush()
+        data = json.loads(handler.messages[0])
+        self.assertEqual(data['uri'], '/hello')
+        self.assertEqual(data['status'], 200)
+        self.assertEqual(data['bytes'], 12)
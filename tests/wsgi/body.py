@@ -0,0 +1,160 @@
+'''Tests the flow control of request bodies read by a WSGI application.'''
+import socket
+import unittest
+
+from pulsar import asyncio, async, get_event_loop, TcpServer
+from pulsar.apps import wsgi
+from pulsar.apps.wsgi.server import StreamReader
+from pulsar.utils.httpurl import Headers, http_parser
+
+
+BLOCK = bytes(range(256))*256
+BLOCKS = 64
+
+
+def respond(start_response, data):
+    data = data.encode('utf-8')
+    start_response('200 OK', [('Content-Length', str(len(data)))])
+    return [data]
+
+
+class SlowConsumer(object):
+    '''Read the body chunk by chunk and record the bytes buffered by the
+    stream.'''
+    def __init__(self):
+        self.buffered = []
+        self.called = 0
+
+    def __call__(self, environ, start_response):
+        self.called += 1
+        return async(self.consume(environ, start_response))
+
+    def consume(self, environ, start_response):
+        stream = environ['wsgi.input']
+        size = 0
+        while True:
+            chunk = yield from stream.next_chunk()
+            if not chunk:
+                break
+            size += len(chunk)
+            self.buffered.append(stream._buffered)
+            yield from asyncio.sleep(0.001)
+        return respond(start_response, str(size))
+
+
+class TestBodyFlowControl(unittest.TestCase):
+
+    def server(self, callable, **params):
+        app = wsgi.WSGIServer(callable, parse_console=False, **params)
+        server = TcpServer(app.protocol_factory(), get_event_loop(),
+                           address=('127.0.0.1', 0))
+        yield from server.start_serving()
+        return server
+
+    def post(self, address, headers=None, chunked=False, blocks=BLOCKS):
+        sock = socket.create_connection(address, timeout=5)
+        if headers is None:
+            headers = 'Content-Length: %d\r\n' % (blocks*len(BLOCK))
+        if 'Connection' not in headers:
+            headers += 'Connection: close\r\n'
+        try:
+            sock.sendall(('POST / HTTP/1.1\r\nHost: 127.0.0.1\r\n%s'
+                          '\r\n' % headers).encode())
+            try:
+                for _ in range(blocks):
+                    if chunked:
+                        sock.sendall(('%X\r\n' % len(BLOCK)).encode() +
+                                     BLOCK + b'\r\n')
+                    else:
+                        sock.sendall(BLOCK)
+                if chunked:
+                    sock.sendall(b'0\r\n\r\n')
+            except socket.error:
+                # the server responded and closed the connection
+                pass
+            data = b''
+            while True:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+        finally:
+            sock.close()
+        return data.split(b'\r\n\r\n', 1)
+
+    def run_post(self, server, *args, **kw):
+        try:
+            return (yield from get_event_loop().run_in_executor(
+                None, lambda: self.post(server.address, *args, **kw)))
+        finally:
+            yield from server.close()
+
+    def test_slow_consumer(self):
+        consumer = SlowConsumer()
+        server = yield from self.server(consumer,
+                                        http_body_buffer=len(BLOCK))
+        head, body = yield from self.run_post(server)
+        self.assertTrue(head.startswith(b'HTTP/1.1 200'))
+        self.assertEqual(int(body), BLOCKS*len(BLOCK))
+        # reading was paused while the buffer was full
+        self.assertTrue(max(consumer.buffered) <= 3*len(BLOCK))
+
+    def test_content_length_too_large(self):
+        consumer = SlowConsumer()
+        server = yield from self.server(consumer,
+                                        http_max_body_size=len(BLOCK))
+        head, body = yield from self.run_post(server)
+        self.assertTrue(head.startswith(b'HTTP/1.1 413'))
+        self.assertEqual(consumer.called, 0)
+
+    def test_invalid_content_length(self):
+        headers = Headers([('Content-Length', 'ten')], kind='client')
+        stream = StreamReader(headers, http_parser(kind=0), max_size=10)
+        self.assertEqual(stream.error.status, 400)
+        headers = Headers([('Content-Length', '11')], kind='client')
+        stream = StreamReader(headers, http_parser(kind=0), max_size=10)
+        self.assertEqual(stream.error.status, 413)
+        consumer = SlowConsumer()
+        server = yield from self.server(consumer,
+                                        http_max_body_size=len(BLOCK))
+        head, body = yield from self.run_post(
+            server, 'Content-Length: ten\r\n', blocks=0)
+        self.assertTrue(head.startswith(b'HTTP/1.1 400'))
+        self.assertEqual(consumer.called, 0)
+
+    def test_chunked_too_large(self):
+        consumer = SlowConsumer()
+        server = yield from self.server(consumer,
+                                        http_max_body_size=len(BLOCK))
+        head, body = yield from self.run_post(
+            server, 'Transfer-Encoding: chunked\r\n', chunked=True)
+        self.assertTrue(head.startswith(b'HTTP/1.1 413'))
+        self.assertEqual(consumer.called, 1)
+
+    def test_read(self):
+        # reading the whole body lifts the limit of the buffer
+        def echo_size(environ, start_response):
+            body = environ['wsgi.input'].read()
+            if not isinstance(body, bytes):
+                body = yield from body
+            return respond(start_response, str(len(body)))
+
+        def app(environ, start_response):
+            return async(echo_size(environ, start_response))
+
+        server = yield from self.server(app, http_body_buffer=len(BLOCK))
+        head, body = yield from self.run_post(server)
+        self.assertTrue(head.startswith(b'HTTP/1.1 200'))
+        self.assertEqual(int(body), BLOCKS*len(BLOCK))
+
+    def test_unread_body(self):
+        # a response sent before reading the body closes the connection
+        def app(environ, start_response):
+            return respond(start_response, 'ok')
+
+        server = yield from self.server(app, http_body_buffer=len(BLOCK))
+        head, body = yield from self.run_post(
+            server, 'Content-Length: %d\r\nConnection: keep-alive\r\n' %
+            (BLOCKS*len(BLOCK)))
+        self.assertTrue(head.startswith(b'HTTP/1.1 200'))
+        self.assertEqual(body, b'ok')
@@ -0,0 +1,277 @@
+'''Tests the response cache middleware.'''
+import json
+import time
+import pickle
+import unittest
+
+import pulsar
+from pulsar import asyncio, async, Future
+from pulsar.apps import wsgi
+from pulsar.apps.wsgi import cache as wsgi_cache
+from pulsar.apps.ds import PulsarDS
+from pulsar.apps.data import create_store
+from pulsar.utils.httpurl import http_date
+
+
+class Resource(object):
+    '''A middleware counting its calls and responding with their number.'''
+    def __init__(self, headers=None, status=200, wait=None):
+        self.headers = headers or [('Cache-Control', 'max-age=60')]
+        self.status = status
+        self.wait = wait
+        self.called = 0
+
+    def __call__(self, environ, start_response):
+        self.called += 1
+        response = wsgi.WsgiResponse(self.status, str(self.called),
+                                     list(self.headers), environ=environ)
+        if self.wait is not None:
+            return async(self.respond(response, self.wait))
+        return response
+
+    def respond(self, response, wait):
+        yield from wait
+        return response
+
+
+def get(cache, path='/', method='GET', **headers):
+    environ = wsgi.test_wsgi_environ(path, method,
+                                     headers=list(headers.items()))
+    return cache(environ, None)
+
+
+class TestCacheMiddleware(unittest.TestCase):
+
+    def test_hit(self):
+        resource = Resource()
+        cache = wsgi.CacheMiddleware(resource)
+        self.assertEqual(get(cache).content, (b'1',))
+        response = get(cache)
+        self.assertEqual(response.content, (b'1',))
+        self.assertEqual(response.headers['age'], '0')
+        self.assertEqual(get(cache, '/other').content, (b'2',))
+        self.assertEqual(get(cache, method='HEAD').content, (b'1',))
+        self.assertEqual(get(cache, method='POST').content, (b'3',))
+        info = cache.info()
+        self.assertEqual(info['hits'], 2)
+        self.assertEqual(info['misses'], 2)
+        self.assertEqual(info['stored'], 2)
+        self.assertEqual(info['cache']['hits'], 2)
+
+    def test_default_ttl(self):
+        resource = Resource([('Content-Type', 'text/plain')])
+        cache = wsgi.CacheMiddleware(resource)
+        get(cache)
+        self.assertEqual(get(cache).content, (b'2',))
+        cache = wsgi.CacheMiddleware(resource, ttl=60)
+        get(cache)
+        self.assertEqual(get(cache).content, (b'3',))
+
+    def test_expires(self):
+        resource = Resource([('Date', http_date(time.time())),
+                             ('Expires', http_date(time.time() + 60))])
+        cache = wsgi.CacheMiddleware(resource)
+        get(cache)
+        self.assertEqual(get(cache).content, (b'1',))
+
+    def test_uncacheable(self):
+        for headers in ([('Cache-Control', 'private, max-age=60')],
+                        [('Cache-Control', 'no-store')],
+                        [('Cache-Control', 'max-age=60'),
+                         ('Set-Cookie', 'a=b')],
+                        [('Cache-Control', 'max-age=60'), ('Vary', '*')]):
+            cache = wsgi.CacheMiddleware(Resource(headers))
+            get(cache)
+            self.assertEqual(get(cache).content, (b'2',))
+            self.assertEqual(cache.info()['uncacheable'], 2)
+        cache = wsgi.CacheMiddleware(Resource(status=500))
+        get(cache)
+        self.assertEqual(get(cache).content, (b'2',))
+
+    def test_request_directives(self):
+        cache = wsgi.CacheMiddleware(Resource())
+        get(cache)
+        response = get(cache, cache_control='no-store')
+        self.assertEqual(response.content, (b'2',))
+        response = get(cache, cache_control='no-cache')
+        self.assertEqual(response.content, (b'3',))
+        self.assertEqual(get(cache).content, (b'3',))
+        response = get(cache, authorization='Basic Zm9vOmJhcg==')
+        self.assertEqual(response.content, (b'4',))
+        self.assertEqual(cache.info()['bypassed'], 2)
+
+    def test_vary(self):
+        resource = Resource([('Cache-Control', 'max-age=60'),
+                             ('Vary', 'Accept-Encoding')])
+        cache = wsgi.CacheMiddleware(resource)
+        get(cache, accept_encoding='gzip')
+        get(cache, accept_encoding='identity')
+        response = get(cache, accept_encoding='gzip')
+        self.assertEqual(response.content, (b'1',))
+        response = get(cache, accept_encoding='identity')
+        self.assertEqual(response.content, (b'2',))
+        self.assertEqual(get(cache).content, (b'3',))
+        self.assertEqual(resource.called, 3)
+
+    def test_if_none_match(self):
+        resource = Resource([('Cache-Control', 'max-age=60'),
+                             ('ETag', '"abc"')])
+        cache = wsgi.CacheMiddleware(resource)
+        get(cache)
+        response = get(cache, if_none_match='"xyz", "abc"')
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, ())
+        self.assertEqual(response.headers['etag'], '"abc"')
+        response = get(cache, if_none_match='"xyz"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(cache.info()['not_modified'], 1)
+        self.assertEqual(resource.called, 1)
+
+    def test_if_modified_since(self):
+        modified = time.time() - 100
+        resource = Resource([('Cache-Control', 'max-age=60'),
+                             ('Last-Modified', http_date(modified))])
+        cache = wsgi.CacheMiddleware(resource)
+        get(cache)
+        response = get(cache, if_modified_since=http_date(modified))
+        self.assertEqual(response.status_code, 304)
+        response = get(cache, if_modified_since=http_date(modified - 10))
+        self.assertEqual(response.status_code, 200)
+
+    def test_stale_while_revalidate(self):
+        resource = Resource([('Cache-Control',
+                              'max-age=10, stale-while-revalidate=30')])
+        cache = wsgi.CacheMiddleware(resource)
+        get(cache)
+        entry = cache.cache.get(cache.key(wsgi.test_wsgi_environ()))
+        entry.created -= 20
+        # the stale response is served while a new one is computed
+        self.assertEqual(get(cache).content, (b'1',))
+        self.assertEqual(get(cache).content, (b'1',))
+        yield from asyncio.sleep(0.05)
+        self.assertEqual(get(cache).content, (b'2',))
+        info = cache.info()
+        self.assertEqual(info['stale'], 2)
+        self.assertEqual(info['revalidations'], 1)
+        # expired
+        entry = cache.cache.get(cache.key(wsgi.test_wsgi_environ()))
+        entry.created -= 100
+        self.assertEqual(get(cache).content, (b'3',))
+
+    def test_coalesce(self):
+        wait = Future()
+        resource = Resource(wait=wait)
+        cache = wsgi.CacheMiddleware(resource)
+        first = get(cache)
+        second = get(cache)
+        third = get(cache, '/other')
+        self.assertEqual(resource.called, 2)
+        wait.set_result(None)
+        response = yield from first
+        self.assertEqual(response.content, (b'1',))
+        response = yield from second
+        self.assertEqual(response.content, (b'1',))
+        response = yield from third
+        self.assertEqual(response.content, (b'2',))
+        self.assertEqual(cache.info()['coalesced'], 1)
+
+    def test_coalesce_uncacheable(self):
+        wait = Future()
+        resource = Resource([('Cache-Control', 'no-store')], wait=wait)
+        cache = wsgi.CacheMiddleware(resource)
+        first = get(cache)
+        second = get(cache)
+        wait.set_result(None)
+        yield from first
+        response = yield from second
+        self.assertEqual(response.content, (b'2',))
+
+    def test_error(self):
+        wait = Future()
+        resource = Resource(wait=wait)
+        cache = wsgi.CacheMiddleware(resource)
+        first = get(cache)
+        second = get(cache)
+        resource.wait = None
+        wait.set_exception(ValueError('bad'))
+        try:
+            yield from first
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('ValueError not raised')
+        response = yield from second
+        self.assertEqual(response.content, (b'2',))
+        self.assertFalse(cache._flights)
+
+    def test_maxweight(self):
+        resource = Resource()
+        cache = wsgi.CacheMiddleware(resource, maxweight=10)
+        get(cache)
+        self.assertEqual(get(cache).content, (b'2',))
+
+
+class TestSerialization(unittest.TestCase):
+
+    def entry(self):
+        response = wsgi.WsgiResponse(200, b'\x00\xffbody',
+                                     [('ETag', '"abc"'),
+                                      ('Last-Modified', http_date(1000)),
+                                      ('Cache-Control', 'max-age=60')])
+        return wsgi_cache.CacheEntry(response, 1444485336.5, 60, 10)
+
+    def test_entry(self):
+        entry = self.entry()
+        loaded = wsgi_cache.loads(wsgi_cache.dumps(entry).encode('utf-8'))
+        self.assertTrue(isinstance(loaded, wsgi_cache.CacheEntry))
+        for name in wsgi_cache.CacheEntry.__slots__:
+            self.assertEqual(getattr(loaded, name), getattr(entry, name))
+        self.assertEqual(loaded.body, b'\x00\xffbody')
+        self.assertEqual(loaded.weight, entry.weight)
+
+    def test_variants(self):
+        variants = wsgi_cache.Variants(['Accept'])
+        loaded = wsgi_cache.loads(wsgi_cache.dumps(variants))
+        self.assertTrue(isinstance(loaded, wsgi_cache.Variants))
+        self.assertEqual(loaded.headers, ['Accept'])
+
+    def test_invalid(self):
+        data = json.loads(wsgi_cache.dumps(self.entry()))
+        data['response']['headers'] = [['ETag', 1]]
+        for value in (pickle.dumps(self.entry().to_json()), b'\xff', b'[]',
+                      b'"response"', b'{"variants": [1]}',
+                      json.dumps(data).encode('utf-8')):
+            self.assertEqual(wsgi_cache.loads(value), None)
+
+
+class TestSharedCache(unittest.TestCase):
+    app_cfg = None
+
+    @classmethod
+    def setUpClass(cls):
+        server = PulsarDS(name=cls.__name__.lower(), bind='127.0.0.1:0',
+                          concurrency=cls.cfg.concurrency)
+        cls.app_cfg = yield from pulsar.send('arbiter', 'run', server)
+        cls.uri = 'pulsar://%s:%s/7' % cls.app_cfg.addresses[0]
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.app_cfg is not None:
+            return pulsar.send('arbiter', 'kill_actor', cls.app_cfg.name)
+
+    def test_shared(self):
+        resource = Resource([('Cache-Control', 'max-age=60'),
+                             ('Vary', 'Accept')])
+        store = create_store(self.uri, namespace='sharedcache')
+        cache1 = wsgi.CacheMiddleware(resource, store=store)
+        cache2 = wsgi.CacheMiddleware(resource, store=store)
+        response = yield from get(cache1, accept='text/html')
+        self.assertEqual(response.content, (b'1',))
+        # give time to the store to set the values
+        yield from asyncio.sleep(0.1)
+        response = yield from get(cache2, accept='text/html')
+        self.assertEqual(response.content, (b'1',))
+        self.assertEqual(cache2.info()['hits'], 1)
+        response = yield from get(cache2, accept='text/plain')
+        self.assertEqual(response.content, (b'2',))
+        self.assertEqual(resource.called, 2)
@@ -0,0 +1,101 @@
+'''Tests the GZipMiddleware in pulsar.apps.wsgi'''
+import gzip
+import unittest
+
+from pulsar.apps import wsgi
+
+
+TEXT = b'Hello World! '*100
+
+
+class TestGZipMiddleware(unittest.TestCase):
+
+    def environ(self, accept='gzip, deflate', path='/'):
+        headers = [('Accept-Encoding', accept)] if accept else None
+        return wsgi.test_wsgi_environ(path, headers=headers)
+
+    def compress(self, response, middleware=None, **kw):
+        middleware = middleware or wsgi.GZipMiddleware()
+        return middleware(self.environ(**kw), response)
+
+    def test_compress(self):
+        response = self.compress(wsgi.WsgiResponse(200, TEXT))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(b''.join(response.content)), TEXT)
+
+    def test_not_accepted(self):
+        for accept in (None, 'deflate', 'gzip;q=0', 'gzip;q=0.5, identity',
+                       '*;q=0, identity'):
+            response = self.compress(wsgi.WsgiResponse(200, TEXT),
+                                     accept=accept)
+            self.assertFalse('Content-Encoding' in response)
+            self.assertEqual(response.content, (TEXT,))
+        response = self.compress(wsgi.WsgiResponse(200, TEXT),
+                                 accept='*')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_short_content(self):
+        response = self.compress(wsgi.WsgiResponse(200, b'Hello'))
+        self.assertFalse('Content-Encoding' in response)
+
+    def test_stream(self):
+        chunks = [b'Hello', 'World', TEXT]
+        response = self.compress(wsgi.WsgiResponse(200, iter(chunks)))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        compressed = list(response)
+        # flushed after every chunk
+        self.assertEqual(len(compressed), 4)
+        self.assertEqual(gzip.decompress(b''.join(compressed)),
+                         b'HelloWorld' + TEXT)
+        response.close()
+        self.assertFalse('Content-Length' in dict(response.get_headers()))
+
+    def test_stream_flush_size(self):
+        chunks = [b'a'*100]*10
+        middleware = wsgi.GZipMiddleware(flush_size=500)
+        response = self.compress(wsgi.WsgiResponse(200, iter(chunks)),
+                                 middleware)
+        compressed = list(response)
+        # the gzip header, two flushes and the trailer
+        self.assertEqual(len(compressed), 4)
+        self.assertEqual(gzip.decompress(b''.join(compressed)),
+                         b''.join(chunks))
+
+    def test_levels(self):
+        middleware = wsgi.GZipMiddleware(level=5, levels={'text/html': 2})
+        response = wsgi.WsgiResponse(200, TEXT, content_type='text/css')
+        self.assertEqual(middleware.compress_level(response), 9)
+        response.content_type = 'text/html; charset=utf-8'
+        self.assertEqual(middleware.compress_level(response), 2)
+        response.content_type = 'text/plain'
+        self.assertEqual(middleware.compress_level(response), 5)
+        self.assertFalse('text/html' in wsgi.GZipMiddleware.content_levels)
+
+    def test_etag_cache(self):
+        middleware = wsgi.GZipMiddleware()
+        for _ in range(2):
+            response = wsgi.WsgiResponse(200, TEXT)
+            response['ETag'] = '"abc"'
+            response = self.compress(response, middleware)
+            self.assertEqual(response['ETag'], 'W/"abc"')
+            self.assertEqual(gzip.decompress(response.content[0]), TEXT)
+        info = middleware.cache.info()
+        self.assertEqual(info['hits'], 1)
+        self.assertEqual(info['size'], 1)
+        # weak ETags are not cached
+        response = wsgi.WsgiResponse(200, TEXT)
+        response['ETag'] = 'W/"abd"'
+        self.compress(response, middleware)
+        self.assertEqual(middleware.cache.info()['size'], 1)
+
+    def test_stream_etag(self):
+        middleware = wsgi.GZipMiddleware()
+        response = wsgi.WsgiResponse(200, iter([TEXT]))
+        response['ETag'] = '"abc"'
+        response['Accept-Ranges'] = 'bytes'
+        response = self.compress(response, middleware)
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertFalse('Accept-Ranges' in response)
+        self.assertEqual(gzip.decompress(b''.join(response)), TEXT)
+        self.assertEqual(middleware.cache.info()['size'], 0)
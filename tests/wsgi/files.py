@@ -0,0 +1,285 @@
+'''Tests the file serving utilities in pulsar.apps.wsgi'''
+import io
+import gzip
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+
+from pulsar import get_event_loop, TcpServer
+from pulsar.apps import wsgi
+from pulsar.apps.wsgi import (FileWrapper, FileCache, etag_match,
+                              parse_range)
+
+
+DATA = bytes(range(256))*64
+
+
+class TestFileUtils(unittest.TestCase):
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), [(0, 100)])
+        self.assertEqual(parse_range('bytes=900-', 1000), [(900, 1000)])
+        self.assertEqual(parse_range('bytes=-100', 1000), [(900, 1000)])
+        self.assertEqual(parse_range('bytes=990-2000', 1000), [(990, 1000)])
+        self.assertEqual(parse_range('bytes=0-0, -1', 1000),
+                         [(0, 1), (999, 1000)])
+        self.assertEqual(parse_range('bytes=-2000', 1000), [(0, 1000)])
+
+    def test_parse_range_unsatisfiable(self):
+        self.assertEqual(parse_range('bytes=1000-', 1000), [])
+        self.assertEqual(parse_range('bytes=-0', 1000), [])
+
+    def test_parse_range_invalid(self):
+        self.assertEqual(parse_range('items=0-10', 1000), None)
+        self.assertEqual(parse_range('bytes=10-5', 1000), None)
+        self.assertEqual(parse_range('bytes=a-5', 1000), None)
+        self.assertEqual(parse_range('bytes=-', 1000), None)
+        self.assertEqual(parse_range('bytes=' + ','.join(['0-1']*17), 1000),
+                         None)
+
+    def test_etag_match(self):
+        self.assertTrue(etag_match('"a", "b"', '"b"'))
+        self.assertTrue(etag_match('*', '"b"'))
+        self.assertFalse(etag_match('"a"', '"b"'))
+        self.assertTrue(etag_match('W/"a"', '"a"'))
+        self.assertTrue(etag_match('"a"', 'W/"a"'))
+        self.assertFalse(etag_match('W/"a"', '"a"', weak=False))
+        self.assertFalse(etag_match('"a"', 'W/"a"', weak=False))
+        self.assertTrue(etag_match('"a"', '"a"', weak=False))
+
+    def test_file_wrapper(self):
+        wrapper = FileWrapper(io.BytesIO(DATA), block_size=1000,
+                              offset=100, count=2500)
+        self.assertEqual(len(wrapper), 2500)
+        chunks = list(wrapper)
+        self.assertEqual([len(c) for c in chunks], [1000, 1000, 500])
+        self.assertEqual(b''.join(chunks), DATA[100:2600])
+        wrapper = FileWrapper(io.BytesIO(DATA))
+        self.assertRaises(TypeError, len, wrapper)
+        self.assertEqual(b''.join(wrapper), DATA)
+        wrapper.close()
+        self.assertTrue(wrapper.file.closed)
+
+    def test_file_wrappers_shared_file(self):
+        file = io.BytesIO(DATA)
+        ranges = [FileWrapper(file, offset=50, count=5),
+                  FileWrapper(file, offset=0, count=5)]
+        self.assertEqual([b''.join(w) for w in ranges],
+                         [DATA[50:55], DATA[:5]])
+
+
+class TestMediaFiles(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.path = tempfile.mkdtemp()
+        for name, size in (('small.bin', 1000), ('large.bin', len(DATA))):
+            with open(os.path.join(cls.path, name), 'wb') as f:
+                f.write(DATA[:size])
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.path)
+
+    def router(self):
+        router = wsgi.MediaRouter('/media', self.path)
+        router.file_cache = FileCache(max_file_size=1000)
+        return router
+
+    def get(self, name, router=None, **headers):
+        router = router or self.router()
+        headers = [(k.replace('_', '-'), v) for k, v in headers.items()]
+        environ = wsgi.test_wsgi_environ('/media/%s' % name, headers=headers)
+        request = wsgi.WsgiRequest(environ, router, {'path': name})
+        return router.get(request)
+
+    def content(self, response):
+        try:
+            return b''.join(bytes(c) if not isinstance(c, FileWrapper)
+                            else b''.join(c) for c in response.content)
+        finally:
+            response.close()
+
+    def test_cached_file(self):
+        router = self.router()
+        response = self.get('small.bin', router)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertTrue(response['ETag'])
+        self.assertEqual(self.content(response), DATA[:1000])
+        self.get('small.bin', router)
+        info = router.file_cache.info()
+        self.assertEqual(info['contents']['hits'], 1)
+        # the file and its missing .gz sibling
+        self.assertEqual(info['stats']['hits'], 2)
+
+    def test_large_file(self):
+        response = self.get('large.bin')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.content), 1)
+        self.assertTrue(isinstance(response.content[0], FileWrapper))
+        self.assertEqual(response.length(), len(DATA))
+        self.assertEqual(self.content(response), DATA)
+
+    def test_if_none_match(self):
+        response = self.get('large.bin')
+        response.close()
+        etag = response['ETag']
+        response = self.get('large.bin', if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.get('large.bin', if_none_match='"x", %s' % etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.get('large.bin', if_none_match='"x"')
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_single_range(self):
+        for name in ('small.bin', 'large.bin'):
+            response = self.get(name, range='bytes=100-199')
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(response['Content-Range'], 'bytes 100-199/%d' %
+                             os.path.getsize(os.path.join(self.path, name)))
+            self.assertEqual(self.content(response), DATA[100:200])
+
+    def test_multiple_ranges(self):
+        response = self.get('large.bin', range='bytes=0-9,-10')
+        self.assertEqual(response.status_code, 206)
+        content_type = response.content_type
+        self.assertTrue(content_type.startswith('multipart/byteranges'))
+        boundary = content_type.split('boundary=')[1]
+        body = self.content(response)
+        parts = body.split(('--%s' % boundary).encode('latin-1'))
+        self.assertEqual(parts[0], b'')
+        self.assertEqual(parts[-1], b'--\r\n')
+        head, data = parts[1].split(b'\r\n\r\n', 1)
+        self.assertTrue(b'Content-Range: bytes 0-9/%d' % len(DATA) in head)
+        self.assertEqual(data, DATA[:10] + b'\r\n')
+        head, data = parts[2].split(b'\r\n\r\n', 1)
+        self.assertEqual(data, DATA[-10:] + b'\r\n')
+
+    def test_unsatisfiable_range(self):
+        response = self.get('small.bin', range='bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1000')
+
+    def test_if_range(self):
+        response = self.get('small.bin', range='bytes=0-9',
+                            if_range='"other"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.content(response), DATA[:1000])
+
+
+class TestSendFiles(unittest.TestCase):
+    '''Files served by a :class:`.WSGIServer`.'''
+    @classmethod
+    def setUpClass(cls):
+        cls.path = tempfile.mkdtemp()
+        with open(os.path.join(cls.path, 'large.bin'), 'wb') as f:
+            for _ in range(64):
+                f.write(DATA)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.path)
+
+    def server(self, callable=None):
+        if callable is None:
+            callable = wsgi.WsgiHandler([wsgi.MediaRouter('/media',
+                                                          self.path)])
+        app = wsgi.WSGIServer(callable, parse_console=False)
+        server = TcpServer(app.protocol_factory(), get_event_loop(),
+                           address=('127.0.0.1', 0))
+        yield from server.start_serving()
+        return server
+
+    def get(self, address, headers=b'', protocol=b'HTTP/1.1'):
+        sock = socket.create_connection(address, timeout=5)
+        try:
+            sock.sendall(b'GET /media/large.bin ' + protocol + b'\r\n'
+                         b'Host: 127.0.0.1\r\n' + headers +
+                         b'Connection: close\r\n\r\n')
+            data = b''
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+        finally:
+            sock.close()
+        return data.split(b'\r\n\r\n', 1)
+
+    def test_sendfile(self):
+        server = yield from self.server()
+        try:
+            head, body = yield from get_event_loop().run_in_executor(
+                None, self.get, server.address)
+        finally:
+            yield from server.close()
+        self.assertTrue(head.startswith(b'HTTP/1.1 200'))
+        self.assertTrue(b'Content-Length: %d' % (64*len(DATA)) in head)
+        self.assertEqual(body, DATA*64)
+
+    def test_range(self):
+        server = yield from self.server()
+        try:
+            head, body = yield from get_event_loop().run_in_executor(
+                None, self.get, server.address, b'Range: bytes=-100\r\n')
+        finally:
+            yield from server.close()
+        self.assertTrue(head.startswith(b'HTTP/1.1 206'))
+        self.assertEqual(body, DATA[-100:])
+
+    def test_stream_wrapper(self):
+        # a file without descriptor is sent in blocks to HTTP/1.0 clients
+        def app(environ, start_response):
+            start_response('200 OK', [])
+            return environ['wsgi.file_wrapper'](io.BytesIO(DATA))
+
+        server = yield from self.server(app)
+        try:
+            head, body = yield from get_event_loop().run_in_executor(
+                None, self.get, server.address, b'', b'HTTP/1.0')
+        finally:
+            yield from server.close()
+        self.assertTrue(head.startswith(b'HTTP/1.0 200'))
+        self.assertEqual(body, DATA)
+
+
+class TestGzipFiles(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.path = tempfile.mkdtemp()
+        with open(os.path.join(cls.path, 'app.js'), 'wb') as f:
+            f.write(b'var x = 1;'*100)
+        with open(os.path.join(cls.path, 'app.js.gz'), 'wb') as f:
+            f.write(gzip.compress(b'var x = 1;'*100))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.path)
+
+    def get(self, accept=None):
+        router = wsgi.MediaRouter('/media', self.path)
+        headers = [('Accept-Encoding', accept)] if accept else None
+        environ = wsgi.test_wsgi_environ('/media/app.js', headers=headers)
+        request = wsgi.WsgiRequest(environ, router, {'path': 'app.js'})
+        response = router.get(request)
+        content = b''.join(response.content)
+        response.close()
+        return response, content
+
+    def test_gzip_sibling(self):
+        response, content = self.get('gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertTrue('javascript' in response.content_type)
+        self.assertEqual(gzip.decompress(content), b'var x = 1;'*100)
+
+    def test_gzip_not_accepted(self):
+        response, content = self.get('gzip;q=0')
+        self.assertFalse('Content-Encoding' in response)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(content, b'var x = 1;'*100)
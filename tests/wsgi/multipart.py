@@ -0,0 +1,151 @@
+'''Tests the streaming of multipart/form-data request bodies.'''
+import socket
+import unittest
+
+from pulsar import HttpException, get_event_loop, chain_future, TcpServer
+from pulsar.apps import wsgi
+
+
+BOUNDARY = 'xYzZY'
+FILE = bytes(range(256))*2048
+
+
+def body(*parts):
+    data = []
+    for name, value, filename in parts:
+        disposition = 'form-data; name="%s"' % name
+        if filename:
+            disposition += '; filename="%s"' % filename
+        data.append(('--%s\r\nContent-Disposition: %s\r\n\r\n' %
+                     (BOUNDARY, disposition)).encode('latin1'))
+        data.append(value + b'\r\n')
+    data.append(('--%s--\r\n' % BOUNDARY).encode('latin1'))
+    return b''.join(data)
+
+
+BODY = body(('a', b'hello', None), ('upload', FILE, 'data.bin'))
+CONTENT_TYPE = 'multipart/form-data; boundary=%s' % BOUNDARY
+
+
+def upload(environ, start_response):
+    '''Respond with the name, size and buffering of the uploaded parts.'''
+    request = wsgi.WsgiRequest(environ)
+
+    def respond(result):
+        forms, files = result
+        part = files['upload']
+        data = ('%s %d %s' % (forms['a'], part.size,
+                              part.is_buffered())).encode('utf-8')
+        start_response('200 OK', [('Content-Length', str(len(data)))])
+        return [data]
+
+    return chain_future(request.data_and_files(), callback=respond)
+
+
+class TestMultipartReader(unittest.TestCase):
+
+    def request(self, data=BODY, content_type=CONTENT_TYPE):
+        environ = wsgi.test_wsgi_environ(
+            method='POST', body=data,
+            headers=[('Content-Type', content_type)])
+        return wsgi.WsgiRequest(environ)
+
+    def test_next_part(self):
+        reader = self.request().multipart()
+        self.assertTrue(reader.done())
+        part = yield from reader.next_part()
+        self.assertEqual(part.name, 'a')
+        self.assertEqual(part.string(), 'hello')
+        part = yield from reader.next_part()
+        self.assertEqual(part.filename, 'data.bin')
+        self.assertEqual(part.file.read(), FILE)
+        part = yield from reader.next_part()
+        self.assertEqual(part, None)
+
+    def test_form_data(self):
+        request = self.request()
+        reader = request.multipart(memfile_limit=1024)
+        self.assertEqual(request.multipart(), reader)
+        forms, files = yield from reader.form_data()
+        self.assertEqual(forms['a'], 'hello')
+        self.assertFalse(files['upload'].is_buffered())
+
+    def test_limit(self):
+        reader = self.request().multipart(max_parts=1)
+        try:
+            yield from reader.form_data()
+        except HttpException as exc:
+            self.assertEqual(exc.status, 413)
+        else:
+            raise AssertionError('HttpException not raised')
+
+    def test_malformed(self):
+        reader = self.request(BODY[:-20]).multipart()
+        try:
+            yield from reader.form_data()
+        except HttpException as exc:
+            self.assertEqual(exc.status, 400)
+        else:
+            raise AssertionError('HttpException not raised')
+
+    def test_not_multipart(self):
+        request = self.request(b'a=1', 'application/x-www-form-urlencoded')
+        try:
+            request.multipart()
+        except HttpException as exc:
+            self.assertEqual(exc.status, 415)
+        else:
+            raise AssertionError('HttpException not raised')
+
+
+class TestStreamingUpload(unittest.TestCase):
+    '''Uploads to a :class:`.WSGIServer`, parsed as they are received.'''
+    def server(self):
+        app = wsgi.WSGIServer(upload, parse_console=False)
+        server = TcpServer(app.protocol_factory(), get_event_loop(),
+                           address=('127.0.0.1', 0))
+        yield from server.start_serving()
+        return server
+
+    def post(self, address, headers=b''):
+        sock = socket.create_connection(address, timeout=5)
+        try:
+            sock.sendall(b'POST / HTTP/1.1\r\n'
+                         b'Host: 127.0.0.1\r\n'
+                         b'Content-Type: ' + CONTENT_TYPE.encode() +
+                         b'\r\nContent-Length: ' + str(len(BODY)).encode() +
+                         b'\r\n' + headers + b'Connection: close\r\n\r\n')
+            if headers:
+                self.assertTrue(sock.recv(4096).startswith(b'HTTP/1.1 100'))
+            for i in range(0, len(BODY), 10000):
+                sock.sendall(BODY[i:i+10000])
+            data = b''
+            while True:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+        finally:
+            sock.close()
+        return data.split(b'\r\n\r\n', 1)
+
+    def test_upload(self):
+        server = yield from self.server()
+        try:
+            head, body = yield from get_event_loop().run_in_executor(
+                None, self.post, server.address)
+        finally:
+            yield from server.close()
+        self.assertTrue(head.startswith(b'HTTP/1.1 200'))
+        self.assertEqual(body, b'hello 524288 False')
+
+    def test_upload_expect(self):
+        server = yield from self.server()
+        try:
+            head, body = yield from get_event_loop().run_in_executor(
+                None, self.post, server.address,
+                b'Expect: 100-continue\r\n')
+        finally:
+            yield from server.close()
+        self.assertTrue(head.startswith(b'HTTP/1.1 200'))
+        self.assertEqual(body, b'hello 524288 False')
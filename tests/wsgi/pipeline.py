@@ -0,0 +1,110 @@
+'''Tests HTTP/1.1 pipelining of requests.'''
+import socket
+import unittest
+
+from pulsar import asyncio, async, get_event_loop, TcpServer
+from pulsar.apps import wsgi
+
+
+class Recorder(object):
+    '''Respond with the path after sleeping for the number of milliseconds
+    in the path and record the requests processed concurrently.'''
+    def __init__(self):
+        self.events = []
+        self.running = 0
+        self.concurrent = 0
+
+    def __call__(self, environ, start_response):
+        return async(self.respond(environ, start_response))
+
+    def respond(self, environ, start_response):
+        path = environ['PATH_INFO']
+        self.events.append(('start', path))
+        self.running += 1
+        self.concurrent = max(self.concurrent, self.running)
+        try:
+            yield from asyncio.sleep(int(path[1:] or 0)/1000)
+        finally:
+            self.running -= 1
+        self.events.append(('end', path))
+        data = ('%s %s' % (environ['REQUEST_METHOD'], path)).encode('utf-8')
+        start_response('200 OK', [('Content-Length', str(len(data)))])
+        return [data]
+
+
+def request(path, method='GET', last=False):
+    headers = 'Host: 127.0.0.1\r\n'
+    if method == 'POST':
+        headers += 'Content-Length: 4\r\n'
+    if last:
+        headers += 'Connection: close\r\n'
+    data = '%s %s HTTP/1.1\r\n%s\r\n' % (method, path, headers)
+    if method == 'POST':
+        data += 'body'
+    return data.encode('utf-8')
+
+
+class TestPipelining(unittest.TestCase):
+
+    def server(self, callable, **params):
+        app = wsgi.WSGIServer(callable, parse_console=False, **params)
+        server = TcpServer(app.protocol_factory(), get_event_loop(),
+                           address=('127.0.0.1', 0))
+        yield from server.start_serving()
+        return server
+
+    def send(self, address, data):
+        sock = socket.create_connection(address, timeout=5)
+        try:
+            sock.sendall(data)
+            data = b''
+            while True:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+        finally:
+            sock.close()
+        return [r.split(b'\r\n\r\n')[1]
+                for r in data.split(b'HTTP/1.1 ')[1:]]
+
+    def pipeline(self, requests, **params):
+        recorder = Recorder()
+        server = yield from self.server(recorder, **params)
+        data = b''.join(request(*r) for r in requests[:-1])
+        data += request(*requests[-1], last=True)
+        try:
+            bodies = yield from get_event_loop().run_in_executor(
+                None, self.send, server.address, data)
+        finally:
+            yield from server.close()
+        return recorder, bodies
+
+    def test_ordered_responses(self):
+        recorder, bodies = yield from self.pipeline([('/30',), ('/20',),
+                                                     ('/10',), ('/0',)])
+        self.assertEqual(bodies, [b'GET /30', b'GET /20', b'GET /10',
+                                  b'GET /0'])
+        self.assertEqual(recorder.concurrent, 4)
+
+    def test_depth(self):
+        recorder, bodies = yield from self.pipeline(
+            [('/20',), ('/10',), ('/0',)], http_pipeline_depth=2)
+        self.assertEqual(bodies, [b'GET /20', b'GET /10', b'GET /0'])
+        self.assertEqual(recorder.concurrent, 2)
+
+    def test_no_pipelining(self):
+        recorder, bodies = yield from self.pipeline(
+            [('/20',), ('/10',), ('/0',)], http_pipeline_depth=1)
+        self.assertEqual(bodies, [b'GET /20', b'GET /10', b'GET /0'])
+        self.assertEqual(recorder.concurrent, 1)
+
+    def test_unsafe_method(self):
+        recorder, bodies = yield from self.pipeline(
+            [('/20',), ('/10', 'POST'), ('/0',)])
+        self.assertEqual(bodies, [b'GET /20', b'POST /10', b'GET /0'])
+        # the POST waits for the responses before it and the GET which
+        # follows it for its response
+        self.assertEqual(recorder.events, [('start', '/20'), ('end', '/20'),
+                                           ('start', '/10'), ('end', '/10'),
+                                           ('start', '/0'), ('end', '/0')])
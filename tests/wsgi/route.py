@@ -1,6 +1,6 @@
 import unittest
 
-from pulsar.apps.wsgi import Route
+from pulsar.apps.wsgi import Route, RouteTrie
 
 
 class Routes(unittest.TestCase):
@@ -199,3 +199,48 @@ class Routes(unittest.TestCase):
         self.assertEqual(r.rule, '')
         self.assertEqual(r.url(), '/')
         self.assertEqual(r.path, '/')
+
+
+class TestRouteTrie(unittest.TestCase):
+    rules = ('', 'bla', 'bla/', 'bla/<id>', '<int:id>', '<int:id>/edit/',
+             '<float:f>', '<string(length=2):lang>/docs', 'files/<path:p>',
+             '<path:p>/edit', '<any(about, help):page>')
+    paths = ('', 'bla', 'bla/', 'bla/foo', 'bla/foo/', '5', '5/edit/',
+             '5/edit/more', '1.5', 'en/docs', 'eng/docs', 'files/a/b',
+             'files/', 'files', 'a/b/edit', 'about', 'help/', 'foo/')
+
+    def test_candidates(self):
+        trie = RouteTrie()
+        routes = [Route(rule) for rule in self.rules]
+        for route in routes:
+            trie.add(route, route)
+        self.assertEqual(len(trie), len(routes))
+        for path in self.paths:
+            candidates = trie.candidates(path)
+            # candidates are in the order they were added
+            self.assertEqual(candidates,
+                             [r for r in routes if r in candidates])
+            for route in routes:
+                if route.match(path) is not None:
+                    self.assertTrue(route in candidates, (route, path))
+        self.assertEqual(trie.candidates('bla'),
+                         [Route(''), Route('bla'), Route('<path:p>/edit')])
+        self.assertEqual(trie.candidates('5/edit/'),
+                         [Route(''), Route('<int:id>/edit/'),
+                          Route('<path:p>/edit')])
+
+    def test_partial(self):
+        trie = RouteTrie()
+        trie.add(Route('bla'), 1, partial=True)
+        trie.add(Route('bla'), 2)
+        self.assertEqual(trie.candidates('bla'), [1, 2])
+        self.assertEqual(trie.candidates('bla/foo'), [1])
+        self.assertEqual(trie.candidates('foo'), [])
+
+    def test_regex_route(self):
+        trie = RouteTrie()
+        trie.add(Route('api/foo', is_re=True), 1)
+        trie.add(Route('api/foo.json', is_re=True), 2)
+        self.assertEqual(trie.candidates('api/foo'), [1, 2])
+        self.assertEqual(trie.candidates('api/fooxjson'), [2])
+        self.assertEqual(trie.candidates('bla'), [])
@@ -62,6 +62,11 @@ class HttpBin3(HttpBin):
         return self.info_data_response(request)
 
 
+def routers(size=8):
+    # enough children for routers to dispatch paths with a RouteTrie
+    return [Router('r%d' % n) for n in range(size)]
+
+
 class TestRouter(unittest.TestCase):
 
     def router(self, path='/'):
@@ -221,3 +226,34 @@ class TestRouter(unittest.TestCase):
         self.assertTrue(child)
         self.assertTrue(child.get.__name__, 'get_elem')
         self.assertTrue(child.post.__name__, 'post_elem')
+
+    def test_resolve_compiled(self):
+        api = Router('api', Router('users'), Router('<int(max=10):id>'),
+                     *routers())
+        router = Router('/', api, Router('<id>'), *routers())
+        child, args = router.resolve('api/users')
+        self.assertEqual(child.path(), '/api/users')
+        child, args = router.resolve('api/5')
+        self.assertEqual(args, {'id': 5})
+        self.assertEqual(child.parent.path(), '/api')
+        # converters raising 404 fall back to the following routes
+        self.assertEqual(router.resolve('api/11'), None)
+        child, args = router.resolve('api')
+        self.assertEqual(child.path(), '/api')
+        child, args = router.resolve('foo')
+        self.assertEqual(args, {'id': 'foo'})
+        self.assertEqual(router.resolve('foo/bla'), None)
+
+    def test_resolve_add_child(self):
+        router = Router('/', Router('a'), *routers())
+        self.assertEqual(router.resolve('b'), None)
+        b = router.add_child(Router('b', *routers()))
+        self.assertEqual(router.resolve('b'), (b, {}))
+        c = b.add_child(Router('c'))
+        self.assertEqual(router.resolve('b/c'), (c, {}))
+        router.remove_child(b)
+        self.assertEqual(router.resolve('b'), None)
+        a = router.routes[0]
+        a.add_child(c)
+        self.assertEqual(router.resolve('a/c'), (c, {}))
+        self.assertEqual(b.resolve('b/c'), None)
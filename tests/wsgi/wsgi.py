@@ -1,6 +1,8 @@
 '''Tests the wsgi middleware in pulsar.apps.wsgi'''
+import io
 import time
 import pickle
+import socket
 import unittest
 from unittest import mock
 from datetime import datetime, timedelta
@@ -9,6 +11,7 @@ from urllib.parse import urlparse
 import pulsar
 from pulsar.apps import wsgi
 from pulsar.apps import http
+from pulsar.apps.wsgi import server
 from pulsar.utils.multipart import parse_form_data, MultipartError
 from pulsar.apps.wsgi.utils import cookie_date
 
@@ -244,3 +247,120 @@ class WsgiRequestTests(unittest.TestCase):
         response = request.redirect('/foo2', permanent=True)
         self.assertEqual(response.status_code, 301)
         self.assertEqual(response['location'], '/foo2')
+
+
+class WsgiEnvironTests(unittest.TestCase):
+
+    def environ(self, template, data, headers=None):
+        parser = server.http_parser(kind=0)
+        parser.execute(data, len(data))
+        return server.wsgi_environ(io.BytesIO(), parser,
+                                   server.Headers(headers, kind='client'),
+                                   ('127.0.0.1', 8060), None, server.Headers(),
+                                   template=template)
+
+    def test_environ_template(self):
+        template = server.environ_template(('10.0.0.1', 5000),
+                                           extra={'pulsar.cfg': 'cfg'})
+        saved = dict(template)
+        environ = self.environ(template, b'GET /a%20b?x=1 HTTP/1.1\r\n\r\n',
+                               [('host', 'localhost')])
+        self.assertEqual(environ['PATH_INFO'], '/a b')
+        self.assertEqual(environ['QUERY_STRING'], 'x=1')
+        self.assertEqual(environ['REMOTE_ADDR'], '10.0.0.1')
+        self.assertEqual(environ['REMOTE_PORT'], '5000')
+        self.assertEqual(environ['wsgi.url_scheme'], 'http')
+        self.assertEqual(environ['pulsar.cfg'], 'cfg')
+        self.assertFalse('HTTPS' in environ)
+        headers = [('host', 'localhost'), ('x-forwarded-for', '10.0.0.2'),
+                   ('x-forwarded-ssl', 'on')]
+        environ = self.environ(template, b'POST /b HTTP/1.1\r\n\r\n',
+                               headers)
+        self.assertEqual(environ['REQUEST_METHOD'], 'POST')
+        self.assertEqual(environ['PATH_INFO'], '/b')
+        self.assertEqual(environ['REMOTE_ADDR'], '10.0.0.2')
+        self.assertEqual(environ['REMOTE_PORT'], '80')
+        self.assertEqual(environ['wsgi.url_scheme'], 'https')
+        self.assertEqual(environ['HTTPS'], 'on')
+        # requests do not change the template
+        self.assertEqual(template, saved)
+
+    def test_environ_template_absolute_uri(self):
+        template = server.environ_template(('10.0.0.1', 5000), https=True)
+        environ = self.environ(template,
+                               b'GET http://foo.com:8000/c HTTP/1.1\r\n\r\n')
+        self.assertEqual(environ['PATH_INFO'], '/c')
+        self.assertEqual(environ['SERVER_PORT'], '8000')
+        self.assertEqual(environ['wsgi.url_scheme'], 'http')
+        self.assertFalse('HTTPS' in environ)
+        self.assertEqual(template['HTTPS'], 'on')
+
+    def test_server_name(self):
+        with mock.patch('socket.getfqdn', return_value='foo.local') as fqdn:
+            self.assertEqual(server.server_name('foo-test-name'), 'foo.local')
+            self.assertEqual(server.server_name('foo-test-name'), 'foo.local')
+        self.assertEqual(fqdn.call_count, 1)
+        self.assertEqual(server.server_name(''), '0.0.0.0')
+
+    def test_http_date_now(self):
+        with mock.patch('time.time', return_value=1000.2):
+            date = server.http_date_now()
+            self.assertEqual(date, server.format_date_time(1000))
+        with mock.patch('pulsar.apps.wsgi.server.format_date_time') as fmt:
+            with mock.patch('time.time', return_value=1000.7):
+                self.assertEqual(server.http_date_now(), date)
+            self.assertEqual(fmt.call_count, 0)
+            with mock.patch('time.time', return_value=1001.1):
+                server.http_date_now()
+            self.assertEqual(fmt.call_count, 1)
+
+    def test_chunked_response(self):
+        data = bytes(range(256))*1000
+
+        def app(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            yield data[:10]
+            yield data[10:]
+
+        def get(address):
+            sock = socket.create_connection(address, timeout=5)
+            try:
+                sock.sendall(b'GET / HTTP/1.1\r\nHost: 127.0.0.1\r\n'
+                             b'Connection: close\r\n\r\n')
+                body = b''
+                while True:
+                    chunk = sock.recv(65536)
+                    if not chunk:
+                        break
+                    body += chunk
+            finally:
+                sock.close()
+            return body.split(b'\r\n\r\n', 1)
+
+        app = wsgi.WSGIServer(app, parse_console=False)
+        loop = pulsar.get_event_loop()
+        srv = pulsar.TcpServer(app.protocol_factory(), loop,
+                               address=('127.0.0.1', 0))
+        yield from srv.start_serving()
+        try:
+            head, body = yield from loop.run_in_executor(None, get,
+                                                         srv.address)
+        finally:
+            yield from srv.close()
+        self.assertTrue(b'Transfer-Encoding: chunked' in head)
+        sizes = []
+        received = b''
+        while True:
+            size, body = body.split(b'\r\n', 1)
+            size = int(size, 16)
+            sizes.append(size)
+            received += body[:size]
+            self.assertEqual(body[size:size+2], b'\r\n')
+            body = body[size+2:]
+            if not size:
+                break
+        self.assertEqual(received, data)
+        self.assertEqual(body, b'')
+        n = len(data) - 10
+        self.assertEqual(sizes, [10] + [server.MAX_CHUNK_SIZE]*3 +
+                         [n - 3*server.MAX_CHUNK_SIZE, 0])